@@ -5,9 +5,21 @@ import eventlet
 eventlet.monkey_patch()
 
 from flask import Flask
-from app.modules.database import close_db
+from app.modules.database import close_db, init_pool, DB_POOL_DEFAULTS
 from app.modules.models import init_db, migrate_db
 from app.routes.__init__ import api_bp
+from app.modules.score_queue import start_score_queue, SCORE_QUEUE_DEFAULTS
+from app.modules.leaderboard import start_leaderboard_worker
+from app.modules.read_cache import configure_read_cache, READ_CACHE_DEFAULTS
+from app.modules.http_client import configure_http_client, HTTP_CLIENT_DEFAULTS
+from app.modules.vpin_integration import VPIN_IMPORT_DEFAULTS
+from app.modules.image_executor import configure_image_executor, IMAGE_EXECUTOR_DEFAULTS
+from app.modules.imageProcessor import configure_image_variants, IMAGE_VARIANT_DEFAULTS
+from app.modules.media import MEDIA_DEFAULTS
+from app.modules.frame_extractor import configure_frame_extractor, FRAME_EXTRACTOR_DEFAULTS
+from app.modules.vpspreadsheet import start_vps_refresher, VPS_REFRESH_DEFAULTS
+from app.modules.export_engine import EXPORT_DEFAULTS
+from app.modules.db_snapshot import configure_snapshots, SNAPSHOT_DEFAULTS
 from app.modules.socketio import socketio
 from app.modules.utils import get_secret_key
 
@@ -17,6 +29,28 @@ def create_app():
     app.config["MAX_CONTENT_LENGTH"] = None
     app.config["DB_PATH"] = "./data/highscores.db"
 
+    # Connection pool / SQLite tuning (see DB_POOL_DEFAULTS in app/modules/database.py)
+    # the score webhook queue (SCORE_QUEUE_DEFAULTS in app/modules/score_queue.py),
+    # the read cache (READ_CACHE_DEFAULTS in app/modules/read_cache.py), outbound
+    # HTTP (HTTP_CLIENT_DEFAULTS in app/modules/http_client.py), VPin game imports
+    # (VPIN_IMPORT_DEFAULTS in app/modules/vpin_integration.py), image processing
+    # (IMAGE_EXECUTOR_DEFAULTS in app/modules/image_executor.py, IMAGE_VARIANT_DEFAULTS
+    # in app/modules/imageProcessor.py, MEDIA_DEFAULTS in app/modules/media.py,
+    # FRAME_EXTRACTOR_DEFAULTS in app/modules/frame_extractor.py), the VPS database
+    # refresher (VPS_REFRESH_DEFAULTS in app/modules/vpspreadsheet.py) and exports
+    # (EXPORT_DEFAULTS in app/modules/export_engine.py, SNAPSHOT_DEFAULTS in
+    # app/modules/db_snapshot.py). Each one can be
+    # overridden with an ARCADESCORE_<NAME> environment variable, e.g.
+    # ARCADESCORE_DB_POOL_SIZE=16.
+    defaults = {
+        **DB_POOL_DEFAULTS, **SCORE_QUEUE_DEFAULTS, **READ_CACHE_DEFAULTS, **HTTP_CLIENT_DEFAULTS,
+        **VPIN_IMPORT_DEFAULTS, **IMAGE_EXECUTOR_DEFAULTS, **IMAGE_VARIANT_DEFAULTS, **MEDIA_DEFAULTS,
+        **FRAME_EXTRACTOR_DEFAULTS, **VPS_REFRESH_DEFAULTS, **EXPORT_DEFAULTS,
+        **SNAPSHOT_DEFAULTS,
+    }
+    for name, default in defaults.items():
+        app.config[name] = type(default)(os.getenv(f"ARCADESCORE_{name}", default))
+
     # Initialize database
     init_db(app.config["DB_PATH"])
     migrate_db(app.config["DB_PATH"])
@@ -24,7 +58,21 @@ def create_app():
     # Register routes
     app.register_blueprint(api_bp)
 
+    # Pre-open the main database's connection pool (WAL mode + tuned PRAGMAs)
+    init_pool(app)
     app.teardown_appcontext(close_db)
+    configure_read_cache(app)
+    configure_http_client(app)
+    configure_image_executor(app)
+    configure_image_variants(app)
+    configure_frame_extractor(app)
+    configure_snapshots(app)
+
+    # Start the workers that process queued score webhooks, rebuild leaderboards
+    # and keep the VPS database up to date
+    start_score_queue(app)
+    start_leaderboard_worker(app)
+    start_vps_refresher(app)
 
     # Initialize SocketIO
     socketio.init_app(app, cors_allowed_origins="*")
@@ -11,7 +11,7 @@ from app.modules.database import get_db
 from app.modules.socketio import emit_progress
 from app.modules.utils import sanitize_slug, validate_scoreboard_name, normalize_vpin_url
 from app.modules.webhooks import register_vpin_webhook
-from app.modules.vpin_integration import import_vpin_game_into_room
+from app.modules.vpin_integration import import_vpin_games_into_room
 
 def process_scoreboard_task(app, data):
     """Background task to create a scoreboard without causing a timeout."""
@@ -156,44 +156,43 @@ def process_scoreboard_task(app, data):
                 "css_title": css_title,
             }
 
-            for index, game in enumerate(vpin_games):
-                pct = int(((index + 1) / total_games) * 98)
-                game_name = game["name"]
-                if pct >= 100:
-                    pct = 99
-
-                print("emit_progress: " + str(pct) + ", for game " + game_name)
-                progress(pct, f"Processing: {game_name}")
-                eventlet.sleep(0)
-
-                if vpin_retrieve_media and vpin_api_enabled:
-                    progress(pct, f"Downloading Media: {game_name}")
-                    eventlet.sleep(0)
-
-                progress(pct, f"Saving: {game_name}")
+            # Games are fetched several at a time and saved as each one arrives
+            # (see import_vpin_games_into_room), so progress counts saved games
+            # rather than following list order.
+            saved_count = 0
+
+            def on_game_progress(stage, game, result):
+                nonlocal saved_count
+                game_name = game.get("name", "Unknown Game")
+                if stage == "saved":
+                    saved_count += 1
+                pct = int((saved_count / total_games) * 98)
+
+                if stage == "fetching":
+                    if vpin_retrieve_media and vpin_api_enabled:
+                        progress(pct, f"Downloading Media: {game_name}")
+                    else:
+                        progress(pct, f"Processing: {game_name}")
+                elif result["success"]:
+                    print("emit_progress: " + str(pct) + ", for game " + game_name)
+                    progress(pct, f"Saved: {game_name}")
+                else:
+                    progress(-1, f"Error saving game: {result['message']}")
                 eventlet.sleep(0)
 
-                # One game failing (flaky media download, a transient DB error) must not
-                # abort every game after it in the wizard's list - each import stands alone.
-                try:
-                    success, message, game_id = import_vpin_game_into_room(
-                        conn, vpin_api_url, room_id, game,
-                        css_style=css_style,
-                        options={
-                            "retrieve_media": bool(vpin_retrieve_media and vpin_api_enabled),
-                            "media_priority": media_priority,
-                            "image_compression_level": image_compression_level,
-                            "sync_historical_scores": bool(vpin_sync_historical_scores and vpin_api_enabled),
-                            "vpin_players": vpin_players,
-                        },
-                    )
-                except Exception as e:
-                    success, message = False, f"Unexpected error: {e}"
-                    print(f"⚠️ Failed to import game {game.get('id')} ({game_name}): {e}")
-                    traceback.print_exc()
-
-                if not success:
-                    progress(-1, f"Error saving game: {message}")
+            if vpin_games:
+                import_vpin_games_into_room(
+                    conn, vpin_api_url, room_id, vpin_games,
+                    css_style=css_style,
+                    options={
+                        "retrieve_media": bool(vpin_retrieve_media and vpin_api_enabled),
+                        "media_priority": media_priority,
+                        "image_compression_level": image_compression_level,
+                        "sync_historical_scores": bool(vpin_sync_historical_scores and vpin_api_enabled),
+                        "vpin_players": vpin_players,
+                    },
+                    on_progress=on_game_progress,
+                )
 
             # Commit all changes
             conn.commit()
@@ -1,113 +1,82 @@
 import os
-import subprocess
-import shutil
 import time
 import eventlet
 from app.modules.socketio import socketio, emit_progress
-from app.modules.utils import get_7z_path, cleanup_unused_images
-from app.modules.database import get_db
+from app.modules.utils import cleanup_unused_images
+from app.modules.export_engine import build_export, load_manifest, save_manifest, EXPORT_DEFAULTS
+from app.modules.database import get_pool
 
 # Restored correct paths
 EXPORT_PATH = "app/static/export"
 IMPORT_PATH = "app/static/import"
 DATA_PATH = "data/highscores.db"
 IMAGE_PATH = "app/static/images"
-
-def run_export_task(app, session_id):
-    """Background task for exporting data asynchronously."""
+# The last export's manifest: the base the next differential export is made against
+EXPORT_MANIFEST_PATH = "data/export_manifest.json"
+
+def run_export_task(app, session_id, archive_format=None, differential=False):
+    """Background task for exporting data asynchronously. The archive is zip unless
+    archive_format (or EXPORT_FORMAT) says 7z - see app/modules/export_engine.py.
+    A differential export only holds the media new or changed since the last
+    export (and is a full one if there's no last export to build on)."""
     with app.app_context():
-        def progress(pct, msg):
-            emit_progress(app, pct, msg, session_id)
+        def progress(pct, msg, details=None):
+            emit_progress(app, pct, msg, session_id, details)
 
         try:
             start_time = time.time()
-            print("Export started...")
+            archive_format = archive_format or app.config.get("EXPORT_FORMAT", EXPORT_DEFAULTS["EXPORT_FORMAT"])
+            previous_manifest = load_manifest(EXPORT_MANIFEST_PATH)
+            differential = differential and previous_manifest is not None
+            kind = "Diff" if differential else "Export"
+            print(f"{kind} export started ({archive_format})...")
 
             progress(0, "Starting export task")
             eventlet.sleep(0)
 
             os.makedirs(EXPORT_PATH, exist_ok=True)
-            archive_filename = f"ArcadeScoreExport_{session_id}.7z"  # Unique filename per session_id
+            archive_filename = f"ArcadeScore{kind}_{session_id}.{archive_format}"  # Unique filename per session_id
             archive_path = os.path.abspath(os.path.join(EXPORT_PATH, archive_filename))
 
-            progress(10, "Cleaning up unused media")
-            eventlet.sleep(0)
-
-            # Run image cleanup
-            cleanup_unused_images(get_db())
-
-            # Ensure previous exports are cleared
-            if os.path.exists(archive_path):
-                os.remove(archive_path)
-
-            progress(30, "Copying database")
+            progress(1, "Cleaning up unused media")
             eventlet.sleep(0)
 
-            # Create a temporary export directory
-            temp_export_dir = os.path.join(EXPORT_PATH, "temp_export")
-            if os.path.exists(temp_export_dir):
-                shutil.rmtree(temp_export_dir)
-            os.makedirs(temp_export_dir)
-
-            # Copy highscores.db
-            if os.path.exists(DATA_PATH):
-                shutil.copy(DATA_PATH, os.path.join(temp_export_dir, "highscores.db"))
-            else:
+            # Run image cleanup. The connection goes straight back to the pool -
+            # held for the whole export, it would take a slot for minutes (and
+            # stall any import's database swap until the export was done). The
+            # snapshot below opens its own, only for as long as it copies.
+            pool = get_pool(app.config["DB_PATH"], app.config)
+            conn = pool.acquire()
+            try:
+                cleanup_unused_images(conn)
+            finally:
+                pool.release(conn)
+
+            if not os.path.exists(DATA_PATH):
                 progress(-1, "Error: Database file not found.")
                 eventlet.sleep(0)
                 return
 
-            progress(60, "Copying images")
-            eventlet.sleep(0)
-
-            # Copy image folders
-            image_export_path = os.path.join(temp_export_dir, "images")
-            os.makedirs(image_export_path, exist_ok=True)
-
-            for folder in ["avatars", "gameBackground", "gameImage"]:
-                src_folder = os.path.join(IMAGE_PATH, folder)
-                dest_folder = os.path.join(image_export_path, folder)
-                if os.path.exists(src_folder):
-                    shutil.copytree(src_folder, dest_folder, dirs_exist_ok=True)
-
-            progress(80, "Creating compressed archive")
-            eventlet.sleep(0)
-
-            # Get the correct 7z path
-            seven_zip_path = get_7z_path()
-            if not seven_zip_path:
-                progress(-1, "Error: 7z.exe not found. Install 7-Zip and add it to your PATH.")
-                print("❌ 7z.exe not found. Install 7-Zip or check PATH.")
-                return
-
-            # Use subprocess to run 7z command
-            compression_start = time.time()
-            command = [seven_zip_path, "a", "-t7z", archive_path, "."]
-            subprocess.run(command, cwd=temp_export_dir, check=True)
+            # Progress from here is by bytes processed: 2-99%
+            def archive_progress(done, total, message, details=None):
+                progress(2 + int(97 * done / total), f"{message} ({done / 1048576:.1f} of {total / 1048576:.1f} MB)", details)
 
-            print(f"✅ Created 7z archive in {time.time() - compression_start:.2f}s")
+            manifest = build_export(DATA_PATH, IMAGE_PATH, archive_path, archive_format, archive_progress,
+                                    previous_manifest, differential)
+            save_manifest(EXPORT_MANIFEST_PATH, {key: manifest[key] for key in ("format", "export_id", "base_id", "created_at", "files")})
+            print(f"✅ Created {archive_format} archive ({manifest['archive_bytes'] / 1048576:.1f} MB, "
+                  f"{manifest['archived_files']} of {len(manifest['files'])} images) in {time.time() - start_time:.2f}s")
 
-            progress(95, "Finalize")
-            eventlet.sleep(0)
-
-            # Remove temporary files
-            shutil.rmtree(temp_export_dir)
-
-            progress(100, "Completed")
+            progress(100, "Completed", {"snapshot": manifest["snapshot"]})
             eventlet.sleep(0)
 
             # Notify client that the file is ready
-            for i in range(5):  # Retry for up to 5 seconds
-                if os.path.exists(archive_path):
-                    print(f"✅ File ready, emitting event: {archive_filename}")  # Debug log
-                    socketio.emit("file_ready", {
-                        "session_id": session_id,
-                        "file_path": f"/api/v1/download/{os.path.basename(archive_path)}"
-                    }, namespace="/")
-
-                    socketio.sleep(0)  # Ensure Eventlet processes the event
-                    break
-                eventlet.sleep(1)
+            print(f"✅ File ready, emitting event: {archive_filename}")  # Debug log
+            socketio.emit("file_ready", {
+                "session_id": session_id,
+                "file_path": f"/api/v1/download/{archive_filename}"
+            }, namespace="/")
+            socketio.sleep(0)  # Ensure Eventlet processes the event
 
         except Exception as e:
             progress(-1, f"Export failed: {str(e)}")
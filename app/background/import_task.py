@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+import eventlet
+from app.modules.socketio import socketio, emit_progress
+from app.modules.import_engine import apply_import
+
+DATA_PATH = "data/highscores.db"
+IMAGE_PATH = "app/static/images"
+
+# Held from the upload being accepted until its import task is done - one import at a time
+import_lock = threading.Lock()
+
+def run_import_task(app, session_id, plan):
+    """Background task applying an import checked by plan_import (see
+    app/modules/import_engine.py). The uploaded archives are removed afterwards
+    and import_lock released, whatever happened."""
+    with app.app_context():
+        def progress(pct, msg, details=None):
+            emit_progress(app, pct, msg, session_id, details)
+
+        def finished(message, error=False):
+            socketio.emit("import_complete", {
+                "session_id": session_id,
+                "message": message,
+                "error": error,
+            }, namespace="/")
+            eventlet.sleep(0)
+
+        try:
+            start_time = time.time()
+            print(f"Import started ({len(plan['archives'])} archive(s))...")
+            progress(0, "Starting import")
+            eventlet.sleep(0)
+
+            # Progress from here is by bytes processed: 1-99%
+            def import_progress(done, total, message, details=None):
+                progress(1 + int(98 * done / total), f"{message} ({done / 1048576:.1f} of {total / 1048576:.1f} MB)", details)
+
+            result = apply_import(plan, DATA_PATH, IMAGE_PATH, import_progress)
+            print(f"✅ Imported database and {result['images']} images ({result['unchanged']} already here) "
+                  f"in {time.time() - start_time:.2f}s")
+
+            progress(100, "Import complete")
+            finished("Import successful.")
+
+        except ValueError as e:
+            progress(-1, str(e))
+            finished(str(e), error=True)
+        except Exception as e:
+            progress(-1, f"Import failed: {str(e)}")
+            print(f"Import failed: {str(e)}")
+            finished(f"Import failed: {str(e)}", error=True)
+        finally:
+            for archive_path, _ in plan["archives"]:
+                if os.path.exists(archive_path):
+                    os.remove(archive_path)
+            import_lock.release()
@@ -1,22 +1,347 @@
-from flask import current_app, g
+from flask import current_app, g, has_app_context
+import os
 import sqlite3
+import threading
+import time
+import eventlet
+from eventlet.event import Event
+from eventlet.queue import LifoQueue, Empty
 
-db_version = 5
+db_version = 12
+
+# Defaults for the connection pool and the PRAGMAs applied to every pooled
+# connection. create_app() copies these into app.config (each overridable by an
+# ARCADESCORE_DB_* environment variable), so this is the one place to look up
+# what a setting means.
+DB_POOL_DEFAULTS = {
+    "DB_POOL_SIZE": 8,              # Connections opened up front and kept open
+    "DB_POOL_TIMEOUT": 5.0,         # Seconds to wait for a free connection before opening an overflow one
+    "DB_BUSY_TIMEOUT_MS": 5000,     # How long SQLite itself waits on a locked database before raising
+    "DB_CACHE_SIZE_KB": 16384,      # Page cache per connection (negative cache_size = KiB)
+    "DB_MMAP_SIZE": 268435456,      # 256 MiB of memory-mapped reads per connection
+    "DB_SYNCHRONOUS": "NORMAL",     # Safe with WAL: only the last commits can be lost on power loss, never corruption
+    "DB_DRAIN_TIMEOUT": 30.0,       # Seconds an import waits for checked-out connections to come back before swapping the file
+}
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection doesn't allow setting attributes on it; this subclass
+    exists only so the pool can stamp checkout times onto its connections."""
+    pass
+
+class ConnectionPool:
+    """
+    A fixed-size pool of pre-opened SQLite connections for one database file.
+
+    Every connection is put in WAL mode, so readers (scoreboard page loads) no
+    longer queue up behind a long writer (a VPin import) the way they did with
+    the default rollback journal. Checkout waits cooperatively on an eventlet
+    queue, so a request waiting for a connection yields to other greenthreads
+    instead of blocking the hub. If nothing frees up within `timeout`, an
+    overflow connection is opened rather than failing the request - it's closed
+    again on release, and counted in the stats so the pool can be resized.
+    """
+
+    def __init__(self, db_path, size=DB_POOL_DEFAULTS["DB_POOL_SIZE"], timeout=DB_POOL_DEFAULTS["DB_POOL_TIMEOUT"],
+                 busy_timeout_ms=DB_POOL_DEFAULTS["DB_BUSY_TIMEOUT_MS"], cache_size_kb=DB_POOL_DEFAULTS["DB_CACHE_SIZE_KB"],
+                 mmap_size=DB_POOL_DEFAULTS["DB_MMAP_SIZE"], synchronous=DB_POOL_DEFAULTS["DB_SYNCHRONOUS"]):
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self.cache_size_kb = int(cache_size_kb)
+        self.mmap_size = int(mmap_size)
+        self.synchronous = str(synchronous).upper()
+
+        # LIFO so the most recently used (cache-warm) connections are handed out first
+        self._idle = LifoQueue()
+        self._lock = threading.Lock()
+        self._pooled = set()  # id() of every connection that belongs to the pool (not overflow)
+        self._in_use = 0
+        self._resumed = None  # An Event while checkouts are held off (see drain)
+        self._stats = {
+            "checkouts": 0,
+            "overflow_checkouts": 0,
+            "waits": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "total_hold_ms": 0.0,
+            "max_hold_ms": 0.0,
+        }
+
+        for _ in range(self.size):
+            conn = self._connect()
+            self._pooled.add(id(conn))
+            self._idle.put(conn)
+
+    def _connect(self):
+        # check_same_thread=False: under eventlet every greenthread shares one OS
+        # thread, but a connection can still be released from a different
+        # greenthread than the one that checked it out.
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False, factory=PooledConnection,
+        )
+        conn.row_factory = sqlite3.Row  # Enables dictionary-like access
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(f"PRAGMA synchronous={self.synchronous};")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb};")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size};")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms};")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        return conn
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` seconds for one to free up."""
+        started = time.perf_counter()
+        waited = False
+        while self._resumed is not None:  # Held off while the database file is swapped
+            waited = True
+            self._resumed.wait()
+        try:
+            conn = self._idle.get_nowait()
+        except Empty:
+            waited = True
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except Empty:
+                conn = self._connect()
+
+        wait_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            if id(conn) not in self._pooled:
+                self._stats["overflow_checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["total_wait_ms"] += wait_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+
+        conn._pool_checked_out_at = time.perf_counter()
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool. Anything left uncommitted is rolled back
+        so the next borrower never inherits a half-finished transaction."""
+        hold_ms = (time.perf_counter() - getattr(conn, "_pool_checked_out_at", time.perf_counter())) * 1000
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+            self._stats["total_hold_ms"] += hold_ms
+            self._stats["max_hold_ms"] = max(self._stats["max_hold_ms"], hold_ms)
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            print(f"⚠️ Discarding pooled connection that failed to roll back: {e}")
+            self._replace(conn)
+            return
+
+        if id(conn) in self._pooled:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    def _replace(self, conn):
+        """Swap a broken pooled connection for a fresh one, keeping the pool at full size."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        if id(conn) in self._pooled:
+            with self._lock:
+                self._pooled.discard(id(conn))
+            fresh = self._connect()
+            with self._lock:
+                self._pooled.add(id(fresh))
+            self._idle.put(fresh)
+
+    def stats(self):
+        """Checkout/wait/hold counters for sizing the pool. Wait time is how long a
+        request sat waiting for a free connection; hold time is how long one was
+        kept checked out (roughly, request duration)."""
+        with self._lock:
+            stats = dict(self._stats)
+            in_use = self._in_use
+        checkouts = stats["checkouts"] or 1
+        return {
+            "db_path": self.db_path,
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "in_use": in_use,
+            "checkouts": stats["checkouts"],
+            "overflow_checkouts": stats["overflow_checkouts"],
+            "waits": stats["waits"],
+            "avg_wait_ms": round(stats["total_wait_ms"] / checkouts, 3),
+            "max_wait_ms": round(stats["max_wait_ms"], 3),
+            "avg_hold_ms": round(stats["total_hold_ms"] / checkouts, 3),
+            "max_hold_ms": round(stats["max_hold_ms"], 3),
+        }
+
+    def drain(self, timeout):
+        """
+        Stop handing out connections and wait up to `timeout` seconds for every
+        checked-out one to come back. Checkouts wait (cooperatively) until
+        resume(). Returns whether the pool drained; if it didn't, checkouts are
+        resumed again before returning.
+        """
+        if self._resumed is None:
+            self._resumed = Event()
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                in_use = self._in_use
+            if not in_use:
+                return True
+            if time.monotonic() >= deadline:
+                self.resume()
+                return False
+            eventlet.sleep(0.05)
+
+    def reopen(self):
+        """Close every idle connection and open fresh ones - the file under them
+        was replaced. Only meant for a drained pool."""
+        self.close_all()
+        for _ in range(self.size):
+            conn = self._connect()
+            with self._lock:
+                self._pooled.add(id(conn))
+            self._idle.put(conn)
+
+    def resume(self):
+        """Let the checkouts held off by drain() through."""
+        resumed, self._resumed = self._resumed, None
+        if resumed is not None:
+            resumed.send()
+
+    def close_all(self):
+        """Close every idle connection. Connections still checked out are closed as
+        they come back, since they're no longer tracked as pool members."""
+        with self._lock:
+            self._pooled.clear()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _pool_key(db_path):
+    return os.path.abspath(db_path)
+
+def init_pool(app):
+    """Open the pool for the app's main database up front (called from create_app),
+    so the first requests after startup don't pay for opening connections."""
+    return get_pool(app.config["DB_PATH"], app.config)
+
+def get_pool(db_path, config=None):
+    """The pool for a database file, created on first use from `config` (falls back
+    to the current app's config, then to DB_POOL_DEFAULTS)."""
+    key = _pool_key(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if config is None:
+                config = current_app.config if has_app_context() else {}
+            settings = {name: config.get(name, default) for name, default in DB_POOL_DEFAULTS.items()}
+            pool = ConnectionPool(
+                db_path,
+                size=settings["DB_POOL_SIZE"],
+                timeout=settings["DB_POOL_TIMEOUT"],
+                busy_timeout_ms=settings["DB_BUSY_TIMEOUT_MS"],
+                cache_size_kb=settings["DB_CACHE_SIZE_KB"],
+                mmap_size=settings["DB_MMAP_SIZE"],
+                synchronous=settings["DB_SYNCHRONOUS"],
+            )
+            _pools[key] = pool
+        return pool
+
+def get_pool_stats():
+    """Stats for every open pool (normally just the main database)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+def close_pool(db_path):
+    """Close and forget the pool for a database file, if one exists."""
+    with _pools_lock:
+        pool = _pools.pop(_pool_key(db_path), None)
+    if pool:
+        pool.close_all()
+
+def swap_database(db_path, replacement_path, timeout=None):
+    """
+    Atomically replace a live database file with replacement_path (a complete,
+    already migrated database on the same filesystem). Its pool stops handing
+    out connections and waits for the checked-out ones to come back; then the
+    old WAL is checkpointed, the file renamed into place and the pool's
+    connections reopened on it. Requests that arrived meanwhile just waited,
+    and carry on against the new database - workers holding on to the pool
+    object included. Raises RuntimeError, leaving everything as it was, if
+    connections are still out after `timeout` (DB_DRAIN_TIMEOUT) seconds. If
+    the swap itself fails, the error is raised with the pool reopened on
+    whichever file ended up in place.
+    """
+    pool = get_pool(db_path)
+    if timeout is None:
+        timeout = current_app.config.get("DB_DRAIN_TIMEOUT", DB_POOL_DEFAULTS["DB_DRAIN_TIMEOUT"]) if has_app_context() \
+            else DB_POOL_DEFAULTS["DB_DRAIN_TIMEOUT"]
+    if not pool.drain(float(timeout)):
+        raise RuntimeError(f"Database still in use after {timeout}s - try the import again when it's quieter")
+    try:
+        # Fold the -wal file into the old database, so nothing of it is left to
+        # be replayed on top of the new one once the connections are closed
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        finally:
+            conn.close()
+        pool.close_all()
+        os.replace(replacement_path, db_path)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        pool.reopen()
+    except Exception:
+        # The pool may have been emptied already - refill it on whichever file
+        # is in place now, or every checkout after this would wait out
+        # DB_POOL_TIMEOUT and fall back to an overflow connection
+        pool.reopen()
+        raise
+    finally:
+        pool.resume()
 
 def get_db(db_path=None):
-    """Retrieve database connection, optionally using a different database file."""
+    """Retrieve database connection, optionally using a different database file.
+
+    The app's main database is served from its connection pool; any other file
+    (e.g. an uploaded database being validated during import) gets a plain,
+    unpooled connection that's simply closed on teardown."""
     if db_path is None:
         db_path = current_app.config["DB_PATH"]  # Use default database path if none is provided
 
     if "db" not in g or getattr(g, "db_path", None) != db_path:
-        g.db = sqlite3.connect(db_path)
-        g.db.row_factory = sqlite3.Row  # Enables dictionary-like access
+        close_db()
+
+        if _pool_key(db_path) == _pool_key(current_app.config["DB_PATH"]):
+            g.db_pool = get_pool(db_path)
+            g.db = g.db_pool.acquire()
+        else:
+            g.db_pool = None
+            g.db = sqlite3.connect(db_path)
+            g.db.row_factory = sqlite3.Row  # Enables dictionary-like access
         g.db_path = db_path  # Track which database file is open
 
     return g.db
 
 def close_db(e=None):
-    """Close the database connection if it exists."""
+    """Return the connection to its pool (or close it, if it wasn't pooled)."""
     db = g.pop("db", None)
+    pool = g.pop("db_pool", None)
+    g.pop("db_path", None)
     if db is not None:
-        db.close()
+        if pool is not None:
+            pool.release(db)
+        else:
+            db.close()
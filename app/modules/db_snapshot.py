@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+import time
+import eventlet
+
+# Defaults for database snapshots (exports, and anything else that needs a copy
+# of the live database). create_app() copies these into app.config (each
+# overridable by an ARCADESCORE_* environment variable), same as
+# DB_POOL_DEFAULTS in app/modules/database.py.
+SNAPSHOT_DEFAULTS = {
+    "SNAPSHOT_PAGES_PER_STEP": 1024,    # Pages copied per backup step; the source is only read-locked during a step
+    "SNAPSHOT_STEP_PAUSE": 0.0,         # Seconds to yield between steps (0 = just let other greenthreads run)
+}
+
+_settings = dict(SNAPSHOT_DEFAULTS)
+_stats = {
+    "lock": threading.Lock(),
+    "snapshots": 0,
+    "failures": 0,
+    "pages_copied": 0,
+    "restarts": 0,      # Backups started over because another connection wrote mid-copy
+    "last": None,       # The last snapshot's result (see snapshot_database)
+}
+
+def configure_snapshots(app):
+    """Apply the SNAPSHOT_* settings from the app config (called once from create_app)."""
+    for name, default in SNAPSHOT_DEFAULTS.items():
+        _settings[name] = app.config.get(name, default)
+
+def snapshot_database(db_path, snapshot_path, on_step=None):
+    """
+    Write a consistent copy of the live database to snapshot_path, through
+    SQLite's online backup API. shutil.copy of the file could catch a webhook
+    mid-write (and would miss whatever is still in the -wal file); the backup
+    copies one point in time, WAL contents included, SNAPSHOT_PAGES_PER_STEP
+    pages at a time. Between steps the source is unlocked and other
+    greenthreads get to run, so score webhooks carry on while a big database
+    is copied. If one of them writes mid-copy, SQLite starts the copy over.
+
+    on_step(copied, total), if given, is called after every step with page
+    counts. The copy is written under a temporary name and renamed into place
+    once complete. Returns what it took:
+    {"pages", "page_size", "bytes", "steps", "restarts", "duration_ms"}.
+    """
+    pages_per_step = max(1, int(_settings["SNAPSHOT_PAGES_PER_STEP"]))
+    pause = float(_settings["SNAPSHOT_STEP_PAUSE"])
+    temp_path = f"{snapshot_path}.part"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    started = time.monotonic()
+    counts = {"steps": 0, "restarts": 0, "copied": 0, "total": 0}
+
+    def step(status, remaining, total):
+        copied = total - remaining
+        if counts["steps"] and copied <= counts["copied"]:  # Started over - every step copies at least one page
+            counts["restarts"] += 1
+        counts["steps"] += 1
+        counts["copied"], counts["total"] = copied, total
+        if on_step:
+            on_step(copied, total)
+        eventlet.sleep(pause)
+
+    source = sqlite3.connect(db_path)
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            page_size = source.execute("PRAGMA page_size;").fetchone()[0]
+            source.backup(target, pages=pages_per_step, progress=step)
+        finally:
+            target.close()
+        os.replace(temp_path, snapshot_path)
+    except Exception:
+        with _stats["lock"]:
+            _stats["failures"] += 1
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        source.close()
+
+    result = {
+        "pages": counts["total"],
+        "page_size": page_size,
+        "bytes": os.path.getsize(snapshot_path),
+        "steps": counts["steps"],
+        "restarts": counts["restarts"],
+        "duration_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    with _stats["lock"]:
+        _stats["snapshots"] += 1
+        _stats["pages_copied"] += result["pages"]
+        _stats["restarts"] += result["restarts"]
+        _stats["last"] = result
+    print(f"📸 Snapshot of {db_path}: {result['pages']} pages in {result['steps']} steps, {result['duration_ms']} ms")
+    return result
+
+def get_snapshot_stats():
+    with _stats["lock"]:
+        return {name: value for name, value in _stats.items() if name != "lock"}
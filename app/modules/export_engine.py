@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os
+import subprocess
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+import eventlet
+from app.modules.db_snapshot import snapshot_database
+from app.modules.imageProcessor import VARIANTS_DIR
+from app.modules.media import MEDIA_FOLDERS
+from app.modules.utils import get_7z_path
+
+# Defaults for exports. create_app() copies these into app.config (each
+# overridable by an ARCADESCORE_* environment variable), same as
+# DB_POOL_DEFAULTS in app/modules/database.py.
+EXPORT_DEFAULTS = {
+    "EXPORT_FORMAT": "zip",     # "zip" (built in) or "7z" (needs 7-Zip installed); ?format= overrides it per export
+}
+EXPORT_FORMATS = ("zip", "7z")
+
+CHUNK_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.25  # Seconds between progress reports while copying
+
+# Already compressed - deflating them again costs time and saves nothing
+STORED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".mp4"}
+
+# Every archive carries one: what the library looked like when it was made
+# (see build_manifest), and which export it builds on if it's differential
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+class ExportProgress:
+    """
+    Bytes processed out of the export's total, reported to on_progress(done,
+    total, message, details) as they go - at most every PROGRESS_INTERVAL
+    seconds, plus whenever the message changes - yielding to other greenthreads
+    each time. details is a dict of step specifics (the snapshot's page counts)
+    or None.
+    """
+
+    def __init__(self, total, on_progress=None):
+        self.total = max(total, 1)
+        self.done = 0
+        self.on_progress = on_progress
+        self._message = None
+        self._reported_at = 0.0
+
+    def advance(self, amount, message, details=None):
+        self.done = min(self.done + amount, self.total)
+        now = time.monotonic()
+        if message != self._message or now - self._reported_at >= PROGRESS_INTERVAL or self.done >= self.total:
+            self._message, self._reported_at = message, now
+            if self.on_progress:
+                self.on_progress(self.done, self.total, message, details)
+        eventlet.sleep(0)
+
+def _snapshot_with_progress(db_path, snapshot_path, progress):
+    """snapshot_database, reporting pages copied as bytes of the export's progress."""
+    db_size = os.path.getsize(db_path)
+    started = time.monotonic()
+    reported = [0]
+
+    def step(copied, total):
+        # A backup restarted by a concurrent write starts counting again from 0
+        progress.advance(max(0, copied - reported[0]) * db_size / max(total, 1), "Snapshotting database", {"snapshot": {
+            "pages_copied": copied, "pages_total": total, "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }})
+        reported[0] = copied
+
+    return snapshot_database(db_path, snapshot_path, step)
+
+def collect_export_files(image_root):
+    """(source path, name in the archive, size) of every stored image; their
+    WebP/AVIF variants are derived, and rebuilt on demand after an import."""
+    entries = []
+    for folder in MEDIA_FOLDERS:
+        folder_path = os.path.join(image_root, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for dirpath, dirnames, filenames in os.walk(folder_path):
+            dirnames[:] = [name for name in dirnames if name != VARIANTS_DIR]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                archive_name = "/".join(["images", os.path.relpath(path, image_root).replace(os.sep, "/")])
+                entries.append((path, archive_name, os.path.getsize(path)))
+    return entries
+
+def file_sha256(path, progress=None):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+            if progress:
+                progress.advance(len(chunk), "Checking media for changes")
+    return digest.hexdigest()
+
+def build_manifest(images, previous=None, progress=None):
+    """
+    {archive name: {sha256, size, mtime}} for every image. A file whose size and
+    mtime match the previous export's manifest keeps the hash recorded there, so
+    only new and touched files are read - a nightly export of an unchanged
+    library hashes nothing.
+    """
+    known = (previous or {}).get("files", {})
+    files = {}
+    for source_path, archive_name, size in images:
+        mtime = os.stat(source_path).st_mtime_ns
+        entry = known.get(archive_name)
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            files[archive_name] = entry
+        else:
+            files[archive_name] = {"sha256": file_sha256(source_path, progress), "size": size, "mtime": mtime}
+    return files
+
+def _unchanged_bytes(images, previous):
+    """How many bytes of images build_manifest won't need to hash."""
+    known = (previous or {}).get("files", {})
+    unchanged = 0
+    for source_path, archive_name, size in images:
+        entry = known.get(archive_name)
+        if entry and entry["size"] == size and entry["mtime"] == os.stat(source_path).st_mtime_ns:
+            unchanged += size
+    return unchanged
+
+def load_manifest(path):
+    """The manifest saved after the last export (see save_manifest), or None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, path)
+
+def read_archive_manifest(archive_path, archive_format):
+    """An export archive's manifest, or None (exports from before manifests)."""
+    if archive_format == "zip":
+        with zipfile.ZipFile(archive_path) as archive:
+            if MANIFEST_NAME not in archive.namelist():
+                return None
+            return json.loads(archive.read(MANIFEST_NAME))
+
+    seven_zip_path = get_7z_path()
+    if not seven_zip_path:
+        raise RuntimeError("7z not found. Install 7-Zip and add it to your PATH.")
+    output = subprocess.run([seven_zip_path, "e", "-so", archive_path, MANIFEST_NAME], capture_output=True).stdout
+    return json.loads(output) if output.strip() else None
+
+def order_archive_chain(manifests):
+    """
+    Given each uploaded archive's manifest (None for a pre-manifest export),
+    the order to apply them in: a full export first, then each differential
+    export after the one it was made against. Returns their indexes; raises
+    ValueError if they don't form one unbroken chain.
+    """
+    if len(manifests) == 1:
+        manifest = manifests[0]
+        if manifest and manifest.get("base_id"):
+            raise ValueError("This is a differential export - import it together with the exports it builds on.")
+        return [0]
+    if any(manifest is None for manifest in manifests):
+        raise ValueError("Only exports with a manifest can be imported together.")
+
+    by_base = {}
+    for index, manifest in enumerate(manifests):
+        by_base.setdefault(manifest.get("base_id"), []).append(index)
+    order = by_base.get(None, [])
+    if len(order) != 1:
+        raise ValueError("Import exactly one full export, plus the differential exports made after it.")
+    while len(order) < len(manifests):
+        following = by_base.get(manifests[order[-1]]["export_id"], [])
+        if len(following) != 1:
+            raise ValueError("The differential exports don't form a chain from the full export - one is missing or repeated.")
+        order.append(following[0])
+    return order
+
+def _write_zip(archive_path, entries, progress):
+    with zipfile.ZipFile(archive_path, "w", allowZip64=True) as archive:
+        for source_path, archive_name, _ in entries:
+            info = zipfile.ZipInfo.from_file(source_path, archive_name)
+            stored = os.path.splitext(archive_name)[1].lower() in STORED_EXTENSIONS
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            message = "Archiving database" if archive_name == "highscores.db" else "Archiving images"
+            with open(source_path, "rb") as source, archive.open(info, "w", force_zip64=True) as target:
+                while chunk := source.read(CHUNK_SIZE):
+                    target.write(chunk)
+                    progress.advance(len(chunk), message)
+
+def _write_7z(archive_path, entries, progress):
+    """7-Zip adds paths relative to its working directory, and the archive has
+    them at its root - so each source directory gets one `7z a` run, from its
+    parent, naming that directory's files."""
+    seven_zip_path = get_7z_path()
+    if not seven_zip_path:
+        raise RuntimeError("7z not found. Install 7-Zip and add it to your PATH, or export as zip.")
+
+    groups = {}
+    for source_path, archive_name, size in entries:
+        # The directory 7z runs in: archive_name, relative to it, is the source path
+        depth = archive_name.count("/")
+        cwd = os.path.dirname(os.path.abspath(source_path))
+        for _ in range(depth):
+            cwd = os.path.dirname(cwd)
+        group = groups.setdefault(cwd, {"names": [], "bytes": 0})
+        group["names"].append(archive_name)
+        group["bytes"] += size
+
+    for cwd, group in groups.items():
+        list_path = f"{archive_path}.list"
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(group["names"]))
+        try:
+            subprocess.run([seven_zip_path, "a", "-t7z", "-scsUTF-8", os.path.abspath(archive_path), f"@{os.path.abspath(list_path)}"],
+                           cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        finally:
+            os.remove(list_path)
+        progress.advance(group["bytes"], "Archiving database" if "highscores.db" in group["names"] else "Archiving images")
+
+def build_export(db_path, image_root, archive_path, archive_format="zip", on_progress=None,
+                 previous_manifest=None, differential=False):
+    """
+    Write an export archive - highscores.db and manifest.json at its root,
+    images/<folder>/... beside them - straight from where the files live: the
+    only copy made is the database snapshot (see app/modules/db_snapshot.py),
+    never the media library. The archive is written under a temporary name and
+    renamed into place once complete. on_progress(done, total, message,
+    details) gets bytes processed (see ExportProgress).
+
+    previous_manifest is the manifest of the last export, if any. With
+    differential, only images that are new or changed since it go in the
+    archive (the database always does): applied on top of that export - and
+    the ones it builds on - it restores the library in full.
+
+    Returns the archive's manifest, with "archive_bytes", "archived_files" and
+    "snapshot" (what snapshot_database reported).
+    """
+    if archive_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {archive_format}")
+    differential = differential and previous_manifest is not None
+
+    os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+    snapshot_dir = f"{archive_path}.snapshot"
+    os.makedirs(snapshot_dir, exist_ok=True)
+    snapshot_path = os.path.join(snapshot_dir, "highscores.db")
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    temp_path = f"{archive_path}.part"
+
+    # The database counts twice: once snapshotted, once archived. Images count
+    # once for hashing (the ones that need it) and once for archiving
+    db_size = os.path.getsize(db_path)
+    images = collect_export_files(image_root)
+    images_size = sum(size for _, _, size in images)
+    progress = ExportProgress(2 * db_size + 2 * images_size - _unchanged_bytes(images, previous_manifest), on_progress)
+
+    try:
+        files = build_manifest(images, previous_manifest, progress)
+        if differential:
+            known = previous_manifest.get("files", {})
+            changed = [entry for entry in images if known.get(entry[1], {}).get("sha256") != files[entry[1]]["sha256"]]
+            progress.total -= sum(size for _, _, size in images) - sum(size for _, _, size in changed)
+            images = changed
+
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "export_id": uuid.uuid4().hex,
+            "base_id": previous_manifest["export_id"] if differential else None,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "files": files,
+        }
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        snapshot = _snapshot_with_progress(db_path, snapshot_path, progress)
+        snapshot_size = snapshot["bytes"]
+        progress.total += snapshot_size - db_size
+        progress.advance(0, "Database snapshot taken", {"snapshot": snapshot})
+        entries = [(snapshot_path, "highscores.db", snapshot_size), (manifest_path, MANIFEST_NAME, os.path.getsize(manifest_path))] + images
+
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        if archive_format == "zip":
+            _write_zip(temp_path, entries, progress)
+        else:
+            _write_7z(temp_path, entries, progress)
+        os.replace(temp_path, archive_path)
+    finally:
+        for path in (snapshot_path, manifest_path, temp_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(snapshot_dir)
+    return {**manifest, "archive_bytes": os.path.getsize(archive_path), "archived_files": len(images), "snapshot": snapshot}
@@ -0,0 +1,229 @@
+import hashlib
+import itertools
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from app.modules import http_client
+
+# Defaults for pulling first frames out of VPin Studio's PlayField/BackGlass videos.
+# create_app() copies these into app.config (each overridable by an ARCADESCORE_*
+# environment variable), same as DB_POOL_DEFAULTS in app/modules/database.py.
+FRAME_EXTRACTOR_DEFAULTS = {
+    "VIDEO_SCRATCH_DIR": "",                      # Partial downloads go here; empty = <system temp>/arcadescore-video
+    "VIDEO_MAX_BYTES": 64 * 1024 * 1024,          # Most bytes downloaded from one video while looking for a frame
+    "VIDEO_TIMEOUT": 60.0,                        # Seconds per video, download and decode attempts included
+    "VIDEO_FIRST_ATTEMPT_BYTES": 256 * 1024,      # First decode attempt after this much; the amount doubles per retry
+}
+
+CHUNK_SIZE = 64 * 1024
+STALE_SCRATCH_SECONDS = 3600  # Leftovers from a crashed process are cleared at startup past this age
+
+class VideoBudgetExceeded(Exception):
+    """A video needed more bytes or time than VIDEO_MAX_BYTES / VIDEO_TIMEOUT allow."""
+
+def _mdat_end(f, available):
+    """
+    Where the metadata of an MP4 that keeps it *after* the media data starts (the
+    end of the top-level 'mdat' box), or None - it's up front, this isn't an MP4,
+    or there isn't enough of the file yet to tell. Encoders that don't
+    "fast start" their files (OpenCV's, for one) write it this way, and no frame
+    can be decoded from the head of such a file alone.
+    """
+    offset = 0
+    while offset + 8 <= available:
+        f.seek(offset)
+        header = f.read(16)
+        size, box_type = struct.unpack(">I4s", header[:8])
+        if size == 1 and len(header) == 16:
+            size = struct.unpack(">Q", header[8:16])[0]
+        if box_type == b"moov" or size < 8:
+            return None
+        if box_type == b"mdat":
+            return offset + size
+        offset += size
+    return None
+
+class VideoDownload:
+    """
+    One video streamed into its own scratch file, only as far as it takes to
+    decode a first frame. extract() downloads a first slice, tries the decode,
+    and doubles the slice until a frame comes out, the video ends, or the
+    byte/time budget runs out. When the MP4's metadata sits at the end of the
+    file and the server takes Range requests, the tail is fetched separately
+    and written at its real offset, leaving a sparse file the decoder can seek
+    through without the megabytes in between.
+    """
+
+    def __init__(self, url, response, scratch_dir, max_bytes, timeout, first_attempt_bytes, stats, prefix=b""):
+        self.url = url
+        self.response = response
+        self.max_bytes = max_bytes
+        self.deadline = time.monotonic() + timeout
+        self.first_attempt_bytes = first_attempt_bytes
+        self.content_length = int(response.headers.get("Content-Length") or 0) or None
+        self.accepts_ranges = "bytes" in response.headers.get("Accept-Ranges", "")
+        self.written = 0        # Contiguous bytes from the start of the file
+        self.downloaded = 0     # Everything received, ranged tail included
+        self.complete = False
+        self._tail_checked = False
+        # prefix: the start of the body, if the caller already read it off the response
+        self._chunks = itertools.chain([prefix] if prefix else [], response.iter_content(chunk_size=CHUNK_SIZE))
+        self._stats = stats
+
+        fd, self.path = tempfile.mkstemp(suffix=".part", dir=scratch_dir)
+        self._file = os.fdopen(fd, "w+b")
+
+    def _count(self, name, amount=1):
+        with self._stats["lock"]:
+            self._stats[name] += amount
+
+    def _check_budget(self):
+        if self.downloaded > self.max_bytes:
+            self._count("over_budget")
+            raise VideoBudgetExceeded(f"more than {self.max_bytes} bytes needed from {self.url}")
+        if time.monotonic() > self.deadline:
+            self._count("over_budget")
+            raise VideoBudgetExceeded(f"no frame from {self.url} within the time budget")
+
+    def _write(self, offset, chunk):
+        self._file.seek(offset)
+        self._file.write(chunk)
+        self.downloaded += len(chunk)
+        self._count("bytes_downloaded", len(chunk))
+        self._check_budget()
+
+    def _download_until(self, target):
+        while self.written < target and not self.complete:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.complete = True
+                break
+            self._write(self.written, chunk)
+            self.written += len(chunk)
+        self._file.flush()
+
+    def _fetch_tail(self):
+        """Range-fetch trailing MP4 metadata, once, if that's what's missing."""
+        self._tail_checked = True
+        if not (self.accepts_ranges and self.content_length):
+            return
+        tail_start = _mdat_end(self._file, self.written)
+        if tail_start is None or tail_start <= self.written or tail_start >= self.content_length:
+            return
+        if self.downloaded + (self.content_length - tail_start) > self.max_bytes:
+            return  # Won't fit the budget - keep streaming the head and hope
+
+        with http_client.get(self.url, stream=True, headers={"Range": f"bytes={tail_start}-"}) as response:
+            if response.status_code != 206:
+                return  # Range ignored (a 200 would be the whole video again)
+            offset = tail_start
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                self._write(offset, chunk)
+                offset += len(chunk)
+        self._file.flush()
+        self._count("range_requests")
+
+    def identity(self):
+        """A sha256 naming this video: its first slice plus its length, so the same
+        video is recognized after one slice instead of a full download."""
+        self._download_until(self.first_attempt_bytes)
+        self._file.seek(0)
+        digest = hashlib.sha256(self._file.read(min(self.written, self.first_attempt_bytes)))
+        digest.update(str(self.content_length or "").encode())
+        return digest.hexdigest()
+
+    def extract(self, attempt):
+        """
+        Call attempt(path) on ever larger downloaded slices until it returns a
+        true value (which is returned). attempt returns false when no frame can
+        be decoded from the file yet; exceptions propagate.
+        """
+        target = self.first_attempt_bytes
+        while True:
+            self._download_until(target)
+            if not self._tail_checked and not self.complete:
+                self._fetch_tail()
+            self._count("attempts")
+            result = attempt(self.path)
+            if result:
+                self._count("frames")
+                return result
+            if self.complete:
+                raise ValueError(f"No frame could be decoded from {self.url}")
+            self._check_budget()
+            target *= 2
+
+    def close(self):
+        self.response.close()
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        with self._stats["lock"]:
+            self._stats["videos"] += 1
+            if self.content_length:
+                self._stats["bytes_skipped"] += max(0, self.content_length - self.downloaded)
+
+_settings = dict(FRAME_EXTRACTOR_DEFAULTS)
+_stats = {
+    "lock": threading.Lock(),
+    "videos": 0,
+    "frames": 0,
+    "attempts": 0,          # Decode attempts (one per slice tried)
+    "range_requests": 0,
+    "bytes_downloaded": 0,
+    "bytes_skipped": 0,     # Bytes of the videos' full length never downloaded
+    "over_budget": 0,
+}
+
+def _scratch_dir():
+    return _settings["VIDEO_SCRATCH_DIR"] or os.path.join(tempfile.gettempdir(), "arcadescore-video")
+
+def configure_frame_extractor(app):
+    """Apply the VIDEO_* settings from the app config and clear stale scratch files
+    (called once from create_app)."""
+    for name, default in FRAME_EXTRACTOR_DEFAULTS.items():
+        _settings[name] = app.config.get(name, default)
+
+    scratch_dir = _scratch_dir()
+    os.makedirs(scratch_dir, exist_ok=True)
+    for name in os.listdir(scratch_dir):
+        path = os.path.join(scratch_dir, name)
+        try:
+            if name.endswith(".part") and time.time() - os.path.getmtime(path) > STALE_SCRATCH_SECONDS:
+                os.remove(path)
+        except OSError:
+            pass
+
+@contextmanager
+def open_video(url, response=None, prefix=b""):
+    """Start streaming a video; yields a VideoDownload. The scratch file is removed
+    and the connection released on exit, however much was read. A response the
+    caller already opened (and read `prefix` from) is picked up where it left off."""
+    if response is None:
+        response = http_client.get(url, stream=True)
+    if response.status_code != 200:
+        response.close()
+        raise ValueError(f"Failed to download video. HTTP Status: {response.status_code}")
+
+    try:
+        os.makedirs(_scratch_dir(), exist_ok=True)
+        video = VideoDownload(
+            url, response, _scratch_dir(), int(_settings["VIDEO_MAX_BYTES"]), float(_settings["VIDEO_TIMEOUT"]),
+            int(_settings["VIDEO_FIRST_ATTEMPT_BYTES"]), _stats, prefix,
+        )
+    except Exception:
+        response.close()
+        raise
+    try:
+        yield video
+    finally:
+        video.close()
+
+def get_frame_stats():
+    with _stats["lock"]:
+        return {name: value for name, value in _stats.items() if name != "lock"}
@@ -1,4 +1,6 @@
 from app.modules.socketio import emit_message
+from app.modules.leaderboard import LEADERBOARD_READY, schedule_leaderboard_rebuild
+from app.modules.read_cache import get_room_settings, invalidate_vpin_games
 
 def save_game_to_db(conn, data, game_id=None):
     """
@@ -45,8 +47,7 @@ def save_game_to_db(conn, data, game_id=None):
             # auto-hides scoreless games, it starts hidden regardless of what the
             # caller asked for - log_score_to_db un-hides it the moment its first
             # score lands.
-            cursor.execute("SELECT auto_hide_no_score_games FROM settings WHERE id = ?;", (data.get("room_id"),))
-            room_settings = cursor.fetchone()
+            room_settings = get_room_settings(cursor, data.get("room_id"))
             if room_settings and room_settings["auto_hide_no_score_games"] == "TRUE":
                 hidden = "TRUE"
 
@@ -83,14 +84,15 @@ def save_game_to_db(conn, data, game_id=None):
             max_sort = cursor.fetchone()[0]
             new_sort_order = (max_sort + 1) if max_sort is not None else 1
 
+            # No scores yet, so its (empty) leaderboard is already built for its sort order
             cursor.execute(
                 """
                 INSERT INTO games (game_name, css_score_cards, css_initials, css_scores, css_box, css_title,
                                 score_type, sort_ascending, game_image, game_background,
-                                tags, hidden, game_color, room_id, game_sort)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+                                tags, hidden, game_color, room_id, game_sort, leaderboard_sort)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
                 """,
-                game_data + (data.get("room_id"), new_sort_order),
+                game_data + (data.get("room_id"), new_sort_order, "TRUE" if data.get("sort_ascending") == "TRUE" else "FALSE"),
             )
             game_id = cursor.lastrowid
 
@@ -98,8 +100,16 @@ def save_game_to_db(conn, data, game_id=None):
         cursor.execute("SELECT css_body, css_card FROM settings WHERE id = ?;", (data.get("room_id"),))
         settings = cursor.fetchone()
 
+        # A changed sort order leaves the game's leaderboard ranked the old way
+        cursor.execute(f"SELECT {LEADERBOARD_READY} FROM games g WHERE g.id = ?;", (game_id,))
+        game_row = cursor.fetchone()
+        leaderboard_ready = not game_row or game_row[0]
+
         conn.commit()
 
+        if not leaderboard_ready:
+            schedule_leaderboard_rebuild([game_id])
+
         # Emit socket event for real-time updates
         updated_game = {
             "gameID": game_id,
@@ -146,6 +156,7 @@ def delete_game_from_db(conn, game_id):
 
         # Delete associated scores first (to prevent foreign key issues)
         cursor.execute("DELETE FROM highscores WHERE game_id = ?", (game_id,))
+        cursor.execute("DELETE FROM leaderboard WHERE game_id = ?", (game_id,))
 
         # Delete from `vpin_games` to maintain data integrity
         cursor.execute("DELETE FROM vpin_games WHERE arcadescore_game_id = ?", (game_id,))
@@ -155,6 +166,7 @@ def delete_game_from_db(conn, game_id):
 
         # Commit changes and close the connection
         conn.commit()
+        invalidate_vpin_games()
 
         # Emit WebSocket event
         deleted_game = {"gameID": game_id, "roomID": room_id}
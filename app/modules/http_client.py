@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+# Defaults for outbound HTTP (VPin Studio servers, VP-Spreadsheet, GitHub, media
+# URLs). create_app() copies these into app.config (each overridable by an
+# ARCADESCORE_* environment variable), same as DB_POOL_DEFAULTS in
+# app/modules/database.py.
+HTTP_CLIENT_DEFAULTS = {
+    "HTTP_CONNECT_TIMEOUT": 5.0,    # Seconds to open a connection, unless the caller passes its own timeout
+    "HTTP_READ_TIMEOUT": 30.0,      # Seconds to wait between bytes of a response
+    "HTTP_MAX_PER_HOST": 4,         # Requests in flight to one host at once (and keep-alive connections kept per host)
+    "HTTP_MAX_HOSTS": 32,           # Hosts with an open session; the least recently used one is closed past this
+}
+
+class _Host:
+    """One host's keep-alive session, concurrency limit and counters."""
+
+    def __init__(self, max_per_host):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.slots = threading.BoundedSemaphore(max_per_host)
+        self.stats = {
+            "requests": 0,
+            "errors": 0,        # Connection failures/timeouts and 5xx responses
+            "in_flight": 0,
+            "waits": 0,         # Requests that had to wait for a free slot
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+        }
+
+class HttpClient:
+    """
+    Shared outbound HTTP. Every host gets its own requests.Session, so repeat
+    calls to the same VPin Studio server (an import makes several per table)
+    reuse a kept-alive connection instead of a fresh TCP handshake each time.
+    Calls get a default (connect, read) timeout unless they pass one, at most
+    max_per_host of them run against one host at once (others wait their turn
+    cooperatively), and each host's latency and error counts are kept for
+    /api/v1/metrics/http.
+
+    The slot is released once the response headers are in; a stream=True
+    response keeps its connection until it's closed, so callers streaming a
+    body should use it as a context manager.
+    """
+
+    def __init__(self, connect_timeout=HTTP_CLIENT_DEFAULTS["HTTP_CONNECT_TIMEOUT"],
+                 read_timeout=HTTP_CLIENT_DEFAULTS["HTTP_READ_TIMEOUT"],
+                 max_per_host=HTTP_CLIENT_DEFAULTS["HTTP_MAX_PER_HOST"],
+                 max_hosts=HTTP_CLIENT_DEFAULTS["HTTP_MAX_HOSTS"]):
+        self.configure(connect_timeout, read_timeout, max_per_host, max_hosts)
+        self._hosts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, connect_timeout, read_timeout, max_per_host, max_hosts):
+        """Change the defaults. Hosts already seen keep their current limit until
+        their session is next recycled."""
+        self.timeout = (float(connect_timeout), float(read_timeout))
+        self.max_per_host = max(1, int(max_per_host))
+        self.max_hosts = max(1, int(max_hosts))
+
+    def _host(self, key):
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                host = self._hosts[key] = _Host(self.max_per_host)
+                while len(self._hosts) > self.max_hosts:
+                    # Idle or not, closing only drops its pooled connections -
+                    # a request still using it finishes on its own connection
+                    _, evicted = self._hosts.popitem(last=False)
+                    evicted.session.close()
+            self._hosts.move_to_end(key)
+            return host
+
+    def request(self, method, url, **kwargs):
+        """requests.request() through the host's pooled session. Raises the same
+        requests exceptions, so callers' existing error handling is unchanged."""
+        parts = urlsplit(url)
+        host = self._host(f"{parts.scheme}://{parts.netloc}".lower())
+        kwargs.setdefault("timeout", self.timeout)
+
+        if not host.slots.acquire(blocking=False):
+            with self._lock:
+                host.stats["waits"] += 1
+            host.slots.acquire()
+
+        with self._lock:
+            host.stats["requests"] += 1
+            host.stats["in_flight"] += 1
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = host.session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            host.slots.release()
+            with self._lock:
+                host.stats["in_flight"] -= 1
+                host.stats["errors"] += failed
+                host.stats["total_ms"] += elapsed_ms
+                host.stats["max_ms"] = max(host.stats["max_ms"], elapsed_ms)
+
+    def stats(self):
+        """Per-host request/error counts and latency (time to response headers)."""
+        with self._lock:
+            hosts = {key: dict(host.stats) for key, host in self._hosts.items()}
+        for stats in hosts.values():
+            total_ms = stats.pop("total_ms")
+            stats["avg_ms"] = round(total_ms / stats["requests"], 3) if stats["requests"] else 0.0
+            stats["max_ms"] = round(stats["max_ms"], 3)
+        return {
+            "connect_timeout": self.timeout[0],
+            "read_timeout": self.timeout[1],
+            "max_per_host": self.max_per_host,
+            "hosts": hosts,
+        }
+
+    def close(self):
+        with self._lock:
+            hosts, self._hosts = list(self._hosts.values()), OrderedDict()
+        for host in hosts:
+            host.session.close()
+
+_client = HttpClient()
+
+def configure_http_client(app):
+    """Apply the HTTP_* settings from the app config (called once from create_app)."""
+    settings = {name: app.config.get(name, default) for name, default in HTTP_CLIENT_DEFAULTS.items()}
+    _client.configure(settings["HTTP_CONNECT_TIMEOUT"], settings["HTTP_READ_TIMEOUT"],
+                      settings["HTTP_MAX_PER_HOST"], settings["HTTP_MAX_HOSTS"])
+
+def get_http_stats():
+    return _client.stats()
+
+def request(method, url, **kwargs):
+    return _client.request(method, url, **kwargs)
+
+def get(url, **kwargs):
+    return _client.request("GET", url, **kwargs)
+
+def head(url, **kwargs):
+    return _client.request("HEAD", url, **kwargs)
+
+def post(url, **kwargs):
+    return _client.request("POST", url, **kwargs)
+
+def delete(url, **kwargs):
+    return _client.request("DELETE", url, **kwargs)
@@ -1,8 +1,14 @@
+import hashlib
 import os
+import shutil
+import tempfile
+import threading
 import cv2
-import requests
-from PIL import Image
+import eventlet
+from PIL import Image, features
 from io import BytesIO
+from app.modules.frame_extractor import open_video
+from app.modules.image_executor import run_image_job
 
 # Compression resolution settings
 COMPRESSION_RESOLUTIONS = {
@@ -12,89 +18,313 @@ COMPRESSION_RESOLUTIONS = {
     "high": (640, 360),
 }
 
-def save_image(image_data, filename, storage_path, db_path, compression_level="original"):
-    """Saves raw image bytes to a file, resizing large images while keeping PNG format."""
-    try:
-        # Ensure filename has a .png extension
-        filename = filename.rsplit(".", 1)[0] + ".png"
+# Defaults for the scaled-down WebP/AVIF copies ("variants") written next to every
+# saved game image, so a scoreboard on a small screen or slow link doesn't have to
+# pull a full-size PNG per card. create_app() copies these into app.config (each
+# overridable by an ARCADESCORE_* environment variable), same as DB_POOL_DEFAULTS
+# in app/modules/database.py.
+IMAGE_VARIANT_DEFAULTS = {
+    "IMAGE_VARIANT_WIDTHS": "480,960,1920",  # Comma-separated; the image's own width is always added
+    "IMAGE_VARIANT_FORMATS": "webp",         # Any of webp,avif (avif needs a Pillow built with it); empty turns variants off
+    "IMAGE_VARIANT_QUALITY": 80,             # Lossy quality, 1-100
+}
 
-        # Load image from raw bytes
-        image = Image.open(BytesIO(image_data)).convert("RGBA")  # Ensure PNG compatibility
+# Variants of <folder>/<name> live in <folder>/variants/<name>/<width>.<format>
+VARIANTS_DIR = "variants"
+VARIANT_MIMETYPES = {"avif": "image/avif", "webp": "image/webp"}  # Most preferred first
 
-        # Determine the maximum size based on compression level
-        max_size = COMPRESSION_RESOLUTIONS.get(compression_level)
-        print(f"Compressing image to {compression_level}: {max_size}")
+# The image pipeline: decode once, apply a list of transforms to the decoded image,
+# encode once. Transforms are plain tuples so a pipeline can be handed to an image
+# worker process as-is:
+#   ("rotate", degrees)    - clockwise, growing the canvas to fit
+#   ("convert", mode)      - e.g. "RGBA", for PNG compatibility
+#   ("thumbnail", (w, h))  - shrink to fit inside w x h, keeping the aspect ratio
 
-        # Resize image if it exceeds max dimensions
-        if max_size and (image.width > max_size[0] or image.height > max_size[1]):
-            print(f"Resizing image from {image.size} to fit {max_size}...")
-            image.thumbnail(max_size)  # Uses anti-aliasing by default in newer versions of Pillow
+def _rotate(image, degrees):
+    return image.rotate(-degrees, expand=True)
 
-        # Save optimized PNG
-        full_filepath = os.path.join(storage_path, filename)
-        relative_filepath = os.path.join(db_path, filename).replace("\\", "/")
+def _convert(image, mode):
+    return image if image.mode == mode else image.convert(mode)
 
-        image.save(full_filepath, format="PNG", optimize=True, compress_level=3)
+def _thumbnail(image, max_size):
+    if image.width > max_size[0] or image.height > max_size[1]:
+        print(f"Resizing image from {image.size} to fit {max_size}...")
+        image.thumbnail(max_size)  # Uses anti-aliasing by default in newer versions of Pillow
+    return image
 
-        print(f"Image saved successfully: {relative_filepath}")
-        return relative_filepath  # Store this in DB
+TRANSFORMS = {
+    "rotate": _rotate,
+    "convert": _convert,
+    "thumbnail": _thumbnail,
+}
 
-    except Exception as e:
-        print(f"Failed to save image: {e}")
-        return None
+def build_transforms(compression_level="original", rotate=False):
+    """The transforms every saved table image goes through: an optional quarter turn,
+    RGBA, then the compression level's size limit."""
+    transforms = []
+    if rotate:
+        transforms.append(("rotate", 90))
+    transforms.append(("convert", "RGBA"))  # Ensure PNG compatibility
+    max_size = COMPRESSION_RESOLUTIONS.get(compression_level)
+    if max_size:
+        transforms.append(("thumbnail", max_size))
+    return transforms
+
+def decode_image(image_data):
+    return Image.open(BytesIO(image_data))
+
+def apply_transforms(image, transforms):
+    for name, argument in transforms:
+        if name not in TRANSFORMS:
+            raise ValueError(f"Unknown image transform: {name}")
+        image = TRANSFORMS[name](image, argument)
+    return image
+
+def encode_png(image, target):
+    """Write an optimized PNG to a path or file object."""
+    image.save(target, format="PNG", optimize=True, compress_level=3)
 
-def extract_first_frame(video_url, output_filename, storage_path, db_path, rotate=False, compression_level="original"):
-    """Extracts the first frame from an MP4 video, optionally rotates it, and saves it as an image."""
+def _parse_variant_spec(widths, formats, quality):
+    widths = tuple(sorted({int(w) for w in str(widths).split(",") if w.strip()}))
+    formats = tuple(
+        f for f in VARIANT_MIMETYPES
+        if f in {name.strip().lower() for name in str(formats).split(",")} and features.check(f)
+    )
+    return (widths, formats, max(1, min(100, int(quality)))) if formats else None
+
+# (widths, formats, quality), or None when variants are off
+_variant_spec = _parse_variant_spec(*IMAGE_VARIANT_DEFAULTS.values())
+
+def configure_image_variants(app):
+    """Apply the IMAGE_VARIANT_* settings from the app config (called once from create_app)."""
+    global _variant_spec
+    settings = {name: app.config.get(name, default) for name, default in IMAGE_VARIANT_DEFAULTS.items()}
+    _variant_spec = _parse_variant_spec(
+        settings["IMAGE_VARIANT_WIDTHS"], settings["IMAGE_VARIANT_FORMATS"], settings["IMAGE_VARIANT_QUALITY"]
+    )
+    if _variant_spec is None and settings["IMAGE_VARIANT_FORMATS"]:
+        print(f"⚠️ No usable image variant format in '{settings['IMAGE_VARIANT_FORMATS']}' - variants are off.")
+
+def variant_dir(full_filepath):
+    folder, name = os.path.split(full_filepath)
+    return os.path.join(folder, VARIANTS_DIR, name)
+
+def encode_variants(image, full_filepath, spec):
+    """Write every width/format variant of an already-decoded image, replacing any
+    older set in one rename so a request never sees a half-written one."""
+    widths, formats, quality = spec
+    target = variant_dir(full_filepath)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(target))
     try:
-        print(f"Downloading video from: {video_url}")
+        for width in sorted({w for w in widths if w < image.width} | {image.width}):
+            resized = image if width == image.width else image.resize(
+                (width, max(1, round(image.height * width / image.width))), Image.LANCZOS
+            )
+            for fmt in formats:
+                resized.save(os.path.join(staging, f"{width}.{fmt}"), format=fmt.upper(), quality=quality)
 
-        response = requests.get(video_url, stream=True)
-        if response.status_code != 200:
-            print(f"❌ Failed to download video. HTTP Status: {response.status_code}")
-            return None
+        if os.path.isdir(target):
+            retired = f"{staging}-old"
+            os.rename(target, retired)
+            os.rename(staging, target)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.rename(staging, target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
 
-        temp_file = "temp_video.mp4"
-        with open(temp_file, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+def list_variants(full_filepath):
+    """{format: [widths, ascending]} for the variants stored for an image."""
+    variants = {}
+    try:
+        names = os.listdir(variant_dir(full_filepath))
+    except OSError:
+        return variants
+    for name in names:
+        width, _, fmt = name.partition(".")
+        if width.isdigit() and fmt in VARIANT_MIMETYPES:
+            variants.setdefault(fmt, []).append(int(width))
+    for widths in variants.values():
+        widths.sort()
+    return variants
 
-        print("Video downloaded successfully. Attempting to open with OpenCV...")
+def pick_variant(full_filepath, accept, width=None):
+    """
+    The variant to serve for an image, as a path relative to the image's folder,
+    or None to serve the original. `accept` is the request's Accept header
+    (werkzeug's MIMEAccept); only formats it names outright count - "*/*" alone
+    is what older browsers send, and they can't decode WebP. With a width, the
+    narrowest variant at least that wide wins; otherwise the full-size one.
+    """
+    variants = list_variants(full_filepath)
+    for fmt, mimetype in VARIANT_MIMETYPES.items():
+        widths = variants.get(fmt)
+        if not widths or not any(value == mimetype and quality > 0 for value, quality in accept):
+            continue
+        chosen = next((w for w in widths if width and w >= width), widths[-1])
+        return "/".join((VARIANTS_DIR, os.path.basename(full_filepath), f"{chosen}.{fmt}"))
+    return None
 
-        cap = cv2.VideoCapture(temp_file)
-        if not cap.isOpened():
-            print("❌ OpenCV failed to open video.")
-            return None
+# The _*_job functions run in an image worker process (app/modules/image_executor.py),
+# so they take and return only plain values - bytes, transform tuples and file paths -
+# and must not touch the database, the app context or the network.
 
-        success, frame = cap.read()
+def _write_png(image, full_filepath):
+    # Written aside and renamed into place: a content-addressed file that exists
+    # is taken as complete by the next store of the same content
+    temp_path = f"{full_filepath}.{os.getpid()}.tmp"
+    try:
+        encode_png(image, temp_path)
+        os.replace(temp_path, full_filepath)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def _pipeline_job(image_data, transforms, full_filepath, variants=None):
+    image = apply_transforms(decode_image(image_data), transforms)
+    _write_png(image, full_filepath)
+    if variants:
+        encode_variants(image, full_filepath, variants)
+
+def _variants_job(full_filepath, variants):
+    with Image.open(full_filepath) as image:
+        encode_variants(image.convert("RGBA"), full_filepath, variants)
+
+def _extract_frame_job(video_path, transforms, full_filepath, variants=None):
+    """Save the first frame of a (possibly partially downloaded) video. Returns
+    False when no frame can be decoded from the file as it stands - see
+    app/modules/frame_extractor.py, which then downloads more and retries."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        success, frame = cap.read() if cap.isOpened() else (False, None)
+    finally:
         cap.release()
+    if not success or frame is None:
+        return False
 
-        if not success or frame is None:
-            print("❌ Failed to extract a valid frame from the video.")
-            return None
+    # Convert OpenCV frame (BGR) to PIL Image (RGB) - the only conversion; the
+    # frame is never round-tripped through PNG bytes
+    image = apply_transforms(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)), transforms)
+    _write_png(image, full_filepath)
+    if variants:
+        encode_variants(image, full_filepath, variants)
+    return True
 
-        print("Frame extracted successfully.")
+_backfilling = set()
+_backfill_lock = threading.Lock()
 
-        # Convert OpenCV frame (BGR) to PIL Image (RGB)
-        image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+def schedule_variants(full_filepath):
+    """Build the variants of an image saved before variants existed (or under other
+    settings), in the background - the caller serves the original meanwhile. At
+    most one job per image is in flight."""
+    spec = _variant_spec
+    if spec is None:
+        return
+    with _backfill_lock:
+        if full_filepath in _backfilling:
+            return
+        _backfilling.add(full_filepath)
 
-        if rotate:
-            print("Rotating image 90 degrees clockwise...")
-            image = image.rotate(-90, expand=True)  # Rotate clockwise
+    def backfill():
+        try:
+            run_image_job("variants", _variants_job, full_filepath, spec)
+        except Exception as e:
+            print(f"⚠️ Failed to build image variants for {full_filepath}: {e}")
+        finally:
+            with _backfill_lock:
+                _backfilling.discard(full_filepath)
 
-        # Convert image to raw PNG bytes
-        buffer = BytesIO()
-        image.save(buffer, format="PNG", optimize=True, compress_level=3)
-        raw_image_data = buffer.getvalue()
+    eventlet.spawn_n(backfill)
 
-        print(f"Saving extracted frame as PNG: {output_filename}")
-        saved_path = save_image(raw_image_data, output_filename, storage_path, db_path, compression_level)
+# Stored images are content-addressed: named by a sha256 of the source bytes plus
+# the transforms applied, so the same backglass imported into five rooms, or from
+# two VPin servers, is processed and stored once. References to the file are
+# counted by the media registry (app/modules/media.py).
 
-        if saved_path:
-            print(f"Image successfully saved: {saved_path}")
-        else:
-            print("❌ Image saving failed.")
+_store_locks = {}
+_store_lock = threading.Lock()
+_store_stats = {"stored": 0, "reused": 0}
+
+def content_address(source_sha256, transforms):
+    return hashlib.sha256(f"{source_sha256}:{transforms!r}".encode()).hexdigest()
+
+def _store(source_sha256, transforms, storage_path, db_path, produce):
+    """Call produce(full_filepath) to write <storage_path>/<address>.png unless that
+    file already exists, and return its DB path. Concurrent stores of the same
+    address wait for the first one instead of processing it again."""
+    name = f"{content_address(source_sha256, transforms)}.png"
+    full_filepath = os.path.join(storage_path, name)
+    relative_filepath = os.path.join(db_path, name).replace("\\", "/")
+
+    with _store_lock:
+        lock = _store_locks.setdefault(full_filepath, threading.Lock())
+    try:
+        with lock:
+            if os.path.exists(full_filepath):
+                with _store_lock:
+                    _store_stats["reused"] += 1
+                print(f"♻️ Already stored, skipping processing: {relative_filepath}")
+                return relative_filepath
+
+            produce(full_filepath)
+            with _store_lock:
+                _store_stats["stored"] += 1
+            return relative_filepath
+    finally:
+        with _store_lock:
+            if _store_locks.get(full_filepath) is lock and not lock.locked():
+                del _store_locks[full_filepath]
 
-        return saved_path
+def get_store_stats():
+    """Images processed and stored vs. found already stored (deduplicated)."""
+    with _store_lock:
+        return dict(_store_stats)
+
+def save_image(image_data, filename, storage_path, db_path, compression_level="original"):
+    """Saves raw image bytes as a PNG, resizing large images. The file is named by
+    content (see content_address); `filename` only labels the log lines. The
+    decode/resize/encode runs in an image worker; the caller waits cooperatively."""
+    try:
+        print(f"Compressing {filename} to {compression_level}: {COMPRESSION_RESOLUTIONS.get(compression_level)}")
+
+        transforms = build_transforms(compression_level)
+        relative_filepath = _store(
+            hashlib.sha256(image_data).hexdigest(), transforms, storage_path, db_path,
+            lambda full_filepath: run_image_job("save", _pipeline_job, image_data, transforms, full_filepath, _variant_spec),
+        )
+
+        print(f"Image saved successfully: {relative_filepath}")
+        return relative_filepath  # Store this in DB
+
+    except Exception as e:
+        print(f"Failed to save image: {e}")
+        return None
+
+def extract_first_frame(video_url, output_filename, storage_path, db_path, rotate=False, compression_level="original",
+                        response=None, prefix=b""):
+    """Extracts the first frame from an MP4 video, optionally rotates it, and saves it
+    as an image. Only as much of the video is downloaded as it takes to decode that
+    frame (app/modules/frame_extractor.py) - and only its first slice, if the same
+    video has been seen before. Pass an already-open streamed response (and the
+    bytes already read from it) to carry on with it instead of requesting again."""
+    try:
+        print(f"Streaming video for {output_filename} from: {video_url}")
+
+        transforms = build_transforms(compression_level, rotate)
+        with open_video(video_url, response, prefix) as video:
+            def produce(full_filepath):
+                video.extract(lambda path: run_image_job(
+                    "frame", _extract_frame_job, path, transforms, full_filepath, _variant_spec,
+                ))
+
+            relative_filepath = _store(video.identity(), transforms, storage_path, db_path, produce)
+            print(f"Downloaded {video.downloaded} of {video.content_length or '?'} bytes")
+
+        print(f"Image successfully saved: {relative_filepath}")
+        return relative_filepath
 
     except Exception as e:
         print(f"❌ Error extracting frame from {video_url}: {e}")
@@ -103,12 +333,11 @@ def extract_first_frame(video_url, output_filename, storage_path, db_path, rotat
 def rotate_image_90(image_data, output_filename, storage_path, db_path, compression_level="original"):
     """Rotates an image 90 degrees clockwise and saves it."""
     try:
-        image = Image.open(BytesIO(image_data))
-        rotated_image = image.rotate(-90, expand=True)
-
-        buffer = BytesIO()
-        rotated_image.save(buffer, format="PNG")
-        return save_image(buffer.getvalue(), output_filename, storage_path, db_path, compression_level)
+        transforms = build_transforms(compression_level, rotate=True)
+        return _store(
+            hashlib.sha256(image_data).hexdigest(), transforms, storage_path, db_path,
+            lambda full_filepath: run_image_job("rotate", _pipeline_job, image_data, transforms, full_filepath, _variant_spec),
+        )
     except Exception as e:
         print(f"Failed to rotate image: {e}")
         return None
@@ -0,0 +1,144 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Defaults for image processing. create_app() copies these into app.config (each
+# overridable by an ARCADESCORE_* environment variable), same as DB_POOL_DEFAULTS
+# in app/modules/database.py.
+IMAGE_EXECUTOR_DEFAULTS = {
+    "IMAGE_WORKERS": 2,     # Worker processes decoding/resizing/encoding images; 0 runs jobs in-process (the old behaviour)
+}
+
+def _run_job(fn, args, kwargs):
+    """Runs in the worker process: the job plus the CPU time it took there."""
+    started = time.process_time()
+    result = fn(*args, **kwargs)
+    return result, time.process_time() - started
+
+class ImageExecutor:
+    """
+    Runs PIL/OpenCV work (decoding, resizing, rotating, PNG encoding) in a pool
+    of worker processes instead of on the eventlet hub. An import saving a few
+    dozen table images used to stall every Socket.IO client and webhook for the
+    length of each encode; now the calling greenthread just waits for its
+    result, and everything else keeps running.
+
+    Jobs must be module-level functions taking and returning picklable values
+    (bytes, paths, tuples) - see the _*_job functions in imageProcessor.py.
+    Workers are started with "spawn" so they never inherit the server's
+    sockets or database connections, and only on first use. A worker that
+    dies (a crash inside a codec) breaks the pool; the job fails and the next
+    one gets a fresh pool.
+    """
+
+    def __init__(self, workers=IMAGE_EXECUTOR_DEFAULTS["IMAGE_WORKERS"]):
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pending = 0
+        self._stats = {}
+        self.configure(workers)
+
+    def configure(self, workers):
+        """Change the worker count. A running pool is replaced on next use."""
+        with self._lock:
+            self.workers = max(0, int(workers))
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _discard_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def _count(self, kind, cpu_seconds, wait_seconds, failed):
+        with self._lock:
+            counters = self._stats.setdefault(kind, {
+                "jobs": 0, "failures": 0, "cpu_ms": 0.0, "max_cpu_ms": 0.0, "wait_ms": 0.0, "max_wait_ms": 0.0,
+            })
+            counters["jobs"] += 1
+            counters["failures"] += failed
+            counters["cpu_ms"] += cpu_seconds * 1000
+            counters["max_cpu_ms"] = max(counters["max_cpu_ms"], cpu_seconds * 1000)
+            counters["wait_ms"] += wait_seconds * 1000
+            counters["max_wait_ms"] = max(counters["max_wait_ms"], wait_seconds * 1000)
+
+    def run(self, kind, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) in a worker process and return its result,
+        raising whatever it raised. The calling greenthread blocks; the hub
+        doesn't (the future's wait is on monkey-patched locks). `kind` only
+        labels the job in stats().
+        """
+        with self._lock:
+            self._pending += 1
+        started = time.perf_counter()
+        cpu_seconds = 0.0
+        failed = True
+        try:
+            if self.workers == 0:
+                result, cpu_seconds = _run_job(fn, args, kwargs)
+            else:
+                pool = self._get_pool()
+                try:
+                    result, cpu_seconds = pool.submit(_run_job, fn, args, kwargs).result()
+                except BrokenProcessPool:
+                    self._discard_pool(pool)
+                    raise
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._count(kind, cpu_seconds, time.perf_counter() - started, failed)
+
+    def stats(self):
+        """Queue depth plus per-kind job counts, CPU time spent in the workers and
+        wall time callers waited (queueing included). When wait_ms climbs well
+        past cpu_ms, jobs are queueing - the pool is saturated."""
+        with self._lock:
+            pending = self._pending
+            kinds = {kind: dict(counters) for kind, counters in self._stats.items()}
+        for counters in kinds.values():
+            jobs = counters["jobs"]
+            for name in ("cpu_ms", "wait_ms"):
+                total = counters.pop(name)
+                counters[f"avg_{name}"] = round(total / jobs, 3) if jobs else 0.0
+            counters["max_cpu_ms"] = round(counters["max_cpu_ms"], 3)
+            counters["max_wait_ms"] = round(counters["max_wait_ms"], 3)
+        running = min(pending, self.workers) if self.workers else pending
+        return {
+            "workers": self.workers,
+            "in_flight": pending,
+            "queued": pending - running,
+            "kinds": kinds,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+_executor = ImageExecutor()
+
+def configure_image_executor(app):
+    """Apply IMAGE_WORKERS from the app config (called once from create_app)."""
+    _executor.configure(app.config.get("IMAGE_WORKERS", IMAGE_EXECUTOR_DEFAULTS["IMAGE_WORKERS"]))
+
+def get_image_stats():
+    return _executor.stats()
+
+def run_image_job(kind, fn, *args, **kwargs):
+    return _executor.run(kind, fn, *args, **kwargs)
@@ -0,0 +1,262 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+from app.modules.database import db_version, swap_database
+from app.modules.export_engine import CHUNK_SIZE, ExportProgress, order_archive_chain, read_archive_manifest
+from app.modules.imageProcessor import VARIANTS_DIR, variant_dir
+from app.modules.media import MEDIA_FOLDERS, content_hash, rebuild_media_registry
+from app.modules.models import migrate_db
+from app.modules.read_cache import clear_read_cache
+from app.modules.utils import get_7z_path
+
+DATABASE_NAME = "highscores.db"
+
+def list_archive(archive_path, archive_format):
+    """{member name: uncompressed size} of everything in an archive, read from its
+    listing - nothing is extracted. Directories end in "/"."""
+    if archive_format == "zip":
+        with zipfile.ZipFile(archive_path) as archive:
+            return {info.filename: info.file_size for info in archive.infolist()}
+
+    seven_zip_path = get_7z_path()
+    if not seven_zip_path:
+        raise RuntimeError("7z not found. Install 7-Zip and add it to your PATH.")
+    output = subprocess.run([seven_zip_path, "l", "-slt", archive_path], capture_output=True, text=True, check=True).stdout
+
+    # -slt prints one "Key = value" block per member after a "----------" line
+    members, entry = {}, {}
+    for line in output.split("----------", 1)[-1].splitlines() + [""]:
+        if " = " in line:
+            key, value = line.split(" = ", 1)
+            entry[key] = value
+        elif entry.get("Path"):
+            name = entry["Path"].replace("\\", "/")
+            if "D" in entry.get("Attributes", "") or entry.get("Folder") == "+":
+                name += "/"
+            members[name] = int(entry.get("Size") or 0)
+            entry = {}
+    return members
+
+def _safe_parts(name):
+    """An archive member's path components, or None if extracting it as named
+    would land outside the target (absolute paths, drive letters, "..")."""
+    if name.startswith("/") or (len(name) > 1 and name[1] == ":"):
+        return None
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    return None if not parts or ".." in parts else parts
+
+def plan_import(archive_paths, archive_formats, image_root):
+    """
+    Check uploaded export archives from their listings alone, before anything
+    is extracted: they chain together (see order_archive_chain), no member
+    would land outside the import, the newest archive has a database, every
+    image its manifest lists is in one of them at the right size, and there's
+    disk space for it all. Raises ValueError (the message is for the user).
+
+    Returns the plan apply_import follows: where the database comes from, and
+    each image's (archive, size, member name) - later archives in the chain win,
+    and an image the newest manifest doesn't list isn't imported at all.
+    """
+    manifests = [read_archive_manifest(path, fmt) for path, fmt in zip(archive_paths, archive_formats)]
+    order = order_archive_chain(manifests)
+    listings = [list_archive(path, fmt) for path, fmt in zip(archive_paths, archive_formats)]
+
+    images = {}
+    for index in order:
+        for name, size in listings[index].items():
+            parts = _safe_parts(name)
+            if parts is None:
+                raise ValueError(f"Unsafe path in the uploaded archive: {name}")
+            if name.endswith("/") or len(parts) < 3 or parts[0] != "images" or parts[1] not in MEDIA_FOLDERS:
+                continue  # highscores.db, manifest.json, directories - and anything else, which isn't imported
+            if VARIANTS_DIR in parts[2:-1]:
+                continue  # Derived, rebuilt on demand
+            images["/".join(parts)] = (index, size, name)
+
+    newest = order[-1]
+    if DATABASE_NAME not in listings[newest]:
+        raise ValueError("Database file is missing in the uploaded archive.")
+
+    if manifests[newest]:
+        # Every image the newest export lists has to come from one of them - and
+        # only those: one an older export has but the newest doesn't list was
+        # deleted in between, and stays deleted
+        listed = manifests[newest]["files"]
+        for name, entry in listed.items():
+            if name not in images or images[name][1] != entry["size"]:
+                raise ValueError(f"Missing from the uploaded archives: {name}. Include every export the differential ones build on.")
+        images = {name: source for name, source in images.items() if name in listed}
+    else:
+        names = listings[newest]
+        for folder in MEDIA_FOLDERS:
+            if not any(name.startswith(f"images/{folder}/") for name in names):
+                raise ValueError(f"Missing required folder: {folder}")
+
+    needed = listings[newest][DATABASE_NAME] + sum(size for _, size, _ in images.values())
+    os.makedirs(image_root, exist_ok=True)
+    if needed > shutil.disk_usage(image_root).free:
+        raise ValueError(f"Not enough disk space to import {needed / 1048576:.1f} MB.")
+
+    return {
+        "archives": list(zip(archive_paths, archive_formats)),
+        "database": newest,
+        "database_bytes": listings[newest][DATABASE_NAME],
+        "images": images,
+    }
+
+def _stream_into_place(source, target_path, progress, message):
+    """Copy a readable stream to target_path, via a temporary name renamed into place."""
+    temp_path = f"{target_path}.import.tmp"
+    try:
+        with open(temp_path, "wb") as target:
+            while chunk := source.read(CHUNK_SIZE):
+                target.write(chunk)
+                progress.advance(len(chunk), message)
+        os.replace(temp_path, target_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+@contextmanager
+def _archive_members(archive_path, archive_format, names, scratch_dir):
+    """
+    Yields open(name) -> a readable stream of that member, for the given members
+    of one archive. A zip is read in place; 7-Zip extracts the members into
+    scratch_dir first (one run for all of them), removed again on exit.
+    """
+    if archive_format == "zip":
+        with zipfile.ZipFile(archive_path) as archive:
+            yield archive.open
+        return
+
+    staging_dir = tempfile.mkdtemp(prefix="import-", dir=scratch_dir)
+    list_path = os.path.join(staging_dir, "members.txt")
+    try:
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(names))
+        subprocess.run([get_7z_path(), "x", "-y", "-scsUTF-8", f"-o{staging_dir}", archive_path, f"@{list_path}"],
+                       check=True, stdout=subprocess.DEVNULL)
+        yield lambda name: open(os.path.join(staging_dir, *name.split("/")), "rb")
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+def _check_database(path):
+    """Refuse a database this app can't run on: no version, a newer one, or damaged."""
+    conn = sqlite3.connect(path)
+    try:
+        if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='meta'").fetchone():
+            raise ValueError("The imported database does not contain the 'meta' table.")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'db_version'").fetchone()
+        if not row:
+            raise ValueError("The imported database does not contain a valid db_version.")
+        if int(row[0]) > db_version:
+            raise ValueError(f"Database version {row[0]} is newer than {db_version}. Update the application.")
+        if conn.execute("PRAGMA quick_check;").fetchone()[0] != "ok":
+            raise ValueError("The imported database is damaged.")
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"The imported database can't be read: {e}")
+    finally:
+        conn.close()
+
+def _stage_images(plan, image_root, staging_root, progress):
+    """Stream every planned image into staging_root (laid out like the media
+    library), each archive opened once. A content-addressed file already in
+    image_root holds the same bytes and isn't staged at all. Returns the
+    staged files' paths relative to both roots, and how many were skipped."""
+    by_archive = {}
+    for name, (index, size, member) in plan["images"].items():
+        by_archive.setdefault(index, []).append((name, size, member))
+
+    staged, unchanged = [], 0
+    for index, images in sorted(by_archive.items()):
+        needed = []
+        for name, size, member in images:
+            relative = os.path.join(*name.split("/")[1:])
+            target_path = os.path.join(image_root, relative)
+            if content_hash(name) and os.path.isfile(target_path) and os.path.getsize(target_path) == size:
+                unchanged += 1
+                progress.advance(size, "Importing images")
+            else:
+                needed.append((member, relative))
+        if not needed:
+            continue
+
+        archive_path, archive_format = plan["archives"][index]
+        with _archive_members(archive_path, archive_format, [member for member, _ in needed], staging_root) as open_member:
+            for member, relative in needed:
+                staged_path = os.path.join(staging_root, relative)
+                os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+                with open_member(member) as source:
+                    _stream_into_place(source, staged_path, progress, "Importing images")
+                staged.append(relative)
+    return staged, unchanged
+
+def _move_images_into_place(staged, staging_root, image_root):
+    """Rename staged images over the media library's, dropping the replaced
+    files' WebP/AVIF variants to be rebuilt on demand."""
+    for relative in staged:
+        target_path = os.path.join(image_root, relative)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        os.replace(os.path.join(staging_root, relative), target_path)
+        shutil.rmtree(variant_dir(target_path), ignore_errors=True)
+
+def apply_import(plan, db_path, image_root, on_progress=None):
+    """
+    Carry out a plan_import plan. The database is streamed out of its archive
+    into a side file next to db_path, checked, and migrated there; images are
+    streamed into a staging directory next to the media library, and the side
+    file's media registry counted against both. Nothing live is touched until
+    then: the side file is swapped in for the live database once in-flight
+    requests are done with it (see swap_database), and only after that are the
+    staged images renamed into the library. If anything fails before the swap,
+    the live database and library are as they were. Every cache of the old
+    database is dropped. on_progress(done, total, message, details) gets bytes
+    processed.
+
+    Returns {"images", "unchanged", "duration_ms"}.
+    """
+    started = time.monotonic()
+    progress = ExportProgress(plan["database_bytes"] + sum(size for _, size, _ in plan["images"].values()), on_progress)
+    side_path = f"{db_path}.import"
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(side_path + suffix):
+            os.remove(side_path + suffix)
+
+    # Next to the library, so staged images can be renamed into it
+    os.makedirs(image_root, exist_ok=True)
+    staging_root = tempfile.mkdtemp(prefix="images-import-", dir=os.path.dirname(os.path.abspath(image_root)))
+    try:
+        archive_path, archive_format = plan["archives"][plan["database"]]
+        scratch_dir = os.path.dirname(os.path.abspath(db_path))
+        with _archive_members(archive_path, archive_format, [DATABASE_NAME], scratch_dir) as open_member, \
+                open_member(DATABASE_NAME) as source:
+            _stream_into_place(source, side_path, progress, "Extracting database")
+        progress.advance(0, "Checking database")
+        _check_database(side_path)
+        migrate_db(side_path)
+
+        staged, unchanged = _stage_images(plan, image_root, staging_root, progress)
+
+        conn = sqlite3.connect(side_path)
+        try:
+            rebuild_media_registry(conn, staging_root)  # The images on their way in...
+            rebuild_media_registry(conn, image_root)    # ...and the ones already there
+        finally:
+            conn.close()
+
+        progress.advance(0, "Switching to the imported database")
+        swap_database(db_path, side_path)
+        clear_read_cache()
+        _move_images_into_place(staged, staging_root, image_root)
+    finally:
+        shutil.rmtree(staging_root, ignore_errors=True)
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            if os.path.exists(side_path + suffix):
+                os.remove(side_path + suffix)
+
+    return {"images": len(staged), "unchanged": unchanged, "duration_ms": round((time.monotonic() - started) * 1000, 1)}
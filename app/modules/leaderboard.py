@@ -0,0 +1,302 @@
+import sys
+import time
+import traceback
+import eventlet
+from eventlet.queue import LightQueue
+from app.modules.database import get_pool
+
+# A write adding more than this many scores to one game rebuilds that game's
+# leaderboard in one statement instead of placing the scores one at a time
+LEADERBOARD_REBUILD_THRESHOLD = 50
+
+# SQL condition (over games g): this game's leaderboard rows were built for its
+# current sort order. Never NULL, so NOT (...) picks out the stale ones.
+LEADERBOARD_READY = "(g.leaderboard_sort IS CASE WHEN g.sort_ascending = 'TRUE' THEN 'TRUE' ELSE 'FALSE' END)"
+
+# One game's best score per visible player, ranked - the same order the score
+# lists use (better score first, equal scores oldest first). Hidden players
+# aren't ranked at all, so they don't take up places a card would show.
+# Param: game_id.
+_RANKED_BEST_SCORES = """
+    SELECT id AS score_id, game_id, player_id, score, ROW_NUMBER() OVER (ORDER BY sort_key, id) AS rank
+    FROM (
+        SELECT h.id, h.game_id, h.player_id, h.score,
+            CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END AS sort_key,
+            ROW_NUMBER() OVER (
+                PARTITION BY h.player_id
+                ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END, h.id
+            ) AS player_rank
+        FROM highscores h
+        JOIN games g ON g.id = h.game_id
+        JOIN players p ON p.id = h.player_id
+        WHERE h.game_id = ? AND p.hidden IS NOT 'TRUE'
+    )
+    WHERE player_rank = 1
+"""
+
+# Columns/joins turning leaderboard rows (l) into the same dicts get_top_scores returns
+_ROW_COLUMNS = """
+    l.game_id,
+    CASE
+        WHEN s.long_names_enabled = 'TRUE' OR p.long_names_enabled = 'TRUE' THEN p.full_name
+        ELSE p.default_alias
+    END AS display_name,
+    p.full_name, p.default_alias,
+    h.score, h.room_id, h.event, h.wins, h.losses, h.timestamp, p.hidden, p.id AS player_id,
+    l.score_id, l.rank
+"""
+_ROW_JOINS = """
+    JOIN highscores h ON h.id = l.score_id
+    JOIN players p ON p.id = l.player_id
+    JOIN settings s ON s.id = h.room_id
+"""
+
+def _rank_range(offset, limit):
+    """SQL condition (and params) for ranks offset+1 .. offset+limit (0 = no upper
+    bound). Built per call rather than as "? = 0 OR ...", which would keep the
+    planner off idx_leaderboard_game_rank."""
+    if limit:
+        return "l.rank > ? AND l.rank <= ?", (offset, offset + limit)
+    return "l.rank > ?", (offset,)
+
+_rebuild_queue = LightQueue()
+_rebuilds_pending = set()
+_worker_started = False
+
+def rebuild_game_leaderboard(conn, game_id):
+    """
+    Recompute one game's leaderboard rows from highscores and stamp the sort
+    order they were built for. Joins the caller's transaction if one is open
+    (and leaves committing to it), otherwise runs in its own.
+    """
+    cursor = conn.cursor()
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        cursor.execute("BEGIN IMMEDIATE;")
+    try:
+        cursor.execute("DELETE FROM leaderboard WHERE game_id = ?;", (game_id,))
+        cursor.execute(f"""
+            INSERT INTO leaderboard (score_id, game_id, player_id, score, rank)
+            {_RANKED_BEST_SCORES};
+        """, (game_id,))
+        cursor.execute("""
+            UPDATE games SET leaderboard_sort = CASE WHEN sort_ascending = 'TRUE' THEN 'TRUE' ELSE 'FALSE' END
+            WHERE id = ?;
+        """, (game_id,))
+        if own_transaction:
+            conn.commit()
+    except Exception:
+        if own_transaction:
+            conn.rollback()
+        raise
+
+def rebuild_leaderboards(conn):
+    """Rebuild every game's leaderboard, one transaction per game (migration 11)."""
+    game_ids = [row[0] for row in conn.execute("SELECT id FROM games;").fetchall()]
+    conn.commit()
+    for game_id in game_ids:
+        rebuild_game_leaderboard(conn, game_id)
+    return len(game_ids)
+
+def _place_score(cursor, game_id, ascending, row):
+    """Fold one new score into a game's leaderboard: if it beats the player's
+    current best (or is their first), move the player to its rank and shift
+    everyone in between down by one. Hidden players' scores aren't ranked."""
+    cursor.execute("SELECT hidden FROM players WHERE id = ?;", (row["player_id"],))
+    player = cursor.fetchone()
+    if player and player[0] == "TRUE":
+        return
+
+    better = "<" if ascending else ">"
+    cursor.execute("SELECT score, rank FROM leaderboard WHERE game_id = ? AND player_id = ?;", (game_id, row["player_id"]))
+    current = cursor.fetchone()
+    if current and not (row["score"] < current[0] if ascending else row["score"] > current[0]):
+        return
+
+    # New scores always have the highest id, so equal scores already listed stay ahead
+    cursor.execute(f"""
+        SELECT COUNT(*) FROM leaderboard WHERE game_id = ? AND (score {better} ? OR score = ?);
+    """, (game_id, row["score"], row["score"]))
+    rank = cursor.fetchone()[0] + 1
+
+    if current:
+        cursor.execute("""
+            UPDATE leaderboard SET rank = rank + 1 WHERE game_id = ? AND rank >= ? AND rank < ?;
+        """, (game_id, rank, current[1]))
+        cursor.execute("""
+            UPDATE leaderboard SET score_id = ?, score = ?, rank = ? WHERE game_id = ? AND player_id = ?;
+        """, (row["id"], row["score"], rank, game_id, row["player_id"]))
+    else:
+        cursor.execute("UPDATE leaderboard SET rank = rank + 1 WHERE game_id = ? AND rank >= ?;", (game_id, rank))
+        cursor.execute("""
+            INSERT INTO leaderboard (score_id, game_id, player_id, score, rank) VALUES (?, ?, ?, ?, ?);
+        """, (row["id"], game_id, row["player_id"], row["score"], rank))
+
+def update_leaderboards(conn, new_scores):
+    """
+    Apply freshly inserted scores (rows from log_scores_to_db, with `id`) to their
+    games' leaderboards. Runs inside the score write's transaction and doesn't
+    commit, so scores and rankings always land together.
+
+    A game whose rows are stale (its sort order changed and the background
+    rebuild hasn't got to it yet) or that got more than
+    LEADERBOARD_REBUILD_THRESHOLD scores at once is rebuilt in place instead.
+    """
+    by_game = {}
+    for row in new_scores:
+        by_game.setdefault(row["game_id"], []).append(row)
+
+    cursor = conn.cursor()
+    for game_id, rows in sorted(by_game.items()):
+        cursor.execute(f"SELECT g.sort_ascending, {LEADERBOARD_READY} FROM games g WHERE g.id = ?;", (game_id,))
+        game = cursor.fetchone()
+        if not game:
+            continue
+        if not game[1] or len(rows) > LEADERBOARD_REBUILD_THRESHOLD:
+            rebuild_game_leaderboard(conn, game_id)
+            continue
+        for row in sorted(rows, key=lambda r: r["id"]):
+            _place_score(cursor, game_id, game[0] == "TRUE", row)
+
+def remove_player_from_leaderboards(conn, player_id):
+    """Drop a player's rows, closing the gap they leave in each game's ranking.
+    Doesn't commit (called from delete_player_from_db's transaction)."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT game_id, rank FROM leaderboard WHERE player_id = ?;", (player_id,))
+    for game_id, rank in cursor.fetchall():
+        cursor.execute("DELETE FROM leaderboard WHERE game_id = ? AND player_id = ?;", (game_id, player_id))
+        cursor.execute("UPDATE leaderboard SET rank = rank - 1 WHERE game_id = ? AND rank > ?;", (game_id, rank))
+
+def refresh_player_leaderboards(conn, player_id, hidden):
+    """
+    A player was just hidden or shown again: drop their rows from every game's
+    ranking, or rebuild the games they have scores in to rank them again.
+    Doesn't commit (called from the visibility toggle's transaction). Returns
+    the (room_id, game_id) pairs affected.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT room_id, game_id FROM highscores WHERE player_id = ?;", (player_id,))
+    games = [(row[0], row[1]) for row in cursor.fetchall()]
+    if hidden:
+        remove_player_from_leaderboards(conn, player_id)
+    else:
+        for _, game_id in games:
+            rebuild_game_leaderboard(conn, game_id)
+    return games
+
+def _live_game_rows(cursor, game_id, offset, limit):
+    """A stale game's ranking, computed from highscores (what its rows will hold once rebuilt)."""
+    rank_range, params = _rank_range(offset, limit)
+    cursor.execute(f"""
+        SELECT {_ROW_COLUMNS}
+        FROM ({_RANKED_BEST_SCORES}) l
+        {_ROW_JOINS}
+        WHERE {rank_range}
+        ORDER BY l.rank;
+    """, (game_id, *params))
+    return [dict(row) for row in cursor.fetchall()]
+
+def get_room_leaderboard(conn, room_id, per_game=0):
+    """
+    Each game's best score per player in a room, top `per_game` (0 = all) of
+    each, in the same dict shape as get_top_scores (plus score_id). Served from
+    the leaderboard table with a rank range per game - no sorting at read time.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT g.id FROM games g WHERE g.room_id = ? AND NOT {LEADERBOARD_READY};", (room_id,))
+    stale = [row[0] for row in cursor.fetchall()]
+
+    rank_range, params = _rank_range(0, per_game)
+    cursor.execute(f"""
+        SELECT {_ROW_COLUMNS}
+        FROM games g
+        JOIN leaderboard l ON l.game_id = g.id
+        {_ROW_JOINS}
+        WHERE g.room_id = ? AND {LEADERBOARD_READY} AND {rank_range}
+        ORDER BY l.game_id, l.rank;
+    """, (room_id, *params))
+    rows = [dict(row) for row in cursor.fetchall()]
+
+    if stale:
+        for game_id in stale:
+            rows.extend(_live_game_rows(cursor, game_id, 0, per_game))
+        rows.sort(key=lambda row: (row["game_id"], row["rank"]))
+    return rows
+
+def get_game_leaderboard(conn, game_id, offset=0, limit=0):
+    """
+    One page of a game's best-score-per-player ranking.
+    :return: (rows, total ranked players)
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {LEADERBOARD_READY} FROM games g WHERE g.id = ?;", (game_id,))
+    game = cursor.fetchone()
+    if not game:
+        return [], 0
+
+    if not game[0]:
+        cursor.execute("""
+            SELECT COUNT(DISTINCT h.player_id) FROM highscores h JOIN players p ON p.id = h.player_id
+            WHERE h.game_id = ? AND p.hidden IS NOT 'TRUE';
+        """, (game_id,))
+        return _live_game_rows(cursor, game_id, offset, limit), cursor.fetchone()[0]
+
+    rank_range, params = _rank_range(offset, limit)
+    cursor.execute(f"""
+        SELECT {_ROW_COLUMNS}
+        FROM leaderboard l
+        {_ROW_JOINS}
+        WHERE l.game_id = ? AND {rank_range}
+        ORDER BY l.rank;
+    """, (game_id, *params))
+    rows = [dict(row) for row in cursor.fetchall()]
+    cursor.execute("SELECT COUNT(*) FROM leaderboard WHERE game_id = ?;", (game_id,))
+    return rows, cursor.fetchone()[0]
+
+def schedule_leaderboard_rebuild(game_ids):
+    """Queue games for a rebuild by the background worker. Without a running
+    worker (tests, scripts) they just stay stale: reads fall back to computing
+    the ranking from highscores, and the game's next score write rebuilds it."""
+    if not _worker_started:
+        return
+    for game_id in game_ids:
+        if game_id not in _rebuilds_pending:
+            _rebuilds_pending.add(game_id)
+            _rebuild_queue.put_nowait(game_id)
+
+def _worker(app):
+    pool = get_pool(app.config["DB_PATH"], app.config)
+    while True:
+        game_id = _rebuild_queue.get()
+        _rebuilds_pending.discard(game_id)
+        started = time.perf_counter()
+        conn = pool.acquire()
+        try:
+            rebuild_game_leaderboard(conn, game_id)
+            print(f"🏆 Rebuilt leaderboard for game {game_id} in {(time.perf_counter() - started) * 1000:.1f}ms")
+        except Exception:
+            print(f"❌ Leaderboard rebuild for game {game_id} failed: {traceback.format_exc()}")
+            sys.stdout.flush()
+        finally:
+            pool.release(conn)
+        eventlet.sleep(0)
+
+def start_leaderboard_worker(app):
+    """Start the background rebuild worker (called once from create_app) and queue
+    any game left stale by the last shutdown."""
+    global _worker_started
+    if _worker_started:
+        return
+
+    _worker_started = True
+    eventlet.spawn_n(_worker, app)
+
+    pool = get_pool(app.config["DB_PATH"], app.config)
+    conn = pool.acquire()
+    try:
+        stale = [row[0] for row in conn.execute(f"SELECT g.id FROM games g WHERE NOT {LEADERBOARD_READY};").fetchall()]
+    finally:
+        pool.release(conn)
+    if stale:
+        print(f"♻️ Queued {len(stale)} stale leaderboard(s) for rebuild")
+        schedule_leaderboard_rebuild(stale)
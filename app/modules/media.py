@@ -0,0 +1,206 @@
+import hashlib
+import os
+import re
+import shutil
+import time
+from app.modules.imageProcessor import variant_dir
+
+# Defaults for the media registry. create_app() copies these into app.config
+# (each overridable by an ARCADESCORE_* environment variable), same as
+# DB_POOL_DEFAULTS in app/modules/database.py.
+MEDIA_DEFAULTS = {
+    "MEDIA_RELEASE_GRACE": 3600,  # Seconds an unreferenced file is kept before cleanup may delete it
+}
+
+# Stored images referenced from these columns are counted in media.refcount by
+# the triggers create_media_registry() installs
+MEDIA_REFERENCES = (
+    ("games", "game_image"),
+    ("games", "game_background"),
+    ("players", "icon"),
+)
+MEDIA_URL_PREFIX = "/static/images/"
+MEDIA_FOLDERS = ("avatars", "gameBackground", "gameImage")
+
+# Shipped with the app; never deleted however many players stop using it
+PROTECTED_MEDIA = {"/static/images/avatars/default-avatar.png"}
+
+# unixepoch() needs SQLite 3.38+; this works everywhere
+_NOW_SQL = "((julianday('now') - 2440587.5) * 86400.0)"
+
+def content_hash(path):
+    """The sha256 a content-addressed path (".../<64 hex chars>.<ext>") is named by, else None."""
+    stem = path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    return stem if re.fullmatch(r"[0-9a-f]{64}", stem) else None
+
+def _hash_from_path_sql(column):
+    """content_hash() in SQL, for the triggers."""
+    name = f"substr({column}, length(rtrim({column}, 'abcdefghijklmnopqrstuvwxyz')) - 64, 64)"
+    return f"CASE WHEN {name} GLOB '{'[0-9a-f]' * 64}' THEN {name} END"
+
+def create_media_registry(cursor):
+    """
+    Registry of stored images (avatars, game images/backgrounds), one row per
+    file path, with how many rows of MEDIA_REFERENCES point at it. Triggers keep
+    refcount right on every insert, update and delete - including whole rooms'
+    games going at once - so no write path has to remember to. A path that
+    isn't registered yet is registered by the first reference to it.
+
+    released_at is when refcount last dropped to 0: cleanup waits a grace period
+    past it, because an import may be about to reuse that exact file (same
+    content, same address) moments after a delete stopped using it.
+    """
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS media (
+            path TEXT PRIMARY KEY,
+            sha256 TEXT,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL DEFAULT {_NOW_SQL},
+            released_at REAL
+        );
+    """)
+    # Cleanup: WHERE refcount <= 0 AND released_at <= ? - only ever the unreferenced rows
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_media_unreferenced ON media (released_at) WHERE refcount <= 0;
+    """)
+
+    for table, column in MEDIA_REFERENCES:
+        def add_ref(value):
+            return f"""
+                INSERT OR IGNORE INTO media (path, sha256)
+                    SELECT {value}, {_hash_from_path_sql(value)} WHERE {value} LIKE '{MEDIA_URL_PREFIX}%';
+                UPDATE media SET refcount = refcount + 1, released_at = NULL WHERE path = {value};
+            """
+
+        def drop_ref(value):
+            return f"""
+                UPDATE media SET refcount = refcount - 1,
+                    released_at = CASE WHEN refcount <= 1 THEN {_NOW_SQL} ELSE released_at END
+                    WHERE path = {value};
+            """
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS media_ref_{table}_{column}_insert AFTER INSERT ON {table}
+            WHEN NEW.{column} IS NOT NULL
+            BEGIN {add_ref(f"NEW.{column}")} END;
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS media_ref_{table}_{column}_update AFTER UPDATE OF {column} ON {table}
+            WHEN NEW.{column} IS NOT OLD.{column}
+            BEGIN {add_ref(f"NEW.{column}")} {drop_ref(f"OLD.{column}")} END;
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS media_ref_{table}_{column}_delete AFTER DELETE ON {table}
+            WHEN OLD.{column} IS NOT NULL
+            BEGIN {drop_ref(f"OLD.{column}")} END;
+        """)
+
+def rebuild_media_registry(conn, image_root="app/static/images"):
+    """
+    (Re)count every reference from scratch, and register the files already on
+    disk that nothing references so cleanup can find them - the one directory
+    walk left, run once when the registry is first created. Returns
+    (registered, unreferenced).
+    """
+    cursor = conn.cursor()
+    references = " UNION ALL ".join(f"SELECT {column} AS path FROM {table}" for table, column in MEDIA_REFERENCES)
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO media (path, sha256)
+        SELECT path, {_hash_from_path_sql("path")} FROM ({references})
+        WHERE path LIKE '{MEDIA_URL_PREFIX}%' GROUP BY path;
+    """)
+
+    for folder in MEDIA_FOLDERS:
+        folder_path = os.path.join(image_root, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for name in os.listdir(folder_path):
+            path = f"{MEDIA_URL_PREFIX}{folder}/{name}"
+            if os.path.isfile(os.path.join(folder_path, name)) and path not in PROTECTED_MEDIA:
+                cursor.execute("""
+                    INSERT OR IGNORE INTO media (path, sha256) VALUES (?, ?);
+                """, (path, content_hash(path)))
+
+    counts = " + ".join(
+        f"(SELECT COUNT(*) FROM {table} WHERE {column} = media.path)" for table, column in MEDIA_REFERENCES
+    )
+    cursor.execute(f"UPDATE media SET refcount = {counts};")
+    cursor.execute(f"""
+        UPDATE media SET released_at = CASE WHEN refcount <= 0 THEN {_NOW_SQL} END;
+    """)
+    conn.commit()
+
+    registered = cursor.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+    unreferenced = cursor.execute("SELECT COUNT(*) FROM media WHERE refcount <= 0").fetchone()[0]
+    return registered, unreferenced
+
+def register_media(conn, path):
+    """Register a freshly stored file nothing references yet (an upload), so it's
+    cleaned up if it never gets used. Already-registered paths are left alone."""
+    conn.execute(f"""
+        INSERT OR IGNORE INTO media (path, sha256, released_at) VALUES (?, ?, {_NOW_SQL});
+    """, (path, content_hash(path)))
+    conn.commit()
+
+def store_upload(data, folder, extension, image_root="app/static/images"):
+    """
+    Write uploaded bytes to <folder>/<sha256><extension> and return its
+    /static/images/... path. The same bytes uploaded twice land on the same
+    file, and aren't written again.
+    """
+    name = f"{hashlib.sha256(data).hexdigest()}{extension.lower()}"
+    file_path = os.path.join(image_root, folder, name)
+    if not os.path.exists(file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+    return f"{MEDIA_URL_PREFIX}{folder}/{name}"
+
+def cleanup_unreferenced_media(conn, static_root, grace_seconds=MEDIA_DEFAULTS["MEDIA_RELEASE_GRACE"]):
+    """
+    Delete the files (and their WebP/AVIF variants) nothing has referenced for
+    at least grace_seconds, and their registry rows. Only unreferenced rows are
+    read. Returns how many were removed.
+    """
+    cursor = conn.cursor()
+    stale = cursor.execute("""
+        SELECT path FROM media WHERE refcount <= 0 AND released_at <= ?;
+    """, (time.time() - grace_seconds,)).fetchall()
+
+    removed = 0
+    for (path,) in stale:
+        if path in PROTECTED_MEDIA:
+            continue
+        # Re-checked per row: a reference may have arrived since the SELECT
+        deleted = cursor.execute("DELETE FROM media WHERE path = ? AND refcount <= 0", (path,)).rowcount
+        conn.commit()
+        if not deleted:
+            continue
+
+        file_path = os.path.join(static_root, path.lstrip("/"))
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(variant_dir(file_path), ignore_errors=True)
+        removed += 1
+        print(f"Removed unused image: {path}")
+    return removed
+
+def get_media_stats(conn):
+    row = conn.execute("""
+        SELECT COUNT(*),
+               COALESCE(SUM(refcount > 0), 0),
+               COALESCE(SUM(refcount), 0),
+               COALESCE(SUM(sha256 IS NOT NULL), 0)
+        FROM media;
+    """).fetchone()
+    return {
+        "files": row[0],
+        "referenced": row[1],
+        "unreferenced": row[0] - row[1],
+        "references": row[2],
+        "content_addressed": row[3],
+    }
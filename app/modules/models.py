@@ -1,6 +1,151 @@
 import sqlite3
 import os
 from app.modules.database import db_version
+from app.modules.leaderboard import rebuild_leaderboards
+from app.modules.media import create_media_registry, rebuild_media_registry
+
+# Secondary indexes for every hot lookup, each matched to the query shape that
+# uses it (name, table, columns). Shared by init_db (fresh installs) and the
+# version 6 migration (existing databases), so both end up with the same set.
+HOT_INDEXES = [
+    # Room scoreboard / API / getHighScores: WHERE room_id = ? ORDER BY game_id, score.
+    # player_id rides along so the auto-hide "games with no scores" subquery and the
+    # score dedup lookup are answered from the index alone.
+    ("idx_highscores_room_game_score", "highscores", "room_id, game_id, score, player_id"),
+    # Per-game score lists pushed after every new score: WHERE game_id = ? ORDER BY score
+    ("idx_highscores_game_score", "highscores", "game_id, score"),
+    # Player detail page + player deletion: WHERE player_id = ? ORDER BY timestamp DESC
+    ("idx_highscores_player_timestamp", "highscores", "player_id, timestamp"),
+    # publicCommands.php getScores2: WHERE room_id = ? ORDER BY timestamp DESC
+    ("idx_highscores_room_timestamp", "highscores", "room_id, timestamp"),
+    # Webhook/import game mapping: WHERE server_url = ? AND vpin_game_id = ? (covering)
+    ("idx_vpin_games_server_game", "vpin_games", "server_url, vpin_game_id, arcadescore_game_id"),
+    # DELETE webhooks carry no server, only the VPin id
+    ("idx_vpin_games_vpin_game_id", "vpin_games", "vpin_game_id"),
+    # Game deletion cleans up its mapping rows
+    ("idx_vpin_games_arcadescore_game_id", "vpin_games", "arcadescore_game_id"),
+    # Per-server player map + single-player resolution (covering)
+    ("idx_vpin_players_server_player", "vpin_players", "server_url, vpin_player_id, arcadescore_player_id"),
+    ("idx_vpin_players_vpin_player_id", "vpin_players", "vpin_player_id"),
+    ("idx_vpin_players_arcadescore_player_id", "vpin_players", "arcadescore_player_id"),
+    # Alias lists per player (lookup by alias already uses the UNIQUE autoindex)
+    ("idx_aliases_player_id", "aliases", "player_id, alias"),
+    ("idx_players_default_alias", "players", "default_alias"),
+    # Games of a room in display order
+    ("idx_games_room_sort", "games", "room_id, game_sort"),
+    # _get_room_webhook / record_webhook_health
+    ("idx_vpin_webhooks_room_id", "vpin_webhooks", "room_id"),
+]
+
+# Score identity (see SCORE_IDENTITY_COLUMNS in app/modules/scores.py). UNIQUE, so
+# log_scores_to_db can dedup with INSERT OR IGNORE instead of a lookup per score.
+SCORE_IDENTITY_INDEX = ("ux_highscores_identity", "highscores", "game_id, player_id, score, timestamp, room_id")
+
+def create_score_identity_index(conn):
+    """Collapse existing exact duplicates (keeping the oldest row of each) and
+    add the unique score-identity index. Duplicates could only get in through
+    paths that never checked for them (publicCommands.php addScore) or an old
+    race between two webhook calls, but any single one would make the CREATE
+    UNIQUE INDEX fail."""
+    name, table, columns = SCORE_IDENTITY_INDEX
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY {columns});
+    """)
+    if cursor.rowcount:
+        print(f"🧹 Removed {cursor.rowcount} duplicate score(s) before adding the score identity index")
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({columns});")
+    conn.commit()
+
+def create_score_version_triggers(cursor):
+    """Keep games.score_version counting every change to a game's scores. Live
+    scoreboards apply score deltas only on top of the exact version they were
+    built from and resync otherwise, so every path that touches highscores has
+    to bump it - triggers make that hold for all of them (including bulk
+    deletes and imports) rather than relying on each call site. Each inserted
+    or deleted row bumps the version by one."""
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_highscores_insert_version AFTER INSERT ON highscores
+        BEGIN
+            UPDATE games SET score_version = score_version + 1 WHERE id = NEW.game_id;
+        END;
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_highscores_delete_version AFTER DELETE ON highscores
+        BEGIN
+            UPDATE games SET score_version = score_version + 1 WHERE id = OLD.game_id;
+        END;
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_highscores_update_version AFTER UPDATE ON highscores
+        BEGIN
+            UPDATE games SET score_version = score_version + 1 WHERE id IN (OLD.game_id, NEW.game_id);
+        END;
+    """)
+
+def create_indexes(conn, indexes=HOT_INDEXES):
+    """Build the given indexes if they don't exist yet, committing after each one.
+
+    SQLite holds the write lock for as long as a single CREATE INDEX runs, so
+    building them one transaction at a time (rather than all inside the
+    migration's transaction) keeps each lock window short on a large existing
+    database - with WAL, readers carry on throughout and writers only ever wait
+    for one index, not the whole set.
+
+    Deliberately no ANALYZE here: statistics gathered on a fresh (nearly empty)
+    database go stale as scores pile up, and stale stats steered the planner
+    away from these indexes in testing - its default heuristics pick them
+    correctly."""
+    cursor = conn.cursor()
+    conn.commit()
+    for name, table, columns in indexes:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns});")
+        conn.commit()
+
+def create_webhook_events_table(cursor):
+    """Durable queue of inbound score webhooks (see app/modules/score_queue.py).
+    Times are unix epoch seconds so the workers can do backoff arithmetic in SQL.
+    status: pending -> processing -> done | failed (pending again on retry)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS webhook_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT NOT NULL DEFAULT 'score',
+            room_id INTEGER,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            result TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        );
+    """)
+    # Workers claim the oldest due event: WHERE status = 'pending' AND next_attempt_at <= ?
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_webhook_events_status_due ON webhook_events (status, next_attempt_at);
+    """)
+
+def create_leaderboard_table(cursor):
+    """Materialized per-game leaderboard: each player's best score in a game and
+    its rank (see app/modules/leaderboard.py). Maintained by the score-write path;
+    games.leaderboard_sort records the sort order a game's rows were built for,
+    so a sort change marks them stale until they're rebuilt."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            game_id INTEGER NOT NULL,
+            player_id INTEGER NOT NULL,
+            score_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            PRIMARY KEY (game_id, player_id)
+        ) WITHOUT ROWID;
+    """)
+    # Reads (top N per game, pages) and rank shifts: WHERE game_id = ? AND rank ...
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_game_rank ON leaderboard (game_id, rank);")
+    # Placing a new best: COUNT(*) WHERE game_id = ? AND score > ?
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_game_score ON leaderboard (game_id, score);")
 
 def init_db(db_path):
     try:
@@ -55,9 +200,12 @@ def init_db(db_path):
                     game_background TEXT,
                     tags TEXT,
                     hidden TEXT,
-                    game_color TEXT
+                    game_color TEXT,
+                    score_version INTEGER NOT NULL DEFAULT 0,
+                    leaderboard_sort TEXT DEFAULT NULL
                 );
             """)
+            create_score_version_triggers(cursor)
 
             # VPin Studio Games Link table
             cursor.execute("""
@@ -103,6 +251,8 @@ def init_db(db_path):
                     "fullscreen_enabled"	TEXT DEFAULT 'TRUE',
                     "text_autofit_enabled"	TEXT DEFAULT 'TRUE',
                     "auto_hide_no_score_games"	TEXT DEFAULT 'FALSE',
+                    "scores_per_card"	INTEGER DEFAULT 0,
+                    "best_score_per_player"	TEXT DEFAULT 'FALSE',
                     PRIMARY KEY("id" AUTOINCREMENT)
                 );
             """)
@@ -197,6 +347,10 @@ def init_db(db_path):
                 );
             """)
 
+            create_webhook_events_table(cursor)
+            create_leaderboard_table(cursor)
+            create_media_registry(cursor)
+
             cursor.execute("SELECT COUNT(*) FROM settings;")
             if cursor.fetchone()[0] == 0:  # No settings exist
                 # Insert placeholder data for settings
@@ -335,6 +489,10 @@ def init_db(db_path):
                     )
                 ])
 
+            conn.commit()
+            create_indexes(conn)
+            create_score_identity_index(conn)
+
         conn.commit()
         conn.close()
         print(f"Database initialized successfully at {db_path}")
@@ -484,12 +642,89 @@ def migrate_db(db_path):
         cursor.execute("UPDATE meta SET value = '5' WHERE key = 'db_version'")
         print("Database migrated to version 5")
     
-    # if current_version < 6:
+    if current_version < 6:
+        # Secondary indexes for every hot lookup (see HOT_INDEXES). Until now every
+        # scoreboard load, score webhook and VPin mapping lookup full-scanned its
+        # table. Built one committed index at a time so a large existing database
+        # stays usable while this runs.
+        create_indexes(conn)
+
+        cursor.execute("UPDATE meta SET value = '6' WHERE key = 'db_version'")
+        print("Database migrated to version 6")
+
+    if current_version < 7:
+        # Score webhooks are now acknowledged straight away and processed from a
+        # queue table by background workers, instead of inline in the request.
+        create_webhook_events_table(cursor)
+
+        cursor.execute("UPDATE meta SET value = '7' WHERE key = 'db_version'")
+        print("Database migrated to version 7")
+
+    if current_version < 8:
+        # Scores are now deduplicated by a unique index (INSERT OR IGNORE) rather
+        # than a SELECT COUNT(*) before every insert.
+        create_score_identity_index(conn)
+
+        cursor.execute("UPDATE meta SET value = '8' WHERE key = 'db_version'")
+        print("Database migrated to version 8")
+
+    if current_version < 9:
+        # Per-game score version for incremental game_score_delta updates (see
+        # create_score_version_triggers).
+        existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(games)")}
+        if "score_version" not in existing_columns:
+            cursor.execute("ALTER TABLE games ADD COLUMN score_version INTEGER NOT NULL DEFAULT 0")
+        create_score_version_triggers(cursor)
+
+        cursor.execute("UPDATE meta SET value = '9' WHERE key = 'db_version'")
+        print("Database migrated to version 9")
+
+    if current_version < 10:
+        # Per-room cap on how many scores each game card renders (0 = all of them).
+        # Enforced in SQL - see get_top_scores in app/modules/scores.py.
+        existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(settings)")}
+        if "scores_per_card" not in existing_columns:
+            cursor.execute("ALTER TABLE settings ADD COLUMN scores_per_card INTEGER DEFAULT 0")
+
+        cursor.execute("UPDATE meta SET value = '10' WHERE key = 'db_version'")
+        print("Database migrated to version 10")
+
+    if current_version < 11:
+        # Materialized leaderboard (create_leaderboard_table) and the room setting
+        # that serves scoreboards from it
+        existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(games)")}
+        if "leaderboard_sort" not in existing_columns:
+            cursor.execute("ALTER TABLE games ADD COLUMN leaderboard_sort TEXT DEFAULT NULL")
+        existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(settings)")}
+        if "best_score_per_player" not in existing_columns:
+            cursor.execute("ALTER TABLE settings ADD COLUMN best_score_per_player TEXT DEFAULT 'FALSE'")
+        create_leaderboard_table(cursor)
+        conn.commit()
+
+        rebuilt = rebuild_leaderboards(conn)
+        print(f"🏆 Built leaderboards for {rebuilt} game(s)")
+
+        cursor.execute("UPDATE meta SET value = '11' WHERE key = 'db_version'")
+        print("Database migrated to version 11")
+
+    if current_version < 12:
+        # Media registry with reference counts (app/modules/media.py). Existing files
+        # keep their names; only newly stored images are content-addressed.
+        create_media_registry(cursor)
+        conn.commit()
+
+        registered, unreferenced = rebuild_media_registry(conn)
+        print(f"🖼️ Registered {registered} image(s), {unreferenced} of them unreferenced")
+
+        cursor.execute("UPDATE meta SET value = '12' WHERE key = 'db_version'")
+        print("Database migrated to version 12")
+
+    # if current_version < 13:
     #     cursor.execute("""
     #         
     #     """)
-    #     cursor.execute("UPDATE meta SET value = '6' WHERE key = 'db_version'")
-    #     print("Database migrated to version 6")
+    #     cursor.execute("UPDATE meta SET value = '13' WHERE key = 'db_version'")
+    #     print("Database migrated to version 13")
 
     conn.commit()
     conn.close()
@@ -2,6 +2,9 @@ import os
 import json
 from werkzeug.utils import secure_filename
 from app.modules.socketio import emit_player_changes
+from app.modules.leaderboard import remove_player_from_leaderboards, refresh_player_leaderboards
+from app.modules.scores import emit_game_score_update
+from app.modules.read_cache import invalidate_vpin_players
 
 UPLOAD_FOLDER = "app/static/images/avatars"
 RELATIVE_FOLDER = "/static/images/avatars"
@@ -243,11 +246,13 @@ def delete_player_from_db(conn, player_id):
 
         # Remove highscores associated with the player
         cursor.execute("DELETE FROM highscores WHERE player_id = ?", (player_id,))
+        remove_player_from_leaderboards(conn, player_id)
 
         # Remove the player from the players table
         cursor.execute("DELETE FROM players WHERE id = ?", (player_id,))
 
         conn.commit()
+        invalidate_vpin_players()
 
         # Emit updated player list to frontend
         emit_player_changes(conn)
@@ -309,6 +314,7 @@ def link_vpin_player(conn, data):
                 )
 
         conn.commit()
+        invalidate_vpin_players(server_url)
 
         emit_player_changes(conn)
         return True, "VPin players linked and updated successfully."
@@ -317,7 +323,9 @@ def link_vpin_player(conn, data):
         return False, f"Failed to link VPin players: {str(e)}"
 
 def toggle_player_score_visibility(conn, player_id, hide=True):
-    """Toggles the visibility of a player."""
+    """Toggles the visibility of a player. Hidden players' scores aren't ranked
+    or sent to scoreboards, so every game they have scores in is re-ranked and
+    its score list pushed out again."""
     try:
         cursor = conn.cursor()
 
@@ -326,9 +334,13 @@ def toggle_player_score_visibility(conn, player_id, hide=True):
         cursor.execute("""
             UPDATE players SET hidden = ? WHERE id = ?
         """, (hidden_value, player_id))
+        games = refresh_player_leaderboards(conn, player_id, hide)
 
         conn.commit()
 
+        for room_id, game_id in games:
+            emit_game_score_update(conn, room_id, game_id)
+
         return True, f"Player {'hidden' if hide else 'unhidden'} successfully."
 
     except Exception as e:
@@ -0,0 +1,194 @@
+import threading
+from collections import OrderedDict
+
+# Defaults for the in-process read cache. create_app() copies these into
+# app.config (each overridable by an ARCADESCORE_* environment variable), same
+# as DB_POOL_DEFAULTS in app/modules/database.py.
+READ_CACHE_DEFAULTS = {
+    "READ_CACHE_MAX_ENTRIES": 1024,  # Least recently used entries are dropped past this
+}
+
+# The settings columns hot paths read on every score (display names, date
+# format, auto-hide, card layout, webhook default preset, the legacy
+# publicCommands.php toggles). Passwords and CSS are deliberately left out -
+# they're read rarely and by code that should always see the database.
+ROOM_SETTINGS_COLUMNS = (
+    "id", "long_names_enabled", "dateformat", "auto_hide_no_score_games",
+    "scores_per_card", "best_score_per_player", "default_preset",
+    "public_scores_enabled", "public_score_entry_enabled",
+)
+
+class ReadCache:
+    """
+    A small thread-safe LRU of rows that are read on every score but written
+    almost never: room settings, a room's webhook routing, and a VPin server's
+    game/player mappings. Keys are tuples starting with a namespace
+    ("room_settings", room_id), so invalidation can drop one key, every key of a
+    namespace, or every key sharing a prefix (one server's mappings).
+
+    Misses (None) are never stored: a row that doesn't exist yet is looked up
+    again next time, so a writer that forgets to invalidate can only ever leave
+    a value stale, never hide a new one.
+    """
+
+    def __init__(self, max_entries=READ_CACHE_DEFAULTS["READ_CACHE_MAX_ENTRIES"]):
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, namespace, name):
+        counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0})
+        counters[name] += 1
+
+    def get(self, key, loader):
+        """The cached value for `key`, calling loader() to fetch it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._count(key[0], "hits")
+                return self._entries[key]
+            self._count(key[0], "misses")
+
+        value = loader()
+        if value is None:
+            return None
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._count(evicted[0], "evictions")
+        return value
+
+    def invalidate(self, *prefix):
+        """Drop every key starting with `prefix` (a namespace, optionally followed
+        by the leading key parts)."""
+        with self._lock:
+            stale = [key for key in self._entries if key[:len(prefix)] == prefix]
+            for key in stale:
+                del self._entries[key]
+                self._count(key[0], "invalidations")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resize(self, max_entries):
+        with self._lock:
+            self.max_entries = max(1, int(max_entries))
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._count(evicted[0], "evictions")
+
+    def stats(self):
+        """Entry count plus hit/miss/eviction/invalidation counters per namespace."""
+        with self._lock:
+            namespaces = {namespace: dict(counters) for namespace, counters in self._stats.items()}
+            size = len(self._entries)
+        for counters in namespaces.values():
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else None
+        return {"entries": size, "max_entries": self.max_entries, "namespaces": namespaces}
+
+_cache = ReadCache()
+
+def configure_read_cache(app):
+    """Apply READ_CACHE_MAX_ENTRIES from the app config (called once from create_app)."""
+    _cache.resize(app.config.get("READ_CACHE_MAX_ENTRIES", READ_CACHE_DEFAULTS["READ_CACHE_MAX_ENTRIES"]))
+
+def get_read_cache_stats():
+    return _cache.stats()
+
+def _room_key(room_id):
+    """Room ids arrive as ints from the database and as strings from requests and
+    webhook bodies; both must land on the same key for invalidation to reach them."""
+    try:
+        return int(room_id)
+    except (TypeError, ValueError):
+        return room_id
+
+def get_room_settings(cursor, room_id):
+    """A room's ROOM_SETTINGS_COLUMNS as a dict, or None if the room doesn't exist.
+    Treat the result as read-only - it's shared with every other caller."""
+    def load():
+        row = cursor.execute(
+            f"SELECT {', '.join(ROOM_SETTINGS_COLUMNS)} FROM settings WHERE id = ?;", (room_id,)
+        ).fetchone()
+        return dict(zip(ROOM_SETTINGS_COLUMNS, row)) if row else None
+    return _cache.get(("room_settings", _room_key(room_id)), load)
+
+def get_room_webhook(cursor, room_id):
+    """The registered VPin Studio webhook (server_url, webhook_token) for a room,
+    or None. Rooms with more than one registered webhook set only get the first
+    row back - a known limitation."""
+    def load():
+        row = cursor.execute("""
+            SELECT server_url, webhook_token FROM vpin_webhooks WHERE room_id = ? LIMIT 1;
+        """, (room_id,)).fetchone()
+        return {"server_url": row[0], "webhook_token": row[1]} if row else None
+    return _cache.get(("room_webhook", _room_key(room_id)), load)
+
+def get_vpin_game_mapping(cursor, server_url, vpin_game_id, room_id):
+    """The ArcadeScore game a VPin server's game is linked to in a room, or None."""
+    def load():
+        row = cursor.execute("""
+            SELECT vpin_games.arcadescore_game_id
+            FROM vpin_games
+            JOIN games ON vpin_games.arcadescore_game_id = games.id
+            WHERE vpin_games.server_url = ? AND vpin_games.vpin_game_id = ? AND games.room_id = ?;
+        """, (server_url, vpin_game_id, room_id)).fetchone()
+        return row[0] if row else None
+    return _cache.get(("vpin_game", server_url, str(vpin_game_id), _room_key(room_id)), load)
+
+def get_vpin_player_map(cursor, server_url):
+    """{vpin_player_id: arcadescore_player_id} for every player linked on a VPin server."""
+    def load():
+        rows = cursor.execute("""
+            SELECT arcadescore_player_id, vpin_player_id FROM vpin_players WHERE server_url = ?;
+        """, (server_url,)).fetchall()
+        return {row[1]: row[0] for row in rows}
+    return _cache.get(("vpin_players", server_url), load)
+
+# Invalidation hooks - call after the write has committed, so a concurrent
+# reader can't reload the old row in between.
+
+def invalidate_room_settings(room_id=None):
+    """A room's settings changed (None: every room's, e.g. a room was deleted)."""
+    if room_id is None:
+        _cache.invalidate("room_settings")
+    else:
+        _cache.invalidate("room_settings", _room_key(room_id))
+
+def invalidate_room_webhook(room_id=None):
+    if room_id is None:
+        _cache.invalidate("room_webhook")
+    else:
+        _cache.invalidate("room_webhook", _room_key(room_id))
+
+def invalidate_vpin_games(server_url=None):
+    """VPin game links changed on a server (None: on any server - e.g. a game was
+    deleted, and its links with it)."""
+    if server_url is None:
+        _cache.invalidate("vpin_game")
+    else:
+        _cache.invalidate("vpin_game", server_url)
+
+def invalidate_vpin_players(server_url=None):
+    if server_url is None:
+        _cache.invalidate("vpin_players")
+    else:
+        _cache.invalidate("vpin_players", server_url)
+
+def invalidate_room(room_id):
+    """Everything cached about a room - for when the room itself is deleted or
+    emptied. Its games' (and players') VPin links go with it, on any server."""
+    invalidate_room_settings(room_id)
+    invalidate_room_webhook(room_id)
+    invalidate_vpin_games()
+    invalidate_vpin_players()
+
+def clear_read_cache():
+    """Forget everything (the whole database was replaced, e.g. by an import)."""
+    _cache.clear()
@@ -0,0 +1,299 @@
+import gzip
+import io
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+import eventlet
+from app.modules.database import db_version
+from app.modules.leaderboard import rebuild_game_leaderboard
+from app.modules.media import MEDIA_REFERENCES, MEDIA_URL_PREFIX
+
+# A room export is NDJSON: one JSON value per line, written and read one line
+# at a time so neither side ever holds a room's scores in memory. Objects carry
+# a "type"; scores - nearly all of the lines - are bare arrays in
+# SCORE_COLUMNS order. Lines come in dependency order: header, room,
+# vpin_server, game, vpin_game, player, alias, vpin_player, media, score, end.
+ROOM_EXPORT_FORMAT = 1
+SCORE_COLUMNS = ("game_id", "player_id", "score", "event", "wins", "losses", "timestamp")
+
+BATCH_SIZE = 5000  # Lines per yield to the client (export), scores per executemany (import)
+IMPORT_CACHE_KB = 65536  # Page cache while a room's scores go in - their five indexes are most of the work
+
+# Columns that are the source database's ids or bookkeeping, not the room's data
+_SKIPPED_COLUMNS = {
+    "settings": {"id"},
+    "vpin_servers": {"id", "room_id"},
+    "games": {"room_id", "score_version", "leaderboard_sort"},
+    "vpin_games": {"id", "arcadescore_game_id"},
+    "players": set(),
+    "aliases": {"id"},
+    "vpin_players": {"id", "arcadescore_player_id"},
+}
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+def _rows(conn, record_type, table, query, params, renames=None):
+    """One NDJSON line per row, every column but the skipped ones (renamed as asked)."""
+    cursor = conn.execute(query, params)
+    columns = [column[0] for column in cursor.description]
+    skipped = _SKIPPED_COLUMNS[table]
+    renames = renames or {}
+    for row in cursor:
+        record = {"type": record_type}
+        for column, value in zip(columns, row):
+            if column in renames:
+                record[renames[column]] = value
+            elif column not in skipped:
+                record[column] = value
+        yield _dumps(record)
+
+def _room_lines(conn, room_id):
+    yield _dumps({
+        "type": "header",
+        "format": ROOM_EXPORT_FORMAT,
+        "db_version": db_version,
+        "exported_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "score_columns": SCORE_COLUMNS,
+    })
+    yield from _rows(conn, "room", "settings", "SELECT * FROM settings WHERE id = ?", (room_id,))
+    yield from _rows(conn, "vpin_server", "vpin_servers", "SELECT * FROM vpin_servers WHERE room_id = ?", (room_id,))
+    yield from _rows(conn, "game", "games", "SELECT * FROM games WHERE room_id = ? ORDER BY id", (room_id,))
+    yield from _rows(conn, "vpin_game", "vpin_games", """
+        SELECT vg.* FROM vpin_games vg JOIN games g ON g.id = vg.arcadescore_game_id WHERE g.room_id = ?
+    """, (room_id,), {"arcadescore_game_id": "game_id"})
+
+    # Players are shared between rooms - the ones with scores here come along
+    linked = "SELECT DISTINCT player_id FROM highscores WHERE room_id = ?"
+    yield from _rows(conn, "player", "players", f"SELECT * FROM players WHERE id IN ({linked}) ORDER BY id", (room_id,))
+    yield from _rows(conn, "alias", "aliases", f"SELECT * FROM aliases WHERE player_id IN ({linked})", (room_id,))
+    yield from _rows(conn, "vpin_player", "vpin_players", f"SELECT * FROM vpin_players WHERE arcadescore_player_id IN ({linked})",
+                     (room_id,), {"arcadescore_player_id": "player_id"})
+
+    # Media goes by reference: the importing instance may already have the
+    # (content-addressed) files, and reports the ones it doesn't
+    references = " UNION ".join(
+        f"SELECT {column} AS path FROM {table} WHERE id IN ({'SELECT id FROM games WHERE room_id = ?' if table == 'games' else linked})"
+        for table, column in MEDIA_REFERENCES
+    )
+    cursor = conn.execute(f"""
+        SELECT r.path, m.sha256 FROM ({references}) r LEFT JOIN media m ON m.path = r.path
+        WHERE r.path LIKE '{MEDIA_URL_PREFIX}%' ORDER BY r.path
+    """, (room_id,) * len(MEDIA_REFERENCES))
+    for path, sha256 in cursor:
+        yield _dumps({"type": "media", "path": path, "sha256": sha256})
+
+    # SQLite writes the score lines itself - json.dumps per row would be most of
+    # the export's time for a big room
+    scores = 0
+    cursor = conn.execute(f"SELECT json_array({', '.join(SCORE_COLUMNS)}) FROM highscores WHERE room_id = ? ORDER BY id", (room_id,))
+    for (line,) in cursor:
+        scores += 1
+        yield line
+    yield _dumps({"type": "end", "scores": scores})
+
+def export_room(conn, room_id, compress=False):
+    """
+    Stream one room as NDJSON - settings, VPin server links, games and their
+    VPin mappings, the players with scores in it (aliases and VPin mappings
+    included), references to the media they use, and every score - in chunks
+    of BATCH_SIZE lines, gzipped if compress. Everything is read inside one
+    read transaction, so the export is of one point in time however long the
+    client takes to download it, and memory stays flat however many scores
+    there are.
+    """
+    # Level 1: scores compress nearly as well as at 6, in under a third of the time.
+    # wbits 31: gzip framing
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 31) if compress else None
+    conn.execute("BEGIN;")
+    try:
+        batch = []
+        for line in _room_lines(conn, room_id):
+            batch.append(line)
+            if len(batch) >= BATCH_SIZE:
+                chunk = ("\n".join(batch) + "\n").encode("utf-8")
+                batch = []
+                yield compressor.compress(chunk) if compressor else chunk
+                eventlet.sleep(0)
+        chunk = ("\n".join(batch) + "\n").encode("utf-8") if batch else b""
+        yield compressor.compress(chunk) + compressor.flush() if compressor else chunk
+    finally:
+        conn.rollback()
+
+class _Rewound(io.RawIOBase):
+    """A stream with the bytes already read off its start put back in front."""
+
+    def __init__(self, head, stream):
+        self._head = head
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._head:
+            size = min(len(buffer), len(self._head))
+            buffer[:size], self._head = self._head[:size], self._head[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def open_room_export(stream):
+    """Lines of a room export from a binary stream (an upload, or the request
+    body), gunzipped on the way if it's compressed."""
+    head = stream.read(2)
+    reader = io.BufferedReader(_Rewound(head, stream))
+    return gzip.GzipFile(fileobj=reader) if head == b"\x1f\x8b" else reader
+
+def _insert(cursor, table, record, columns, **values):
+    """INSERT one record's known columns (those this database has) plus values."""
+    row = {name: value for name, value in record.items() if name in columns and name not in _SKIPPED_COLUMNS[table]}
+    row.update(values)
+    names = ", ".join(f'"{name}"' for name in row)
+    cursor.execute(f"INSERT INTO {table} ({names}) VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+    return cursor.lastrowid
+
+def import_room(conn, lines, user=None, room_name=None, static_root="app"):
+    """
+    Create a room from a room export (see export_room), with every id remapped
+    to this database's: the room, its games and VPin links get new ids;
+    players are matched by full name - a player already here keeps their id
+    and gains the room's scores - and only new ones are added. Scores are
+    staged in an unindexed temporary table (on disk, BATCH_SIZE at a time) and
+    moved into highscores with one INSERT ... SELECT sorted by game and player,
+    so the indexes are filled in order rather than at random. It's all one
+    transaction: a failure part way leaves nothing behind. user / room_name
+    override the exported ones (the room's user has to be free here).
+
+    Raises ValueError for an export that can't be imported. Returns the new
+    room's id, counts, and the referenced media that isn't on this instance.
+    """
+    cursor = conn.cursor()
+    columns = {table: {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")} for table in _SKIPPED_COLUMNS}
+    iterator = iter(lines)
+
+    try:
+        header = json.loads(next(iterator, b"{}") or b"{}")
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        raise ValueError(f"The room export can't be read: {e}")
+    if not isinstance(header, dict) or header.get("type") != "header" or header.get("format") != ROOM_EXPORT_FORMAT:
+        raise ValueError("Not an ArcadeScore room export.")
+    if int(header.get("db_version", 0)) > db_version:
+        raise ValueError(f"This room was exported from a newer ArcadeScore (database version {header['db_version']}). Update the application.")
+    exported_columns = list(header.get("score_columns", []))
+    if not set(SCORE_COLUMNS) <= set(exported_columns):
+        raise ValueError("The room export's scores are missing columns.")
+    score_positions = [exported_columns.index(column) for column in SCORE_COLUMNS]
+
+    room_id = None
+    game_ids, player_ids = {}, {}
+    counts = {"games": 0, "players_added": 0, "players_matched": 0, "scores": 0}
+    missing_media = []
+    finished = False
+
+    def flush(batch):
+        cursor.executemany("INSERT INTO temp.room_import_scores VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+        eventlet.sleep(0)
+
+    # A million staged scores belong on disk, not in the pool's in-memory temp store
+    temp_store = cursor.execute("PRAGMA temp_store;").fetchone()[0]
+    cache_size = cursor.execute("PRAGMA cache_size;").fetchone()[0]
+    cursor.execute("PRAGMA temp_store=FILE;")
+    cursor.execute(f"PRAGMA cache_size=-{IMPORT_CACHE_KB};")
+    cursor.execute("BEGIN IMMEDIATE;")
+    try:
+        cursor.execute(f"CREATE TEMP TABLE room_import_scores ({', '.join(SCORE_COLUMNS)});")
+        batch = []
+        for line in iterator:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if finished:
+                raise ValueError("Unexpected data after the end of the room export.")
+
+            if isinstance(record, list):
+                if room_id is None:
+                    raise ValueError("Scores came before the room they belong to.")
+                values = [record[position] for position in score_positions]
+                batch.append((game_ids[values[0]], player_ids[values[1]], *values[2:]))
+                if len(batch) >= BATCH_SIZE:
+                    flush(batch)
+                    batch = []
+                continue
+
+            record_type = record.get("type")
+            if record_type == "room":
+                record["user"] = user or record["user"]
+                record["room_name"] = room_name or record["room_name"]
+                if cursor.execute("SELECT 1 FROM settings WHERE user = ?", (record["user"],)).fetchone():
+                    raise ValueError(f"A scoreboard with the user '{record['user']}' already exists - import it under another one.")
+                room_id = _insert(cursor, "settings", record, columns["settings"])
+            elif room_id is None:
+                raise ValueError("The room export doesn't start with its room.")
+            elif record_type == "vpin_server":
+                cursor.execute("INSERT OR IGNORE INTO vpin_servers (room_id, server_url, label) VALUES (?, ?, ?)",
+                               (room_id, record["server_url"], record.get("label")))
+            elif record_type == "game":
+                old_id = record.pop("id")
+                game_ids[old_id] = _insert(cursor, "games", record, columns["games"], room_id=room_id)
+                counts["games"] += 1
+            elif record_type == "vpin_game":
+                _insert(cursor, "vpin_games", record, columns["vpin_games"], arcadescore_game_id=game_ids[record["game_id"]])
+            elif record_type == "player":
+                old_id = record.pop("id")
+                existing = cursor.execute("SELECT id FROM players WHERE full_name = ?", (record["full_name"],)).fetchone()
+                if existing:
+                    player_ids[old_id] = existing[0]
+                    counts["players_matched"] += 1
+                else:
+                    player_ids[old_id] = _insert(cursor, "players", record, columns["players"])
+                    counts["players_added"] += 1
+            elif record_type == "alias":
+                cursor.execute("INSERT OR IGNORE INTO aliases (player_id, alias) VALUES (?, ?)",
+                               (player_ids[record["player_id"]], record["alias"]))
+            elif record_type == "vpin_player":
+                player_id = player_ids[record["player_id"]]
+                if not cursor.execute("""
+                    SELECT 1 FROM vpin_players WHERE server_url = ? AND vpin_player_id = ? AND arcadescore_player_id = ?
+                """, (record["server_url"], record["vpin_player_id"], player_id)).fetchone():
+                    _insert(cursor, "vpin_players", record, columns["vpin_players"], arcadescore_player_id=player_id)
+            elif record_type == "media":
+                if not os.path.isfile(os.path.join(static_root, record["path"].lstrip("/"))):
+                    missing_media.append(record["path"])
+            elif record_type == "end":
+                finished = True
+            else:
+                raise ValueError(f"Unknown record in the room export: {record_type}")
+
+        if batch:
+            flush(batch)
+        if not finished:
+            raise ValueError("The room export is incomplete - it ends before its last line.")
+
+        columns_list = ", ".join(SCORE_COLUMNS)
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO highscores (room_id, {columns_list})
+            SELECT ?, {columns_list} FROM temp.room_import_scores ORDER BY game_id, player_id, score
+        """, (room_id,))
+        counts["scores"] = cursor.rowcount
+        cursor.execute("DROP TABLE temp.room_import_scores;")
+
+        for game_id in game_ids.values():
+            rebuild_game_leaderboard(conn, game_id)
+        conn.commit()
+    except KeyError as e:
+        conn.rollback()
+        raise ValueError(f"The room export refers to something it doesn't contain: {e}")
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        conn.rollback()
+        raise ValueError(f"The room export can't be read - is it complete? ({e})")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute(f"PRAGMA cache_size={cache_size};")
+        cursor.execute(f"PRAGMA temp_store={temp_store};")
+
+    return {"room_id": room_id, **counts, "missing_media": missing_media}
@@ -0,0 +1,320 @@
+import sys
+import json
+import time
+import threading
+import traceback
+import eventlet
+from eventlet.queue import LightQueue, Empty
+from app.modules.database import get_pool
+from app.modules.webhooks import prepare_score_webhook, fetch_webhook_scores, log_webhook_scores, record_webhook_health
+
+# Defaults for the score webhook queue. create_app() copies these into app.config
+# (each overridable by an ARCADESCORE_* environment variable), same as
+# DB_POOL_DEFAULTS in app/modules/database.py.
+SCORE_QUEUE_DEFAULTS = {
+    "SCORE_QUEUE_WORKERS": 4,                # Green workers draining the queue
+    "SCORE_QUEUE_MAX_ATTEMPTS": 6,           # Fetches from VPin Studio before an event is marked failed
+    "SCORE_QUEUE_RETRY_BASE_SECONDS": 2.0,   # First retry delay, doubled on every further attempt...
+    "SCORE_QUEUE_RETRY_MAX_SECONDS": 60.0,   # ...up to this cap
+    "SCORE_QUEUE_POLL_SECONDS": 1.0,         # Idle workers re-check for due retries this often
+    "SCORE_QUEUE_RETENTION_DAYS": 7,         # Finished events are kept this long for the status endpoint
+}
+
+PRUNE_INTERVAL_SECONDS = 3600
+
+# Enqueueing rings this so an idle worker picks the event up at once instead of
+# on its next poll. Only rung once workers are running (nothing drains it otherwise).
+_doorbell = LightQueue()
+_workers_started = False
+_last_prune = 0.0
+
+_counters_lock = threading.Lock()
+_counters = {
+    "enqueued": 0,
+    "attempts": 0,
+    "succeeded": 0,
+    "failed": 0,
+    "retried": 0,
+    # Latency observations (count/total/max each)
+    "count_queue_wait_ms": 0,
+    "total_queue_wait_ms": 0.0,     # created -> picked up by a worker (first attempt)
+    "max_queue_wait_ms": 0.0,
+    "count_processing_ms": 0,
+    "total_processing_ms": 0.0,     # one attempt, start to finish
+    "max_processing_ms": 0.0,
+    "count_end_to_end_ms": 0,
+    "total_end_to_end_ms": 0.0,     # created -> done/failed, retries included
+    "max_end_to_end_ms": 0.0,
+}
+
+def _count(name, amount=1):
+    with _counters_lock:
+        _counters[name] += amount
+
+def _observe(name, value_ms):
+    with _counters_lock:
+        _counters[f"count_{name}"] += 1
+        _counters[f"total_{name}"] += value_ms
+        _counters[f"max_{name}"] = max(_counters[f"max_{name}"], value_ms)
+
+def _retry_delay(attempts, config):
+    base = float(config.get("SCORE_QUEUE_RETRY_BASE_SECONDS", SCORE_QUEUE_DEFAULTS["SCORE_QUEUE_RETRY_BASE_SECONDS"]))
+    cap = float(config.get("SCORE_QUEUE_RETRY_MAX_SECONDS", SCORE_QUEUE_DEFAULTS["SCORE_QUEUE_RETRY_MAX_SECONDS"]))
+    return min(cap, base * (2 ** max(0, attempts - 1)))
+
+def enqueue_score_event(conn, data):
+    """Persist a validated score webhook payload and return its event id. The
+    row is committed before this returns, so an acknowledged event survives a
+    restart even if no worker has touched it yet."""
+    now = time.time()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO webhook_events (event_type, room_id, payload, status, next_attempt_at, created_at)
+        VALUES ('score', ?, ?, 'pending', ?, ?);
+    """, (data.get("roomID"), json.dumps(data), now, now))
+    conn.commit()
+    event_id = cursor.lastrowid
+
+    _count("enqueued")
+    if _workers_started:
+        _doorbell.put_nowait(event_id)
+    return event_id
+
+def get_event_status(conn, event_id):
+    """Public view of an event for the status endpoint. The payload is left out
+    on purpose - it carries the webhook token."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, event_type, room_id, status, attempts, next_attempt_at, last_error, result,
+               created_at, started_at, finished_at
+        FROM webhook_events WHERE id = ?;
+    """, (event_id,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+def claim_next_event(conn):
+    """Atomically move the oldest due pending event to 'processing' and return it
+    (or None). BEGIN IMMEDIATE takes the write lock up front, so two workers can
+    never claim the same row."""
+    now = time.time()
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE;")
+    try:
+        cursor.execute("""
+            SELECT id, payload, attempts, created_at FROM webhook_events
+            WHERE status = 'pending' AND next_attempt_at <= ?
+            ORDER BY next_attempt_at, id LIMIT 1;
+        """, (now,))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute("""
+                UPDATE webhook_events SET status = 'processing', attempts = attempts + 1, started_at = ?
+                WHERE id = ?;
+            """, (now, row["id"]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if not row:
+        return None
+    return {"id": row["id"], "payload": row["payload"], "attempts": row["attempts"] + 1,
+            "created_at": row["created_at"], "started_at": now}
+
+def process_event(pool, event, config=None):
+    """
+    Run one attempt of a claimed event and record the outcome: done, failed, or
+    back to pending with an exponential backoff if the attempt's failure is
+    retryable (VPin Studio unreachable, or the new score not visible on its API
+    yet) and attempts remain.
+
+    The attempt is webhook_log_score's steps run once each, with a connection
+    from `pool` checked out only for the database work on either side of the
+    fetch from VPin Studio - a slow or unreachable server then doesn't pin pool
+    slots (which would also hold up swap_database's drain).
+    """
+    config = config or SCORE_QUEUE_DEFAULTS
+    max_attempts = int(config.get("SCORE_QUEUE_MAX_ATTEMPTS", SCORE_QUEUE_DEFAULTS["SCORE_QUEUE_MAX_ATTEMPTS"]))
+
+    _count("attempts")
+    if event["attempts"] == 1:
+        _observe("queue_wait_ms", (event["started_at"] - event["created_at"]) * 1000)
+
+    data = {}
+    try:
+        data = json.loads(event["payload"])
+        conn = pool.acquire()
+        try:
+            context, result = prepare_score_webhook(conn, data)
+        finally:
+            pool.release(conn)
+        if not result:
+            scores_data, result = fetch_webhook_scores(context)
+    except Exception as e:
+        print(f"❌ Exception processing webhook event {event['id']}: {traceback.format_exc()}")
+        sys.stdout.flush()
+        result = {"success": False, "error": f"Internal Server Error: {str(e)}"}
+
+    conn = pool.acquire()
+    try:
+        if not result:
+            try:
+                result = log_webhook_scores(conn, context, scores_data)
+            except Exception as e:
+                print(f"❌ Exception processing webhook event {event['id']}: {traceback.format_exc()}")
+                sys.stdout.flush()
+                result = {"success": False, "error": f"Internal Server Error: {str(e)}"}
+        _record_outcome(conn, event, data, result, config, max_attempts)
+    finally:
+        pool.release(conn)
+    return result
+
+def _record_outcome(conn, event, data, result, config, max_attempts):
+    now = time.time()
+    _observe("processing_ms", (now - event["started_at"]) * 1000)
+    conn.rollback()  # Never leave a half-finished transaction behind the status update
+
+    cursor = conn.cursor()
+    if not result.get("success") and result.get("retryable") and event["attempts"] < max_attempts:
+        delay = _retry_delay(event["attempts"], config)
+        cursor.execute("""
+            UPDATE webhook_events SET status = 'pending', next_attempt_at = ?, last_error = ?
+            WHERE id = ?;
+        """, (now + delay, result.get("error"), event["id"]))
+        conn.commit()
+        _count("retried")
+        print(f"⏳ Webhook event {event['id']} attempt {event['attempts']}/{max_attempts}: {result.get('error')} Retrying in {delay:g}s.")
+        sys.stdout.flush()
+        return
+
+    status = "done" if result.get("success") else "failed"
+    cursor.execute("""
+        UPDATE webhook_events SET status = ?, last_error = ?, result = ?, finished_at = ?
+        WHERE id = ?;
+    """, (status, result.get("error"), result.get("message"), now, event["id"]))
+    conn.commit()
+
+    _count("succeeded" if status == "done" else "failed")
+    _observe("end_to_end_ms", (now - event["created_at"]) * 1000)
+
+    record_webhook_health(
+        conn,
+        result.get("room_id") or data.get("roomID"),
+        error=None if result.get("success") else result.get("error"),
+    )
+
+def process_next_event(pool, config=None):
+    """Claim and process one due event. Returns False if nothing was due."""
+    conn = pool.acquire()
+    try:
+        event = claim_next_event(conn)
+    finally:
+        pool.release(conn)
+    if not event:
+        return False
+    process_event(pool, event, config)
+    return True
+
+def recover_interrupted_events(conn):
+    """Events left 'processing' by a crash or restart go back to pending, due now.
+    Their attempt stays counted."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE webhook_events SET status = 'pending', next_attempt_at = ? WHERE status = 'processing';
+    """, (time.time(),))
+    conn.commit()
+    return cursor.rowcount
+
+def prune_finished_events(conn, retention_days):
+    """Drop done/failed events older than the retention window."""
+    cutoff = time.time() - float(retention_days) * 86400
+    cursor = conn.cursor()
+    cursor.execute("""
+        DELETE FROM webhook_events WHERE status IN ('done', 'failed') AND finished_at < ?;
+    """, (cutoff,))
+    conn.commit()
+    return cursor.rowcount
+
+def get_queue_stats(conn):
+    """Queue depth by status (from the table, so it includes events from before
+    a restart) plus this process's attempt/outcome/latency counters."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT status, COUNT(*) AS n FROM webhook_events GROUP BY status;")
+    depth = {"pending": 0, "processing": 0, "done": 0, "failed": 0}
+    depth.update({row["status"]: row["n"] for row in cursor.fetchall()})
+
+    cursor.execute("SELECT MIN(created_at) FROM webhook_events WHERE status IN ('pending', 'processing');")
+    oldest = cursor.fetchone()[0]
+
+    with _counters_lock:
+        counters = dict(_counters)
+    def avg(name):
+        return round(counters[f"total_{name}"] / (counters[f"count_{name}"] or 1), 3)
+
+    return {
+        "workers_running": _workers_started,
+        "depth": depth,
+        "oldest_unfinished_age_s": round(time.time() - oldest, 3) if oldest else None,
+        "enqueued": counters["enqueued"],
+        "attempts": counters["attempts"],
+        "succeeded": counters["succeeded"],
+        "failed": counters["failed"],
+        "retried": counters["retried"],
+        "avg_queue_wait_ms": avg("queue_wait_ms"),
+        "max_queue_wait_ms": round(counters["max_queue_wait_ms"], 3),
+        "avg_processing_ms": avg("processing_ms"),
+        "max_processing_ms": round(counters["max_processing_ms"], 3),
+        "avg_end_to_end_ms": avg("end_to_end_ms"),
+        "max_end_to_end_ms": round(counters["max_end_to_end_ms"], 3),
+    }
+
+def _worker(app, worker_id):
+    """Drain due events until there are none, then wait for the doorbell (or the
+    poll interval, which is what picks up scheduled retries)."""
+    global _last_prune
+    pool = get_pool(app.config["DB_PATH"], app.config)
+    poll = float(app.config.get("SCORE_QUEUE_POLL_SECONDS", SCORE_QUEUE_DEFAULTS["SCORE_QUEUE_POLL_SECONDS"]))
+
+    with app.app_context():
+        while True:
+            try:
+                while process_next_event(pool, app.config):
+                    eventlet.sleep(0)
+
+                if worker_id == 0 and time.time() - _last_prune > PRUNE_INTERVAL_SECONDS:
+                    _last_prune = time.time()
+                    conn = pool.acquire()
+                    try:
+                        prune_finished_events(conn, app.config.get("SCORE_QUEUE_RETENTION_DAYS", SCORE_QUEUE_DEFAULTS["SCORE_QUEUE_RETENTION_DAYS"]))
+                    finally:
+                        pool.release(conn)
+            except Exception:
+                print(f"❌ Score queue worker {worker_id} error: {traceback.format_exc()}")
+                sys.stdout.flush()
+
+            try:
+                _doorbell.get(timeout=poll)
+            except Empty:
+                pass
+
+def start_score_queue(app):
+    """Requeue anything interrupted by the last shutdown and start the workers
+    (called once from create_app)."""
+    global _workers_started
+    if _workers_started:
+        return
+
+    pool = get_pool(app.config["DB_PATH"], app.config)
+    conn = pool.acquire()
+    try:
+        recovered = recover_interrupted_events(conn)
+        if recovered:
+            print(f"♻️ Requeued {recovered} score webhook event(s) interrupted by the last shutdown")
+    finally:
+        pool.release(conn)
+
+    workers = max(1, int(app.config.get("SCORE_QUEUE_WORKERS", SCORE_QUEUE_DEFAULTS["SCORE_QUEUE_WORKERS"])))
+    _workers_started = True
+    for worker_id in range(workers):
+        eventlet.spawn_n(_worker, app, worker_id)
+    print(f"📬 Score webhook queue started with {workers} worker(s)")
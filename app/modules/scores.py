@@ -1,5 +1,24 @@
 import traceback
-from app.modules.socketio import emit_message
+from datetime import datetime, timezone
+from app.modules.socketio import emit_message, emit_player_changes
+from app.modules.utils import format_timestamp
+from app.modules.leaderboard import update_leaderboards, get_room_leaderboard, get_game_leaderboard
+from app.modules.read_cache import get_room_settings
+
+# Upper bound on entries per /api/v1/scores/batch request
+MAX_BATCH_SCORES = 5000
+
+# A write adding more than this many scores to one game sends that game's full
+# list (game_score_update) instead of a delta - cheaper for clients than
+# splicing in that many cards one by one
+MAX_DELTA_SCORES = 50
+
+# Largest page GET /api/v1/games/<id>/scores hands out per request
+MAX_SCORE_PAGE_SIZE = 500
+
+# Chunk size for IN (...) lookups - stays under SQLite's default 999-variable limit
+# on older builds
+LOOKUP_CHUNK_SIZE = 500
 
 def unhide_game_if_auto_hidden(conn, room_id, game_id):
     """If this room auto-hides scoreless games and this game is currently hidden,
@@ -8,8 +27,7 @@ def unhide_game_if_auto_hidden(conn, room_id, game_id):
     VPin webhook, VPin historical import, legacy publicCommands.php) it was."""
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT auto_hide_no_score_games FROM settings WHERE id = ?;", (room_id,))
-        room_settings = cursor.fetchone()
+        room_settings = get_room_settings(cursor, room_id)
         if not room_settings or room_settings["auto_hide_no_score_games"] != "TRUE":
             return
 
@@ -25,84 +43,530 @@ def unhide_game_if_auto_hidden(conn, room_id, game_id):
     except Exception:
         print(f"⚠️ Failed to auto-unhide game {game_id}: {traceback.format_exc()}")
 
-def log_score_to_db(conn, data):
+def unhide_games_with_new_scores(conn, new_scores):
+    """unhide_game_if_auto_hidden for each game that just got one of `new_scores`
+    (rows from log_scores_to_db). Commits, so only once the scores themselves are."""
+    for room_id, game_id in sorted({(row["room_id"], row["game_id"]) for row in new_scores}):
+        unhide_game_if_auto_hidden(conn, room_id, game_id)
+
+# A score's identity: the same player posting the same score on the same game
+# in the same room at the same moment is one score, however many times it's
+# reported (webhook retries, resyncs). Enforced by a UNIQUE index (migration 8),
+# so duplicates are skipped by INSERT OR IGNORE rather than checked for first.
+SCORE_IDENTITY_COLUMNS = ("game_id", "player_id", "score", "timestamp", "room_id")
+
+def _score_row(data):
+    """Validate one score dict into an INSERT parameter tuple (SCORE_IDENTITY_COLUMNS
+    order, then wins and losses)."""
+    game_id = int(data.get("game_id"))
+    player_id = int(data.get("player_id"))
+    score = int(data.get("score", 0))
+    room_id = int(data.get("room_id"))
+    if not game_id or not player_id:
+        raise ValueError(f"Invalid data: game_id ({game_id}) or player_id ({player_id}) is missing.")
+    # Same format as the column's CURRENT_TIMESTAMP default, which an explicit NULL would bypass
+    timestamp = data.get("timestamp") or datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return (game_id, player_id, score, timestamp, room_id, int(data.get("wins") or 0), int(data.get("losses") or 0))
+
+def log_scores_to_db(conn, scores):
     """
-    Logs a new score in the database. Creates a player if they don’t exist.
-    :param data: Dictionary containing `game_id`, `player_id`, `score`, `room_id`, `timestamp`.
-    :return: (success: bool, message: str)
+    Logs many scores in a single transaction, skipping any already recorded.
+    :param scores: List of dictionaries containing `game_id`, `player_id`, `score`, `room_id`, `timestamp`,
+        and optionally `wins`/`losses`.
+    :return: (success: bool, message: str, new_scores: list of the rows actually inserted, with their `id`
+        and `score_version` - their game's version right after this write)
+
+    All rows go through one executemany INSERT OR IGNORE against the unique
+    score-identity index, so a resync of thousands of historical scores is one
+    statement and one commit instead of a lookup + insert + commit per score.
+    The write lock is taken before reading the current max id; since highscores
+    uses AUTOINCREMENT, every row with a higher id afterwards is one we inserted.
+
+    If the caller already has a transaction open (e.g. players it just created
+    for these scores), the insert joins it and it's left to the caller to commit
+    or roll back - as well as to call unhide_games_with_new_scores after its
+    commit. Otherwise the scores get a transaction of their own, committed here.
     """
+    rows = []
+    for data in scores:
+        try:
+            rows.append(_score_row(data))
+        except (TypeError, ValueError) as e:
+            print(f"⚠️ Skipping invalid score entry {data}: {e}")
+
+    if not rows:
+        return True, "No scores to log", []
+
     try:
         cursor = conn.cursor()
+        joined_transaction = conn.in_transaction  # Caller's pending writes already hold the write lock
+        if not joined_transaction:
+            cursor.execute("BEGIN IMMEDIATE;")
 
-        game_id = int(data.get("game_id"))
-        player_id = int(data.get("player_id"))
-        score = int(data.get("score", 0))
-        room_id = int(data.get("room_id"))
-        timestamp = data.get("timestamp")  # Ensure we use the timestamp from historical scores
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM highscores;")
+        max_id = cursor.fetchone()[0]
 
-        if not game_id or not player_id:
-            return False, f"Invalid data: game_id ({game_id}) or player_id ({player_id}) is missing."
+        cursor.executemany("""
+            INSERT OR IGNORE INTO highscores (game_id, player_id, score, timestamp, room_id, wins, losses)
+            VALUES (?, ?, ?, ?, ?, ?, ?);
+        """, rows)
 
-        # Insert score into highscores table
         cursor.execute("""
-            INSERT INTO highscores (game_id, player_id, score, room_id, timestamp)
-            VALUES (?, ?, ?, ?, ?);
-        """, (game_id, player_id, score, room_id, timestamp))
+            SELECT id, game_id, player_id, score, timestamp, room_id FROM highscores WHERE id > ? ORDER BY id;
+        """, (max_id,))
+        new_scores = [dict(zip(("id",) + SCORE_IDENTITY_COLUMNS, row)) for row in cursor.fetchall()]
 
-        conn.commit()
+        # Read inside the transaction, so no other write can have moved them since
+        versions = _game_score_versions(cursor, {row["game_id"] for row in new_scores})
+        for row in new_scores:
+            row["score_version"] = versions.get(row["game_id"], 0)
 
-        unhide_game_if_auto_hidden(conn, room_id, game_id)
+        update_leaderboards(conn, new_scores)
+        if not joined_transaction:
+            conn.commit()
+    except Exception as e:
+        if not joined_transaction:
+            conn.rollback()
+        print(f"❌ Error logging scores: {traceback.format_exc()}")
+        return False, str(e), []
 
-        print(f"✅ Score logged: Player {player_id}, Game {game_id}, Score {score}, Room {room_id}, Time {timestamp}")
-        return True, "Score logged successfully!"
+    if not joined_transaction:
+        unhide_games_with_new_scores(conn, new_scores)
 
-    except Exception as e:
-        print(f"❌ Error logging score: {traceback.format_exc()}")
-        return False, str(e)
+    print(f"✅ Logged {len(new_scores)} new score(s), skipped {len(rows) - len(new_scores)} already recorded")
+    return True, f"Logged {len(new_scores)} new score(s)", new_scores
 
-def get_high_scores(conn, room_id):
+def log_score_to_db(conn, data):
     """
-    Retrieves high scores for one room, with game and player details.
-    :return: List of scores in dictionary format.
+    Logs a new score in the database (a batch of one - see log_scores_to_db).
+    :param data: Dictionary containing `game_id`, `player_id`, `score`, `room_id`, `timestamp`.
+    :return: (success: bool, message: str)
     """
     try:
-        cursor = conn.cursor()
+        _score_row(data)
+    except (TypeError, ValueError) as e:
+        return False, str(e)
 
-        cursor.execute("""
-            SELECT DISTINCT h.game_id,
+    success, message, new_scores = log_scores_to_db(conn, [data])
+    if not success:
+        return False, message
+    if not new_scores:
+        return False, "Score already logged"
+
+    score = new_scores[0]
+    print(f"✅ Score logged: Player {score['player_id']}, Game {score['game_id']}, Score {score['score']}, Room {score['room_id']}, Time {score['timestamp']}")
+    return True, "Score logged successfully!"
+
+def _game_score_versions(cursor, game_ids):
+    versions = {}
+    for chunk in _chunks(game_ids):
+        cursor.execute(f"SELECT id, score_version FROM games WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        versions.update({row[0]: row[1] for row in cursor.fetchall()})
+    return versions
+
+def _room_display_settings(cursor, room_id):
+    room = get_room_settings(cursor, room_id)
+    long_names_enabled = room["long_names_enabled"] if room else "FALSE"
+    date_format = room["dateformat"] if room and room["dateformat"] else "MM/DD/YYYY"
+    return long_names_enabled, date_format
+
+def room_card_settings(cursor, room_id):
+    """How a room's game cards list scores: (scores_per_card - 0 = all,
+    best_score_per_player - True to list only each player's best, served from
+    the leaderboard table)."""
+    room = get_room_settings(cursor, room_id)
+    if not room:
+        return 0, False
+    return max(0, int(room["scores_per_card"] or 0)), room["best_score_per_player"] == "TRUE"
+
+def get_top_scores(conn, room_id, per_game=None):
+    """
+    The scores a room's game cards show: each game's best `per_game` scores, in
+    card order (game, then rank) - or, if the room lists only each player's best
+    score, the top of each game's leaderboard.
+    :param per_game: scores per game; defaults to the room's scores_per_card, 0 = all.
+    :return: list of dicts (game_id, display_name, full_name, default_alias, score,
+        room_id, event, wins, losses, timestamp, hidden, player_id, rank).
+
+    The cut happens in SQL with ROW_NUMBER() over each game's sorted scores, so a
+    room with years of history still only hands a few rows per game to Python
+    and the template, instead of every score it has ever recorded. h.id breaks
+    ties the same way ranks in game_score_delta do. Hidden players are left out
+    before the cut, so a card still gets its full `per_game` visible scores.
+    """
+    cursor = conn.cursor()
+    room_per_card, best_only = room_card_settings(cursor, room_id)
+    if per_game is None:
+        per_game = room_per_card
+    if best_only:
+        return get_room_leaderboard(conn, room_id, per_game)
+
+    cursor.execute("""
+        SELECT * FROM (
+            SELECT h.game_id,
                 CASE
                     WHEN s.long_names_enabled = 'TRUE' OR p.long_names_enabled = 'TRUE' THEN p.full_name
                     ELSE p.default_alias
-                END AS player_name,
-                h.score, h.room_id, h.event, h.wins, h.losses, h.timestamp, p.hidden
+                END AS display_name,
+                p.full_name, p.default_alias,
+                h.score, h.room_id, h.event, h.wins, h.losses, h.timestamp, p.hidden, p.id AS player_id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY h.game_id
+                    ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC, h.id ASC
+                ) AS rank
             FROM highscores h
             JOIN players p ON h.player_id = p.id
             JOIN settings s ON s.id = h.room_id
             JOIN games g ON g.id = h.game_id
-            WHERE h.room_id = ?
-            ORDER BY h.game_id, CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC;
-        """, (room_id,))
+            WHERE h.room_id = ? AND p.hidden IS NOT 'TRUE'
+        )
+        WHERE ? = 0 OR rank <= ?
+        ORDER BY game_id, rank;
+    """, (room_id, per_game, per_game))
+    return [dict(row) for row in cursor.fetchall()]
+
+def _score_entry(row, long_names_enabled, date_format):
+    """One score as sent to scoreboards (row: full_name, default_alias, score,
+    timestamp, wins, losses, player_id)."""
+    return {
+        "displayName": row["full_name"] if long_names_enabled == "TRUE" else row["default_alias"],
+        "fullName": row["full_name"],
+        "defaultAlias": row["default_alias"],
+        "score": row["score"],
+        "timestamp": row["timestamp"],
+        "formatted_timestamp": format_timestamp(row["timestamp"], date_format),
+        "wins": row["wins"],
+        "losses": row["losses"],
+        "playerId": row["player_id"],
+    }
+
+def build_game_score_payload(conn, room_id, game_id, offset=0, limit=None):
+    """
+    A page of a game's sorted score list plus its card styling and score version -
+    the game_score_update payload, also served by the per-game scores endpoint.
+    :param limit: scores to return; defaults to the room's scores_per_card (what
+        the card shows), 0 = all of them.
+    :return: dict (with the game's `total` score count), or None if the game
+        doesn't exist in that room. Rooms listing only each player's best score
+        get a page of the game's leaderboard instead.
+    """
+    cursor = conn.cursor()
+    long_names_enabled, date_format = _room_display_settings(cursor, room_id)
+    per_card, best_only = room_card_settings(cursor, room_id)
+    if limit is None:
+        limit = per_card
 
-        results = cursor.fetchall()
+    cursor.execute("""
+        SELECT css_score_cards, css_initials, css_scores, score_type, score_version
+        FROM games WHERE id = ? AND room_id = ?;
+    """, (game_id, room_id))
+    game = cursor.fetchone()
+    if not game:
+        return None
+
+    if best_only:
+        rows, total = get_game_leaderboard(conn, game_id, offset, limit)
+    else:
+        # h.id breaks ties the same way score ranks in game_score_delta do;
+        # hidden players' scores aren't listed (or counted)
+        cursor.execute("""
+            SELECT p.full_name, p.default_alias, h.score, h.timestamp, h.wins, h.losses, h.player_id
+            FROM highscores h
+            JOIN players p ON h.player_id = p.id
+            JOIN games g ON g.id = h.game_id
+            WHERE h.game_id = ? AND p.hidden IS NOT 'TRUE'
+            ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC, h.id ASC
+            LIMIT ? OFFSET ?;
+        """, (game_id, limit or -1, offset))
+        rows = cursor.fetchall()
 
-        # Format the results into a JSON array
-        scores = [
+        cursor.execute("""
+            SELECT COUNT(*) FROM highscores h JOIN players p ON h.player_id = p.id
+            WHERE h.game_id = ? AND p.hidden IS NOT 'TRUE';
+        """, (game_id,))
+        total = cursor.fetchone()[0]
+    scores = [_score_entry(row, long_names_enabled, date_format) for row in rows]
+
+    return {
+        "gameID": game_id,
+        "roomID": room_id,
+        "version": game["score_version"],
+        "scores": scores,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "CSSScoreCards": game["css_score_cards"],
+        "CSSInitials": game["css_initials"],
+        "CSSScores": game["css_scores"],
+        "ScoreType": game["score_type"],
+    }
+
+def emit_game_score_update(conn, room_id, game_id):
+    """
+    Push a game's full score list to every client viewing the room. Used when
+    a delta won't do (see emit_new_scores), e.g. after a large import.
+    :return: True if emitted, False if the game doesn't exist in that room.
+    """
+    payload = build_game_score_payload(conn, room_id, game_id)
+    if payload is None:
+        return False
+
+    print(f"📢 Emitting {len(payload['scores'])} scores for game {game_id} to room {room_id}.")
+    emit_message("game_score_update", payload, room=f"room_{room_id}")
+    return True
+
+def emit_game_score_delta(conn, room_id, game_id, new_scores):
+    """
+    Push only the newly inserted scores of one game (game_score_delta), each with
+    its 1-based rank in the game's sorted list, plus the game's version before
+    (baseVersion) and after (version) the write. A client whose copy is exactly
+    at baseVersion splices them in; any other client has missed something and
+    fetches the full list instead. Scores ranked below the room's scores_per_card
+    are left out (the version still moves on), since no card would show them -
+    as are hidden players' scores, which aren't ranked at all.
+    :param new_scores: rows from log_scores_to_db for this game (need id and score_version)
+    :return: True if emitted, False if the game doesn't exist in that room.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT css_score_cards, css_initials, css_scores, score_type, sort_ascending
+        FROM games WHERE id = ? AND room_id = ?;
+    """, (game_id, room_id))
+    game = cursor.fetchone()
+    if not game:
+        return False
+
+    long_names_enabled, date_format = _room_display_settings(cursor, room_id)
+    per_card, _ = room_card_settings(cursor, room_id)
+    ids = [row["id"] for row in new_scores]
+    cursor.execute(f"""
+        SELECT h.id, p.full_name, p.default_alias, h.score, h.timestamp, h.wins, h.losses, h.player_id
+        FROM highscores h
+        JOIN players p ON h.player_id = p.id
+        WHERE h.id IN ({','.join('?' * len(ids))}) AND p.hidden IS NOT 'TRUE';
+    """, ids)
+    rows = cursor.fetchall()
+
+    # Rank = 1 + visible scores sorting ahead of this one (better score, or equal
+    # and older). Walks idx_highscores_game_score, checking each one's player.
+    # Only rows up to this write's last id count, so a score inserted since it
+    # committed can't shift the ranks away from the list at `version`.
+    better = "<" if game["sort_ascending"] == "TRUE" else ">"
+    last_id = max(ids)
+    scores = []
+    for row in rows:
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM highscores h JOIN players p ON h.player_id = p.id
+            WHERE h.game_id = ? AND h.id <= ? AND (h.score {better} ? OR (h.score = ? AND h.id < ?))
+              AND p.hidden IS NOT 'TRUE';
+        """, (game_id, last_id, row["score"], row["score"], row["id"]))
+        entry = _score_entry(row, long_names_enabled, date_format)
+        entry["id"] = row["id"]
+        entry["rank"] = cursor.fetchone()[0] + 1
+        if not per_card or entry["rank"] <= per_card:
+            scores.append(entry)
+    scores.sort(key=lambda entry: entry["rank"])
+
+    version = max(row["score_version"] for row in new_scores)
+    print(f"📢 Emitting {len(scores)} new score(s) for game {game_id} to room {room_id} (version {version}).")
+    emit_message("game_score_delta", {
+        "gameID": game_id,
+        "roomID": room_id,
+        "version": version,
+        "baseVersion": version - len(new_scores),
+        "scores": scores,
+        "scoresPerCard": per_card,
+        "CSSScoreCards": game["css_score_cards"],
+        "CSSInitials": game["css_initials"],
+        "CSSScores": game["css_scores"],
+        "ScoreType": game["score_type"],
+    }, room=f"room_{room_id}")
+    return True
+
+def emit_new_scores(conn, new_scores):
+    """Tell scoreboards about freshly inserted scores (rows from log_scores_to_db):
+    one game_score_delta per affected game, or the full list for a game that got
+    more than MAX_DELTA_SCORES at once. Rooms listing only each player's best
+    score always get the full list - a new best replaces that player's old entry
+    rather than adding one, which a delta can't express."""
+    by_game = {}
+    for row in new_scores:
+        by_game.setdefault((row["room_id"], row["game_id"]), []).append(row)
+
+    cursor = conn.cursor()
+    best_only_rooms = {room_id for room_id, _ in by_game if room_card_settings(cursor, room_id)[1]}
+    for (room_id, game_id), rows in sorted(by_game.items()):
+        if len(rows) > MAX_DELTA_SCORES or room_id in best_only_rooms:
+            emit_game_score_update(conn, room_id, game_id)
+        else:
+            emit_game_score_delta(conn, room_id, game_id, rows)
+
+def _chunks(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def resolve_players_by_name(conn, names, long_names_enabled):
+    """
+    Map many player names to player ids in a few IN (...) queries, creating any
+    that don't exist yet (same rules as publicCommands.php addScore: full_name
+    when the room shows long names, otherwise default_alias then aliases; new
+    players get the name as both full name and alias). Does not commit.
+    :return: (name -> player_id dict, number of players created)
+    """
+    cursor = conn.cursor()
+    resolved = {}
+    pending = set(names)
+
+    lookups = ["SELECT full_name, id FROM players WHERE full_name IN ({})"] if long_names_enabled == "TRUE" else [
+        "SELECT default_alias, id FROM players WHERE default_alias IN ({})",
+        "SELECT alias, player_id FROM aliases WHERE alias IN ({})",
+    ]
+    for sql in lookups:
+        for chunk in _chunks(pending):
+            cursor.execute(sql.format(",".join("?" * len(chunk))), chunk)
+            for name, player_id in cursor.fetchall():
+                resolved.setdefault(name, player_id)
+        pending -= resolved.keys()
+
+    for name in sorted(pending):
+        cursor.execute("""
+            INSERT INTO players (full_name, default_alias, long_names_enabled)
+            VALUES (?, ?, ?);
+        """, (name, name, long_names_enabled))
+        resolved[name] = cursor.lastrowid
+        cursor.execute("INSERT INTO aliases (player_id, alias) VALUES (?, ?);", (resolved[name], name))
+
+    return resolved, len(pending)
+
+def ingest_score_batch(conn, room_id, entries):
+    """
+    Bulk score ingestion for one room (tournaments, cabinet backfills).
+    :param entries: list of dicts with `gameID`, `score`, a player as `playerID` or
+        `playerName`, and optionally `timestamp` ("YYYY-MM-DD HH:MM:SS", UTC; now if
+        omitted), `wins`, `losses`.
+    :return: dict with success, counts and per-entry rejections.
+
+    Players are resolved in bulk, then new players and every score are written
+    in one transaction (log_scores_to_db joins it), so a batch lands entirely or
+    not at all. Afterwards each affected game is un-hidden if needed and gets a
+    single score event (see emit_new_scores), however many of its scores were in
+    the batch.
+    """
+    cursor = conn.cursor()
+    room = get_room_settings(cursor, room_id)
+    if not room:
+        return {"success": False, "error": f"Room {room_id} not found"}
+    long_names_enabled = room["long_names_enabled"] or "FALSE"
+
+    rejected = []
+    valid = []
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            rejected.append({"index": index, "error": "Entry is not an object"})
+            continue
+        try:
+            game_id = int(entry.get("gameID"))
+            score = int(entry.get("score"))
+            player_id = int(entry["playerID"]) if entry.get("playerID") not in (None, "") else None
+            wins = int(entry.get("wins") or 0)
+            losses = int(entry.get("losses") or 0)
+            if entry.get("timestamp"):
+                datetime.strptime(entry["timestamp"], "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError) as e:
+            rejected.append({"index": index, "error": f"Invalid gameID, playerID, score, wins, losses or timestamp: {e}"})
+            continue
+        player_name = str(entry.get("playerName") or "").strip()
+        if not player_id and not player_name:
+            rejected.append({"index": index, "error": "Missing playerID or playerName"})
+            continue
+        valid.append((index, entry, game_id, player_id, player_name, score, wins, losses))
+
+    room_games = set()
+    for chunk in _chunks({game_id for _, _, game_id, _, _, _, _, _ in valid}):
+        cursor.execute(f"SELECT id FROM games WHERE room_id = ? AND id IN ({','.join('?' * len(chunk))})", [room_id, *chunk])
+        room_games.update(row[0] for row in cursor.fetchall())
+
+    known_players = set()
+    for chunk in _chunks({player_id for _, _, _, player_id, _, _, _, _ in valid if player_id}):
+        cursor.execute(f"SELECT id FROM players WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        known_players.update(row[0] for row in cursor.fetchall())
+
+    accepted = []
+    for index, entry, game_id, player_id, player_name, score, wins, losses in valid:
+        if game_id not in room_games:
+            rejected.append({"index": index, "error": f"GameID {game_id} not found in room {room_id}"})
+        elif player_id and player_id not in known_players:
+            rejected.append({"index": index, "error": f"PlayerID {player_id} not found"})
+        else:
+            accepted.append((entry, game_id, player_id, player_name, score, wins, losses))
+
+    if not accepted:
+        return {"success": True, "received": len(entries), "inserted": 0, "duplicates": 0,
+                "players_created": 0, "rejected": sorted(rejected, key=lambda r: r["index"])}
+
+    try:
+        cursor.execute("BEGIN IMMEDIATE;")
+        names = {player_name for _, _, player_id, player_name, _, _, _ in accepted if not player_id}
+        name_to_id, players_created = resolve_players_by_name(conn, names, long_names_enabled)
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error resolving players for score batch: {traceback.format_exc()}")
+        return {"success": False, "error": str(e)}
+
+    scores = [{
+        "game_id": game_id,
+        "player_id": player_id or name_to_id[player_name],
+        "score": score,
+        "timestamp": entry.get("timestamp") or now,
+        "room_id": room_id,
+        "wins": wins,
+        "losses": losses,
+    } for entry, game_id, player_id, player_name, score, wins, losses in accepted]
+
+    success, message, new_scores = log_scores_to_db(conn, scores)
+    if not success:
+        conn.rollback()
+        return {"success": False, "error": message}
+    conn.commit()
+    unhide_games_with_new_scores(conn, new_scores)
+
+    if players_created:
+        emit_player_changes(conn)
+    emit_new_scores(conn, new_scores)
+
+    return {
+        "success": True,
+        "received": len(entries),
+        "inserted": len(new_scores),
+        "duplicates": len(accepted) - len(new_scores),
+        "players_created": players_created,
+        "rejected": sorted(rejected, key=lambda r: r["index"]),
+    }
+
+def get_high_scores(conn, room_id):
+    """
+    Retrieves high scores for one room, with game and player details - each game's
+    top scores_per_card scores (see get_top_scores).
+    :return: List of scores in dictionary format.
+    """
+    try:
+        return [
             {
-                "gameID": row[0],
-                "playerName": row[1],
-                "score": row[2],
-                "roomID": row[3],
-                "event": row[4],
-                "wins": row[5],
-                "losses": row[6],
-                "timestamp": row[7],
-                "hidden": row[8],
+                "gameID": row["game_id"],
+                "playerName": row["display_name"],
+                "score": row["score"],
+                "roomID": row["room_id"],
+                "event": row["event"],
+                "wins": row["wins"],
+                "losses": row["losses"],
+                "timestamp": row["timestamp"],
+                "hidden": row["hidden"],
             }
-            for row in results
+            for row in get_top_scores(conn, room_id)
         ]
 
-        return scores
-
     except Exception as e:
         print(f"Error retrieving high scores: {traceback.format_exc()}")
         return {"error": str(e)}
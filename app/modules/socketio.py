@@ -88,17 +88,21 @@ def emit_settings_changes(room_id, settings_data):
     """Notify other displays showing this room that its admin settings changed."""
     socketio.emit("settings_updated", {"roomID": room_id, **settings_data}, to=f"room_{room_id}", namespace="/")
 
-def emit_progress(app, progress, message, session_id=None):
+def emit_progress(app, progress, message, session_id=None, details=None):
     """Emit WebSocket messages asynchronously with Flask context. session_id, when
     given, lets the client that triggered the background task (creation/export)
-    tell its own progress apart from another tab's."""
+    tell its own progress apart from another tab's. details (a dict) rides along
+    when the task has more to say - an export's database snapshot page counts."""
     with app.app_context():
         print(f"Emitting progress message: '{message}' at {progress}%")
 
-        socketio.emit("progress_update", {
+        payload = {
             "progress": progress,
             "message": message,
             "session_id": session_id,
-        }, namespace="/")
+        }
+        if details:
+            payload["details"] = details
+        socketio.emit("progress_update", payload, namespace="/")
 
         print("Emit complete.")
@@ -6,7 +6,7 @@ import time
 from datetime import datetime, timezone
 
 import eventlet
-import requests
+from app.modules import http_client
 
 DEFAULT_REPO = "mikedmor/ArcadeScore"
 CACHE_TTL_SECONDS = 3600  # don't hit GitHub's API more than once an hour unless forced
@@ -60,7 +60,7 @@ def fetch_available_releases():
 
     repo = os.getenv("ARCADESCORE_UPDATE_REPO", DEFAULT_REPO)
     url = f"https://api.github.com/repos/{repo}/releases"
-    response = requests.get(url, headers={"Accept": "application/vnd.github+json"}, timeout=10)
+    response = http_client.get(url, headers={"Accept": "application/vnd.github+json"}, timeout=10)
     response.raise_for_status()
     return response.json()
 
@@ -8,12 +8,10 @@ import socket
 from flask import current_app
 from urllib.parse import urlparse
 from datetime import datetime, timezone
+from app.modules.media import cleanup_unreferenced_media, MEDIA_DEFAULTS
 
 RESERVED_NAMES = {"api", "static", "webhook", "highscores", "admin", "config", "system"}
 
-STATIC_IMAGE_PATH = os.path.join("static", "images")
-DEFAULT_AVATAR_PATH = os.path.join(STATIC_IMAGE_PATH, "avatars", "default-avatar.png")
-
 def get_secret_key(data_dir="data"):
     """Flask's session-signing key. An env var always wins; otherwise a random
     key is generated once and persisted under data_dir so admin login sessions
@@ -65,8 +63,8 @@ def parse_vpin_timestamp(created_at):
     epoch-milliseconds integer this used to assume. Handles both anyway since the
     format isn't documented as stable. Raises ValueError on anything unrecognized —
     callers should catch it rather than silently substituting "now", since a wrong
-    "now" timestamp defeats the exact-timestamp-match dedup check in webhook_log_score
-    and vpin_integration's historical-score import."""
+    "now" timestamp defeats the score-identity dedup (exact timestamp match, see
+    log_scores_to_db) in webhook_log_score and vpin_integration's historical-score import."""
     if isinstance(created_at, (int, float)):
         return datetime.fromtimestamp(created_at / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
     if isinstance(created_at, str):
@@ -115,65 +113,13 @@ def get_7z_path():
     return None
 
 def cleanup_unused_images(conn):
-    """Remove images not referenced in the database, while keeping the default avatar."""
+    """Remove images nothing has referenced for a while (the default avatar is never
+    removed). The media registry (app/modules/media.py) keeps reference counts as
+    rows change, so this reads only the unreferenced entries - no directory walk."""
     print("Running image cleanup...")
 
-    IMAGE_PATH = os.path.join(current_app.root_path, STATIC_IMAGE_PATH)
-
-    cursor = conn.cursor()
-
-    # Fetch all image references from the database
-    cursor.execute("SELECT icon FROM players WHERE icon IS NOT NULL;")
-    used_avatars = {row[0] for row in cursor.fetchall()}
-
-    cursor.execute("SELECT game_background FROM games WHERE game_background IS NOT NULL;")
-    used_backgrounds = {row[0] for row in cursor.fetchall()}
-
-    cursor.execute("SELECT game_image FROM games WHERE game_image IS NOT NULL;")
-    used_game_images = {row[0] for row in cursor.fetchall()}
-
-    # Convert relative DB paths to absolute paths
-    def convert_to_absolute(path):
-        """Convert DB-stored relative image paths to absolute file paths."""
-        if not path:
-            return None
-        if not path.startswith("/static/images/"):
-            print(f"⚠️ Unexpected DB path format: {path}")
-            return None
-        return os.path.abspath(os.path.join(current_app.root_path, path.lstrip("/")))
-
-    # Map database references to absolute paths
-    used_files = set()
-    for image_set in [used_avatars, used_backgrounds, used_game_images]:
-        for img in image_set:
-            abs_path = convert_to_absolute(img)
-            if abs_path:
-                used_files.add(abs_path)
-
-    removed_count = 0
-
-    # Iterate over each image directory
-    for folder_name, folder_path in IMAGE_DIRS.items():
-        image_folder = os.path.join(IMAGE_PATH, folder_path)
-
-        if not os.path.exists(image_folder):
-            continue  # Skip missing folders
-
-        for file in os.listdir(image_folder):
-            file_path = os.path.abspath(os.path.join(image_folder, file))
-
-            # **Ensure we DO NOT delete the default avatar**
-            if file_path == os.path.abspath(os.path.join(current_app.root_path, DEFAULT_AVATAR_PATH)):
-                print(f"Skipping default avatar: {file_path}")
-                continue
-
-            # Delete files not referenced in the database
-            if file_path not in used_files:
-                os.remove(file_path)
-                removed_count += 1
-                print(f"Removed unused image: {file_path}")
-            else:
-                print(f"Keeping used image: {file_path}")
+    grace_seconds = current_app.config.get("MEDIA_RELEASE_GRACE", MEDIA_DEFAULTS["MEDIA_RELEASE_GRACE"])
+    removed_count = cleanup_unreferenced_media(conn, current_app.root_path, grace_seconds)
 
     print(f"Cleanup complete. {removed_count} images removed.")
 
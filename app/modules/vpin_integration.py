@@ -1,69 +1,54 @@
+import time
+import traceback
+import eventlet
+import requests
+from eventlet.queue import LightQueue, Empty
+from flask import current_app
+from app.modules import http_client
 from app.modules.vpspreadsheet import generate_vpspreadsheet_url, fetch_vpspreadsheet_media
 from app.modules.vpinstudio import fetch_game_images, fetch_historical_scores
 from app.modules.games import save_game_to_db
-from app.modules.scores import log_score_to_db
-from app.modules.socketio import emit_message
-from app.modules.utils import generate_random_color, format_timestamp
-
-def _emit_game_score_update(conn, room_id, game_id, css_style):
-    """Push freshly-synced historical scores to any open scoreboard tab. Without this, a
-    bulk import/resync writes real data to the DB but an already-open tab never sees it:
-    game_update (emitted by save_game_to_db just before this runs) carries no "scores"
-    field by design - scores are always pushed separately, same as the live webhook path
-    (webhook_log_score) does with its own game_score_update emit."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT long_names_enabled, dateformat FROM settings WHERE id = ?", (room_id,))
-    room = cursor.fetchone()
-    long_names_enabled = room["long_names_enabled"] if room else "FALSE"
-    date_format = room["dateformat"] if room and room["dateformat"] else "MM/DD/YYYY"
+from app.modules.scores import log_scores_to_db, emit_new_scores
+from app.modules.utils import generate_random_color, vpin_url
+from app.modules.read_cache import invalidate_vpin_games
 
-    cursor.execute("""
-        SELECT p.full_name, p.default_alias, h.score, h.timestamp, h.wins, h.losses
-        FROM highscores h
-        JOIN players p ON h.player_id = p.id
-        JOIN games g ON g.id = h.game_id
-        WHERE h.game_id = ?
-        ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC;
-    """, (game_id,))
-
-    scores = [{
-        "displayName": row["full_name"] if long_names_enabled == "TRUE" else row["default_alias"],
-        "fullName": row["full_name"],
-        "defaultAlias": row["default_alias"],
-        "score": row["score"],
-        "timestamp": row["timestamp"],
-        "formatted_timestamp": format_timestamp(row["timestamp"], date_format),
-        "wins": row["wins"],
-        "losses": row["losses"],
-    } for row in cursor.fetchall()]
-
-    emit_message("game_score_update", {
-        "gameID": game_id,
-        "roomID": room_id,
-        "scores": scores,
-        "CSSScoreCards": css_style.get("css_score_cards"),
-        "CSSInitials": css_style.get("css_initials"),
-        "CSSScores": css_style.get("css_scores"),
-        "ScoreType": "hideBoth",
-    }, room=f"room_{room_id}")
+# Defaults for multi-game imports. create_app() copies these into app.config
+# (each overridable by an ARCADESCORE_* environment variable), same as
+# DB_POOL_DEFAULTS in app/modules/database.py.
+VPIN_IMPORT_DEFAULTS = {
+    "VPIN_IMPORT_CONCURRENCY": 4,   # Games fetched from one VPin server at once
+    "VPIN_IMPORT_WRITE_BATCH": 10,  # Fetched games whose historical scores are written in one transaction
+}
 
 def _fetch_media_for_game(vpin_api_url, game, image_compression_level, media_priority):
     """Fetch game media honoring the configured source priority, falling back to the
-    other source if either image is missing."""
+    other source if either image is missing. Returns (game_image, game_background,
+    timings), timings being milliseconds spent per source tried (and per asset, for
+    VPin Studio) plus the total."""
     ext_table_id = game.get("extTableId")
     ext_table_version_id = game.get("extTableVersionId")
+    timings = {}
 
     def fetch_from(source):
-        if source == "vpin_studio":
-            return fetch_game_images(vpin_api_url, game["id"], image_compression_level)
-        elif source == "vp_spreadsheet":
-            if not ext_table_id or not ext_table_version_id:
-                print(f"Missing extTableId or extTableVersionId for game: {game.get('name')}")
-                return {"backglass": "", "playfield": ""}
-            vps_media = fetch_vpspreadsheet_media(ext_table_id, ext_table_version_id, compression_level=image_compression_level)
-            return {"backglass": vps_media.get("backglass", ""), "playfield": vps_media.get("playfield", "")}
-        return {"backglass": "", "playfield": ""}
+        started = time.perf_counter()
+        try:
+            if source == "vpin_studio":
+                media = fetch_game_images(vpin_api_url, game["id"], image_compression_level)
+                timings[source] = dict(media.get("timings_ms", {}))
+                return media
+            elif source == "vp_spreadsheet":
+                timings[source] = {}
+                if not ext_table_id or not ext_table_version_id:
+                    print(f"Missing extTableId or extTableVersionId for game: {game.get('name')}")
+                    return {"backglass": "", "playfield": ""}
+                vps_media = fetch_vpspreadsheet_media(ext_table_id, ext_table_version_id, compression_level=image_compression_level)
+                return {"backglass": vps_media.get("backglass", ""), "playfield": vps_media.get("playfield", "")}
+            return {"backglass": "", "playfield": ""}
+        finally:
+            if source in timings:
+                timings[source]["total"] = round((time.perf_counter() - started) * 1000, 1)
 
+    started = time.perf_counter()
     preferred_source = "vp_spreadsheet" if media_priority == "preferred" else "vpin_studio"
     preferred = fetch_from(preferred_source)
     game_image = preferred.get("backglass", "")
@@ -76,34 +61,64 @@ def _fetch_media_for_game(vpin_api_url, game, image_compression_level, media_pri
         game_image = game_image or fallback.get("backglass", "")
         game_background = game_background or fallback.get("playfield", "")
 
-    return game_image or "", game_background or ""
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return game_image or "", game_background or "", timings
 
-def import_vpin_game_into_room(conn, vpin_api_url, room_id, game, css_style, options):
+def fetch_vpin_game(vpin_api_url, game, options):
     """
-    Creates (or, if this room already has this VPin game linked, updates in place)
-    one ArcadeScore game from a VPin Studio game entry: fetches media, builds the
-    VP-Spreadsheet link, saves the game, links it in `vpin_games`, and optionally
-    syncs historical scores. Shared by the scoreboard creation wizard
-    (app/background/create_scoreboards.py) and the Integrations Menu's game
-    import/resync actions (app/routes/api/v1/vpin_integrations.py), so a game
-    behaves the same regardless of which of those first added it — and calling
-    this again for an already-linked game safely refreshes it instead of creating
-    a duplicate.
+    The network half of importing a game - everything that doesn't touch the
+    database, so several games can run it at once: refreshes the game's details
+    from VPin Studio (options["refresh_details"], used by resync), downloads and
+    processes its media, and fetches its historical scores.
 
-    :param game: dict with at least "id" and "name", optionally "extTableId"/"extTableVersionId"
-    :param css_style: dict with css_score_cards/css_initials/css_scores/css_box/css_title
-    :param options: dict with retrieve_media (bool), media_priority ("preferred"/"fallback"),
-        image_compression_level (str), sync_historical_scores (bool),
-        vpin_players (list, required if syncing — see fetch_historical_scores)
-    :return: (success: bool, message: str, game_id: int or None)
+    :return: dict with game (the possibly refreshed game entry), game_image,
+        game_background, media_ms (media fetch timings, see _fetch_media_for_game;
+        None if not retrieving media) and scores (score dicts without game_id;
+        None if not syncing)
+    :raises requests.RequestException: if refreshing the details fails
+    """
+    if options.get("refresh_details"):
+        response = http_client.get(vpin_url(vpin_api_url, f"api/v1/games/{game['id']}"), timeout=10)
+        response.raise_for_status()
+        details = response.json()
+        game = {
+            **game,
+            "name": details.get("gameDisplayName", game.get("name")),
+            "extTableId": details.get("extTableId"),
+            "extTableVersionId": details.get("extTableVersionId"),
+        }
+
+    game_image, game_background, media_ms = "", "", None
+    if options.get("retrieve_media"):
+        game_image, game_background, media_ms = _fetch_media_for_game(
+            vpin_api_url, game,
+            options.get("image_compression_level", "original"),
+            options.get("media_priority", "fallback"),
+        )
+
+    scores = None
+    if options.get("sync_historical_scores"):
+        scores = fetch_historical_scores(vpin_api_url, game["id"], options.get("vpin_players", []), None, None) or []
+
+    return {"game": game, "game_image": game_image, "game_background": game_background, "media_ms": media_ms, "scores": scores}
+
+def save_vpin_game(conn, vpin_api_url, room_id, css_style, fetched):
+    """
+    The database half of importing a game: saves (or updates) the game from what
+    fetch_vpin_game fetched and links it in `vpin_games`. Historical scores are
+    handed back with game_id/room_id filled in rather than written, so callers
+    can write several games' scores in one go.
+
+    :return: (success: bool, message: str, game_id: int or None, scores: list)
     """
+    game = fetched["game"]
     game_name = game.get("name", "Unknown Game")
     cursor = conn.cursor()
 
     # If this room already has this VPin game linked, update it in place instead
     # of creating a duplicate.
     cursor.execute("""
-        SELECT vg.arcadescore_game_id
+        SELECT vg.arcadescore_game_id, g.game_color
         FROM vpin_games vg
         JOIN games g ON vg.arcadescore_game_id = g.id
         WHERE vg.server_url = ? AND vg.vpin_game_id = ? AND g.room_id = ?;
@@ -111,24 +126,6 @@ def import_vpin_game_into_room(conn, vpin_api_url, room_id, game, css_style, opt
     existing = cursor.fetchone()
     existing_game_id = existing["arcadescore_game_id"] if existing else None
 
-    existing_game_color = None
-    if existing_game_id:
-        cursor.execute("SELECT game_color FROM games WHERE id = ?", (existing_game_id,))
-        row = cursor.fetchone()
-        existing_game_color = row["game_color"] if row else None
-
-    ext_table_id = game.get("extTableId")
-    ext_table_version_id = game.get("extTableVersionId")
-    vpin_spreadsheet_url = generate_vpspreadsheet_url(ext_table_id, ext_table_version_id)
-
-    game_image, game_background = "", ""
-    if options.get("retrieve_media"):
-        game_image, game_background = _fetch_media_for_game(
-            vpin_api_url, game,
-            options.get("image_compression_level", "original"),
-            options.get("media_priority", "fallback"),
-        )
-
     game_data = {
         "game_name": game_name,
         "css_score_cards": css_style.get("css_score_cards"),
@@ -138,17 +135,17 @@ def import_vpin_game_into_room(conn, vpin_api_url, room_id, game, css_style, opt
         "css_title": css_style.get("css_title"),
         "score_type": "hideBoth",
         "sort_ascending": "FALSE",
-        "game_image": game_image,
-        "game_background": game_background,
-        "tags": vpin_spreadsheet_url,
+        "game_image": fetched["game_image"],
+        "game_background": fetched["game_background"],
+        "tags": generate_vpspreadsheet_url(game.get("extTableId"), game.get("extTableVersionId")),
         "hidden": "FALSE",
-        "game_color": existing_game_color if existing_game_id else generate_random_color(),
+        "game_color": existing["game_color"] if existing else generate_random_color(),
         "room_id": room_id,
     }
 
     success, message, game_id = save_game_to_db(conn, game_data, existing_game_id)
     if not success:
-        return False, message, None
+        return False, message, None, []
 
     if not existing_game_id:
         cursor.execute("""
@@ -156,28 +153,151 @@ def import_vpin_game_into_room(conn, vpin_api_url, room_id, game, css_style, opt
             VALUES (?, ?, ?)
         """, (vpin_api_url, game_id, game["id"]))
         conn.commit()
+        invalidate_vpin_games(vpin_api_url)
 
-    if options.get("sync_historical_scores"):
-        vpin_players = options.get("vpin_players", [])
-        retrieved_scores = fetch_historical_scores(vpin_api_url, game["id"], vpin_players, game_id, room_id)
-
-        if retrieved_scores:
-            added = 0
-            for score in retrieved_scores:
-                cursor.execute("""
-                    SELECT COUNT(*) FROM highscores
-                    WHERE game_id = ? AND player_id = ? AND score = ? AND timestamp = ? AND room_id = ?;
-                """, (score["game_id"], score["player_id"], score["score"], score["timestamp"], score["room_id"]))
-                if cursor.fetchone()[0] > 0:
-                    continue  # Already logged - safe to call this again as a "resync"
-                log_score_to_db(conn, score)
-                added += 1
-            print(f"✅ Added {added} new score(s) for game {game_name} (skipped {len(retrieved_scores) - added} already present).")
-
-            if added:
-                _emit_game_score_update(conn, room_id, game_id, css_style)
-        else:
-            print(f"No scores found for game {game_name} or an error occurred.")
+    scores = [{**score, "game_id": game_id, "room_id": room_id} for score in fetched["scores"] or []]
+    if fetched["scores"] is not None and not scores:
+        print(f"No scores found for game {game_name} or an error occurred.")
 
     verb = "updated" if existing_game_id else "imported"
-    return True, f"Game '{game_name}' {verb} successfully", game_id
+    return True, f"Game '{game_name}' {verb} successfully", game_id, scores
+
+def _log_synced_scores(conn, scores, label):
+    """Write historical scores fetched for one or more games, skipping the ones
+    already on record, and push the new ones to open scoreboards."""
+    if not scores:
+        return
+    # One batched INSERT OR IGNORE - already-logged scores are skipped by the
+    # unique score-identity index, so this is safe to call again as a "resync"
+    success, message, new_scores = log_scores_to_db(conn, scores)
+    if not success:
+        print(f"❌ Failed to sync scores for {label}: {message}")
+        return
+    added = len(new_scores)
+    print(f"✅ Added {added} new score(s) for {label} (skipped {len(scores) - added} already present).")
+
+    if added:
+        # Push the synced scores to any open scoreboard tab - game_update (emitted
+        # by save_game_to_db) deliberately carries no scores
+        emit_new_scores(conn, new_scores)
+
+def import_vpin_game_into_room(conn, vpin_api_url, room_id, game, css_style, options):
+    """
+    Creates (or, if this room already has this VPin game linked, updates in place)
+    one ArcadeScore game from a VPin Studio game entry: fetches media, builds the
+    VP-Spreadsheet link, saves the game, links it in `vpin_games`, and optionally
+    syncs historical scores. Games imported in bulk go through
+    import_vpin_games_into_room instead, which runs the same two halves
+    (fetch_vpin_game, save_vpin_game) with the fetches in parallel - so a game
+    behaves the same regardless of which path first added it, and calling this
+    again for an already-linked game safely refreshes it instead of creating a
+    duplicate.
+
+    :param game: dict with at least "id" and "name", optionally "extTableId"/"extTableVersionId"
+    :param css_style: dict with css_score_cards/css_initials/css_scores/css_box/css_title
+    :param options: dict with retrieve_media (bool), media_priority ("preferred"/"fallback"),
+        image_compression_level (str), sync_historical_scores (bool),
+        vpin_players (list, required if syncing — see fetch_historical_scores)
+    :return: (success: bool, message: str, game_id: int or None)
+    """
+    fetched = fetch_vpin_game(vpin_api_url, game, options)
+    success, message, game_id, scores = save_vpin_game(conn, vpin_api_url, room_id, css_style, fetched)
+    if success:
+        _log_synced_scores(conn, scores, f"game {fetched['game'].get('name')}")
+    return success, message, game_id
+
+def import_vpin_games_into_room(conn, vpin_api_url, room_id, games, css_style, options, on_progress=None):
+    """
+    Import (or refresh) many VPin Studio games into a room as a two-stage
+    pipeline. Up to VPIN_IMPORT_CONCURRENCY games are fetched at once on green
+    threads (fetch_vpin_game: details, media, historical scores - no database),
+    while this greenthread is the only writer: it saves each game as soon as its
+    fetch finishes, and writes the historical scores of up to
+    VPIN_IMPORT_WRITE_BATCH ready games in one transaction.
+
+    Each game stands alone - a failed download or save is recorded in that
+    game's result and the rest carry on.
+
+    :param css_style: dict applied to every game, or a function of the game
+        returning one (resync keeps each game's own styles)
+    :param options: as for import_vpin_game_into_room, plus refresh_details (bool)
+    :param on_progress: optional callback(stage, game, result) - stage "fetching"
+        when a game's fetch starts (result None), "saved" when it's been written
+        (result is its entry in the returned list)
+    :return: list of {vpin_game_id, name, success, message, game_id}, in `games`
+        order - plus media_ms, per-source media fetch timings, when media was retrieved
+    """
+    app = current_app._get_current_object()
+    concurrency = max(1, int(app.config.get("VPIN_IMPORT_CONCURRENCY", VPIN_IMPORT_DEFAULTS["VPIN_IMPORT_CONCURRENCY"])))
+    batch_size = max(1, int(app.config.get("VPIN_IMPORT_WRITE_BATCH", VPIN_IMPORT_DEFAULTS["VPIN_IMPORT_WRITE_BATCH"])))
+    style_for = css_style if callable(css_style) else (lambda game: css_style)
+
+    fetched_queue = LightQueue()
+
+    def fetch(index, game):
+        # Whatever happens here, the writer below gets one entry per game -
+        # it waits for exactly len(games) of them
+        fetched = RuntimeError("Fetch did not finish")
+        try:
+            with app.app_context():
+                if on_progress:
+                    on_progress("fetching", game, None)
+                fetched = fetch_vpin_game(vpin_api_url, game, options)
+        except Exception as e:
+            print(f"⚠️ Failed to fetch game {game.get('id')} ({game.get('name')}): {e}")
+            if not isinstance(e, requests.RequestException):
+                traceback.print_exc()
+            fetched = e
+        finally:
+            fetched_queue.put((index, fetched))
+
+    def feed():
+        pool = eventlet.GreenPool(concurrency)
+        for index, game in enumerate(games):
+            pool.spawn_n(fetch, index, game)
+
+    eventlet.spawn_n(feed)
+
+    results = [None] * len(games)
+    written = 0
+    while written < len(games):
+        ready = [fetched_queue.get()]
+        while len(ready) < batch_size:
+            try:
+                ready.append(fetched_queue.get_nowait())
+            except Empty:
+                break
+
+        batch_scores = []
+        saved = []
+        for index, fetched in ready:
+            game = games[index]
+            result = {"vpin_game_id": game.get("id"), "name": game.get("name"), "success": False, "game_id": None}
+            if isinstance(fetched, Exception):
+                result["message"] = f"Failed to fetch game: {fetched}"
+            else:
+                result["name"] = fetched["game"].get("name")
+                if fetched.get("media_ms") is not None:
+                    result["media_ms"] = fetched["media_ms"]
+                try:
+                    success, message, game_id, scores = save_vpin_game(
+                        conn, vpin_api_url, room_id, style_for(game), fetched
+                    )
+                    result.update(success=success, message=message, game_id=game_id)
+                    batch_scores.extend(scores)
+                except Exception as e:
+                    conn.rollback()
+                    result["message"] = f"Unexpected error: {e}"
+                    print(f"⚠️ Failed to save game {game.get('id')} ({result['name']}): {e}")
+                    traceback.print_exc()
+            results[index] = result
+            saved.append((game, result))
+
+        _log_synced_scores(conn, batch_scores, f"{len(ready)} game(s)")
+
+        written += len(ready)
+        if on_progress:
+            for game, result in saved:
+                on_progress("saved", game, result)
+
+    return results
@@ -1,69 +1,96 @@
 import os
-import requests
+import time
 import traceback
+from app.modules import http_client
 from app.modules.imageProcessor import save_image, extract_first_frame, rotate_image_90
 from app.modules.utils import vpin_url, normalize_vpin_url, parse_vpin_timestamp
 from app.routes.misc import GAMEIMAGE_STORAGE_PATH, GAMEBACKGROUND_STORAGE_PATH, GAMEIMAGE_DB_PATH, GAMEBACKGROUND_DB_PATH
 
-def fetch_game_images(vpin_api_url, vpin_game_id, compression_level="original"):
-    """Fetch PlayField (background) and BackGlass (game image) from VPin API."""
-    if not vpin_api_url:
-        return {
-            "playfield": None,
-            "backglass": None
-        }
+# Leading bytes of the formats VPin Studio serves media as: (offset, magic, kind)
+MEDIA_SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n", "image"),
+    (0, b"\xff\xd8\xff", "image"),                 # JPEG
+    (0, b"GIF8", "image"),
+    (0, b"BM", "image"),
+    (8, b"WEBP", "image"),                         # RIFF....WEBP
+    (4, b"ftyp", "video"),                         # MP4 / MOV / M4V
+    (0, b"\x1a\x45\xdf\xa3", "video"),              # WebM / MKV
+    (8, b"AVI ", "video"),                         # RIFF....AVI
+)
+SNIFF_BYTES = 64 * 1024
+
+def sniff_media_kind(head, content_type=""):
+    """
+    "image" or "video", from the first bytes of a response - VPin Studio's
+    Content-Type isn't always right about which one it's sending - falling back
+    to the Content-Type for formats not recognized here. None if neither says.
+    """
+    for offset, magic, kind in MEDIA_SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return kind
+    for kind in ("image", "video"):
+        if content_type.startswith(f"{kind}/"):
+            return kind
+    return None
+
+def _fetch_media(url, output_filename, storage_path, db_path, rotate, compression_level):
+    """
+    Download one VPin Studio media asset with a single streamed GET, and store
+    it as an image: pictures are read to the end and saved (rotated, for the
+    PlayField), videos are handed to extract_first_frame on the same connection
+    to read only as far as a first frame. Returns the stored path or None.
+    """
+    with http_client.get(url, stream=True) as response:
+        if response.status_code != 200:
+            print(f"Failed to fetch from VPin Studio: {url} - Status Code: {response.status_code}")
+            return None
 
-    playfield_url = vpin_url(vpin_api_url, f"api/v1/media/{vpin_game_id}/PlayField")
-    backglass_url = vpin_url(vpin_api_url, f"api/v1/media/{vpin_game_id}/BackGlass")
+        chunks = response.iter_content(chunk_size=SNIFF_BYTES)
+        head = next(chunks, b"")
+        kind = sniff_media_kind(head, response.headers.get("Content-Type", ""))
 
-    try:
-        # Check media types
-        playfield_response = requests.head(playfield_url, allow_redirects=True)
-        backglass_response = requests.head(backglass_url, allow_redirects=True)
-
-        is_playfield_video = "video" in playfield_response.headers.get("Content-Type", "")
-        is_backglass_video = "video" in backglass_response.headers.get("Content-Type", "")
-
-        playfield_path = None
-        backglass_path = None
-
-        # Handle PlayField
-        if is_playfield_video:
-            playfield_path = extract_first_frame(playfield_url, f"{vpin_game_id}_playfield.png", GAMEBACKGROUND_STORAGE_PATH, GAMEBACKGROUND_DB_PATH, True, compression_level)
-        else:
-            response = requests.get(playfield_url)
-            if response.status_code == 200:
-                print(f"Successfully fetched image from VPin Studio: {playfield_url}")
-                playfield_path = rotate_image_90(response.content, f"{vpin_game_id}_playfield.png", GAMEBACKGROUND_STORAGE_PATH, GAMEBACKGROUND_DB_PATH, compression_level)
-            else:
-                playfield_path = None
-                print(f"Failed to fetch from VPin Studio: {playfield_url} - Status Code: {response.status_code}")
-
-        # Handle BackGlass
-        if is_backglass_video:
-            backglass_path = extract_first_frame(backglass_url, f"{vpin_game_id}_backglass.png", GAMEIMAGE_STORAGE_PATH, GAMEIMAGE_DB_PATH, False, compression_level)
-        else:
-            response = requests.get(backglass_url)
-            if response.status_code == 200:
-                print(f"Successfully fetched image from VPin Studio: {backglass_url}")
-                backglass_path = save_image(response.content, f"{vpin_game_id}_backglass.png", GAMEIMAGE_STORAGE_PATH, GAMEIMAGE_DB_PATH, compression_level)
-            else:
-                backglass_path = None
-                print(f"Failed to fetch from VPin Studio: {backglass_url} - Status Code: {response.status_code}")
-
-        # If API fails, return VPSDB placeholder
-        return {
-            "playfield": playfield_path,
-            "backglass": backglass_path
-        }
+        if kind == "video":
+            return extract_first_frame(url, output_filename, storage_path, db_path, rotate, compression_level,
+                                       response=response, prefix=head)
+        if kind != "image":
+            print(f"Unrecognized media from VPin Studio: {url} ({response.headers.get('Content-Type')!r})")
+            return None
 
-    except Exception as e:
-        print(f"Failed to fetch images from VPin API: {e}")
+        image_data = head + b"".join(chunks)
+        print(f"Successfully fetched image from VPin Studio: {url}")
+        if rotate:
+            return rotate_image_90(image_data, output_filename, storage_path, db_path, compression_level)
+        return save_image(image_data, output_filename, storage_path, db_path, compression_level)
+
+def fetch_game_images(vpin_api_url, vpin_game_id, compression_level="original"):
+    """
+    Fetch PlayField (background) and BackGlass (game image) from VPin API, one
+    request each. Also returns how long each took, in milliseconds, under
+    "timings_ms" - the download plus the image processing.
+    """
+    if not vpin_api_url:
         return {
             "playfield": None,
-            "backglass": None
+            "backglass": None,
+            "timings_ms": {},
         }
 
+    assets = {
+        "playfield": (GAMEBACKGROUND_STORAGE_PATH, GAMEBACKGROUND_DB_PATH, True),
+        "backglass": (GAMEIMAGE_STORAGE_PATH, GAMEIMAGE_DB_PATH, False),
+    }
+    media = {"timings_ms": {}}
+    for asset, (storage_path, db_path, rotate) in assets.items():
+        url = vpin_url(vpin_api_url, f"api/v1/media/{vpin_game_id}/{'PlayField' if rotate else 'BackGlass'}")
+        started = time.perf_counter()
+        try:
+            media[asset] = _fetch_media(url, f"{vpin_game_id}_{asset}.png", storage_path, db_path, rotate, compression_level)
+        except Exception as e:
+            print(f"Failed to fetch {asset} from VPin API: {e}")
+            media[asset] = None
+        media["timings_ms"][asset] = round((time.perf_counter() - started) * 1000, 1)
+    return media
+
 def fetch_historical_scores(vpin_api_url, vpin_game_id, vpin_players, game_id, room_id):
     """
     Fetch historical scores from the VPin API and return them as a list of dictionaries.
@@ -76,7 +103,7 @@ def fetch_historical_scores(vpin_api_url, vpin_game_id, vpin_players, game_id, r
         print(f"Fetching historical scores from: {score_endpoint}")
 
         # Fetch the scores from the VPin API
-        score_response = requests.get(score_endpoint)
+        score_response = http_client.get(score_endpoint)
         if score_response.status_code != 200:
             print(f"❌ Failed to fetch scores. HTTP Status: {score_response.status_code}")
             return None
@@ -1,73 +1,437 @@
 import json
 import os
+import re
+import sqlite3
+import sys
+import threading
 import time
-import requests
+import traceback
+import eventlet
 from flask import current_app
+from app.modules import http_client
 from app.modules.imageProcessor import save_image
 from app.routes.misc import GAMEIMAGE_STORAGE_PATH, GAMEBACKGROUND_STORAGE_PATH, GAMEIMAGE_DB_PATH, GAMEBACKGROUND_DB_PATH
 
 VPS_DB_URL = "https://virtualpinballspreadsheet.github.io/vps-db/db/vpsdb.json"
 VPS_LAST_UPDATED_URL = "https://virtualpinballspreadsheet.github.io/vps-db/lastUpdated.json"
-CACHE_EXPIRY = 3600  # Cache expiry in seconds (1 hour)
 
-# Cache storage
-cached_vpsdb = None
+# Defaults for the VPS database refresher. create_app() copies these into
+# app.config (each overridable by an ARCADESCORE_* environment variable), same
+# as DB_POOL_DEFAULTS in app/modules/database.py.
+VPS_REFRESH_DEFAULTS = {
+    "VPS_REFRESH_INTERVAL": 3600,   # Seconds between checks of lastUpdated.json for a new VPS database
+}
+VPS_RETRY_INTERVAL = 300  # Seconds before trying again after a failed refresh
+
+# The local copy requests are served from: every game by its VPS id, as a
+# compact VpsGame, plus the snapshot file (vps-data/vpsdb.sqlite) they were
+# loaded from, which search reads too. Only the refresher replaces them, and
+# always whole - see _load_vps_data
 last_checked_time = None
 cached_last_updated = None
+vps_games_by_id = {}
+vps_index_path = None
+_index_lock = threading.Lock()
+
+# Bumped whenever the snapshot's layout changes, so older snapshots are rebuilt
+VPS_SNAPSHOT_FORMAT = 2
+VPS_SNAPSHOT_MMAP_BYTES = 256 * 1024 * 1024
+
+VPS_SEARCH_MAX_PER_PAGE = 100
+
+_refresh_lock = threading.Lock()    # Held by the one refresh running, if any
+_refresher_started = False
+_refresh_requested = None           # Event that wakes the refresher early
+_vps_data_dir = None                # Set by start_vps_refresher, for use outside a request
+_status = {
+    "loaded_at": None,          # When the copy being served was loaded (epoch seconds)
+    "last_checked_at": None,    # When lastUpdated.json was last checked
+    "last_updated": None,       # The VPS database's own lastUpdated stamp, of the copy being served
+    "last_result": None,        # "updated", "unchanged" or "failed"
+    "last_error": None,
+    "last_duration_ms": None,
+    "refreshing": False,
+    "refreshes": 0,
+    "failures": 0,
+}
 
 def get_vps_paths():
-    vps_data_dir = os.path.join(current_app.root_path, 'vps-data')
+    vps_data_dir = _vps_data_dir or os.path.join(current_app.root_path, 'vps-data')
     vps_json_path = os.path.join(vps_data_dir, "vpsdb.json")
     last_updated_path = os.path.join(vps_data_dir, "lastUpdated.json")
     return vps_data_dir, vps_json_path, last_updated_path
 
-def fetch_vps_data(force_refresh=False):
+class VpsGame:
     """
-    Fetches VPS data and updates the cache if outdated or forced refresh is requested.
-    Returns the VPS database as a dictionary.
+    One VPS game, reduced to the fields ArcadeScore uses. vpsdb.json carries a
+    lot more per game (authors, features, ROM/PUP/alt-sound files, comments,
+    ...), and kept as parsed JSON the whole thing is a few hundred MB of dicts;
+    these records are a small fraction of that.
     """
-    global cached_vpsdb, cached_last_updated, last_checked_time
-    current_time = time.time()
+    __slots__ = ("id", "name", "manufacturer", "year", "type", "backglass_url", "tables")
 
-    vps_data_dir, vps_json_path, last_updated_path = get_vps_paths()
-    os.makedirs(vps_data_dir, exist_ok=True)
+    def __init__(self, id, name, manufacturer, year, type, backglass_url, tables):
+        self.id = id
+        self.name = name
+        # Repeated across thousands of games - one string object each
+        self.manufacturer = sys.intern(manufacturer) if manufacturer else manufacturer
+        self.year = year
+        self.type = sys.intern(type) if type else type
+        self.backglass_url = backglass_url
+        self.tables = tables  # ((table version id, playfield image URL), ...)
+
+    @classmethod
+    def from_json(cls, game):
+        b2s_files = game.get("b2sFiles") or [{}]
+        return cls(
+            game.get("id"), game.get("name"), game.get("manufacturer"), game.get("year"), game.get("type"),
+            b2s_files[0].get("imgUrl"),
+            tuple((table.get("id"), table.get("imgUrl")) for table in game.get("tableFiles") or []),
+        )
+
+    def table_image(self, table_id):
+        """The playfield image URL of one of this game's table versions, or None."""
+        return next((img_url for id, img_url in self.tables if id == table_id), None)
 
+    def summary(self):
+        """What a search result shows - enough to list and pick the game."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "manufacturer": self.manufacturer,
+            "year": self.year,
+            "type": self.type,
+            "imgUrl": self.backglass_url,
+            "tableCount": len(self.tables),
+        }
+
+    def to_dict(self):
+        """The game in vpsdb.json's own shape, with only the fields kept."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "manufacturer": self.manufacturer,
+            "year": self.year,
+            "type": self.type,
+            "b2sFiles": [{"imgUrl": self.backglass_url}] if self.backglass_url else [],
+            "tableFiles": [{"id": id, "imgUrl": img_url} for id, img_url in self.tables],
+        }
+
+def iter_json_array(f, chunk_size=256 * 1024):
+    """
+    Yield the elements of the top-level JSON array in file f one at a time,
+    reading chunk_size characters at a time - so only one game's worth of
+    parsed JSON, not the whole database's, is ever alive at once.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def skip(separators):
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in separators:
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            fill()
+
+    skip(" \t\r\n")
+    if buffer[position:position + 1] != "[":
+        raise ValueError("Expected a JSON array")
+    position += 1
+    while True:
+        skip(" \t\r\n,")
+        if buffer[position:position + 1] == "]":
+            return
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                # A number at the end of the buffer may go on in the next chunk
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        position = end
+        yield element
+
+def _snapshot_stamp(last_updated):
+    return f"{VPS_SNAPSHOT_FORMAT}:{json.dumps(last_updated)}"
+
+def _connect_snapshot(path):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA mmap_size = {VPS_SNAPSHOT_MMAP_BYTES};")
+    return conn
+
+def _read_vps_snapshot(snapshot_path, stamp):
+    """The games in an up-to-date snapshot, by id - read straight from its
+    memory-mapped pages, no JSON parsing - or None if it's missing or stale."""
     try:
-        # Refresh cache if expired or forced
-        if force_refresh or not last_checked_time or current_time - last_checked_time >= CACHE_EXPIRY:
-            response = requests.get(VPS_LAST_UPDATED_URL)
-            response.raise_for_status()
-            last_updated = response.json()
-
-            # Compare with local lastUpdated.json
-            local_last_updated = None
-            if os.path.exists(last_updated_path):
-                with open(last_updated_path, "r") as f:
-                    local_last_updated = json.load(f)
-
-            if force_refresh or last_updated != local_last_updated:
-                vpsdb_response = requests.get(VPS_DB_URL)
-                vpsdb_response.raise_for_status()
-                cached_vpsdb = vpsdb_response.json()
+        with _connect_snapshot(snapshot_path) as conn:
+            current = conn.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+            if not current or current[0] != stamp:
+                return None
+            rows = conn.execute("""
+                SELECT id, name, manufacturer, year, type, backglass_url, tables FROM vps_games;
+            """).fetchall()
+    except sqlite3.Error:
+        return None  # Missing or unreadable - rebuild it
+    return {
+        row[0]: VpsGame(*row[:6], tuple(tuple(table) for table in json.loads(row[6])))
+        for row in rows
+    }
 
-                # Save new cache
-                with open(vps_json_path, "w") as f:
-                    json.dump(cached_vpsdb, f)
-                with open(last_updated_path, "w") as f:
-                    json.dump(last_updated, f)
+def _ingest_vps_json(vps_json_path, stamp, snapshot_path):
+    """
+    Stream vpsdb.json into compact VpsGame records, writing each to a new
+    snapshot as it goes: a SQLite file with the records plus an FTS5 index over
+    names and manufacturers for search. Swapped in whole once complete, so
+    searches running meanwhile keep reading the previous one. Returns the games
+    by id.
+    """
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
 
-            else:
-                with open(vps_json_path, "r") as f:
-                    cached_vpsdb = json.load(f)
+    games = {}
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE vps_games (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                name TEXT,
+                manufacturer TEXT,
+                year INTEGER,
+                type TEXT,
+                backglass_url TEXT,
+                tables TEXT NOT NULL
+            );
+            CREATE INDEX idx_vps_games_name ON vps_games (name COLLATE NOCASE);
+            CREATE VIRTUAL TABLE vps_games_fts USING fts5(
+                name, manufacturer, content='vps_games', content_rowid='rowid'
+            );
+        """)
+        with open(vps_json_path, "r", encoding="utf-8") as f:
+            for element in iter_json_array(f):
+                game = VpsGame.from_json(element)
+                if not game.id or game.id in games:
+                    continue
+                games[game.id] = game
+                conn.execute("""
+                    INSERT INTO vps_games (id, name, manufacturer, year, type, backglass_url, tables)
+                    VALUES (?, ?, ?, ?, ?, ?, ?);
+                """, (game.id, game.name, game.manufacturer, game.year, game.type, game.backglass_url,
+                      json.dumps(game.tables)))
+        conn.execute("INSERT INTO vps_games_fts (vps_games_fts) VALUES ('rebuild');")
+        conn.execute("INSERT INTO meta (key, value) VALUES ('stamp', ?);", (stamp,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(temp_path, snapshot_path)
+    print(f"Indexed {len(games)} VPS games for search")
+    return games
+
+def _load_vps_data(vps_data_dir, vps_json_path, last_updated_path):
+    """Load the local copy, replacing what's served: from the snapshot if it's
+    up to date with lastUpdated, otherwise by ingesting vpsdb.json anew."""
+    global vps_games_by_id, vps_index_path, cached_last_updated
+    last_updated = None
+    if os.path.exists(last_updated_path):
+        with open(last_updated_path, "r") as f:
+            last_updated = json.load(f)
+    stamp = _snapshot_stamp(last_updated)
+    snapshot_path = os.path.join(vps_data_dir, "vpsdb.sqlite")
+
+    with _index_lock:
+        games = _read_vps_snapshot(snapshot_path, stamp)
+        if games is None:
+            games = _ingest_vps_json(vps_json_path, stamp, snapshot_path)
+        vps_games_by_id, vps_index_path, cached_last_updated = games, snapshot_path, last_updated
+    _status.update(loaded_at=time.time(), last_updated=last_updated)
 
-            cached_last_updated = last_updated
-            last_checked_time = current_time
+def refresh_vps_data(force=False):
+    """
+    Bring the local VPS database up to date from GitHub: check lastUpdated.json,
+    and download vpsdb.json only if it changed (or force). The download goes to
+    a temp file first, so a failed one leaves the previous copy - which keeps
+    being served the whole time - in place. Single-flight: returns "running"
+    straight away if another refresh is already in progress. Otherwise returns
+    "updated", "unchanged" or "failed".
+    """
+    global last_checked_time
+    if not _refresh_lock.acquire(blocking=False):
+        return "running"
+
+    started = time.perf_counter()
+    _status["refreshing"] = True
+    try:
+        vps_data_dir, vps_json_path, last_updated_path = get_vps_paths()
+        os.makedirs(vps_data_dir, exist_ok=True)
+
+        response = http_client.get(VPS_LAST_UPDATED_URL)
+        response.raise_for_status()
+        last_updated = response.json()
+
+        local_last_updated = None
+        if os.path.exists(last_updated_path):
+            with open(last_updated_path, "r") as f:
+                local_last_updated = json.load(f)
+
+        if force or last_updated != local_last_updated or not os.path.exists(vps_json_path):
+            temp_path = f"{vps_json_path}.{os.getpid()}.tmp"
+            with http_client.get(VPS_DB_URL, stream=True) as vpsdb_response:
+                vpsdb_response.raise_for_status()
+                with open(temp_path, "wb") as f:
+                    for chunk in vpsdb_response.iter_content(chunk_size=256 * 1024):
+                        f.write(chunk)
+            os.replace(temp_path, vps_json_path)
+            with open(last_updated_path, "w") as f:
+                json.dump(last_updated, f)
+            result = "updated"
+        else:
+            result = "unchanged"
 
-        return cached_vpsdb
+        if result == "updated" or vps_index_path is None:
+            _load_vps_data(vps_data_dir, vps_json_path, last_updated_path)
+        last_checked_time = time.time()
+        _status.update(last_checked_at=last_checked_time, last_error=None)
 
     except Exception as e:
-        print(f"Error fetching VPS data: {e}")
-        return cached_vpsdb or {}
+        print(f"Error refreshing VPS data: {e}")
+        result = "failed"
+        _status["failures"] += 1
+        _status["last_error"] = str(e)
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        _status.update(refreshing=False, last_duration_ms=duration_ms)
+        _refresh_lock.release()
+
+    _status["refreshes"] += 1
+    _status["last_result"] = result
+    if result == "updated":
+        print(f"📥 VPS database updated ({len(vps_games_by_id)} games) in {duration_ms}ms")
+    return result
+
+def _refresher(interval):
+    # Serve the copy already on disk straight away, then bring it up to date
+    vps_data_dir, vps_json_path, last_updated_path = get_vps_paths()
+    if os.path.exists(vps_json_path):
+        try:
+            _load_vps_data(vps_data_dir, vps_json_path, last_updated_path)
+        except Exception:
+            print(f"❌ Failed to load the local VPS database: {traceback.format_exc()}")
+
+    force = False
+    while True:
+        result = refresh_vps_data(force=force)
+        force = False
+        with eventlet.Timeout(VPS_RETRY_INTERVAL if result == "failed" else interval, False):
+            force = _refresh_requested.wait()  # Or woken early by request_vps_refresh
+        if _refresh_requested.ready():
+            _refresh_requested.reset()
+
+def start_vps_refresher(app):
+    """Start the background VPS refresher (called once from create_app)."""
+    global _refresher_started, _vps_data_dir, _refresh_requested
+    if _refresher_started:
+        return
+
+    _refresher_started = True
+    _vps_data_dir = os.path.join(app.root_path, "vps-data")
+    _refresh_requested = eventlet.event.Event()
+    interval = max(60, int(app.config.get("VPS_REFRESH_INTERVAL", VPS_REFRESH_DEFAULTS["VPS_REFRESH_INTERVAL"])))
+    eventlet.spawn_n(_refresher, interval)
+
+def request_vps_refresh(force=False):
+    """Ask the refresher to check for a new VPS database now, instead of at its
+    next scheduled time. Without a running refresher (tests, scripts) this
+    refreshes in the caller."""
+    if not _refresher_started:
+        return refresh_vps_data(force=force)
+    if not _refresh_requested.ready():
+        _refresh_requested.send(force)
+    return "scheduled"
+
+def fetch_vps_data(force_refresh=False):
+    """
+    The VPS database as last loaded, as a list of VpsGame records - never waits
+    on GitHub; the background refresher keeps it up to date. Empty until the
+    first load. force_refresh asks for a refresh now, and still returns the
+    current copy.
+    """
+    if force_refresh:
+        request_vps_refresh(force=True)
+    elif vps_index_path is None and not _refresher_started:
+        # No refresher (tests, scripts): load on first use, as before
+        refresh_vps_data()
+    return list(vps_games_by_id.values())
+
+def get_vps_status():
+    """The refresher's state, and the size of the copy being served."""
+    _, vps_json_path, _ = get_vps_paths()
+    return {
+        **_status,
+        "games": len(vps_games_by_id),
+        "bytes": os.path.getsize(vps_json_path) if os.path.exists(vps_json_path) else None,
+    }
+
+def get_vps_game(game_id):
+    """One VPS game (a VpsGame) by its id, or None."""
+    fetch_vps_data()
+    return vps_games_by_id.get(game_id)
+
+def _fts_query(query):
+    """User input as an FTS5 query: every word must match, as a prefix. Quoting
+    each word keeps FTS syntax characters in names from breaking the query."""
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words)
+
+def search_vps_games(query="", page=1, per_page=25):
+    """
+    Search VPS games by name and manufacturer, best matches first - or, with
+    no query, all of them by name - a page at a time. Returns
+    {"results": [game summaries], "total", "page", "per_page"}.
+    """
+    fetch_vps_data()
+    page = max(1, int(page))
+    per_page = min(max(1, int(per_page)), VPS_SEARCH_MAX_PER_PAGE)
+    empty = {"results": [], "total": 0, "page": page, "per_page": per_page}
+    if not vps_index_path:
+        return empty
+
+    match = _fts_query(query or "")
+    if query and not match:
+        return empty  # Nothing searchable in it (punctuation only)
+
+    columns = "g.id, g.name, g.manufacturer, g.year, g.type, g.backglass_url, json_array_length(g.tables)"
+    with _connect_snapshot(vps_index_path) as conn:
+        if match:
+            total = conn.execute("SELECT COUNT(*) FROM vps_games_fts WHERE vps_games_fts MATCH ?", (match,)).fetchone()[0]
+            rows = conn.execute(f"""
+                SELECT {columns} FROM vps_games_fts
+                JOIN vps_games g ON g.rowid = vps_games_fts.rowid
+                WHERE vps_games_fts MATCH ?
+                ORDER BY bm25(vps_games_fts, 10.0, 1.0), g.name COLLATE NOCASE
+                LIMIT ? OFFSET ?;
+            """, (match, per_page, (page - 1) * per_page)).fetchall()
+        else:
+            total = conn.execute("SELECT COUNT(*) FROM vps_games").fetchone()[0]
+            rows = conn.execute(f"""
+                SELECT {columns} FROM vps_games g ORDER BY g.name COLLATE NOCASE LIMIT ? OFFSET ?;
+            """, (per_page, (page - 1) * per_page)).fetchall()
+
+    keys = ("id", "name", "manufacturer", "year", "type", "imgUrl", "tableCount")
+    return {"results": [dict(zip(keys, row)) for row in rows], "total": total, "page": page, "per_page": per_page}
 
 def generate_vpspreadsheet_url(extTableId = None, extTableVersionId = None):
     # Generate VPin Spreadsheet URL
@@ -88,31 +452,28 @@ def fetch_vpspreadsheet_media(ext_table_id, ext_table_version_id, compression_le
     :return: Dictionary with backglass and playfield paths or None if unavailable
     """
     print(f"Fetching media from VP Spreadsheet for Table ID: {ext_table_id}, Version ID: {ext_table_version_id}")
-    vpsdb = fetch_vps_data()
-
     try:
         # 1️⃣ Find the game using extTableId
-        game_data = next((game for game in vpsdb if game.get("id") == ext_table_id), None)
+        game_data = get_vps_game(ext_table_id)
         if not game_data:
             print(f"Game with extTableId {ext_table_id} not found in VPS database.")
             return {"backglass": None, "playfield": None}
 
         # 2️⃣ Find the table version using extTableVersionId
-        table_data = next((table for table in game_data.get("tableFiles", []) if table.get("id") == ext_table_version_id), None)
-        if not table_data:
+        if not any(table_id == ext_table_version_id for table_id, _ in game_data.tables):
             print(f"Table version with extTableVersionId {ext_table_version_id} not found.")
             return {"backglass": None, "playfield": None}
 
         # 3️⃣ Extract media URLs
-        backglass_url = game_data.get("b2sFiles", [{}])[0].get("imgUrl")
-        playfield_url = table_data.get("imgUrl")
+        backglass_url = game_data.backglass_url
+        playfield_url = game_data.table_image(ext_table_version_id)
 
         backglass_path = None
         playfield_path = None
 
         # 4️⃣ Download & compress backglass
         if backglass_url:
-            response = requests.get(backglass_url)
+            response = http_client.get(backglass_url)
             if response.status_code == 200:
                 backglass_filename = f"{ext_table_id}_{ext_table_version_id}_backglass.png"
                 backglass_path = save_image(
@@ -127,7 +488,7 @@ def fetch_vpspreadsheet_media(ext_table_id, ext_table_version_id, compression_le
 
         # 5️⃣ Download & compress playfield
         if playfield_url:
-            response = requests.get(playfield_url)
+            response = http_client.get(playfield_url)
             if response.status_code == 200:
                 playfield_filename = f"{ext_table_id}_{ext_table_version_id}_playfield.png"
                 playfield_path = save_image(
@@ -4,13 +4,17 @@ import traceback
 import uuid
 import json
 import eventlet
-from app.modules.utils import get_server_base_url, generate_random_color, format_timestamp, normalize_vpin_url, vpin_url, parse_vpin_timestamp
-from app.modules.scores import log_score_to_db
+from app.modules import http_client
+from app.modules.utils import get_server_base_url, generate_random_color, normalize_vpin_url, vpin_url, parse_vpin_timestamp
+from app.modules.scores import log_scores_to_db, emit_new_scores
 from app.modules.players import add_player_to_db, update_player_in_db, delete_player_from_db, link_vpin_player
 from app.modules.games import save_game_to_db, delete_game_from_db
 from app.modules.vpspreadsheet import generate_vpspreadsheet_url
 from app.modules.vpinstudio import fetch_game_images
 from app.modules.socketio import emit_message
+from app.modules.read_cache import (
+    get_room_settings, get_room_webhook, get_vpin_game_mapping, get_vpin_player_map, invalidate_room_webhook,
+)
 
 # Score webhooks have, in the past, arrived slightly before VPin Studio's own score
 # endpoint reflects the new score. Retry a few times before giving up rather than
@@ -21,11 +25,9 @@ SCORE_FETCH_RETRY_DELAY_SECONDS = 2
 def _get_room_webhook(cursor, room_id):
     """Look up the registered VPin Studio webhook (server + auth token) for a room.
     Rooms with more than one registered webhook set only get the first row back —
-    a known limitation."""
-    cursor.execute("""
-        SELECT server_url, webhook_token FROM vpin_webhooks WHERE room_id = ? LIMIT 1;
-    """, (room_id,))
-    return cursor.fetchone()
+    a known limitation. Served from the read cache (app/modules/read_cache.py),
+    since every inbound webhook call starts here."""
+    return get_room_webhook(cursor, room_id)
 
 def _verify_webhook_token(webhook_row, data):
     """Reject a CREATE/UPDATE webhook call that doesn't carry the token this room's
@@ -143,7 +145,7 @@ def register_vpin_webhook(conn, vpin_api_url, room_id, scoreboard_name, webhooks
         print(f"Registering webhook with payload:\n{formatted_payload}")
 
         # Send JSON payload to VPin Studio
-        response = requests.post(webhook_url, data=formatted_payload, headers={'Content-Type': 'application/json'}, timeout=10)
+        response = http_client.post(webhook_url, data=formatted_payload, headers={'Content-Type': 'application/json'}, timeout=10)
 
         if response.status_code == 200:
             cursor = conn.cursor()
@@ -173,6 +175,7 @@ def register_vpin_webhook(conn, vpin_api_url, room_id, scoreboard_name, webhooks
             """, (room_id, vpin_api_url))
 
             conn.commit()
+            invalidate_room_webhook(room_id)
             return {"success": True, "message": "Webhook registered successfully."}
 
         return {"success": False, "message": f"Failed to register webhook. Status Code: {response.status_code}, Response: {response.text}"}
@@ -180,212 +183,210 @@ def register_vpin_webhook(conn, vpin_api_url, room_id, scoreboard_name, webhooks
     except requests.RequestException as e:
         return {"success": False, "message": f"Webhook request error: {str(e)}"}
 
-def webhook_log_score(conn, data):
+def check_score_webhook(conn, data):
     """
-    Webhook to handle score submissions from VPin Studio.
-    Retrieves score details via the VPin API, logs only new scores, and
-    emits an update to the frontend.
+    The cheap, synchronous part of a score webhook: required parameters, a
+    registered webhook for the room, and its token. Returns None if the call is
+    acceptable, otherwise the same error result webhook_log_score would return.
+    The route runs this before queueing, so a misconfigured cabinet still gets an
+    immediate 400 instead of a queued event that can only ever fail.
     """
-    try:
-        print(f"📩 New Score Webhook Data: {data}")
-        sys.stdout.flush()
+    room_id = data.get("roomID")
+    vpin_game_id = data.get("id")  # Game ID provided in webhook
 
-        room_id = data.get("roomID")
-        vpin_game_id = data.get("id")  # Game ID provided in webhook
+    if not room_id or not vpin_game_id:
+        return {"success": False, "error": "Missing required parameters: roomID or game ID"}
 
-        if not room_id or not vpin_game_id:
-            return {"success": False, "error": "Missing required parameters: roomID or game ID"}
+    webhook_row = _get_room_webhook(conn.cursor(), room_id)
+    if not webhook_row:
+        return {"success": False, "error": f"No VPin API URL found for room {room_id}", "room_id": room_id}
 
-        cursor = conn.cursor()
+    if not _verify_webhook_token(webhook_row, data):
+        return {"success": False, "error": "Invalid or missing webhook token", "room_id": room_id}
 
-        webhook_row = _get_room_webhook(cursor, room_id)
-        if not webhook_row:
-            return {"success": False, "error": f"No VPin API URL found for room {room_id}", "room_id": room_id}
+    return None
 
-        if not _verify_webhook_token(webhook_row, data):
-            return {"success": False, "error": "Invalid or missing webhook token", "room_id": room_id}
+def can_view_score_event(conn, room_id, token):
+    """Whether a status request may see a queued score event's details: it has
+    to carry the token the room's webhook was registered with - the same check
+    the score PUT passes (see _verify_webhook_token)."""
+    webhook_row = _get_room_webhook(conn.cursor(), room_id)
+    return bool(webhook_row) and _verify_webhook_token(webhook_row, {"token": token})
 
-        vpin_api_url = webhook_row["server_url"]
+def prepare_score_webhook(conn, data):
+    """
+    Everything a score webhook needs from the database before it can ask VPin
+    Studio for the scores: the checks in check_score_webhook, the room, the
+    ArcadeScore game the VPin game is mapped to, and the server's player map.
+    :return: (context, None) to pass on to fetch_webhook_scores/log_webhook_scores,
+        or (None, error result).
+    """
+    invalid = check_score_webhook(conn, data)
+    if invalid:
+        return None, invalid
 
-        # ✅ Fetch additional settings
-        cursor.execute("""
-            SELECT long_names_enabled, dateformat FROM settings WHERE id = ?;
-        """, (room_id,))
-        room_data = cursor.fetchone()
+    room_id = data.get("roomID")
+    vpin_game_id = data.get("id")
 
-        if not room_data:
-            return {"success": False, "error": f"No room settings found for room {room_id}", "room_id": room_id}
+    cursor = conn.cursor()
+    vpin_api_url = _get_room_webhook(cursor, room_id)["server_url"]
 
-        long_names_enabled = room_data["long_names_enabled"]
-        date_format = room_data["dateformat"] if room_data["dateformat"] else 'MM/DD/YYYY'
+    # ✅ Make sure the room itself still exists
+    if not get_room_settings(cursor, room_id):
+        return None, {"success": False, "error": f"No room settings found for room {room_id}", "room_id": room_id}
 
-        # ✅ Fetch the correct ArcadeScore game ID based on VPin game ID, server, and room
-        cursor.execute("""
-            SELECT vpin_games.arcadescore_game_id
-            FROM vpin_games
-            JOIN games ON vpin_games.arcadescore_game_id = games.id
-            WHERE vpin_games.server_url = ? AND vpin_games.vpin_game_id = ? AND games.room_id = ?;
-        """, (vpin_api_url, vpin_game_id, room_id))
+    # ✅ Fetch the correct ArcadeScore game ID based on VPin game ID, server, and room
+    arcadescore_game_id = get_vpin_game_mapping(cursor, vpin_api_url, vpin_game_id, room_id)
 
-        mapping = cursor.fetchone()
+    if not arcadescore_game_id:
+        return None, {"success": False, "error": f"No matching ArcadeScore game found for VPin Game ID {vpin_game_id}", "room_id": room_id}
 
-        if not mapping:
-            return {"success": False, "error": f"No matching ArcadeScore game found for VPin Game ID {vpin_game_id}", "room_id": room_id}
+    print(f"🎮 VPin Game ID {vpin_game_id} mapped to ArcadeScore Game ID {arcadescore_game_id}")
+    sys.stdout.flush()
 
-        arcadescore_game_id = mapping["arcadescore_game_id"]
-        print(f"🎮 VPin Game ID {vpin_game_id} mapped to ArcadeScore Game ID {arcadescore_game_id}")
-        sys.stdout.flush()
+    # ✅ Fetch all mapped players from `vpin_players` for this server (once, reused
+    # across every fetch attempt)
+    vpin_players = get_vpin_player_map(cursor, vpin_api_url)
 
-        score_api_url = vpin_url(vpin_api_url, f"api/v1/games/scores/{vpin_game_id}")
+    print(f"📋 vpin_players List for {vpin_api_url}: {vpin_players}")
+    sys.stdout.flush()
 
-        # ✅ Fetch all mapped players from `vpin_players` for this server (once, reused
-        # across every retry attempt below)
-        cursor.execute("""
-            SELECT arcadescore_player_id, vpin_player_id FROM vpin_players WHERE server_url = ?;
-        """, (vpin_api_url,))
-        vpin_players = {row["vpin_player_id"]: row["arcadescore_player_id"] for row in cursor.fetchall()}
+    return {
+        "room_id": room_id,
+        "game_id": arcadescore_game_id,
+        "vpin_api_url": vpin_api_url,
+        "score_api_url": vpin_url(vpin_api_url, f"api/v1/games/scores/{vpin_game_id}"),
+        "vpin_players": vpin_players,
+    }, None
 
-        print(f"📋 vpin_players List for {vpin_api_url}: {vpin_players}")
+def fetch_webhook_scores(context, attempt=1, max_attempts=1):
+    """
+    Fetch the game's score list from VPin Studio. Doesn't touch the database, so
+    the score queue holds no pooled connection while this waits on the network.
+    :return: (score entries, None), or (None, a retryable error result).
+    """
+    score_api_url = context["score_api_url"]
+    print(f"🌐 Fetching scores from {score_api_url} (attempt {attempt}/{max_attempts})")
+    sys.stdout.flush()
+
+    try:
+        response = http_client.get(score_api_url, timeout=10)
+        response.raise_for_status()  # Raises an exception for HTTP errors
+    except requests.RequestException as e:
+        print(f"🌐 Request Exception: {traceback.format_exc()}")
         sys.stdout.flush()
+        return None, {"success": False, "error": f"Error fetching score details: {str(e)}", "room_id": context["room_id"], "retryable": True}
 
-        new_scores = []
+    scores_data = response.json().get("scores", [])
+    print(f"📊 Found {len(scores_data)} scores to process.")
+    sys.stdout.flush()
+    return scores_data, None
 
-        for attempt in range(1, SCORE_FETCH_MAX_ATTEMPTS + 1):
-            print(f"🌐 Fetching scores from {score_api_url} (attempt {attempt}/{SCORE_FETCH_MAX_ATTEMPTS})")
-            sys.stdout.flush()
+def log_webhook_scores(conn, context, scores_data):
+    """
+    Log the fetched scores of mapped players, skipping any already on record,
+    and emit the new ones to the frontend.
+    :return: the webhook's result - a retryable failure if nothing new turned up
+        (the score may not be visible on VPin Studio's API yet).
+    """
+    room_id = context["room_id"]
+    vpin_players = context["vpin_players"]
 
-            try:
-                response = requests.get(score_api_url, timeout=10)
-                response.raise_for_status()  # Raises an exception for HTTP errors
-            except requests.RequestException as e:
-                print(f"🌐 Request Exception: {traceback.format_exc()}")
-                sys.stdout.flush()
-                return {"success": False, "error": f"Error fetching score details: {str(e)}", "room_id": room_id}
+    candidates = []
+    for score_entry in scores_data:
+        vpin_player = score_entry.get("player")
 
-            scores_data = response.json().get("scores", [])
-            print(f"📊 Found {len(scores_data)} scores to process.")
+        if not vpin_player:
+            print(f"⚠️ Skipping score entry with missing player: {score_entry}")
             sys.stdout.flush()
+            continue  # Skip scores without a player
 
-            new_scores = []
-            for score_entry in scores_data:
-                vpin_player = score_entry.get("player")
-
-                if not vpin_player:
-                    print(f"⚠️ Skipping score entry with missing player: {score_entry}")
-                    sys.stdout.flush()
-                    continue  # Skip scores without a player
-
-                vpin_player_id = vpin_player.get("id")
-                score_value = score_entry.get("score")
-                raw_timestamp = score_entry.get("createdAt")
-
-                # Convert timestamp to proper format. A fallback to "now" here would
-                # defeat the exact-timestamp dedup check below on every retry of this
-                # same score, so a parse failure is logged loudly rather than silently
-                # substituted.
-                try:
-                    formatted_timestamp = parse_vpin_timestamp(raw_timestamp)
-                except Exception as e:
-                    print(f"⚠️ Failed to parse timestamp {raw_timestamp!r}, skipping score entry. Error: {e}")
-                    sys.stdout.flush()
-                    continue
-
-                # ✅ Attempt to match the player using the dictionary lookup
-                arcadescore_player_id = vpin_players.get(vpin_player_id)
-
-                if not arcadescore_player_id:
-                    print(f"⚠️ No matching player found for VPin Player ID: {vpin_player_id} on {vpin_api_url}. Skipping score.")
-                    sys.stdout.flush()
-                    continue  # Skip scores with unknown players
-
-                # ✅ Check if the score already exists
-                cursor.execute("""
-                    SELECT COUNT(*) FROM highscores
-                    WHERE game_id = ? AND player_id = ? AND score = ? AND timestamp = ? AND room_id = ?;
-                """, (arcadescore_game_id, arcadescore_player_id, score_value, formatted_timestamp, room_id))
-                score_exists = cursor.fetchone()[0] > 0
-
-                if score_exists:
-                    continue
-
-                # ✅ Log the new score in the database
-                score_data = {
-                    "game_id": arcadescore_game_id,
-                    "player_id": arcadescore_player_id,
-                    "score": int(score_value),
-                    "timestamp": formatted_timestamp,
-                    "room_id": room_id
-                }
-                success, message = log_score_to_db(conn, score_data)
+        vpin_player_id = vpin_player.get("id")
+        score_value = score_entry.get("score")
+        raw_timestamp = score_entry.get("createdAt")
 
-                if success:
-                    print(f"🎉 New score logged for Player {arcadescore_player_id}: {score_value}")
-                    sys.stdout.flush()
-                    new_scores.append(score_data)  # Add to list for emitting to frontend
-                else:
-                    print(f"❌ Failed to log score: {message}")
-                    sys.stdout.flush()
+        # Convert timestamp to proper format. A fallback to "now" here would
+        # defeat the score-identity dedup below on every retry of this
+        # same score, so a parse failure is logged loudly rather than silently
+        # substituted.
+        try:
+            formatted_timestamp = parse_vpin_timestamp(raw_timestamp)
+        except Exception as e:
+            print(f"⚠️ Failed to parse timestamp {raw_timestamp!r}, skipping score entry. Error: {e}")
+            sys.stdout.flush()
+            continue
 
-            if new_scores:
-                break
+        # ✅ Attempt to match the player using the dictionary lookup
+        arcadescore_player_id = vpin_players.get(vpin_player_id)
 
-            if attempt < SCORE_FETCH_MAX_ATTEMPTS:
-                print(f"⏳ No new scores yet, retrying in {SCORE_FETCH_RETRY_DELAY_SECONDS}s...")
-                sys.stdout.flush()
-                eventlet.sleep(SCORE_FETCH_RETRY_DELAY_SECONDS)
+        if not arcadescore_player_id:
+            print(f"⚠️ No matching player found for VPin Player ID: {vpin_player_id} on {context['vpin_api_url']}. Skipping score.")
+            sys.stdout.flush()
+            continue  # Skip scores with unknown players
+
+        candidates.append({
+            "game_id": context["game_id"],
+            "player_id": arcadescore_player_id,
+            "score": int(score_value),
+            "timestamp": formatted_timestamp,
+            "room_id": room_id
+        })
+
+    # ✅ Log them all at once; scores already on record are skipped by the
+    # unique score-identity index, and only the genuinely new rows come back
+    success, message, new_scores = log_scores_to_db(conn, candidates)
+    if not success:
+        print(f"❌ Failed to log scores: {message}")
+        sys.stdout.flush()
+        return {"success": False, "error": f"Failed to log scores: {message}", "room_id": room_id, "retryable": True}
 
-        conn.commit()
+    if not new_scores:
+        return {"success": False, "error": "No new scores found after retrying.", "room_id": room_id, "retryable": True}
 
-        if not new_scores:
-            return {"success": False, "error": "No new scores found after retrying.", "room_id": room_id}
+    for score_data in new_scores:
+        print(f"🎉 New score logged for Player {score_data['player_id']}: {score_data['score']}")
+    sys.stdout.flush()
 
-        # ✅ Fetch all scores for this game after the update
-        cursor.execute("""
-            SELECT p.full_name, p.default_alias, h.score, h.timestamp, h.wins, h.losses
-            FROM highscores h
-            JOIN players p ON h.player_id = p.id
-            JOIN games g ON g.id = h.game_id
-            WHERE h.game_id = ?
-            ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC;
-        """, (arcadescore_game_id,))
-
-        all_scores = [{
-            "displayName": row[0] if long_names_enabled == "TRUE" else row[1],
-            "fullName": row[0],
-            "defaultAlias": row[1],
-            "score": row[2],
-            "timestamp": row[3],
-            "formatted_timestamp": format_timestamp(row[3], date_format),
-            "wins": row[4],
-            "losses": row[5]
-        } for row in cursor.fetchall()]
-
-        # Fetch CSS and ScoreType settings
-        cursor.execute("""
-            SELECT css_score_cards, css_initials, css_scores, score_type
-            FROM games WHERE id = ? AND room_id = ?;
-        """, (arcadescore_game_id, room_id))
-        game_settings = cursor.fetchone()
+    # Emit socket event to update scores on the dashboard (only the new ones)
+    emit_new_scores(conn, new_scores)
 
-        if not game_settings:
-            return {"success": False, "error": f"GameID '{arcadescore_game_id}' not found for room ID {room_id}", "room_id": room_id}
+    return {"success": True, "message": f"Processed {len(new_scores)} new scores", "room_id": room_id}
 
-        css_score_cards, css_initials, css_scores, score_type = game_settings
+def webhook_log_score(conn, data, max_attempts=SCORE_FETCH_MAX_ATTEMPTS):
+    """
+    Webhook to handle score submissions from VPin Studio.
+    Retrieves score details via the VPin API, logs only new scores, and
+    emits an update to the frontend.
 
-        # Emit socket event to update scores on the dashboard
-        print(f"📢 Emitting {len(all_scores)} scores to frontend.")
+    Fetches up to `max_attempts` times, sleeping between attempts, until a new
+    score shows up. The score queue (app/modules/score_queue.py) runs the steps
+    (prepare_score_webhook, fetch_webhook_scores, log_webhook_scores) itself,
+    once per attempt, and does its own retrying with backoff, so a worker isn't
+    parked in a sleep; results it may retry are flagged "retryable".
+    """
+    try:
+        print(f"📩 New Score Webhook Data: {data}")
         sys.stdout.flush()
-        emit_message("game_score_update", {
-            "gameID": arcadescore_game_id,
-            "roomID": room_id,
-            "scores": all_scores,
-            "CSSScoreCards": css_score_cards,
-            "CSSInitials": css_initials,
-            "CSSScores": css_scores,
-            "ScoreType": score_type
-        }, room=f"room_{room_id}")
 
-        return {"success": True, "message": f"Processed {len(new_scores)} new scores", "room_id": room_id}
+        context, result = prepare_score_webhook(conn, data)
+        if result:
+            return result
+
+        for attempt in range(1, max_attempts + 1):
+            scores_data, result = fetch_webhook_scores(context, attempt, max_attempts)
+            if result:
+                return result
+
+            result = log_webhook_scores(conn, context, scores_data)
+            if result["success"] or not result.get("retryable"):
+                return result
+
+            if attempt < max_attempts:
+                print(f"⏳ No new scores yet, retrying in {SCORE_FETCH_RETRY_DELAY_SECONDS}s...")
+                sys.stdout.flush()
+                eventlet.sleep(SCORE_FETCH_RETRY_DELAY_SECONDS)
+
+        return result
 
     except Exception as e:
         error_message = traceback.format_exc()
@@ -435,7 +436,7 @@ def webhook_player(conn, data, vpin_player_id=None):
         # ✅ Fetch full player details from VPin API
         player_api_url = vpin_url(vpin_api_url, f"api/v1/players/{vpin_player_id}")
         try:
-            response = requests.get(player_api_url, timeout=10)
+            response = http_client.get(player_api_url, timeout=10)
             response.raise_for_status()
         except requests.RequestException as e:
             print(f"🌐 Request Exception: {traceback.format_exc()}")
@@ -598,8 +599,7 @@ def webhook_game(conn, data, vpin_game_id=None):
                     "css_title": existing_row["css_title"],
                 }
         else:
-            cursor.execute("SELECT default_preset FROM settings WHERE id = ?", (room_id,))
-            settings_row = cursor.fetchone()
+            settings_row = get_room_settings(cursor, room_id)
             default_preset_id = settings_row["default_preset"] if settings_row else 1
             cursor.execute("""
                 SELECT css_score_cards, css_initials, css_scores, css_box, css_title
@@ -613,7 +613,7 @@ def webhook_game(conn, data, vpin_game_id=None):
         game_api_url = vpin_url(vpin_api_url, f"api/v1/games/{vpin_game_id}")
 
         try:
-            response = requests.get(game_api_url, timeout=10)
+            response = http_client.get(game_api_url, timeout=10)
             response.raise_for_status()  # Raises an exception for HTTP errors
         except requests.RequestException as e:
             print(f"🌐 Request Exception: {traceback.format_exc()}")
@@ -3,6 +3,7 @@ from app.modules.database import get_db
 from app.modules.socketio import emit_message
 from app.modules.games import save_game_to_db, delete_game_from_db
 from app.modules.auth import require_room_admin
+from app.modules.scores import build_game_score_payload, MAX_SCORE_PAGE_SIZE
 
 games_bp = Blueprint('games', __name__)
 
@@ -49,6 +50,32 @@ def get_game(game_id):
         print("Error fetching game:", str(e))  # Debugging log
         return jsonify({"error": str(e)}), 500
 
+# GET a game's sorted score list (the game_score_update payload). Without paging
+# parameters it returns what the game's card shows (the room's scores_per_card) -
+# scoreboards fall back to this when a game_score_delta doesn't follow on from the
+# version they have. The full history is paged through with ?offset=&limit=.
+@games_bp.route("/api/v1/games/<int:game_id>/scores", methods=["GET"])
+def get_game_scores(game_id):
+    try:
+        offset = request.args.get("offset", type=int)
+        limit = request.args.get("limit", type=int)
+        if "offset" in request.args and (offset is None or offset < 0):
+            return jsonify({"error": "offset must be a non-negative integer"}), 400
+        if "limit" in request.args and (limit is None or not 1 <= limit <= MAX_SCORE_PAGE_SIZE):
+            return jsonify({"error": f"limit must be between 1 and {MAX_SCORE_PAGE_SIZE}"}), 400
+
+        cursor = get_db().cursor()
+        cursor.execute("SELECT room_id FROM games WHERE id = ?;", (game_id,))
+        game = cursor.fetchone()
+        if not game:
+            return jsonify({"error": "Game not found"}), 404
+
+        return jsonify(build_game_score_payload(get_db(), game["room_id"], game_id, offset=offset or 0, limit=limit)), 200
+
+    except Exception as e:
+        print("Error fetching game scores:", str(e))
+        return jsonify({"error": str(e)}), 500
+
 # POST & PUT game (Add or Update)
 @games_bp.route("/api/v1/games", methods=["POST"])
 @games_bp.route("/api/v1/games/<int:game_id>", methods=["PUT"])
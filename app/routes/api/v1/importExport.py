@@ -1,34 +1,43 @@
 import os
-import shutil
 import uuid
 import eventlet
-import subprocess
-from flask import Blueprint, jsonify, send_file, request, current_app
-from app.modules.database import get_db, db_version
-from app.modules.models import migrate_db
+from flask import Blueprint, Response, jsonify, send_file, request, current_app, stream_with_context
 from app.background.export_task import run_export_task
+from app.background.import_task import run_import_task, import_lock
+from app.modules.export_engine import EXPORT_FORMATS
+from app.modules.import_engine import plan_import
+from app.modules.room_transfer import export_room, import_room, open_room_export
+from app.modules.read_cache import invalidate_room
+from app.modules.database import get_db
 from app.modules.utils import get_7z_path
-from app.modules.auth import require_any_room_admin
+from app.modules.auth import require_any_room_admin, require_room_admin
 
 import_export_bp = Blueprint("import_export", __name__)
 
 # Restored correct paths
 EXPORT_PATH = "app/static/export"
 IMPORT_PATH = "app/static/import"
-DATA_PATH = "data/highscores.db"
 IMAGE_PATH = "app/static/images"
 
 @import_export_bp.route("/api/v1/export", methods=["GET"])
 @require_any_room_admin
 def export_data():
-    """Trigger background export and return immediate response."""
+    """Trigger background export and return immediate response. ?format=zip|7z picks
+    the archive type (default: EXPORT_FORMAT, zip unless configured otherwise);
+    ?mode=diff exports only the media new or changed since the last export."""
     session_id = request.args.get("session_id") or str(uuid.uuid4())  # Get session ID or create one
+    archive_format = request.args.get("format")
+    if archive_format and archive_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unknown export format: {archive_format}"}), 400
+    mode = request.args.get("mode", "full")
+    if mode not in ("full", "diff"):
+        return jsonify({"error": f"Unknown export mode: {mode}"}), 400
     app = current_app._get_current_object()  # Get the Flask app instance
 
     print(f"Scheduling run_export_task for session {session_id}...")
 
     # Pass `app` to ensure proper context
-    eventlet.spawn_n(run_export_task, app, session_id)
+    eventlet.spawn_n(run_export_task, app, session_id, archive_format, mode == "diff")
 
     print(f"Export task scheduled using eventlet.spawn_n, returning response immediately.")
 
@@ -52,97 +61,96 @@ def download_export(filename):
 @import_export_bp.route("/api/v1/import", methods=["POST"])
 @require_any_room_admin
 def import_data():
-    """Import highscores.db and images from a 7z file."""
+    """
+    Import highscores.db and images from a zip or 7z export - or from a chain
+    of them: a full export plus the differential exports made after it, sent
+    together as several "file" fields in any order. They're applied oldest
+    first, so the result is the library as of the newest one.
+
+    The archives are checked from their listings here (see plan_import); the
+    import itself runs in the background, reporting progress_update events
+    for session_id and an import_complete event at the end.
+    """
+    files = request.files.getlist("file")
+    archive_formats = [os.path.splitext(file.filename)[1].lower().lstrip(".") for file in files]
+    if not files or any(archive_format not in EXPORT_FORMATS for archive_format in archive_formats):
+        return jsonify({"error": "Invalid file format. Upload a .zip or .7z file."}), 400
+    if "7z" in archive_formats and not get_7z_path():
+        return jsonify({"error": "7z.exe not found. Install 7-Zip or check PATH."}), 400
+    if not import_lock.acquire(blocking=False):
+        return jsonify({"error": "An import is already running."}), 409
+
+    session_id = request.form.get("session_id") or str(uuid.uuid4())
+    archive_paths = []
     try:
-        # Ensure the request has a file
-        file = request.files.get("file")
-        if not file or not file.filename.endswith(".7z"):
-            return jsonify({"error": "Invalid file format. Upload a .7z file."}), 400
-
-        # Ensure import directory exists
+        # Save the uploaded archives
         os.makedirs(IMPORT_PATH, exist_ok=True)
+        for index, (file, archive_format) in enumerate(zip(files, archive_formats)):
+            archive_path = os.path.join(IMPORT_PATH, f"import_{session_id}_{index}.{archive_format}")
+            file.save(archive_path)
+            archive_paths.append(archive_path)
 
-        # Save the uploaded archive
-        archive_path = os.path.join(IMPORT_PATH, "import.7z")
-        file.save(archive_path)
-
-        # Create a temporary directory for extraction
-        temp_import_dir = os.path.join(IMPORT_PATH, "temp_import")
-        if os.path.exists(temp_import_dir):
-            shutil.rmtree(temp_import_dir)
-        os.makedirs(temp_import_dir)
-
-        # Get the correct 7z path
-        seven_zip_path = get_7z_path()
-        if not seven_zip_path:
-            return jsonify({"message": "7z.exe not found. Install 7-Zip or check PATH."})
-
-        # Extract 7z contents using the correct executable path
-        command = [seven_zip_path, "x", archive_path, f"-o{temp_import_dir}", "-y"]
-        subprocess.run(command, check=True)
-
-        # Validate that highscores.db exists
-        extracted_db_path = os.path.join(temp_import_dir, "highscores.db")
-        if not os.path.exists(extracted_db_path):
-            return jsonify({"error": "Database file is missing in the uploaded archive."}), 400
-
-        # Ensure the extracted structure matches our expected format
-        image_import_path = os.path.join(temp_import_dir, "images")
-        required_folders = ["avatars", "gameBackground", "gameImage"]
-
-        for folder in required_folders:
-            src_folder = os.path.join(image_import_path, folder)
-            dest_folder = os.path.join(IMAGE_PATH, folder)
-
-            if not os.path.exists(src_folder):
-                return jsonify({"error": f"Missing required folder: {folder}"}), 400
-
-        # Check database version from meta table
-        conn = get_db(extracted_db_path)
-        cursor = conn.cursor()
-
-        # Ensure meta table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='meta'")
-        if not cursor.fetchone():
-            return jsonify({"error": "The imported database does not contain the 'meta' table."}), 400
-
-        # Fetch database version
-        cursor.execute("SELECT value FROM meta WHERE key = 'db_version'")
-        imported_db_version = cursor.fetchone()
-
-        if not imported_db_version:
-            return jsonify({"error": "The imported database does not contain a valid db_version."}), 400
-
-        imported_db_version = int(imported_db_version[0])
-
-        # Validate version
-        if imported_db_version > db_version:
-            return jsonify({"error": f"Database version {imported_db_version} is newer than {db_version}. Update the application."}), 400
-
-        # Replace the database safely
-        shutil.copy2(extracted_db_path, DATA_PATH)  # Copy instead of os.replace()
-        os.remove(extracted_db_path)  # Remove old file after copy
-
-        # An imported database can be older than the running app's schema (that's the
-        # whole point of the version check above only rejecting *newer* ones) -
-        # migrate_db() only otherwise runs once at app startup, so without this the
-        # live app would keep running against the stale imported schema until the
-        # next full restart.
-        migrate_db(DATA_PATH)
-
-        # Move images
-        for folder in required_folders:
-            src_folder = os.path.join(image_import_path, folder)
-            dest_folder = os.path.join(IMAGE_PATH, folder)
+        plan = plan_import(archive_paths, archive_formats, IMAGE_PATH)
+    except Exception as e:
+        import_lock.release()
+        for archive_path in archive_paths:
+            os.remove(archive_path)
+        if isinstance(e, ValueError):
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"error": "Import failed", "details": str(e)}), 500
 
-            os.makedirs(dest_folder, exist_ok=True)
-            shutil.copytree(src_folder, dest_folder, dirs_exist_ok=True)
+    app = current_app._get_current_object()
+    eventlet.spawn_n(run_import_task, app, session_id, plan)
 
-        # Clean up temporary files
-        shutil.rmtree(temp_import_dir)
-        os.remove(archive_path)
+    return jsonify({
+        "message": "Import started",
+        "session_id": session_id
+    }), 202
 
-        return jsonify({"message": "Import successful."})
+@import_export_bp.route("/api/v1/scoreboards/<int:scoreboard_id>/export", methods=["GET"])
+@require_room_admin
+def export_scoreboard(scoreboard_id):
+    """
+    Download one room as NDJSON (see app/modules/room_transfer.py) - its
+    settings, games, players, scores and media references, streamed straight
+    from the database as it's read. ?gzip=1 compresses it on the way.
+    """
+    conn = get_db()
+    room = conn.execute("SELECT user FROM settings WHERE id = ?", (scoreboard_id,)).fetchone()
+    if not room:
+        return jsonify({"error": "Scoreboard not found"}), 404
+
+    compress = request.args.get("gzip", "").lower() in ("1", "true", "yes")
+    filename = f"ArcadeScoreRoom_{room['user']}.ndjson{'.gz' if compress else ''}"
+    return Response(
+        stream_with_context(export_room(conn, scoreboard_id, compress=compress)),
+        mimetype="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@import_export_bp.route("/api/v1/scoreboards/import", methods=["POST"])
+@require_any_room_admin
+def import_scoreboard():
+    """
+    Create a room from a room export (.ndjson or .ndjson.gz), sent as the
+    "file" field of a form or as the request body. ?user= / ?room_name= (or
+    form fields) import it under another user or name - the user has to be
+    free on this instance. Returns the new room's id, what was added, and the
+    media it references that this instance doesn't have.
+    """
+    upload = request.files.get("file")
+    stream = upload.stream if upload else request.stream
+    user = request.args.get("user") or request.form.get("user")
+    room_name = request.args.get("room_name") or request.form.get("room_name")
 
+    try:
+        result = import_room(get_db(), open_room_export(stream), user=user, room_name=room_name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": "Import failed", "details": str(e)}), 500
+        print(f"❌ Room import failed: {e}")
+        return jsonify({"error": "Room import failed", "details": str(e)}), 500
+
+    invalidate_room(result["room_id"])
+    print(f"✅ Imported room {result['room_id']}: {result['games']} games, {result['scores']} scores")
+    return jsonify({"message": "Scoreboard imported", **result}), 201
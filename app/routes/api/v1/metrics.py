@@ -0,0 +1,90 @@
+from flask import Blueprint, jsonify
+from app.modules.database import get_db, get_pool_stats
+from app.modules.score_queue import get_queue_stats
+from app.modules.read_cache import get_read_cache_stats
+from app.modules.http_client import get_http_stats
+from app.modules.image_executor import get_image_stats
+from app.modules.imageProcessor import get_store_stats
+from app.modules.frame_extractor import get_frame_stats
+from app.modules.media import get_media_stats
+from app.modules.vpspreadsheet import get_vps_status
+from app.modules.db_snapshot import get_snapshot_stats
+from app.modules.auth import require_any_room_admin
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/api/v1/metrics/db", methods=["GET"])
+@require_any_room_admin
+def get_db_metrics():
+    """Connection pool checkout/wait stats, for sizing ARCADESCORE_DB_POOL_SIZE."""
+    try:
+        return jsonify({"pools": get_pool_stats()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@metrics_bp.route("/api/v1/metrics/queue", methods=["GET"])
+@require_any_room_admin
+def get_queue_metrics():
+    """Score webhook queue depth, outcomes and latency (queue wait, per attempt, end to end)."""
+    try:
+        return jsonify(get_queue_stats(get_db())), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@metrics_bp.route("/api/v1/metrics/cache", methods=["GET"])
+@require_any_room_admin
+def get_cache_metrics():
+    """Read cache size and hit/miss/eviction counters, for sizing ARCADESCORE_READ_CACHE_MAX_ENTRIES."""
+    try:
+        return jsonify(get_read_cache_stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@metrics_bp.route("/api/v1/metrics/http", methods=["GET"])
+@require_any_room_admin
+def get_http_metrics():
+    """Outbound HTTP per host (VPin Studio servers, VP-Spreadsheet, ...): requests, errors, waits and latency."""
+    try:
+        return jsonify(get_http_stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@metrics_bp.route("/api/v1/metrics/images", methods=["GET"])
+@require_any_room_admin
+def get_image_metrics():
+    """Image worker pool: jobs in flight/queued, plus CPU and wait time per kind of job;
+    and how much of each video first frames were pulled from took downloading."""
+    try:
+        return jsonify({**get_image_stats(), "video": get_frame_stats()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@metrics_bp.route("/api/v1/metrics/media", methods=["GET"])
+@require_any_room_admin
+def get_media_metrics():
+    """Media registry: stored files, how many are (un)referenced, and how many image
+    saves were skipped because the same content was already stored."""
+    try:
+        return jsonify({"registry": get_media_stats(get_db()), "store": get_store_stats()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@metrics_bp.route("/api/v1/metrics/vps", methods=["GET"])
+@require_any_room_admin
+def get_vps_metrics():
+    """VPS database refresher: when the local copy was last loaded and checked, the
+    last refresh's outcome and duration, and the copy's size (games and bytes)."""
+    try:
+        return jsonify(get_vps_status()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@metrics_bp.route("/api/v1/metrics/snapshots", methods=["GET"])
+@require_any_room_admin
+def get_snapshot_metrics():
+    """Database snapshots (exports): how many, pages copied, restarts forced by
+    concurrent writes, and the last one's duration and page counts."""
+    try:
+        return jsonify(get_snapshot_stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,8 +1,8 @@
 from flask import Blueprint, jsonify, request
 from app.modules.database import get_db
-from app.modules.socketio import emit_message
-from app.modules.utils import format_timestamp
-from app.modules.scores import unhide_game_if_auto_hidden
+from app.modules.scores import log_scores_to_db, emit_new_scores, resolve_players_by_name, unhide_games_with_new_scores
+from app.modules.leaderboard import get_room_leaderboard
+from app.modules.read_cache import get_room_settings
 
 public_commands_bp = Blueprint('public_commands', __name__)
 
@@ -19,9 +19,8 @@ def public_commands():
                 conn = get_db()
                 cursor = conn.cursor()
 
-                cursor.execute("SELECT public_scores_enabled FROM settings WHERE id = ?", (room_id,))
-                room_settings = cursor.fetchone()
-                if not room_settings or room_settings[0] != "TRUE":
+                room_settings = get_room_settings(cursor, room_id)
+                if not room_settings or room_settings["public_scores_enabled"] != "TRUE":
                     return jsonify({"error": "Public score access is disabled for this scoreboard"}), 403
 
                 cursor.execute("""
@@ -79,11 +78,24 @@ def public_commands():
                 cursor = conn.cursor()
 
                 # Fetch settings to determine name display preference
-                cursor.execute("SELECT long_names_enabled, public_scores_enabled FROM settings WHERE id = ?", (room_id,))
-                settings = cursor.fetchone()
-                if not settings or settings[1] != "TRUE":
+                settings = get_room_settings(cursor, room_id)
+                if not settings or settings["public_scores_enabled"] != "TRUE":
                     return jsonify({"error": "Public score access is disabled for this scoreboard"}), 403
-                long_names_enabled = settings[0] if settings else "FALSE"
+                long_names_enabled = settings["long_names_enabled"]
+
+                if settings["best_score_per_player"] == "TRUE":
+                    # Rooms listing only each player's best score serve it from the leaderboard
+                    best_scores = sorted(get_room_leaderboard(conn, room_id), key=lambda row: row["timestamp"], reverse=True)
+                    return jsonify([{
+                        "name": row["full_name"] if long_names_enabled == "TRUE" else row["default_alias"],
+                        "id": row["score_id"],
+                        "game": row["game_id"],
+                        "event": row["event"],
+                        "date": row["timestamp"],
+                        "wins": row["wins"],
+                        "losses": row["losses"],
+                        "score": row["score"]
+                    } for row in best_scores])
 
                 # Fetch highscores, join with players table to get the correct name
                 cursor.execute(f"""
@@ -142,95 +154,40 @@ def public_commands():
                 return jsonify({"error": "Missing required parameters"}), 400
 
             # Fetch room settings to determine name resolution method
-            cursor.execute("SELECT long_names_enabled, dateformat, public_score_entry_enabled FROM settings WHERE id = ?", (room_id,))
-            settings = cursor.fetchone()
-            if not settings or settings[2] != "TRUE":
+            settings = get_room_settings(cursor, room_id)
+            if not settings or settings["public_score_entry_enabled"] != "TRUE":
                 return jsonify({"error": "Public score entry is disabled for this scoreboard"}), 403
-            long_names_enabled = settings[0] if settings else "FALSE"
-            date_format = settings[1] if settings else 'MM/DD/YYYY'
-
-            cursor.execute("""
-                SELECT css_score_cards, css_initials, css_scores, score_type
-                FROM games
-                WHERE id = ? AND room_id = ?;
-            """, (game_id, room_id))
-            game_row = cursor.fetchone()
+            long_names_enabled = settings["long_names_enabled"]
 
-            if not game_row:
+            cursor.execute("SELECT id FROM games WHERE id = ? AND room_id = ?;", (game_id, room_id))
+            if not cursor.fetchone():
                 return jsonify({"error": f"GameID '{game_id}' not found for room ID {room_id}"}), 404
 
-            css_score_cards, css_initials, css_scores, score_type = game_row
-
-            # Determine `player_id` based on settings
-            if long_names_enabled == "TRUE":
-                # Match using full_name
-                cursor.execute("SELECT id FROM players WHERE full_name = ?", (player_name,))
-                player_id_row = cursor.fetchone()
-            else:
-                # Match using default_alias or alias table
-                cursor.execute("SELECT id FROM players WHERE default_alias = ?", (player_name,))
-                player_id_row = cursor.fetchone()
-
-                # If no match, check aliases
-                if not player_id_row:
-                    cursor.execute("SELECT player_id FROM aliases WHERE alias = ?", (player_name,))
-                    player_id_row = cursor.fetchone()
-
-            # Handle new players dynamically
-            if player_id_row:
-                player_id = player_id_row[0]
-            else:
-                # Create a new player dynamically
-                cursor.execute("""
-                    INSERT INTO players (full_name, default_alias, long_names_enabled)
-                    VALUES (?, ?, ?);
-                """, (player_name, player_name, long_names_enabled))
-                player_id = cursor.lastrowid  # Get new player ID
-
-                # Also add alias for initials-based lookup
-                cursor.execute("INSERT INTO aliases (player_id, alias) VALUES (?, ?);", (player_id, player_name))
-
-            # Insert score into `highscores` table
-            cursor.execute("""
-                INSERT INTO highscores (game_id, player_id, score, wins, losses, room_id)
-                VALUES (?, ?, ?, ?, ?, ?);
-            """, (game_id, player_id, high_score, wins, losses, room_id))
-
-            # After inserting a new score, fetch all scores for this game
-            cursor.execute("""
-                SELECT p.full_name, p.default_alias, h.score, h.timestamp, h.wins, h.losses
-                FROM highscores h
-                JOIN players p ON h.player_id = p.id
-                JOIN games g ON g.id = h.game_id
-                WHERE h.game_id = ?
-                ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC;
-            """, (game_id,))
-
-            scores = [{
-                "displayName": row[0] if long_names_enabled == "TRUE" else row[1],
-                "fullName": row[0],
-                "defaultAlias": row[1],
-                "score": row[2],
-                "timestamp": row[3],
-                "formatted_timestamp": format_timestamp(row[3],date_format),
-                "wins": row[4],
-                "losses": row[5]
-            } for row in cursor.fetchall()]
-
+            # Determine `player_id` based on settings (full_name with long names on,
+            # otherwise default_alias then aliases), creating the player if needed
+            cursor.execute("BEGIN IMMEDIATE;")
+            player_ids, _ = resolve_players_by_name(conn, [player_name], long_names_enabled)
+            player_id = player_ids[player_name]
+
+            # Insert score into `highscores` table, in the same transaction as the new
+            # player above. A client re-sending the same score within the same second
+            # is skipped by the unique score-identity index.
+            success, message, new_scores = log_scores_to_db(conn, [{
+                "game_id": game_id,
+                "player_id": player_id,
+                "score": high_score,
+                "wins": wins,
+                "losses": losses,
+                "room_id": room_id,
+            }])
+            if not success:
+                conn.rollback()
+                return jsonify({"error": "Failed to add score", "details": message}), 500
             conn.commit()
+            unhide_games_with_new_scores(conn, new_scores)
 
-            unhide_game_if_auto_hidden(conn, room_id, game_id)
-
-            # Emit socket event to update scores on the dashboard
-            emit_message("game_score_update", {
-                "gameID": game_id,
-                "roomID": room_id,
-                "scores": scores,
-                "CSSScoreCards": css_score_cards,
-                "CSSInitials": css_initials,
-                "CSSScores": css_scores,
-                "ScoreType": score_type
-            }, room=f"room_{room_id}")
+            # Emit socket event to update scores on the dashboard (just the new score)
+            emit_new_scores(conn, new_scores)
 
             # Return success response
             return jsonify({"message": "Score added successfully!"}), 201
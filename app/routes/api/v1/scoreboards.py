@@ -2,8 +2,10 @@ import eventlet
 import requests
 from flask import Blueprint, request, jsonify, current_app
 from app.modules.database import get_db
+from app.modules import http_client
 from app.background.create_scoreboards import process_scoreboard_task
 from app.modules.auth import require_room_admin
+from app.modules.read_cache import invalidate_room, invalidate_vpin_games
 
 scoreboards_bp = Blueprint("scoreboards", __name__)
 
@@ -146,7 +148,7 @@ def delete_scoreboard(scoreboard_id):
             print(f"🌐 Deleting webhook at: {webhook_delete_url}")
 
             try:
-                response = requests.delete(webhook_delete_url, timeout=10)
+                response = http_client.delete(webhook_delete_url, timeout=10)
                 if response.status_code == 200:
                     print(f"✅ Successfully removed webhook {webhook_uuid} from VPin Studio")
                 else:
@@ -173,6 +175,7 @@ def delete_scoreboard(scoreboard_id):
 
         # Delete scores related to this scoreboard
         cursor.execute("DELETE FROM highscores WHERE room_id = ?", (scoreboard_id,))
+        cursor.execute("DELETE FROM leaderboard WHERE game_id IN (SELECT id FROM games WHERE room_id = ?)", (scoreboard_id,))
 
         # Delete games linked to this scoreboard
         cursor.execute("DELETE FROM games WHERE room_id = ?", (scoreboard_id,))
@@ -184,6 +187,7 @@ def delete_scoreboard(scoreboard_id):
         cursor.execute("DELETE FROM settings WHERE id = ?", (scoreboard_id,))
 
         conn.commit()
+        invalidate_room(scoreboard_id)
 
         return jsonify({"message": "Scoreboard and related data deleted successfully."}), 200
 
@@ -208,6 +212,7 @@ def clear_scores(scoreboard_id):
 
         # Delete all scores linked to the scoreboard
         cursor.execute("DELETE FROM highscores WHERE room_id = ?", (scoreboard_id,))
+        cursor.execute("DELETE FROM leaderboard WHERE game_id IN (SELECT id FROM games WHERE room_id = ?)", (scoreboard_id,))
 
         conn.commit()
         return jsonify({"message": "All scores cleared successfully."}), 200
@@ -247,8 +252,10 @@ def clear_games(scoreboard_id):
             DELETE FROM highscores
             WHERE game_id NOT IN (SELECT id FROM games)
         """)
+        cursor.execute("DELETE FROM leaderboard WHERE game_id NOT IN (SELECT id FROM games)")
 
         conn.commit()
+        invalidate_vpin_games()
         return jsonify({"message": "All games cleared successfully."}), 200
 
     except Exception as e:
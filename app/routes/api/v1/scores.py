@@ -1,6 +1,8 @@
+import json
 from flask import Blueprint, request, jsonify
 from app.modules.database import get_db
-from app.modules.scores import log_score_to_db, get_high_scores
+from app.modules.auth import is_room_admin_session
+from app.modules.scores import get_high_scores, ingest_score_batch, MAX_BATCH_SCORES
 
 scores_bp = Blueprint('scores', __name__)
 
@@ -32,6 +34,75 @@ scores_bp = Blueprint('scores', __name__)
 #         close_db()
 #         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
 
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+def _parse_batch_body():
+    """Score entries + optional roomID from a batch request body: either NDJSON
+    (one score object per line) or JSON - a bare array, or {"roomID": ..., "scores": [...]}.
+    :return: (entries, room_id, error)"""
+    if request.mimetype in NDJSON_MIMETYPES:
+        entries = []
+        for line_no, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError as e:
+                return None, None, f"Invalid JSON on line {line_no}: {e}"
+        return entries, None, None
+
+    data = request.get_json(silent=True)
+    if isinstance(data, list):
+        return data, None, None
+    if isinstance(data, dict) and isinstance(data.get("scores"), list):
+        return data["scores"], data.get("roomID"), None
+    return None, None, "Expected a JSON array of scores, {\"scores\": [...]}, or NDJSON"
+
+@scores_bp.route("/api/v1/scores/batch", methods=["POST"])
+def log_score_batch():
+    """
+    Bulk score ingestion for tournaments and cabinet backfills. Takes a JSON or
+    NDJSON array of {gameID, playerID | playerName, score, timestamp?, wins?, losses?}
+    for one room (?roomID= or "roomID" in a JSON object body), writes them in a
+    single transaction and pushes one game_score_update per affected game.
+    Already-recorded scores are skipped, not errors. Requires the room's API write
+    access setting, or an admin session for the room.
+    """
+    try:
+        entries, body_room_id, error = _parse_batch_body()
+        if error:
+            return jsonify({"error": error}), 400
+
+        room_id = request.args.get("roomID") or body_room_id
+        if not room_id:
+            return jsonify({"error": "Missing 'roomID' parameter"}), 400
+        try:
+            room_id = int(room_id)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid 'roomID' parameter"}), 400
+
+        if len(entries) > MAX_BATCH_SCORES:
+            return jsonify({"error": f"Too many scores in one batch (max {MAX_BATCH_SCORES})"}), 413
+
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT api_write_access FROM settings WHERE id = ?", (room_id,))
+        room = cursor.fetchone()
+        if not room:
+            return jsonify({"error": f"Room {room_id} not found"}), 404
+        if room["api_write_access"] != "TRUE" and not is_room_admin_session(room_id):
+            return jsonify({"error": "API write access is disabled for this scoreboard"}), 403
+
+        result = ingest_score_batch(conn, room_id, entries)
+        if not result["success"]:
+            return jsonify({"error": result["error"]}), 500
+
+        del result["success"]
+        return jsonify(result), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
+
 @scores_bp.route("/highscores", methods=["GET"])
 def get_scores():
     """
@@ -1,9 +1,11 @@
+import os
 import sys
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, send_file
 from app.modules.database import get_db
-from app.modules.vpspreadsheet import fetch_vps_data
+from app.modules.vpspreadsheet import get_vps_paths, get_vps_game, search_vps_games
 from app.modules.utils import get_server_base_url
 from app.modules.socketio import emit_settings_changes, emit_message
+from app.modules.read_cache import invalidate_room_settings
 from app.modules.auth import (
     require_room_admin,
     hash_password,
@@ -18,17 +20,49 @@ settings_bp = Blueprint('settings', __name__)
 
 @settings_bp.route("/api/vpsdata", methods=["GET"])
 def get_vps_data():
+    """
+    The whole VPS database (tens of MB), as downloaded. Kept for anything still
+    using it - ArcadeScore's own pages look games up through /api/v1/vps/games
+    instead. Sent straight from the local vpsdb.json rather than from memory,
+    which only holds the compact records.
+    """
     try:
-        vps_data = fetch_vps_data()  # This now returns the VPS data directly
-
-        if not vps_data:
+        _, vps_json_path, _ = get_vps_paths()
+        if not os.path.exists(vps_json_path):
             return jsonify({"error": "VPS data not initialized or could not be fetched."}), 500
 
-        return jsonify(vps_data), 200
+        return send_file(vps_json_path, mimetype="application/json")
     except Exception as e:
         print(f"Error in /api/vpsdata: {e}")
         return jsonify({"error": "Failed to load VPS data"}), 500
 
+@settings_bp.route("/api/v1/vps/games", methods=["GET"])
+def search_vps_data():
+    """
+    Search the VPS database by game name/manufacturer, a page at a time:
+    ?q=<words>&page=1&per_page=25. Without q, lists every game by name.
+    Returns {"results": [...], "total": n, "page": 1, "per_page": 25}.
+    """
+    try:
+        page = request.args.get("page", 1, type=int)
+        per_page = request.args.get("per_page", 25, type=int)
+        return jsonify(search_vps_games(request.args.get("q", "").strip(), page, per_page)), 200
+    except Exception as e:
+        print(f"Error in /api/v1/vps/games: {e}")
+        return jsonify({"error": "Failed to search VPS data"}), 500
+
+@settings_bp.route("/api/v1/vps/games/<game_id>", methods=["GET"])
+def get_vps_game_data(game_id):
+    """One VPS game by its id, with its table and backglass files."""
+    try:
+        game = get_vps_game(game_id)
+        if not game:
+            return jsonify({"error": "Game not found"}), 404
+        return jsonify(game.to_dict()), 200
+    except Exception as e:
+        print(f"Error in /api/v1/vps/games/{game_id}: {e}")
+        return jsonify({"error": "Failed to load VPS data"}), 500
+
 @settings_bp.route("/api/v1/settings/<int:room_id>", methods=["PUT"])
 @require_room_admin
 def update_settings(room_id):
@@ -58,6 +92,8 @@ def update_settings(room_id):
             "api_read_access": str,
             "api_write_access": str,
             "auto_hide_no_score_games": str,
+            "scores_per_card": int,
+            "best_score_per_player": str,
         }
 
         # Build the SQL query dynamically
@@ -79,6 +115,9 @@ def update_settings(room_id):
                     except ValueError:
                         return jsonify({"error": f"Invalid value for {field}"}), 400
 
+                if field == "scores_per_card" and value < 0:
+                    return jsonify({"error": "scores_per_card must be 0 (all) or more"}), 400
+
                 update_fields.append(f"{field} = ?")
                 update_values.append(value)
 
@@ -93,6 +132,7 @@ def update_settings(room_id):
         """, update_values + [room_id])
 
         conn.commit()
+        invalidate_room_settings(room_id)
 
         # Reconcile immediately when auto-hide is (still) on, rather than waiting for
         # the next score - covers both the moment it's first enabled and every
@@ -3,7 +3,8 @@ from werkzeug.utils import secure_filename
 from app.modules.database import get_db
 from app.modules.socketio import emit_style_changes, emit_message
 from app.modules.auth import require_room_admin
-import requests
+from app.modules import http_client
+from app.modules.media import store_upload, register_media, MEDIA_FOLDERS
 import os
 
 styles_bp = Blueprint('styles', __name__)
@@ -309,23 +310,21 @@ def store_image():
     if image_url.startswith("/static/images/"):
         return jsonify({"localPath": image_url}), 200
 
+    if image_type not in MEDIA_FOLDERS:
+        return jsonify({"error": "Invalid image type"}), 400
+
     try:
-        response = requests.get(image_url, stream=True)
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch image from URL: {image_url}")
-
-        filename = secure_filename(image_url.split("/")[-1])
-        file_path = os.path.join("app/static/images", image_type, filename)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-        with open(file_path, "wb") as f:
-            for chunk in response.iter_content(1024):
-                f.write(chunk)
-
-        # Return the same "/static/images/..." form upload_image returns, so this
-        # path is recognized as in-use by cleanup_unused_images instead of being
-        # deleted as unreferenced on the next export (BUG-21).
-        return jsonify({"localPath": f"/static/images/{image_type}/{filename}"}), 200
+        with http_client.get(image_url, stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"Failed to fetch image from URL: {image_url}")
+            image_data = b"".join(response.iter_content(64 * 1024))
+
+        # Stored by content hash - fetching the same image again reuses the file.
+        # Registered so it's cleaned up if no game ends up using it.
+        extension = os.path.splitext(secure_filename(image_url.split("/")[-1]))[1]
+        local_path = store_upload(image_data, image_type, extension)
+        register_media(get_db(), local_path)
+        return jsonify({"localPath": local_path}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -337,17 +336,14 @@ def upload_image():
     file = request.files["file"]
     image_type = request.form.get("type")  # "gameImage" or "gameBackground"
 
-    if not file or not image_type:
+    if not file or image_type not in MEDIA_FOLDERS:
         return jsonify({"error": "Invalid request"}), 400
 
-    # Save the file locally
+    # Save the file locally, by content hash (see store_image)
     try:
-        filename = secure_filename(file.filename)
-        file_path = os.path.join("app/static/images", image_type, filename)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        file.save(file_path)
-
-        local_path = f"/static/images/{image_type}/{filename}"
+        extension = os.path.splitext(secure_filename(file.filename))[1]
+        local_path = store_upload(file.read(), image_type, extension)
+        register_media(get_db(), local_path)
         return jsonify({"localPath": local_path}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
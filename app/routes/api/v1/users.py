@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, render_template
 from app.modules.database import get_db
 from app.modules.utils import format_timestamp
+from app.modules.scores import get_top_scores
 
 users_bp = Blueprint('users', __name__)
 
@@ -17,7 +18,8 @@ def user_scoreboard(username):
                horizontal_scroll_enabled, horizontal_scroll_speed, horizontal_scroll_delay,
                vertical_scroll_enabled, vertical_scroll_speed, vertical_scroll_delay,
                fullscreen_enabled, text_autofit_enabled, long_names_enabled, public_scores_enabled,
-               public_score_entry_enabled, api_read_access, api_write_access, auto_hide_no_score_games
+               public_score_entry_enabled, api_read_access, api_write_access, auto_hide_no_score_games,
+               scores_per_card, best_score_per_player
         FROM settings WHERE user = ?;
         """, (username,))
         settings = cursor.fetchone()
@@ -50,6 +52,8 @@ def user_scoreboard(username):
             "api_read_access": settings[18] or "FALSE",
             "api_write_access": settings[19] or "FALSE",
             "auto_hide_no_score_games": settings[20] or "FALSE",
+            "scores_per_card": settings[21] or 0,
+            "best_score_per_player": settings[22] or "FALSE",
         }
 
         # ✅ Fetch associated webhooks for the scoreboard
@@ -92,11 +96,15 @@ def user_scoreboard(username):
             for row in cursor.fetchall()
         ]
 
+        # Games (with their score versions) and scores are read from one snapshot, so
+        # the version each card starts from matches exactly the scores rendered into it
+        cursor.execute("BEGIN;")
+
         # Fetch games for the user
         cursor.execute("""
             SELECT g.id, g.game_name, g.css_score_cards, g.css_initials, g.css_scores, g.css_box, g.css_title, 
                 g.score_type, g.sort_ascending, g.game_color, g.game_image, g.game_background,
-                g.tags, g.hidden, g.game_sort
+                g.tags, g.hidden, g.game_sort, g.score_version
             FROM games g
             WHERE g.room_id = ?
             ORDER BY g.game_sort ASC;
@@ -107,26 +115,9 @@ def user_scoreboard(username):
         cursor.execute("SELECT id, name FROM presets")
         presets = cursor.fetchall()
 
-        # Fetch scores for the user's room
-        cursor.execute("""
-            SELECT DISTINCT h.game_id,
-                CASE
-                    WHEN s.long_names_enabled = 'TRUE' OR p.long_names_enabled = 'TRUE' THEN p.full_name
-                    ELSE p.default_alias
-                END AS display_name,
-                p.full_name,
-                p.default_alias,
-                h.score, h.event, h.wins, h.losses, h.timestamp, p.hidden, p.id
-            FROM highscores h
-            JOIN players p ON h.player_id = p.id
-            JOIN settings s ON s.id = h.room_id
-            JOIN games g ON g.id = h.game_id
-            WHERE h.room_id = ?
-            ORDER BY h.game_id, CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC;
-        """, (room_id,))
-
-        # Fetch all rows as dictionary-like objects
-        scores = [dict(row) for row in cursor.fetchall()]
+        # Fetch the scores each card shows (the room's scores_per_card, cut in SQL)
+        scores = get_top_scores(conn, room_id, settings_dict["scores_per_card"])
+        conn.commit()  # End the read snapshot
 
         # Fetch players
         cursor.execute("""
@@ -174,7 +165,7 @@ def user_scoreboard(username):
                 "losses": score["losses"] or 0,
                 "timestamp": score["timestamp"],
                 "formatted_timestamp": format_timestamp(score["timestamp"], dateformat),
-                "player_id": score["id"]
+                "player_id": score["player_id"]
             })
 
         games_list = []
@@ -203,6 +194,7 @@ def user_scoreboard(username):
                 "tags": game[12] or "",
                 "hidden": game[13] or "FALSE",
                 "scores": score_map.get(game_id, []),
+                "score_version": game[15] or 0,
                 "css_card": css_card
             })
 
@@ -254,37 +246,23 @@ def api_read_games(user):
         """, (room_id,))
         games = cursor.fetchall()
 
-        # Fetch scores for the user's room
-        cursor.execute("""
-            SELECT DISTINCT h.game_id,
-                CASE
-                    WHEN s.long_names_enabled = 'TRUE' OR p.long_names_enabled = 'TRUE' THEN p.full_name
-                    ELSE p.default_alias
-                END AS player_name,
-                h.score, h.event, h.wins, h.losses, h.timestamp
-            FROM highscores h
-            JOIN players p ON h.player_id = p.id
-            JOIN settings s ON s.id = h.room_id
-            JOIN games g ON g.id = h.game_id
-            WHERE h.room_id = ?
-            ORDER BY h.game_id, CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC;
-        """, (room_id,))
-        scores = cursor.fetchall()
-
+        # Fetch every score for the user's room (or each player's best, from the
+        # leaderboard, if the room lists only those)
+        scores = get_top_scores(conn, room_id, per_game=0)
 
         # Group scores by game_id
         score_map = {}
         for score in scores:
-            game_id = score[0]
+            game_id = score["game_id"]
             if game_id not in score_map:
                 score_map[game_id] = []
             score_map[game_id].append({
-                "player_name": score[1],
-                "score": score[2],
-                "event": score[3] or "N/A",
-                "wins": score[4] or 0,
-                "losses": score[5] or 0,
-                "timestamp": score[6],
+                "player_name": score["display_name"],
+                "score": score["score"],
+                "event": score["event"] or "N/A",
+                "wins": score["wins"] or 0,
+                "losses": score["losses"] or 0,
+                "timestamp": score["timestamp"],
                 "dateFormat": dateformat
             })
 
@@ -1,10 +1,12 @@
 import requests
 from flask import Blueprint, request, jsonify
 from app.modules.database import get_db
+from app.modules import http_client
 from app.modules.utils import normalize_vpin_url, vpin_url
-from app.modules.vpin_integration import import_vpin_game_into_room
+from app.modules.vpin_integration import import_vpin_games_into_room
 from app.modules.webhooks import register_vpin_webhook
 from app.modules.auth import require_room_admin
+from app.modules.read_cache import invalidate_room_webhook
 
 vpin_integrations_bp = Blueprint("vpin_integrations", __name__)
 
@@ -171,7 +173,7 @@ def delete_vpin_webhook(room_id, webhook_id):
 
         try:
             delete_url = vpin_url(webhook["server_url"], f"api/v1/webhooks/{webhook['webhook_uuid']}")
-            response = requests.delete(delete_url, timeout=10)
+            response = http_client.delete(delete_url, timeout=10)
             if response.status_code != 200:
                 print(f"⚠️ VPin Studio returned {response.status_code} deleting webhook {webhook['webhook_uuid']}; removing locally anyway.")
         except requests.RequestException as e:
@@ -179,6 +181,7 @@ def delete_vpin_webhook(room_id, webhook_id):
 
         cursor.execute("DELETE FROM vpin_webhooks WHERE id = ?", (webhook_id,))
         conn.commit()
+        invalidate_room_webhook(room_id)
         return jsonify({"message": "Webhook removed"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -257,34 +260,17 @@ def import_vpin_games(room_id):
                 for row in cursor.fetchall()
             ]
 
-        results = []
-        for game in games:
-            # One game failing (flaky media download, a transient DB error) must not
-            # abort every game after it in the batch - each import stands alone.
-            try:
-                success, message, game_id = import_vpin_game_into_room(
-                    conn, server_url, room_id, game,
-                    css_style=css_style,
-                    options={
-                        "retrieve_media": retrieve_media,
-                        "media_priority": media_priority,
-                        "image_compression_level": image_compression_level,
-                        "sync_historical_scores": sync_historical_scores,
-                        "vpin_players": vpin_players,
-                    },
-                )
-            except Exception as e:
-                success, message, game_id = False, f"Unexpected error: {e}", None
-                print(f"⚠️ Failed to import game {game.get('id')} ({game.get('name')}): {e}")
-
-            results.append({
-                "vpin_game_id": game.get("id"),
-                "name": game.get("name"),
-                "success": success,
-                "message": message,
-                "game_id": game_id,
-            })
-
+        results = import_vpin_games_into_room(
+            conn, server_url, room_id, games,
+            css_style=css_style,
+            options={
+                "retrieve_media": retrieve_media,
+                "media_priority": media_priority,
+                "image_compression_level": image_compression_level,
+                "sync_historical_scores": sync_historical_scores,
+                "vpin_players": vpin_players,
+            },
+        )
 
         succeeded = sum(1 for r in results if r["success"])
         return jsonify({
@@ -345,60 +331,32 @@ def resync_vpin_games(room_id):
                 for row in cursor.fetchall()
             ]
 
-        results = []
-        for row in linked_games:
-            vpin_game_id = row["vpin_game_id"]
-
-            try:
-                game_details_url = vpin_url(server_url, f"api/v1/games/{vpin_game_id}")
-                response = requests.get(game_details_url, timeout=10)
-                response.raise_for_status()
-                game_details = response.json()
-            except requests.RequestException as e:
-                results.append({
-                    "vpin_game_id": vpin_game_id, "name": row["game_name"],
-                    "success": False, "message": f"Failed to fetch game details: {e}",
-                })
-                continue
-
-            game = {
-                "id": vpin_game_id,
-                "name": game_details.get("gameDisplayName", row["game_name"]),
-                "extTableId": game_details.get("extTableId"),
-                "extTableVersionId": game_details.get("extTableVersionId"),
-            }
-
-            css_style = {
+        # Each game keeps its own per-game CSS; its name and VPS ids are
+        # refreshed from VPin Studio as part of the (parallel) fetch
+        games = [{"id": row["vpin_game_id"], "name": row["game_name"]} for row in linked_games]
+        styles = {
+            row["vpin_game_id"]: {
                 "css_score_cards": row["css_score_cards"],
                 "css_initials": row["css_initials"],
                 "css_scores": row["css_scores"],
                 "css_box": row["css_box"],
                 "css_title": row["css_title"],
             }
+            for row in linked_games
+        }
 
-            # One game failing (flaky media download, a transient DB error) must not
-            # abort every game after it in the batch - each resync stands alone.
-            try:
-                success, message, game_id = import_vpin_game_into_room(
-                    conn, server_url, room_id, game,
-                    css_style=css_style,
-                    options={
-                        "retrieve_media": retrieve_media,
-                        "media_priority": media_priority,
-                        "image_compression_level": image_compression_level,
-                        "sync_historical_scores": sync_historical_scores,
-                        "vpin_players": vpin_players,
-                    },
-                )
-            except Exception as e:
-                success, message, game_id = False, f"Unexpected error: {e}", None
-                print(f"⚠️ Failed to resync game {vpin_game_id} ({game['name']}): {e}")
-
-            results.append({
-                "vpin_game_id": vpin_game_id, "name": game["name"],
-                "success": success, "message": message, "game_id": game_id,
-            })
-
+        results = import_vpin_games_into_room(
+            conn, server_url, room_id, games,
+            css_style=lambda game: styles[game["id"]],
+            options={
+                "refresh_details": True,
+                "retrieve_media": retrieve_media,
+                "media_priority": media_priority,
+                "image_compression_level": image_compression_level,
+                "sync_historical_scores": sync_historical_scores,
+                "vpin_players": vpin_players,
+            },
+        )
 
         succeeded = sum(1 for r in results if r["success"])
         return jsonify({
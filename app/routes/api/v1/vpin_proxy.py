@@ -3,6 +3,7 @@ import socket
 import requests
 from flask import Blueprint, request, jsonify, Response
 from urllib.parse import urlparse
+from app.modules import http_client
 
 vpin_proxy_bp = Blueprint("vpin_proxy", __name__)
 
@@ -56,7 +57,7 @@ def proxy_vpin_api():
         return jsonify({"error": "Refusing to proxy requests to that host"}), 400
 
     try:
-        response = requests.get(target_url, timeout=5)
+        response = http_client.get(target_url, timeout=5)
         response.raise_for_status()
 
         # Ensure we preserve raw string values properly
@@ -1,5 +1,7 @@
 import os
-from flask import Blueprint, request, jsonify, render_template, send_from_directory
+from flask import Blueprint, request, jsonify, render_template, send_from_directory, current_app
+from werkzeug.security import safe_join
+from app.modules.imageProcessor import pick_variant, schedule_variants, variant_dir, VARIANTS_DIR
 
 # Define storage path for game images
 GAMEIMAGE_STORAGE_PATH = "app/static/images/gameImage"
@@ -40,10 +42,29 @@ def favicon():
 def serve_avatar(filename):
     return send_from_directory('static/images/avatars', filename)
 
+def _serve_game_media(folder, filename):
+    """
+    Serve a stored game image, or the best WebP/AVIF variant of it the browser
+    accepts (app/modules/imageProcessor.py). ?w=<pixels> asks for the narrowest
+    variant at least that wide - e.g. a scoreboard card on a Raspberry Pi
+    display. Images saved before variants existed get them built in the
+    background on first request and are served as-is until then.
+    """
+    full_filepath = safe_join(os.path.join(current_app.root_path, folder), filename)
+    variant = None
+    if full_filepath and os.path.isfile(full_filepath) and not filename.startswith(f"{VARIANTS_DIR}/"):
+        variant = pick_variant(full_filepath, request.accept_mimetypes, request.args.get("w", type=int))
+        if variant is None and not os.path.isdir(variant_dir(full_filepath)):
+            schedule_variants(full_filepath)
+
+    response = send_from_directory(folder, variant or filename)
+    response.vary.add("Accept")
+    return response
+
 @misc_bp.route('/static/images/gameBackground/<path:filename>')
 def serve_gameBackground(filename):
-    return send_from_directory('static/images/gameBackground', filename)
+    return _serve_game_media('static/images/gameBackground', filename)
 
 @misc_bp.route('/static/images/gameImage/<path:filename>')
 def serve_gameImage(filename):
-    return send_from_directory('static/images/gameImage', filename)
\ No newline at end of file
+    return _serve_game_media('static/images/gameImage', filename)
\ No newline at end of file
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app.modules.database import get_db
-from app.modules.webhooks import webhook_log_score, record_webhook_health
+from app.modules.webhooks import check_score_webhook, record_webhook_health, can_view_score_event
+from app.modules.auth import is_room_admin_session
+from app.modules.score_queue import enqueue_score_event, get_event_status
 
 webhook_scores_bp = Blueprint("webhook_scores", __name__)
 
@@ -8,28 +10,48 @@ webhook_scores_bp = Blueprint("webhook_scores", __name__)
 def handle_webhook_log_score():
     """
     Webhook to handle score submissions from VPin Studio.
-    It retrieves the score details via the VPin API and logs a new score entry in ArcadeScore.
+    Only the parameters and token are checked here; the event is then queued and
+    acknowledged with 202. A background worker fetches the score details via the
+    VPin API (retrying until the new score shows up) and logs it - poll
+    /webhook/scores/<event_id> to see how that went.
     """
     try:
         data = request.get_json(silent=True) or {}
 
         conn = get_db()
 
-        webhook_result = webhook_log_score(conn, data)
+        invalid = check_score_webhook(conn, data)
+        if invalid:
+            record_webhook_health(conn, invalid.get("room_id"), error=invalid["error"])
+            return jsonify({"error": invalid["error"]}), 400
 
-        record_webhook_health(
-            conn,
-            webhook_result.get("room_id"),
-            error=None if webhook_result.get("success") else webhook_result.get("error"),
-        )
+        event_id = enqueue_score_event(conn, data)
 
+        return jsonify({
+            "message": "Score webhook queued",
+            "event_id": event_id,
+            "status_url": f"/webhook/scores/{event_id}",
+        }), 202
 
-        if webhook_result["success"]:
-            return jsonify({"message": webhook_result["message"]}), 201
-        elif "error" in webhook_result:
-            return jsonify({"error": webhook_result["error"]}), 400
-        else:
-            return jsonify({"error": "Unknown error occurred"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
 
+@webhook_scores_bp.route("/webhook/scores/<int:event_id>", methods=["GET"])
+def get_webhook_score_status(event_id):
+    """
+    Status of a queued score webhook: pending, processing, done or failed.
+    Event ids are sequential, so the details (room, errors, result) are only
+    shown to a caller passing the room's webhook token as ?token= - or logged
+    in as the room's admin. Anyone else just gets the status.
+    """
+    try:
+        conn = get_db()
+        event = get_event_status(conn, event_id)
+        if not event:
+            return jsonify({"error": f"Webhook event {event_id} not found"}), 404
+        if not (can_view_score_event(conn, event["room_id"], request.args.get("token"))
+                or is_room_admin_session(event["room_id"])):
+            return jsonify({"id": event["id"], "status": event["status"]}), 200
+        return jsonify(event), 200
     except Exception as e:
-        return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
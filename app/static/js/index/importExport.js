@@ -11,6 +11,7 @@ document.addEventListener("DOMContentLoaded", () => {
     importExportIcon.addEventListener("click", () => {
         importExportModal.style.display = "flex";
         importExportModal.classList.remove("hidden");
+        loadRoomExportOptions();
     });
 
     // Close modal when clicking the close button
@@ -31,12 +32,18 @@ document.addEventListener("DOMContentLoaded", () => {
     document.getElementById("import-data-btn").addEventListener("click", () => {
         document.getElementById("import-data-btn").disabled = true;
         document.getElementById("export-data-btn").disabled = true;
+        document.getElementById("export-diff-btn").disabled = true;
         document.getElementById("import-file-input").click();
     });
 
     document.getElementById("import-file-input").addEventListener("change", function () {
-        const file = this.files[0];
-        if (!file) return;
+        // A full export, or a full export plus the "changes only" exports made after it
+        const files = Array.from(this.files);
+        if (!files.length) return;
+        const file = files.length === 1 ? files[0] : {
+            name: `${files.length} archives`,
+            size: files.reduce((total, archive) => total + archive.size, 0),
+        };
     
         // Get DOM elements
         const importStatus = document.getElementById("import-status");
@@ -54,33 +61,35 @@ document.addEventListener("DOMContentLoaded", () => {
         progressBar.classList.add("indeterminate");
     
         // Prepare file for upload
+        const sessionId = localStorage.getItem("session_id") || crypto.randomUUID();
+        localStorage.setItem("session_id", sessionId);
         const formData = new FormData();
-        formData.append("file", file);
+        files.forEach(archive => formData.append("file", archive));
+        formData.append("session_id", sessionId);
     
+        // The archives are checked on upload; the import itself runs in the
+        // background, reporting progress_update and import_complete events (websocket.js)
         fetch("/api/v1/import", {
             method: "POST",
             body: formData
         })
         .then(response => response.json())
         .then(data => {
-            // Remove indeterminate effect and hide loading modal
             progressBar.classList.remove("indeterminate");
+            if (!data.error) {
+                modalLoadingStatus.textContent = "Upload complete. Importing...";
+                return;
+            }
+
+            // Rejected before the import started
             globalLoadingModal.classList.add("hidden");
-    
-            // Update the import status inside the import/export modal
             importStatus.classList.remove("hidden");
-            importStatus.textContent = data.message || "Import completed.";
-            importStatus.style.color = data.error ? "red" : "green";
-    
-            // Show close button for user acknowledgment
-            modalCloseButton.classList.remove("hidden");
-            modalCloseButton.addEventListener("click", () => {
-                globalLoadingModal.classList.add("hidden");
-            });
-            loadScoreboards();
-            
+            importStatus.textContent = data.error;
+            importStatus.style.color = "red";
+
             document.getElementById("import-data-btn").disabled = false;
             document.getElementById("export-data-btn").disabled = false;
+            document.getElementById("export-diff-btn").disabled = false;
         })
         .catch(error => {
             // Remove indeterminate effect and hide loading modal
@@ -100,18 +109,20 @@ document.addEventListener("DOMContentLoaded", () => {
             
             document.getElementById("import-data-btn").disabled = false;
             document.getElementById("export-data-btn").disabled = false;
+            document.getElementById("export-diff-btn").disabled = false;
         });
     });
 
-    // Export Functionality
-    document.getElementById("export-data-btn").addEventListener("click", () => {
+    // Export Functionality ("diff": only media new or changed since the last export)
+    const startExport = (mode) => {
         document.getElementById("import-data-btn").disabled = true;
         document.getElementById("export-data-btn").disabled = true;
+        document.getElementById("export-diff-btn").disabled = true;
 
         const sessionId = localStorage.getItem("session_id") || crypto.randomUUID();
         localStorage.setItem("session_id", sessionId);
 
-        fetch("/api/v1/export?session_id=" + sessionId)
+        fetch(`/api/v1/export?session_id=${sessionId}&mode=${mode}`)
             .then(response => response.json())
             .then(data => {
                 if (data.task_id) {
@@ -141,5 +152,73 @@ document.addEventListener("DOMContentLoaded", () => {
         //     document.getElementById("import-data-btn").disabled = false;
         //     document.getElementById("export-data-btn").disabled = false;
         // });
+    };
+    document.getElementById("export-data-btn").addEventListener("click", () => startExport("full"));
+    document.getElementById("export-diff-btn").addEventListener("click", () => startExport("diff"));
+
+    // Single scoreboard export/import (NDJSON, streamed - no background task)
+    const roomExportSelect = document.getElementById("room-export-select");
+    const roomImportStatus = document.getElementById("room-import-status");
+
+    const showRoomStatus = (message, isError) => {
+        roomImportStatus.classList.remove("hidden");
+        roomImportStatus.textContent = message;
+        roomImportStatus.style.color = isError ? "red" : "";
+    };
+
+    const loadRoomExportOptions = () => {
+        fetch("/api/v1/scoreboards")
+            .then(response => response.json())
+            .then(scoreboards => {
+                roomExportSelect.innerHTML = "";
+                scoreboards.forEach(scoreboard => {
+                    const option = document.createElement("option");
+                    option.value = scoreboard.id;
+                    option.textContent = `${scoreboard.room_name} (${scoreboard.num_scores} scores)`;
+                    roomExportSelect.appendChild(option);
+                });
+            })
+            .catch(error => console.error("Failed to load scoreboards:", error));
+    };
+
+    document.getElementById("room-export-btn").addEventListener("click", () => {
+        if (!roomExportSelect.value) return;
+        window.location.href = `/api/v1/scoreboards/${roomExportSelect.value}/export?gzip=1`;
+    });
+
+    document.getElementById("room-import-btn").addEventListener("click", () => {
+        document.getElementById("room-import-file-input").click();
+    });
+
+    document.getElementById("room-import-file-input").addEventListener("change", function () {
+        const file = this.files[0];
+        if (!file) return;
+        const formData = new FormData();
+        formData.append("file", file);
+        showRoomStatus(`Importing ${file.name}...`, false);
+
+        fetch("/api/v1/scoreboards/import", {
+            method: "POST",
+            body: formData
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                showRoomStatus(data.error, true);
+                return;
+            }
+            let message = `Imported ${data.games} games and ${data.scores} scores.`;
+            if (data.missing_media.length) {
+                message += ` ${data.missing_media.length} image(s) aren't on this server yet.`;
+            }
+            showRoomStatus(message, false);
+            loadScoreboards();
+            loadRoomExportOptions();
+        })
+        .catch(error => {
+            showRoomStatus("Import failed. Check console for details.", true);
+            console.error("Scoreboard import error:", error);
+        })
+        .finally(() => { this.value = ""; });
     });
 });
@@ -27,7 +27,21 @@ document.addEventListener("DOMContentLoaded", () => {
     reloadVPSButton.classList.add('reload-vps-button');
     vpsUrlField.parentElement.appendChild(reloadVPSButton);
 
-    let localVPSDB = null;
+    // Fetch one game from the server's indexed copy of the VPS database
+    async function fetchVPSGame(gameId) {
+        try {
+            loader.style.display = "block"; // Show loader
+            const response = await fetch(`/api/v1/vps/games/${encodeURIComponent(gameId)}`);
+            if (response.status === 404) return null;
+            if (!response.ok) throw new Error("Failed to fetch VPS data");
+            return await response.json();
+        } catch (error) {
+            console.error("Failed to fetch VPS data:", error);
+            return null;
+        } finally {
+            loader.style.display = "none"; // Hide loader
+        }
+    }
 
     
     // Function to reload the form from the VPS URL
@@ -44,56 +58,39 @@ document.addEventListener("DOMContentLoaded", () => {
         processVPSURL(url);
     }
 
-    // Fetch cached VPS data from the server
-    async function fetchVPSDB() {
-        try {
-            loader.style.display = "block"; // Show loader
-            const response = await fetch("/api/vpsdata");
-            if (!response.ok) throw new Error("Failed to fetch VPS data");
-            localVPSDB = await response.json();
-        } catch (error) {
-            console.error("Failed to fetch VPS data:", error);
-        } finally {
-            loader.style.display = "none"; // Hide loader
-        }
-    }
-
     // Extract VPS data based on URL
     async function processVPSURL(url) {
         try {
-            if (!localVPSDB) await fetchVPSDB();
-
             const urlParams = new URLSearchParams(new URL(url).search);
             const gameId = urlParams.get("game");
             const tableId = url.split("#")[1];
+            if (!gameId) return;
 
-            if (localVPSDB) {
-                const gameData = localVPSDB.find((game) => game.id === gameId);
-                if (gameData) {
-                    const tableData = gameData.tableFiles.find((table) => table.id === tableId);
-                    if (tableData) {
-                        // Populate fields
-                        if(gameNameField.value == ""){
-                            gameNameField.value = `${gameData.name} (${gameData.manufacturer} ${gameData.year})`;
-                        }
-                        if (gameData.b2sFiles[0]?.imgUrl && gameImageField.value == "") gameImageField.value = gameData.b2sFiles[0].imgUrl;
-                        
-                        if (tableData.imgUrl && gameBackgroundField.value == "") gameBackgroundField.value = tableData.imgUrl;
-
-                        // Trigger image preview updates
-                        updateImagePreview(gameImageField, gameImagePreview);
-                        updateImagePreview(gameBackgroundField, gameBackgroundPreview);
-
-                    } else {
-                        if(gameNameField.value == ""){
-                            gameNameField.placeholder = "Table not found";
-                        }
+            const gameData = await fetchVPSGame(gameId);
+            if (gameData) {
+                const tableData = (gameData.tableFiles || []).find((table) => table.id === tableId);
+                if (tableData) {
+                    // Populate fields
+                    if(gameNameField.value == ""){
+                        gameNameField.value = `${gameData.name} (${gameData.manufacturer} ${gameData.year})`;
                     }
+                    if (gameData.b2sFiles?.[0]?.imgUrl && gameImageField.value == "") gameImageField.value = gameData.b2sFiles[0].imgUrl;
+                    
+                    if (tableData.imgUrl && gameBackgroundField.value == "") gameBackgroundField.value = tableData.imgUrl;
+
+                    // Trigger image preview updates
+                    updateImagePreview(gameImageField, gameImagePreview);
+                    updateImagePreview(gameBackgroundField, gameBackgroundPreview);
+
                 } else {
                     if(gameNameField.value == ""){
-                        gameNameField.placeholder = "Game not found";
+                        gameNameField.placeholder = "Table not found";
                     }
                 }
+            } else {
+                if(gameNameField.value == ""){
+                    gameNameField.placeholder = "Game not found";
+                }
             }
         } catch (error) {
             console.error("Error processing VPS URL:", error);
@@ -106,9 +103,6 @@ document.addEventListener("DOMContentLoaded", () => {
         if (url) processVPSURL(url);
     });
 
-    // Initialize VPS data on load
-    fetchVPSDB();
-
     // Add event listener to the reload button
     reloadVPSButton.addEventListener('click', reloadFormFromVPS);
 });
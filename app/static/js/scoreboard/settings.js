@@ -1,4 +1,5 @@
 import { showToast, showConfirm } from '../utils.js';
+import { resyncGameScores } from '../socketModules/games.js';
 
 document.addEventListener("DOMContentLoaded", () => {
     const settingsForm = document.getElementById("admin-section");
@@ -56,6 +57,8 @@ document.addEventListener("DOMContentLoaded", () => {
                 fullscreen_enabled: document.getElementById("fullscreen_enabled").checked ? "TRUE" : "FALSE",
                 long_names_enabled: newLongNameEnabled,
                 auto_hide_no_score_games: document.getElementById("auto_hide_no_score_games").checked ? "TRUE" : "FALSE",
+                scores_per_card: Math.max(0, parseInt(document.getElementById("scores_per_card").value, 10) || 0),
+                best_score_per_player: document.getElementById("best_score_per_player").checked ? "TRUE" : "FALSE",
             };
 
             // These toggles are currently commented out in scoreboard.jinja (deferred
@@ -97,6 +100,15 @@ document.addEventListener("DOMContentLoaded", () => {
                 updateLongNames(newLongNameEnabled === "TRUE");
             }
 
+            // Cards only hold scores_per_card scores (or each player's best), so
+            // changing either means fetching each card's list again - once the
+            // server has the new value
+            const newBestScorePerPlayer = settingsData.best_score_per_player === "TRUE";
+            const scoresPerCardChanged = settings.scoresPerCard !== settingsData.scores_per_card
+                || settings.bestScorePerPlayer !== newBestScorePerPlayer;
+            settings.scoresPerCard = settingsData.scores_per_card;
+            settings.bestScorePerPlayer = newBestScorePerPlayer;
+
             fetch(`/api/v1/settings/${roomID}`, {
                 method: "PUT",
                 headers: { "Content-Type": "application/json" },
@@ -109,6 +121,9 @@ document.addEventListener("DOMContentLoaded", () => {
                     showToast("Failed to update settings.", { type: "error" });
                 } else {
                     console.log("Settings updated successfully!");
+                    if (scoresPerCardChanged) {
+                        document.querySelectorAll(".game-card").forEach(card => resyncGameScores(card.dataset.id));
+                    }
                 }
             })
             .catch(error => console.error("Request error:", error));
@@ -200,6 +200,89 @@ export function updateGameScores(data) {
 
     // Replace the existing scores with the updated list
     scoreContainer.innerHTML = scoresHTML;
+
+    // The full list is the state at this version - deltas continue from here
+    if (data.version !== undefined) {
+        gameCard.dataset.scoreVersion = data.version;
+    }
+}
+
+// Games with a full-list fetch already in flight, so a burst of deltas arriving
+// while a card is out of sync only triggers one resync
+const resyncsInFlight = new Set();
+
+/**
+ * Replace a game's scores with the full list from the server. Used when a
+ * game_score_delta doesn't follow on from the version this card is showing.
+ */
+export async function resyncGameScores(gameID) {
+    if (resyncsInFlight.has(gameID)) return;
+    resyncsInFlight.add(gameID);
+
+    try {
+        const response = await fetch(`/api/v1/games/${gameID}/scores`);
+        if (!response.ok) {
+            console.error(`Failed to resync scores for game ${gameID}: ${response.status}`);
+            return;
+        }
+        updateGameScores(await response.json());
+    } catch (error) {
+        console.error(`Failed to resync scores for game ${gameID}:`, error);
+    } finally {
+        resyncsInFlight.delete(gameID);
+    }
+}
+
+/**
+ * Merge newly added scores into a game card in place. Each score carries its
+ * 1-based rank in the game's sorted list; the delta applies only if this card
+ * is at exactly the version the server built it on (baseVersion), otherwise
+ * something was missed and the card's list is fetched instead. Scores ranked
+ * below the room's scores-per-card limit are never sent.
+ */
+export function applyGameScoreDelta(data) {
+    const gameCard = document.querySelector(`.game-card[data-id="${data.gameID}"]`);
+
+    if (!gameCard) {
+        console.warn(`Game card with ID ${data.gameID} not found. Skipping score delta.`);
+        return;
+    }
+
+    const scoreContainer = gameCard.querySelector(".score-container");
+    if (!scoreContainer) {
+        console.error(`Score container not found for game ID ${data.gameID}`);
+        return;
+    }
+
+    // Cards created live (game_update) have no version yet - treat as out of sync
+    const currentVersion = gameCard.dataset.scoreVersion === undefined ? NaN : Number(gameCard.dataset.scoreVersion);
+
+    if (currentVersion >= data.version) {
+        return; // Already covered, e.g. by a resync that finished after this was sent
+    }
+    if (currentVersion !== data.baseVersion) {
+        console.log(`Score version gap for game ${data.gameID} (have ${currentVersion}, delta from ${data.baseVersion}), resyncing.`);
+        resyncGameScores(data.gameID);
+        return;
+    }
+
+    scoreContainer.querySelector(".no-scores-yet")?.remove();
+
+    // Ascending rank order, so every score ranked ahead of the one being placed
+    // (old or new) is already in position
+    [...data.scores].sort((a, b) => a.rank - b.rank).forEach(score => {
+        const template = document.createElement("template");
+        template.innerHTML = generateScoreCardHTML(data, score).trim();
+        scoreContainer.insertBefore(template.content.firstElementChild, scoreContainer.children[score.rank - 1] || null);
+    });
+
+    // Cards show only the room's top scoresPerCard (0 = all) - whatever the new
+    // scores pushed past the end drops off
+    if (data.scoresPerCard > 0) {
+        [...scoreContainer.children].slice(data.scoresPerCard).forEach(card => card.remove());
+    }
+
+    gameCard.dataset.scoreVersion = data.version;
 }
 
 /**
@@ -307,28 +390,31 @@ function generateScoreHTML(game) {
         return `<div class="score-card no-scores-yet" style="${game.CSSScoreCards}">No scores yet.</div>`;
     }
 
-    return scores
-        .map(score => {
-            let extraFields = "";
-
-            if (game.ScoreType === "") {
-                extraFields = `
-                    <div class="score-event">${score.event || 'N/A'}</div>
-                    <div class="score-wins">${score.wins} Wins | ${score.losses} Losses</div>
-                `;
-            } else if (game.ScoreType === "hideWins") {
-                extraFields = `<div class="score-event">${score.event || 'N/A'}</div>`;
-            } else if (game.ScoreType === "hideEvent") {
-                extraFields = `<div class="score-wins">${score.wins} Wins | ${score.losses} Losses</div>`;
-            }
+    return scores.map(score => generateScoreCardHTML(game, score)).join("");
+}
+
+/**
+ * Generates the HTML for one score card
+ */
+function generateScoreCardHTML(game, score) {
+    let extraFields = "";
+
+    if (game.ScoreType === "") {
+        extraFields = `
+            <div class="score-event">${score.event || 'N/A'}</div>
+            <div class="score-wins">${score.wins} Wins | ${score.losses} Losses</div>
+        `;
+    } else if (game.ScoreType === "hideWins") {
+        extraFields = `<div class="score-event">${score.event || 'N/A'}</div>`;
+    } else if (game.ScoreType === "hideEvent") {
+        extraFields = `<div class="score-wins">${score.wins} Wins | ${score.losses} Losses</div>`;
+    }
 
-            return `
-                <div class="score-card" style="${game.CSSScoreCards}" data-player-id="${score.playerId}">
-                    <div class="score-player-name" style="${game.CSSInitials}" data-full-name="${score.fullName}" data-default-alias="${score.defaultAlias}">${score.displayName}</div>
-                    <div class="score-score" style="${game.CSSScores}">${score.score}</div>
-                    <div class="score-date" data-timestamp="${score.timestamp}">${score.formatted_timestamp}</div>
-                    ${extraFields}
-                </div>`;
-        })
-        .join("");
+    return `
+        <div class="score-card" style="${game.CSSScoreCards}" data-player-id="${score.playerId}">
+            <div class="score-player-name" style="${game.CSSInitials}" data-full-name="${score.fullName}" data-default-alias="${score.defaultAlias}">${score.displayName}</div>
+            <div class="score-score" style="${game.CSSScores}">${score.score}</div>
+            <div class="score-date" data-timestamp="${score.timestamp}">${score.formatted_timestamp}</div>
+            ${extraFields}
+        </div>`;
 }
\ No newline at end of file
@@ -76,7 +76,7 @@ document.addEventListener("DOMContentLoaded", async () => {
                 const downloadUrl = data.file_path;
                 const downloadLink = document.createElement("a");
                 downloadLink.href = downloadUrl;
-                downloadLink.download = "ArcadeScoreExport.7z";
+                downloadLink.download = downloadUrl.split("/").pop().replace(/_[^_.]+(?=\.)/, "");  // ArcadeScoreExport.zip / ArcadeScoreDiff.zip
                 document.body.appendChild(downloadLink);
                 downloadLink.click();
                 document.body.removeChild(downloadLink);
@@ -84,11 +84,32 @@ document.addEventListener("DOMContentLoaded", async () => {
             
             document.getElementById("import-data-btn").disabled = false;
             document.getElementById("export-data-btn").disabled = false;
+            document.getElementById("export-diff-btn").disabled = false;
+        });
+
+        // Background import finished (progress came through progress_update)
+        socket.on("import_complete", (data) => {
+            console.log("Import finished:", data);
+
+            if (data.session_id !== localStorage.getItem("session_id")) {
+                return;
+            }
+
+            const importStatus = document.getElementById("import-status");
+            importStatus.classList.remove("hidden");
+            importStatus.textContent = data.message;
+            importStatus.style.color = data.error ? "red" : "green";
+            modalCloseButton.classList.remove("hidden");
+            loadScoreboards();
+
+            document.getElementById("import-data-btn").disabled = false;
+            document.getElementById("export-data-btn").disabled = false;
+            document.getElementById("export-diff-btn").disabled = false;
         });
     }
 
     // Sockets only for scoreboard
-    let updateGameCard, updateGameMenu, removeGameFromDOM, toggleGameVisibility, updateGameSort, updateGameScores, updateGamePauseState, updateStylesMenu, refreshPlayerList;
+    let updateGameCard, updateGameMenu, removeGameFromDOM, toggleGameVisibility, updateGameSort, updateGameScores, applyGameScoreDelta, updateGamePauseState, updateStylesMenu, refreshPlayerList;
     if (currentPage === "scoreboard") {
         console.log("Loading scoreboard Sockets");
         const gamesModule =   await import("/static/js/socketModules/games.js");
@@ -101,6 +122,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         toggleGameVisibility = gamesModule.toggleGameVisibility;
         updateGameSort = gamesModule.updateGameSort;
         updateGameScores = gamesModule.updateGameScores;
+        applyGameScoreDelta = gamesModule.applyGameScoreDelta;
         updateGamePauseState = gamesModule.updateGamePauseState;
         updateStylesMenu = stylesModule.updateStylesMenu;
         refreshPlayerList = playersModule.refreshPlayerList;
@@ -167,6 +189,13 @@ document.addEventListener("DOMContentLoaded", async () => {
             }
         });
 
+        socket.on("game_score_delta", (data) => {
+            console.log("New game scores via WebSocket:", data);
+            if (data.roomID === roomID) {
+                applyGameScoreDelta(data);
+            }
+        });
+
         socket.on("game_pause_state", (data) => {
             console.log("Game pause state changed via WebSocket:", data);
             if (data.roomID === roomID) {
@@ -21,8 +21,11 @@ eventlet.monkey_patch()
 from app import create_app
 from app.modules.socketio import socketio
 
-# Create Flask app
-app = create_app()
+# Create Flask app - but not in the image worker processes (app/modules/image_executor.py).
+# They're started with "spawn", which re-imports this script as __mp_main__ in each
+# worker; building the app there would open the database and start the queue workers.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     # Read port from environment, default to 8080
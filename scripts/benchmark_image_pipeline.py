@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+Benchmarks the decode-once image pipeline (app/modules/imageProcessor.py)
+against the code it replaced, over the sample images in app/static/images.
+
+Before the pipeline, rotate_image_90 and extract_first_frame decoded the
+image, transformed it, encoded an intermediate PNG (optimize=True for
+frames), then handed those bytes to save_image - which decoded them again,
+converted to RGBA and encoded the final PNG. The "legacy" functions below
+are that code, minus the prints and file paths.
+
+Each scenario/variant runs in its own process on samples prepared up front,
+so peak memory is that process's peak RSS above what it used before the
+timed loop started.
+
+Usage (from the repo root):
+    python scripts/benchmark_image_pipeline.py [--repeat 5] [--scale 2.0] [--compression high]
+"""
+import argparse
+import glob
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_DIR = os.path.join(REPO_ROOT, "app", "static", "images")
+SCENARIOS = ("save", "rotate", "frame")
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+def _load_samples(scale, scenario):
+    """PNG bytes per sample image - or for "frame", BGR arrays standing in for
+    decoded video frames, as cv2.VideoCapture returns them."""
+    import cv2
+    import numpy
+    from PIL import Image
+
+    samples = []
+    for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "**", "*.*"), recursive=True)):
+        with Image.open(path) as image:
+            image = image.convert("RGBA")
+            if scale != 1.0:
+                image = image.resize((int(image.width * scale), int(image.height * scale)))
+            if scenario == "frame":
+                samples.append(cv2.cvtColor(numpy.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR))
+                continue
+            buffer = BytesIO()
+            image.save(buffer, format="PNG")
+        samples.append(buffer.getvalue())
+    return samples
+
+# The pre-pipeline code paths
+
+def _legacy_save(image_data, max_size):
+    from PIL import Image
+
+    image = Image.open(BytesIO(image_data)).convert("RGBA")
+    if max_size and (image.width > max_size[0] or image.height > max_size[1]):
+        image.thumbnail(max_size)
+    out = BytesIO()
+    image.save(out, format="PNG", optimize=True, compress_level=3)
+    return out.getvalue()
+
+def _legacy_rotate(image_data, max_size):
+    from PIL import Image
+
+    rotated_image = Image.open(BytesIO(image_data)).rotate(-90, expand=True)
+    buffer = BytesIO()
+    rotated_image.save(buffer, format="PNG")
+    return _legacy_save(buffer.getvalue(), max_size)
+
+def _legacy_frame(frame, max_size):
+    import cv2
+    from PIL import Image
+
+    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).rotate(-90, expand=True)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True, compress_level=3)
+    return _legacy_save(buffer.getvalue(), max_size)
+
+def _run_variant(scenario, variant, repeat, samples_path, compression):
+    """Child process: time one scenario/variant and print its result as JSON."""
+    import contextlib
+    import cv2
+    from PIL import Image
+
+    sys.path.insert(0, REPO_ROOT)
+    with contextlib.redirect_stdout(sys.stderr):  # Keep the app's prints out of the JSON
+        from app.modules import imageProcessor as ip
+
+    max_size = ip.COMPRESSION_RESOLUTIONS.get(compression)
+    with open(samples_path, "rb") as f:
+        samples = pickle.load(f)
+
+    def pipeline(source):
+        if scenario == "frame":
+            image = Image.fromarray(cv2.cvtColor(source, cv2.COLOR_BGR2RGB))
+        else:
+            image = ip.decode_image(source)
+        out = BytesIO()
+        ip.encode_png(ip.apply_transforms(image, ip.build_transforms(compression, rotate=scenario != "save")), out)
+        return out.getvalue()
+
+    legacy = {"save": _legacy_save, "rotate": _legacy_rotate, "frame": _legacy_frame}[scenario]
+    run = pipeline if variant == "pipeline" else (lambda source: legacy(source, max_size))
+
+    baseline_rss = _peak_rss_bytes()
+    with contextlib.redirect_stdout(sys.stderr):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for source in samples:
+                run(source)
+        elapsed = time.perf_counter() - started
+    peak_rss = _peak_rss_bytes()
+
+    print(json.dumps({
+        "images": len(samples) * repeat,
+        "seconds": elapsed,
+        "peak_mb": (peak_rss - baseline_rss) / (1024 * 1024) if peak_rss is not None else None,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the sample set per variant")
+    parser.add_argument("--scale", type=float, default=1.0, help="upscale the samples (they're small) to stress the encoder")
+    parser.add_argument("--compression", default="high", choices=["original", "low", "medium", "high"])
+    parser.add_argument("--worker", nargs=3, metavar=("SCENARIO", "VARIANT", "SAMPLES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        scenario, variant, samples_path = args.worker
+        _run_variant(scenario, variant, args.repeat, samples_path, args.compression)
+        return
+
+    print(f"Samples: {SAMPLES_DIR} (x{args.scale}), {args.repeat} passes, compression={args.compression}\n")
+    print(f"{'scenario':<10}{'variant':<10}{'ms/image':>10}{'peak MB':>10}")
+    for scenario in SCENARIOS:
+        fd, samples_path = tempfile.mkstemp(suffix=".pickle")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(_load_samples(args.scale, scenario), f)
+
+        results = {}
+        try:
+            for variant in ("legacy", "pipeline"):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--worker", scenario, variant, samples_path,
+                     "--repeat", str(args.repeat), "--compression", args.compression],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = results[variant] = json.loads(output.strip().splitlines()[-1])
+                peak = f"{result['peak_mb']:.1f}" if result["peak_mb"] is not None else "n/a"
+                print(f"{scenario:<10}{variant:<10}{result['seconds'] * 1000 / result['images']:>10.2f}{peak:>10}")
+        finally:
+            os.remove(samples_path)
+        saved = 1 - results["pipeline"]["seconds"] / results["legacy"]["seconds"]
+        print(f"{'':<10}{'saved':<10}{saved:>10.0%}\n")
+
+if __name__ == "__main__":
+    main()
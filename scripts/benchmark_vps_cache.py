@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Benchmarks how much memory the cached VPS database takes
+(app/modules/vpspreadsheet.py), and how long loading it takes.
+
+Before the compact cache, fetch_vps_data() kept vpsdb.json as parsed JSON -
+the whole nested dict graph - for the life of the process. Now vpsdb.json is
+streamed into VpsGame records (ingest: done once per VPS update, also writing
+the snapshot) and every later start loads those from the memory-mapped
+snapshot instead.
+
+Uses app/vps-data/vpsdb.json if it's there, otherwise a synthetic database
+shaped like the real one (--games of them). Each variant runs in its own
+process; "resident MB" is how much its resident set grew while loading, with
+the result still held.
+
+Usage (from the repo root):
+    python scripts/benchmark_vps_cache.py [--games 2500] [--vpsdb path/to/vpsdb.json]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCAL_VPSDB = os.path.join(REPO_ROOT, "app", "vps-data", "vpsdb.json")
+VARIANTS = ("json", "ingest", "snapshot")
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # Not Linux - fall back to the peak
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def _synthetic_vpsdb(games):
+    """Games with the fields (and roughly the sizes) real vpsdb.json entries have."""
+    rng = random.Random(0)
+    manufacturers = ["Bally", "Williams", "Gottlieb", "Stern", "Data East", "Sega", "Original", "Zaccaria"]
+
+    def files(count, **extra):
+        return [{
+            "id": f"{rng.getrandbits(40):x}",
+            "createdAt": 1700000000000 + rng.randrange(10 ** 10),
+            "updatedAt": 1700000000000 + rng.randrange(10 ** 10),
+            "authors": [f"Author {rng.randrange(500)}" for _ in range(rng.randrange(1, 4))],
+            "version": f"{rng.randrange(1, 5)}.{rng.randrange(10)}",
+            "urls": [{"url": f"https://vpuniverse.com/files/file/{rng.randrange(10 ** 5)}/", "broken": False}],
+            "comment": "Mod of the original release " * rng.randrange(0, 3),
+            **extra,
+        } for _ in range(count)]
+
+    return [{
+        "id": f"{rng.getrandbits(40):x}",
+        "name": f"Table {index}",
+        "manufacturer": rng.choice(manufacturers),
+        "year": rng.randrange(1950, 2025),
+        "type": rng.choice(["EM", "SS", "PM"]),
+        "players": rng.randrange(1, 5),
+        "designers": [f"Designer {rng.randrange(200)}"],
+        "theme": ["Fantasy", "Sports"],
+        "ipdbUrl": f"https://www.ipdb.org/machine.cgi?id={rng.randrange(7000)}",
+        "updatedAt": 1700000000000 + rng.randrange(10 ** 10),
+        "lastCreatedAt": 1700000000000 + rng.randrange(10 ** 10),
+        "features": ["incl. B2S", "SSF", "FastFlips"],
+        "tableFiles": files(rng.randrange(1, 8), tableFormat="VPX", imgUrl=f"https://vpsdb/img/{index}.webp",
+                            features=["VR", "MOD"], edition="Premium"),
+        "b2sFiles": files(rng.randrange(0, 4), imgUrl=f"https://vpsdb/b2s/{index}.webp", features=["FullDMD"]),
+        "romFiles": files(rng.randrange(0, 4)),
+        "pupPackFiles": files(rng.randrange(0, 2)),
+        "altSoundFiles": files(rng.randrange(0, 2)),
+        "wheelArtFiles": files(rng.randrange(0, 3)),
+        "topperFiles": files(rng.randrange(0, 2)),
+    } for index in range(games)]
+
+def _run_variant(variant, workdir):
+    """Child process: load the VPS database one way and print the result as JSON."""
+    import contextlib
+    sys.path.insert(0, REPO_ROOT)
+    with contextlib.redirect_stdout(sys.stderr):  # Keep the app's prints out of the JSON
+        from app.modules import vpspreadsheet
+
+    vps_json_path = os.path.join(workdir, "vpsdb.json")
+    snapshot_path = os.path.join(workdir, "vpsdb.sqlite")
+    stamp = vpspreadsheet._snapshot_stamp("benchmark")
+
+    gc.collect()
+    baseline = _rss_bytes()
+    with contextlib.redirect_stdout(sys.stderr):
+        started = time.perf_counter()
+        if variant == "json":
+            with open(vps_json_path) as f:
+                games = json.load(f)
+        elif variant == "ingest":
+            games = vpspreadsheet._ingest_vps_json(vps_json_path, stamp, snapshot_path)
+        else:
+            games = vpspreadsheet._read_vps_snapshot(snapshot_path, stamp)
+        elapsed = time.perf_counter() - started
+    gc.collect()
+
+    print(json.dumps({"games": len(games), "seconds": elapsed, "resident_mb": (_rss_bytes() - baseline) / (1024 * 1024)}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vpsdb", default=LOCAL_VPSDB, help="vpsdb.json to load (default: the app's local copy)")
+    parser.add_argument("--games", type=int, default=2500, help="size of the synthetic database, without a vpsdb.json")
+    parser.add_argument("--worker", nargs=2, metavar=("VARIANT", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _run_variant(*args.worker)
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        vps_json_path = os.path.join(workdir, "vpsdb.json")
+        if os.path.exists(args.vpsdb):
+            shutil.copy(args.vpsdb, vps_json_path)
+            source = args.vpsdb
+        else:
+            with open(vps_json_path, "w") as f:
+                json.dump(_synthetic_vpsdb(args.games), f)
+            source = f"synthetic, {args.games} games"
+        print(f"VPS database: {source} ({os.path.getsize(vps_json_path) / (1024 * 1024):.1f} MB)\n")
+        print(f"{'variant':<10}{'games':>8}{'load ms':>10}{'resident MB':>14}")
+
+        results = {}
+        for variant in VARIANTS:  # "ingest" writes the snapshot "snapshot" reads
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", variant, workdir],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = results[variant] = json.loads(output.strip().splitlines()[-1])
+            print(f"{variant:<10}{result['games']:>8}{result['seconds'] * 1000:>10.0f}{result['resident_mb']:>14.1f}")
+
+        saved = 1 - results["snapshot"]["resident_mb"] / results["json"]["resident_mb"]
+        print(f"\nResident memory saved vs. parsed JSON: {saved:.0%}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ import pytest
 from flask import Flask
 
 from app.modules.models import init_db, migrate_db
+from app.modules.read_cache import clear_read_cache
 from app.modules.socketio import socketio
 
 
@@ -46,6 +47,9 @@ def conn():
     try:
         init_db(db_path)
         migrate_db(db_path)
+        # The read cache is per process, not per database file - start every
+        # test's fresh database with an empty one
+        clear_read_cache()
 
         connection = sqlite3.connect(db_path)
         connection.row_factory = sqlite3.Row
@@ -0,0 +1,154 @@
+"""Tests for the pooled SQLite connection manager (app/modules/database.py)."""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import eventlet
+import pytest
+from flask import Flask
+
+from app.modules.database import ConnectionPool, get_db, get_pool, close_db, close_pool, swap_database
+from app.modules.models import init_db, migrate_db
+
+
+@pytest.fixture
+def db_path():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    init_db(path)
+    migrate_db(path)
+    try:
+        yield path
+    finally:
+        close_pool(path)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+class TestConnectionPool:
+    def test_connections_are_opened_in_wal_mode_with_tuned_pragmas(self, db_path):
+        pool = ConnectionPool(db_path, size=1, busy_timeout_ms=1234, cache_size_kb=2048, synchronous="NORMAL")
+        conn = pool.acquire()
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2048
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        finally:
+            pool.release(conn)
+            pool.close_all()
+
+    def test_released_connection_is_reused(self, db_path):
+        pool = ConnectionPool(db_path, size=1)
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        assert second is first
+        pool.release(second)
+        pool.close_all()
+
+    def test_uncommitted_work_is_rolled_back_on_release(self, db_path):
+        """A request that errors out mid-transaction must not leak its half-done
+        writes to whichever request borrows the connection next."""
+        pool = ConnectionPool(db_path, size=1)
+        conn = pool.acquire()
+        conn.execute("INSERT INTO players (full_name, default_alias) VALUES ('Ghost', 'GHO')")
+        pool.release(conn)
+
+        conn = pool.acquire()
+        assert conn.execute("SELECT COUNT(*) FROM players WHERE full_name = 'Ghost'").fetchone()[0] == 0
+        pool.release(conn)
+        pool.close_all()
+
+    def test_exhausted_pool_opens_an_overflow_connection(self, db_path):
+        pool = ConnectionPool(db_path, size=1, timeout=0.01)
+        held = pool.acquire()
+        overflow = pool.acquire()
+
+        assert overflow is not held
+        stats = pool.stats()
+        assert stats["in_use"] == 2
+        assert stats["waits"] == 1
+        assert stats["overflow_checkouts"] == 1
+
+        pool.release(overflow)
+        pool.release(held)
+        assert pool.stats()["idle"] == 1  # The overflow connection was closed, not pooled
+        pool.close_all()
+
+
+class TestGetDb:
+    def test_app_database_is_served_from_the_pool(self, db_path):
+        app = Flask(__name__)
+        app.config["DB_PATH"] = db_path
+        app.config["DB_POOL_SIZE"] = 2
+
+        with app.app_context():
+            first = get_db()
+            assert get_db() is first  # Same connection for the rest of the request
+            close_db()
+            assert get_db() is first  # ...and handed back out on the next one
+            close_db()
+
+
+class TestSwapDatabase:
+    def _replacement(self, db_path):
+        replacement = f"{db_path}.import"
+        shutil.copy(db_path, replacement)
+        conn = sqlite3.connect(replacement)
+        conn.execute("INSERT INTO players (full_name, default_alias) VALUES ('Imported', 'IMP')")
+        conn.commit()
+        conn.close()
+        return replacement
+
+    def test_waits_for_checked_out_connections_and_keeps_the_pool_object(self, db_path):
+        pool = get_pool(db_path)
+        held = pool.acquire()
+        replacement = self._replacement(db_path)
+
+        def finish_request():
+            eventlet.sleep(0.1)
+            pool.release(held)
+        eventlet.spawn_n(finish_request)
+        swap_database(db_path, replacement, timeout=5)
+
+        assert get_pool(db_path) is pool  # Workers holding on to it carry on
+        conn = pool.acquire()
+        assert conn is not held
+        assert conn.execute("SELECT COUNT(*) FROM players WHERE full_name = 'Imported'").fetchone()[0] == 1
+        pool.release(conn)
+        assert not os.path.exists(replacement)
+
+    def test_gives_up_if_connections_stay_out(self, db_path):
+        pool = get_pool(db_path)
+        held = pool.acquire()
+        replacement = self._replacement(db_path)
+
+        with pytest.raises(RuntimeError):
+            swap_database(db_path, replacement, timeout=0.1)
+
+        assert os.path.exists(replacement)  # Nothing swapped...
+        pool.release(held)
+        conn = pool.acquire()  # ...and checkouts work again
+        assert conn.execute("SELECT COUNT(*) FROM players WHERE full_name = 'Imported'").fetchone()[0] == 0
+        pool.release(conn)
+        os.remove(replacement)
+
+    def test_a_failed_swap_still_leaves_a_full_pool(self, db_path, monkeypatch):
+        pool = get_pool(db_path)
+        replacement = self._replacement(db_path)
+
+        def refuse(*args):
+            raise OSError("disk on fire")
+        monkeypatch.setattr("app.modules.database.os.replace", refuse)
+        with pytest.raises(OSError):
+            swap_database(db_path, replacement, timeout=5)
+
+        assert pool.stats()["idle"] == pool.size
+        conn = pool.acquire()
+        assert conn.execute("SELECT COUNT(*) FROM players WHERE full_name = 'Imported'").fetchone()[0] == 0  # The old file
+        pool.release(conn)
+        assert pool.stats()["overflow_checkouts"] == 0
+        os.remove(replacement)
@@ -0,0 +1,56 @@
+"""Tests for online database snapshots (app/modules/db_snapshot.py)."""
+import sqlite3
+
+import pytest
+
+from app.modules import db_snapshot
+from app.modules.db_snapshot import get_snapshot_stats, snapshot_database
+from tests.conftest import make_room, make_game
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = dict(db_snapshot.SNAPSHOT_DEFAULTS, SNAPSHOT_PAGES_PER_STEP=4)
+    monkeypatch.setattr(db_snapshot, "_settings", settings)
+    return settings
+
+
+def _db_path(conn):
+    return conn.execute("PRAGMA database_list").fetchone()["file"]
+
+
+class TestSnapshotDatabase:
+    def test_copies_in_steps_and_reports_page_counts(self, conn, settings, tmp_path):
+        conn.execute("PRAGMA journal_mode=WAL;")
+        make_game(conn, make_room(conn), game_name="Uncheckpointed")  # Only in the -wal file so far
+        steps = []
+
+        result = snapshot_database(_db_path(conn), str(tmp_path / "snapshot.db"), lambda copied, total: steps.append((copied, total)))
+
+        assert result["steps"] == len(steps) > 1 and result["restarts"] == 0
+        assert steps[-1] == (result["pages"], result["pages"])
+        assert result["bytes"] == result["pages"] * result["page_size"]
+        snapshot = sqlite3.connect(tmp_path / "snapshot.db")
+        assert snapshot.execute("SELECT COUNT(*) FROM games WHERE game_name = 'Uncheckpointed'").fetchone()[0] == 1
+        snapshot.close()
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["snapshot.db"]
+        assert get_snapshot_stats()["last"] == result
+
+    def test_a_write_mid_copy_restarts_it_and_the_copy_still_has_one_point_in_time(self, conn, settings, tmp_path):
+        room_id = make_room(conn)
+        writer = sqlite3.connect(_db_path(conn))
+
+        def write_once(copied, total):
+            if copied and not writer.in_transaction and not getattr(write_once, "done", False):
+                write_once.done = True
+                writer.execute("INSERT INTO games (room_id, game_name) VALUES (?, 'Mid-copy')", (room_id,))
+                writer.commit()
+
+        result = snapshot_database(_db_path(conn), str(tmp_path / "snapshot.db"), write_once)
+        writer.close()
+
+        assert result["restarts"] == 1
+        snapshot = sqlite3.connect(tmp_path / "snapshot.db")
+        assert snapshot.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert snapshot.execute("SELECT COUNT(*) FROM games WHERE game_name = 'Mid-copy'").fetchone()[0] == 1
+        snapshot.close()
@@ -0,0 +1,102 @@
+"""Tests for the streaming export engine (app/modules/export_engine.py)."""
+import os
+import shutil
+import sqlite3
+import zipfile
+
+import pytest
+
+from app.modules import export_engine
+from app.modules.export_engine import build_export, collect_export_files, order_archive_chain, read_archive_manifest
+from tests.conftest import make_room, make_game
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "images"
+    for folder, name, size in (("avatars", "a.png", 10), ("gameImage", "b.png", 300_000), ("gameBackground", "c.jpg", 5)):
+        (root / folder).mkdir(parents=True, exist_ok=True)
+        (root / folder / name).write_bytes(b"x" * size)
+    (root / "gameImage" / "variants" / "b.png").mkdir(parents=True)
+    (root / "gameImage" / "variants" / "b.png" / "480.webp").write_bytes(b"derived")
+    (root / "elsewhere").mkdir()
+    (root / "elsewhere" / "d.png").write_bytes(b"not media")
+    return root
+
+
+def _db_path(conn):
+    return conn.execute("PRAGMA database_list").fetchone()["file"]
+
+
+class TestExportEngine:
+    def test_collects_media_without_variants(self, library):
+        names = sorted(name for _, name, _ in collect_export_files(str(library)))
+        assert names == ["images/avatars/a.png", "images/gameBackground/c.jpg", "images/gameImage/b.png"]
+
+    def test_zip_has_a_consistent_snapshot_and_reports_bytes(self, conn, library, tmp_path, monkeypatch):
+        monkeypatch.setattr(export_engine, "PROGRESS_INTERVAL", 0)
+        monkeypatch.setattr(export_engine, "CHUNK_SIZE", 64 * 1024)
+        conn.execute("PRAGMA journal_mode=WAL;")  # As the app's pooled connections run
+        make_game(conn, make_room(conn), game_name="Uncheckpointed")  # Only in the -wal file so far
+        reports = []
+
+        archive_path = tmp_path / "export" / "ArcadeScoreExport.zip"
+        build_export(_db_path(conn), str(library), str(archive_path), on_progress=lambda *report: reports.append(report))
+
+        with zipfile.ZipFile(archive_path) as archive:
+            assert sorted(archive.namelist()) == [
+                "highscores.db", "images/avatars/a.png", "images/gameBackground/c.jpg", "images/gameImage/b.png", "manifest.json",
+            ]
+            assert archive.getinfo("images/gameImage/b.png").compress_type == zipfile.ZIP_STORED
+            archive.extract("highscores.db", tmp_path / "out")
+        snapshot = sqlite3.connect(tmp_path / "out" / "highscores.db")
+        assert snapshot.execute("SELECT COUNT(*) FROM games WHERE game_name = 'Uncheckpointed'").fetchone()[0] == 1
+        snapshot.close()
+
+        done = [done for done, _, _, _ in reports]
+        assert done == sorted(done) and done[-1] == reports[-1][1]
+        assert {message for _, _, message, _ in reports} == {
+            "Checking media for changes", "Snapshotting database", "Database snapshot taken", "Archiving database", "Archiving images",
+        }
+        pages = [details["snapshot"] for _, _, message, details in reports if message == "Snapshotting database"]
+        assert pages[-1]["pages_copied"] == pages[-1]["pages_total"] > 0
+        assert sorted(path.name for path in archive_path.parent.iterdir()) == ["ArcadeScoreExport.zip"]  # No temp files left
+
+    @pytest.mark.skipif(not shutil.which("7z"), reason="7-Zip not installed")
+    def test_7z(self, conn, library, tmp_path):
+        archive_path = tmp_path / "ArcadeScoreExport.7z"
+        build_export(_db_path(conn), str(library), str(archive_path), "7z")
+
+        listing = export_engine.subprocess.run(["7z", "l", "-slt", str(archive_path)], capture_output=True, text=True).stdout
+        assert "Path = highscores.db" in listing and "Path = images/gameImage/b.png" in listing.replace("\\", "/")
+
+
+class TestDifferentialExport:
+    def test_only_changed_media_is_archived_and_unchanged_files_are_not_rehashed(self, conn, library, tmp_path, monkeypatch):
+        db_path = _db_path(conn)
+        base = build_export(db_path, str(library), str(tmp_path / "base.zip"))
+        (library / "avatars" / "new.png").write_bytes(b"new")
+        (library / "gameBackground" / "c.jpg").write_bytes(b"changed")
+        os.utime(library / "gameImage" / "b.png")  # Touched, same content
+        hashed = []
+        real_sha256 = export_engine.file_sha256
+        monkeypatch.setattr(export_engine, "file_sha256", lambda path, progress=None: hashed.append(path) or real_sha256(path))
+
+        diff = build_export(db_path, str(library), str(tmp_path / "diff.zip"), previous_manifest=base, differential=True)
+
+        assert sorted(os.path.basename(path) for path in hashed) == ["b.png", "c.jpg", "new.png"]
+        with zipfile.ZipFile(tmp_path / "diff.zip") as archive:
+            assert sorted(archive.namelist()) == [
+                "highscores.db", "images/avatars/new.png", "images/gameBackground/c.jpg", "manifest.json",
+            ]
+        assert diff["base_id"] == base["export_id"] and len(diff["files"]) == 4
+        assert read_archive_manifest(str(tmp_path / "diff.zip"), "zip")["export_id"] == diff["export_id"]
+
+    def test_import_order_follows_the_chain(self):
+        full, first, second = {"export_id": "a", "base_id": None}, {"export_id": "b", "base_id": "a"}, {"export_id": "c", "base_id": "b"}
+
+        assert order_archive_chain([second, full, first]) == [1, 2, 0]
+        assert order_archive_chain([None]) == [0]  # An export from before manifests
+        for broken in ([first], [full, second], [full, first, first], [full, None]):
+            with pytest.raises(ValueError):
+                order_archive_chain(broken)
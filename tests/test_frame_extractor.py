@@ -0,0 +1,113 @@
+"""Tests for streaming first-frame extraction (app/modules/frame_extractor.py).
+
+The "server" is a patched http_client.get serving an MP4 written by OpenCV
+from memory, honouring Range headers when asked to - OpenCV writes its
+metadata at the end of the file, so it's also the awkward case.
+"""
+from unittest.mock import patch
+
+import cv2
+import numpy
+import pytest
+from PIL import Image
+
+from app.modules import frame_extractor, imageProcessor
+from app.modules.frame_extractor import VideoBudgetExceeded, open_video
+
+URL = "http://vpin.local:8089/api/v1/media/7/PlayField"
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("video") / "playfield.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (160, 120))
+    noise = numpy.random.default_rng(0)
+    for _ in range(120):  # Noise compresses badly - a video of a few MB
+        writer.write((noise.random((120, 160, 3)) * 255).astype("uint8"))
+    writer.release()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class _Response:
+    def __init__(self, body, status_code=200, headers=None):
+        self.body, self.status_code, self.headers = body, status_code, headers or {}
+        self.served = 0
+
+    def iter_content(self, chunk_size):
+        for offset in range(0, len(self.body), chunk_size):
+            self.served += len(self.body[offset:offset + chunk_size])
+            yield self.body[offset:offset + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _server(body, ranges=True):
+    responses = []
+
+    def get(url, stream=False, headers=None):
+        range_header = (headers or {}).get("Range")
+        if range_header and ranges:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            response = _Response(body[start:], 206)
+        else:
+            response = _Response(body, 200, {"Content-Length": str(len(body)), "Accept-Ranges": "bytes" if ranges else "none"})
+        responses.append(response)
+        return response
+    return get, responses
+
+
+@pytest.fixture
+def settings(monkeypatch, tmp_path):
+    settings = dict(frame_extractor.FRAME_EXTRACTOR_DEFAULTS, VIDEO_SCRATCH_DIR=str(tmp_path / "scratch"),
+                    VIDEO_FIRST_ATTEMPT_BYTES=128 * 1024)
+    monkeypatch.setattr(frame_extractor, "_settings", settings)
+    monkeypatch.setattr(imageProcessor, "run_image_job", lambda kind, fn, *args: fn(*args))
+    monkeypatch.setattr(imageProcessor, "_variant_spec", None)
+    return settings
+
+
+class TestFrameExtractor:
+    def test_fetches_the_trailing_metadata_by_range_instead_of_the_whole_video(self, video, settings, tmp_path):
+        get, responses = _server(video)
+        with patch("app.modules.http_client.get", side_effect=get):
+            path = imageProcessor.extract_first_frame(URL, "7_playfield.png", str(tmp_path), "/img", rotate=True)
+
+        assert path is not None
+        with Image.open(tmp_path / path.rsplit("/", 1)[1]) as frame:
+            assert frame.size == (120, 160)  # Rotated
+        assert [r.status_code for r in responses] == [200, 206]
+        assert sum(r.served for r in responses) < len(video) // 4
+        assert list((tmp_path / "scratch").iterdir()) == []  # Scratch file removed
+
+    def test_without_ranges_streams_until_a_frame_decodes(self, video, settings, tmp_path):
+        get, responses = _server(video, ranges=False)
+        with patch("app.modules.http_client.get", side_effect=get):
+            assert imageProcessor.extract_first_frame(URL, "7_playfield.png", str(tmp_path), "/img") is not None
+
+        assert len(responses) == 1  # Metadata at the end: the whole file, but no more requests
+
+    def test_a_video_already_stored_stops_after_its_first_slice(self, video, settings, tmp_path):
+        get, responses = _server(video)
+        with patch("app.modules.http_client.get", side_effect=get):
+            first = imageProcessor.extract_first_frame(URL, "7_playfield.png", str(tmp_path), "/img")
+            responses.clear()
+            second = imageProcessor.extract_first_frame(URL, "8_playfield.png", str(tmp_path), "/img")
+
+        assert first == second
+        assert [r.served for r in responses] == [settings["VIDEO_FIRST_ATTEMPT_BYTES"]]
+
+    def test_byte_budget(self, video, settings):
+        settings["VIDEO_MAX_BYTES"] = 256 * 1024
+        get, _ = _server(video, ranges=False)
+        with patch("app.modules.http_client.get", side_effect=get), open_video(URL) as download:
+            with pytest.raises(VideoBudgetExceeded):
+                download.extract(lambda path: False)
+            assert download.downloaded <= settings["VIDEO_MAX_BYTES"] + frame_extractor.CHUNK_SIZE
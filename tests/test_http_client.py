@@ -0,0 +1,63 @@
+"""Tests for the shared outbound HTTP client (app/modules/http_client.py).
+
+requests.Session.request is patched out - what's under test is the layer on
+top of it: one session per host, default timeouts, the per-host limit and
+the counters.
+"""
+from unittest.mock import patch, Mock
+
+import eventlet
+import pytest
+import requests
+
+from app.modules.http_client import HttpClient
+
+
+def _response(status_code=200):
+    return Mock(status_code=status_code)
+
+
+class TestHttpClient:
+    def test_reuses_one_session_per_host_and_applies_default_timeouts(self):
+        client = HttpClient(connect_timeout=2, read_timeout=7)
+        with patch.object(requests.Session, "request", autospec=True, return_value=_response()) as mock_request:
+            client.request("GET", "http://VPin.local:8089/api/v1/games/1")
+            client.request("GET", "http://vpin.local:8089/api/v1/games/2", timeout=10)
+            client.request("GET", "https://example.com/image.png")
+
+        sessions = {id(call.args[0]) for call in mock_request.call_args_list}
+        assert len(sessions) == 2
+        assert mock_request.call_args_list[0].kwargs["timeout"] == (2.0, 7.0)
+        assert mock_request.call_args_list[1].kwargs["timeout"] == 10  # A caller's own timeout wins
+        assert set(client.stats()["hosts"]) == {"http://vpin.local:8089", "https://example.com"}
+
+    def test_counts_errors_and_reraises(self):
+        client = HttpClient()
+        with patch.object(requests.Session, "request", side_effect=[_response(503), requests.ConnectionError("refused")]):
+            assert client.request("GET", "http://vpin.local/api/v1/x").status_code == 503
+            with pytest.raises(requests.ConnectionError):
+                client.request("GET", "http://vpin.local/api/v1/x")
+
+        stats = client.stats()["hosts"]["http://vpin.local"]
+        assert (stats["requests"], stats["errors"], stats["in_flight"]) == (2, 2, 0)
+
+    def test_limits_requests_in_flight_per_host(self):
+        client = HttpClient(max_per_host=2)
+        in_flight = []
+        peak = []
+
+        def slow_request(*args, **kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            eventlet.sleep(0.01)
+            in_flight.pop()
+            return _response()
+
+        with patch.object(requests.Session, "request", side_effect=slow_request):
+            pool = eventlet.GreenPool()
+            for _ in range(6):
+                pool.spawn(client.request, "GET", "http://vpin.local/api/v1/x")
+            pool.waitall()
+
+        assert max(peak) == 2
+        assert client.stats()["hosts"]["http://vpin.local"]["waits"] >= 4
@@ -0,0 +1,62 @@
+"""Tests for the image worker pool (app/modules/image_executor.py) and the
+imageProcessor functions that submit to it."""
+from io import BytesIO
+
+import eventlet
+import pytest
+from PIL import Image
+
+from app.modules.image_executor import ImageExecutor
+from app.modules import imageProcessor
+
+
+def _png(size=(2000, 1000), color=(200, 30, 30)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = ImageExecutor(workers=1)
+    monkeypatch.setattr(imageProcessor, "run_image_job", executor.run)
+    yield executor
+    executor.shutdown()
+
+
+class TestImageExecutor:
+    def test_saves_in_a_worker_while_the_hub_keeps_running(self, executor, tmp_path):
+        ticks = []
+
+        def ticker():
+            while True:
+                ticks.append(1)
+                eventlet.sleep(0.001)
+
+        background = eventlet.spawn(ticker)
+        path = imageProcessor.save_image(_png(), "table.jpg", str(tmp_path), "/images", "high")
+        background.kill()
+
+        assert path.startswith("/images/") and path.endswith(".png")
+        with Image.open(tmp_path / path.rsplit("/", 1)[1]) as saved:
+            assert (saved.size, saved.mode) == ((640, 320), "RGBA")
+        assert ticks  # Other greenthreads ran while the encode was in the worker
+        stats = executor.stats()
+        assert (stats["workers"], stats["in_flight"], stats["kinds"]["save"]["jobs"]) == (1, 0, 1)
+        assert stats["kinds"]["save"]["avg_cpu_ms"] > 0
+
+    def test_rotates_and_reports_failures(self, executor, tmp_path):
+        path = imageProcessor.rotate_image_90(_png((300, 100)), "wheel", str(tmp_path), "/images")
+        with Image.open(tmp_path / path.rsplit("/", 1)[1]) as saved:
+            assert saved.size == (100, 300)
+
+        assert imageProcessor.save_image(b"not an image", "broken", str(tmp_path), "/images") is None
+        assert executor.stats()["kinds"]["save"]["failures"] == 1
+
+    def test_zero_workers_runs_in_process(self, tmp_path):
+        executor = ImageExecutor(workers=0)
+        executor.run("save", imageProcessor._pipeline_job, _png(), [], str(tmp_path / "inline.png"))
+
+        assert executor.stats()["kinds"]["save"]["jobs"] == 1
+        with Image.open(tmp_path / "inline.png") as saved:
+            assert saved.size == (2000, 1000)
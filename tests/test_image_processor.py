@@ -0,0 +1,93 @@
+"""Tests for the decode-once image pipeline and the WebP/AVIF variants it writes
+(app/modules/imageProcessor.py, served by app/routes/misc.py)."""
+from io import BytesIO
+from unittest.mock import patch
+
+import eventlet
+import pytest
+from flask import Flask
+from PIL import Image
+from werkzeug.datastructures import MIMEAccept
+
+from app.modules import imageProcessor
+from app.modules.imageProcessor import (
+    apply_transforms, build_transforms, decode_image, list_variants, pick_variant, _pipeline_job,
+)
+from app.routes.misc import misc_bp
+
+
+def _png(size, mode="RGB"):
+    buffer = BytesIO()
+    Image.new(mode, size).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestImagePipeline:
+    def test_builds_the_standard_transforms(self):
+        assert build_transforms() == [("convert", "RGBA")]
+        assert build_transforms("high", rotate=True) == [("rotate", 90), ("convert", "RGBA"), ("thumbnail", (640, 360))]
+
+    def test_rotates_before_fitting_the_size_limit(self):
+        image = apply_transforms(decode_image(_png((400, 1600))), build_transforms("high", rotate=True))
+
+        assert (image.size, image.mode) == ((640, 160), "RGBA")
+
+    def test_decodes_and_encodes_exactly_once(self, tmp_path):
+        image_data = _png((800, 600), "P")
+        with patch("app.modules.imageProcessor.Image.open", wraps=Image.open) as mock_open, \
+             patch.object(Image.Image, "save", autospec=True, side_effect=Image.Image.save) as mock_save:
+            _pipeline_job(image_data, build_transforms("high", rotate=True), str(tmp_path / "out.png"))
+
+        assert mock_open.call_count == 1
+        assert mock_save.call_count == 1
+        assert [path.name for path in tmp_path.iterdir()] == ["out.png"]  # Written aside, then renamed into place
+
+    def test_rejects_unknown_transforms(self):
+        with pytest.raises(ValueError):
+            apply_transforms(decode_image(_png((10, 10))), [("sepia", 1)])
+
+
+@pytest.fixture
+def media_app(tmp_path):
+    app = Flask(__name__, root_path=str(tmp_path))
+    app.register_blueprint(misc_bp)
+    (tmp_path / "static" / "images" / "gameImage").mkdir(parents=True)
+    return app
+
+
+class TestImageVariants:
+    SPEC = ((320, 640, 4000), ("webp",), 80)
+
+    def test_writes_each_width_up_to_the_original(self, tmp_path):
+        target = tmp_path / "table.png"
+        _pipeline_job(_png((1000, 500)), build_transforms(), str(target), self.SPEC)
+
+        assert target.exists()
+        assert list_variants(str(target)) == {"webp": [320, 640, 1000]}
+        with Image.open(tmp_path / "variants" / "table.png" / "320.webp") as variant:
+            assert variant.size == (320, 160)
+
+    def test_negotiates_format_and_width(self, tmp_path):
+        target = tmp_path / "table.png"
+        _pipeline_job(_png((1000, 500)), build_transforms(), str(target), self.SPEC)
+
+        assert pick_variant(str(target), MIMEAccept([("image/webp", 1), ("*/*", 0.8)])) == "variants/table.png/1000.webp"
+        assert pick_variant(str(target), MIMEAccept([("image/webp", 1)]), width=500) == "variants/table.png/640.webp"
+        assert pick_variant(str(target), MIMEAccept([("image/webp", 1)]), width=5000) == "variants/table.png/1000.webp"
+        assert pick_variant(str(target), MIMEAccept([("*/*", 1)])) is None
+
+    def test_route_serves_the_variant_and_backfills_missing_ones(self, media_app, tmp_path, monkeypatch):
+        monkeypatch.setattr(imageProcessor, "_variant_spec", self.SPEC)
+        monkeypatch.setattr(imageProcessor, "run_image_job", lambda kind, fn, *args: fn(*args))
+        (tmp_path / "static" / "images" / "gameImage" / "table.png").write_bytes(_png((1000, 500)))
+        client = media_app.test_client()
+
+        first = client.get("/static/images/gameImage/table.png?w=300", headers={"Accept": "image/webp,*/*;q=0.8"})
+        eventlet.sleep(0)  # Let the background backfill run
+        second = client.get("/static/images/gameImage/table.png?w=300", headers={"Accept": "image/webp,*/*;q=0.8"})
+        legacy = client.get("/static/images/gameImage/table.png?w=300", headers={"Accept": "image/png,*/*;q=0.5"})
+
+        assert (first.mimetype, second.mimetype, legacy.mimetype) == ("image/png", "image/webp", "image/png")
+        assert "Accept" in second.headers["Vary"]
+        with Image.open(BytesIO(second.data)) as variant:
+            assert variant.width == 320
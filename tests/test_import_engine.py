@@ -0,0 +1,160 @@
+"""Tests for validated imports with an atomic database swap (app/modules/import_engine.py)."""
+import os
+import sqlite3
+import tempfile
+import zipfile
+
+import pytest
+
+from app.modules import export_engine, import_engine
+from app.modules.database import close_pool, db_version, get_pool
+from app.modules.export_engine import build_export, read_archive_manifest
+from app.modules.import_engine import apply_import, plan_import
+from app.modules.models import init_db, migrate_db
+from tests.conftest import make_room, make_game
+
+HASHED = "a" * 64 + ".png"
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "source-images"
+    for folder, name, content in (("avatars", "a.png", b"avatar"), ("gameImage", HASHED, b"hashed"), ("gameBackground", "c.jpg", b"bg")):
+        (root / folder).mkdir(parents=True, exist_ok=True)
+        (root / folder / name).write_bytes(content)
+    return root
+
+
+@pytest.fixture
+def live(tmp_path):
+    """The database and media library being imported into, with its pool open."""
+    fd, db_path = tempfile.mkstemp(suffix=".db", dir=tmp_path)
+    os.close(fd)
+    init_db(db_path)
+    migrate_db(db_path)
+    get_pool(db_path)
+    image_root = tmp_path / "images"
+    (image_root / "gameBackground" / "variants" / "c.jpg").mkdir(parents=True)
+    (image_root / "gameImage").mkdir()
+    (image_root / "gameBackground" / "c.jpg").write_bytes(b"old")
+    (image_root / "gameImage" / HASHED).write_bytes(b"hashed")  # Same address, same bytes
+    try:
+        yield db_path, image_root
+    finally:
+        close_pool(db_path)
+
+
+def _export(conn, library, tmp_path):
+    make_game(conn, make_room(conn), game_name="Imported Game")
+    db_path = conn.execute("PRAGMA database_list").fetchone()["file"]
+    archive_path = tmp_path / "export.zip"
+    build_export(db_path, str(library), str(archive_path))
+    return str(archive_path)
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+class TestPlanImport:
+    def test_refuses_archives_from_their_listing_alone(self, tmp_path):
+        image_root = tmp_path / "images"
+        escaping = _zip(tmp_path / "escaping.zip", {"highscores.db": b"", "images/avatars/../../../evil.png": b"x"})
+        no_database = _zip(tmp_path / "no-db.zip", {f"images/{folder}/x.png": b"x" for folder in ("avatars", "gameImage", "gameBackground")})
+
+        with pytest.raises(ValueError, match="Unsafe path"):
+            plan_import([escaping], ["zip"], str(image_root))
+        with pytest.raises(ValueError, match="Database file is missing"):
+            plan_import([no_database], ["zip"], str(image_root))
+        assert not os.path.exists(image_root / "evil.png")
+
+    def test_every_image_in_the_manifest_has_to_be_there(self, conn, library, tmp_path):
+        archive_path = _export(conn, library, tmp_path)
+        trimmed = tmp_path / "trimmed.zip"
+        with zipfile.ZipFile(archive_path) as source, zipfile.ZipFile(trimmed, "w") as target:
+            for info in source.infolist():
+                if info.filename != "images/avatars/a.png":
+                    target.writestr(info, source.read(info))
+
+        with pytest.raises(ValueError, match="images/avatars/a.png"):
+            plan_import([str(trimmed)], ["zip"], str(tmp_path / "images"))
+
+    def test_images_deleted_since_the_full_export_stay_deleted(self, conn, library, tmp_path):
+        full_path = _export(conn, library, tmp_path)
+        db_path = conn.execute("PRAGMA database_list").fetchone()["file"]
+        full = read_archive_manifest(full_path, "zip")
+        (library / "avatars" / "a.png").unlink()
+        diff_path = str(tmp_path / "diff.zip")
+        build_export(db_path, str(library), diff_path, previous_manifest=full, differential=True)
+
+        plan = plan_import([diff_path, full_path], ["zip", "zip"], str(tmp_path / "images"))
+
+        assert "images/avatars/a.png" not in plan["images"]
+        assert plan["images"]["images/gameBackground/c.jpg"][0] == 1  # Unchanged - from the full export
+
+
+class TestApplyImport:
+    def test_streams_media_and_swaps_the_migrated_database_in(self, conn, library, live, tmp_path, monkeypatch):
+        monkeypatch.setattr(export_engine, "PROGRESS_INTERVAL", 0)
+        db_path, image_root = live
+        archive_path = _export(conn, library, tmp_path)
+        reports = []
+
+        plan = plan_import([archive_path], ["zip"], str(image_root))
+        result = apply_import(plan, db_path, str(image_root), lambda *report: reports.append(report))
+
+        assert (result["images"], result["unchanged"]) == (2, 1)
+        assert (image_root / "gameBackground" / "c.jpg").read_bytes() == b"bg"
+        assert not (image_root / "gameBackground" / "variants" / "c.jpg").exists()  # Rebuilt on demand
+        live_conn = get_pool(db_path).acquire()
+        try:
+            assert live_conn.execute("SELECT COUNT(*) FROM games WHERE game_name = 'Imported Game'").fetchone()[0] == 1
+            registered = {row[0] for row in live_conn.execute("SELECT path FROM media")}
+            assert "/static/images/avatars/a.png" in registered
+        finally:
+            get_pool(db_path).release(live_conn)
+        assert {message for _, _, message, _ in reports} >= {"Extracting database", "Importing images", "Switching to the imported database"}
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".import") or name.endswith(".tmp")]
+
+    def test_a_database_from_a_newer_app_leaves_the_live_one_alone(self, live, tmp_path):
+        db_path, image_root = live
+        newer = tmp_path / "newer.db"
+        init_db(str(newer))
+        migrate_db(str(newer))
+        newer_conn = sqlite3.connect(newer)
+        newer_conn.execute("UPDATE meta SET value = ? WHERE key = 'db_version'", (str(db_version + 1),))
+        newer_conn.commit()
+        newer_conn.close()
+        archive_path = _zip(tmp_path / "newer.zip", {
+            "highscores.db": newer.read_bytes(),
+            **{f"images/{folder}/x.png": b"x" for folder in ("avatars", "gameImage", "gameBackground")},
+        })
+
+        plan = plan_import([archive_path], ["zip"], str(image_root))
+        with pytest.raises(ValueError, match="newer"):
+            apply_import(plan, db_path, str(image_root))
+
+        assert not (image_root / "avatars" / "x.png").exists()  # Stopped before any media was touched
+        assert not os.path.exists(f"{db_path}.import")
+        live_conn = get_pool(db_path).acquire()
+        assert live_conn.execute("SELECT value FROM meta WHERE key = 'db_version'").fetchone()[0] == str(db_version)
+        get_pool(db_path).release(live_conn)
+
+    def test_a_failed_swap_leaves_the_media_library_alone(self, conn, library, live, tmp_path, monkeypatch):
+        db_path, image_root = live
+        archive_path = _export(conn, library, tmp_path)
+
+        def busy(*args):
+            raise RuntimeError("Database still in use")
+        monkeypatch.setattr(import_engine, "swap_database", busy)
+        plan = plan_import([archive_path], ["zip"], str(image_root))
+        with pytest.raises(RuntimeError):
+            apply_import(plan, db_path, str(image_root))
+
+        assert (image_root / "gameBackground" / "c.jpg").read_bytes() == b"old"
+        assert (image_root / "gameBackground" / "variants" / "c.jpg").exists()
+        assert not (image_root / "avatars").exists()
+        assert not [name for name in os.listdir(tmp_path) if name.startswith("images-import-")]
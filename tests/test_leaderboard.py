@@ -0,0 +1,166 @@
+"""Tests for the materialized leaderboard (app/modules/leaderboard.py).
+
+The incremental path is checked against a from-scratch rebuild: whatever
+order scores arrive in, placing them one at a time must end up with exactly
+the rows rebuild_game_leaderboard computes.
+"""
+import random
+from unittest.mock import patch
+
+from app.modules.leaderboard import (
+    rebuild_game_leaderboard,
+    remove_player_from_leaderboards,
+    get_room_leaderboard,
+    get_game_leaderboard,
+    LEADERBOARD_REBUILD_THRESHOLD,
+)
+from app.modules.games import save_game_to_db
+from app.modules.scores import log_scores_to_db, get_top_scores
+from app.modules.players import delete_player_from_db, toggle_player_score_visibility
+from app.modules.read_cache import invalidate_room_settings
+from tests.conftest import make_room, make_game, make_player
+
+
+def _rows(conn, game_id):
+    return [tuple(row) for row in conn.execute(
+        "SELECT player_id, score_id, score, rank FROM leaderboard WHERE game_id = ? ORDER BY rank", (game_id,)
+    )]
+
+
+def _log(conn, room_id, game_id, player_id, score, second):
+    log_scores_to_db(conn, [{"game_id": game_id, "player_id": player_id, "score": score, "room_id": room_id,
+                             "timestamp": f"2026-01-01 00:{second // 60:02d}:{second % 60:02d}"}])
+
+
+class TestIncrementalLeaderboard:
+    def test_incremental_updates_match_a_rebuild(self, conn):
+        rng = random.Random(8)
+        room_id = make_room(conn)
+        descending = make_game(conn, room_id, game_name="High wins")
+        ascending = make_game(conn, room_id, game_name="Low wins")
+        conn.execute("UPDATE games SET sort_ascending = 'TRUE' WHERE id = ?", (ascending,))
+        conn.execute("UPDATE games SET leaderboard_sort = CASE WHEN sort_ascending = 'TRUE' THEN 'TRUE' ELSE 'FALSE' END")
+        conn.commit()
+        players = [make_player(conn, full_name=f"P{i}", default_alias=f"P{i}") for i in range(6)]
+
+        for second in range(60):
+            for game_id in (descending, ascending):
+                _log(conn, room_id, game_id, rng.choice(players), rng.choice([100, 200, 300, 400, 500]), second)
+
+        for game_id in (descending, ascending):
+            incremental = _rows(conn, game_id)
+            rebuild_game_leaderboard(conn, game_id)
+            assert incremental == _rows(conn, game_id)
+            assert [rank for *_, rank in incremental] == list(range(1, len(incremental) + 1))
+
+        best = conn.execute("SELECT MIN(score) FROM highscores WHERE game_id = ?", (ascending,)).fetchone()[0]
+        assert _rows(conn, ascending)[0][2] == best
+
+    def test_large_writes_rebuild_the_game(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        conn.execute("UPDATE games SET leaderboard_sort = 'FALSE'")
+        players = [make_player(conn, full_name=f"P{i}", default_alias=f"P{i}") for i in range(3)]
+
+        log_scores_to_db(conn, [
+            {"game_id": game_id, "player_id": players[i % 3], "score": i, "room_id": room_id,
+             "timestamp": f"2026-01-01 00:00:{i:02d}"}
+            for i in range(LEADERBOARD_REBUILD_THRESHOLD + 1)
+        ])
+
+        assert [score for _, _, score, _ in _rows(conn, game_id)] == [50, 49, 48]
+
+    def test_deleting_a_player_closes_the_gap(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        conn.execute("UPDATE games SET leaderboard_sort = 'FALSE'")
+        first, second, third = (make_player(conn, full_name=f"P{i}", default_alias=f"P{i}") for i in range(3))
+        for i, (player_id, score) in enumerate([(first, 300), (second, 200), (third, 100)]):
+            _log(conn, room_id, game_id, player_id, score, i)
+
+        with patch("app.modules.players.emit_player_changes"):
+            delete_player_from_db(conn, second)
+
+        assert [(player_id, rank) for player_id, _, _, rank in _rows(conn, game_id)] == [(first, 1), (third, 2)]
+
+    def test_removing_a_player_matches_a_rebuild_without_them(self, conn):
+        room_id = make_room(conn)
+        games = [make_game(conn, room_id, game_name=f"G{i}") for i in range(2)]
+        conn.execute("UPDATE games SET leaderboard_sort = 'FALSE'")
+        players = [make_player(conn, full_name=f"P{i}", default_alias=f"P{i}") for i in range(4)]
+        for i, player_id in enumerate(players):
+            for game_id in games:
+                _log(conn, room_id, game_id, player_id, 100 * (i + 1) if game_id == games[0] else 100 * (4 - i), i)
+
+        remove_player_from_leaderboards(conn, players[1])
+        conn.execute("DELETE FROM highscores WHERE player_id = ?", (players[1],))
+        conn.commit()
+
+        for game_id in games:
+            removed = _rows(conn, game_id)
+            assert players[1] not in [player_id for player_id, *_ in removed]
+            rebuild_game_leaderboard(conn, game_id)
+            assert removed == _rows(conn, game_id)
+
+    def test_hidden_players_are_not_ranked(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        conn.execute("UPDATE games SET leaderboard_sort = 'FALSE'")
+        top, other = (make_player(conn, full_name=f"P{i}", default_alias=f"P{i}") for i in range(2))
+        _log(conn, room_id, game_id, top, 300, 0)
+        _log(conn, room_id, game_id, other, 100, 1)
+
+        with patch("app.modules.players.emit_game_score_update") as mock_update:
+            toggle_player_score_visibility(conn, top, hide=True)
+        mock_update.assert_called_once_with(conn, room_id, game_id)
+        assert [(player_id, rank) for player_id, _, _, rank in _rows(conn, game_id)] == [(other, 1)]
+
+        _log(conn, room_id, game_id, top, 500, 2)  # Still hidden - not placed
+        assert [(player_id, rank) for player_id, _, _, rank in _rows(conn, game_id)] == [(other, 1)]
+
+        with patch("app.modules.players.emit_game_score_update"):
+            toggle_player_score_visibility(conn, top, hide=False)
+        incremental = _rows(conn, game_id)
+        assert [(player_id, score) for player_id, _, score, _ in incremental] == [(top, 500), (other, 100)]
+        rebuild_game_leaderboard(conn, game_id)
+        assert _rows(conn, game_id) == incremental
+
+
+class TestLeaderboardReads:
+    def _room_with_scores(self, conn):
+        room_id = make_room(conn)
+        conn.execute("UPDATE settings SET best_score_per_player = 'TRUE' WHERE id = ?", (room_id,))
+        invalidate_room_settings(room_id)
+        with patch("app.modules.games.emit_message"):
+            _, _, game_id = save_game_to_db(conn, {"room_id": room_id, "game_name": "G", "sort_ascending": "FALSE"})
+        alice = make_player(conn, full_name="Alice", default_alias="ALI")
+        bob = make_player(conn, full_name="Bob", default_alias="BOB")
+        for i, (player_id, score) in enumerate([(alice, 100), (bob, 300), (alice, 500), (bob, 50)]):
+            _log(conn, room_id, game_id, player_id, score, i)
+        return room_id, game_id, alice, bob
+
+    def test_best_score_rooms_list_one_score_per_player(self, conn):
+        room_id, game_id, alice, bob = self._room_with_scores(conn)
+
+        rows = get_top_scores(conn, room_id)
+
+        assert [(row["player_id"], row["score"], row["rank"]) for row in rows] == [(alice, 500, 1), (bob, 300, 2)]
+        page, total = get_game_leaderboard(conn, game_id, offset=1, limit=5)
+        assert [row["score"] for row in page] == [300]
+        assert total == 2
+
+    def test_sort_change_falls_back_to_live_ranking_until_rebuilt(self, conn):
+        room_id, game_id, alice, bob = self._room_with_scores(conn)
+
+        with patch("app.modules.games.emit_message"), \
+             patch("app.modules.games.schedule_leaderboard_rebuild") as mock_schedule:
+            save_game_to_db(conn, {"room_id": room_id, "game_name": "G", "sort_ascending": "TRUE"}, game_id)
+
+        mock_schedule.assert_called_once_with([game_id])
+        stale_rows = _rows(conn, game_id)
+        live = [(row["player_id"], row["score"]) for row in get_room_leaderboard(conn, room_id)]
+        assert live == [(bob, 50), (alice, 100)]
+
+        rebuild_game_leaderboard(conn, game_id)
+        assert _rows(conn, game_id) != stale_rows
+        assert [(row["player_id"], row["score"]) for row in get_room_leaderboard(conn, room_id)] == live
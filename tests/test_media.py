@@ -0,0 +1,117 @@
+"""Tests for the media registry (app/modules/media.py) and content-addressed
+image storage (app/modules/imageProcessor.py)."""
+import hashlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.modules import imageProcessor
+from app.modules.media import cleanup_unreferenced_media, rebuild_media_registry, register_media
+from app.modules.models import migrate_db
+from tests.conftest import make_room, make_game
+
+IMAGE = "/static/images/gameImage/" + "a" * 64 + ".png"
+OTHER = "/static/images/gameImage/legacy_backglass.png"
+
+
+def _media(conn, path):
+    row = conn.execute("SELECT sha256, refcount, released_at FROM media WHERE path = ?", (path,)).fetchone()
+    return tuple(row) if row else None
+
+
+def _set_image(conn, game_id, path):
+    conn.execute("UPDATE games SET game_image = ? WHERE id = ?", (path, game_id))
+    conn.commit()
+
+
+class TestReferenceCounting:
+    def test_triggers_count_every_reference(self, conn):
+        room_id = make_room(conn)
+        first, second = make_game(conn, room_id), make_game(conn, room_id)
+
+        _set_image(conn, first, IMAGE)
+        _set_image(conn, second, IMAGE)
+        assert _media(conn, IMAGE) == ("a" * 64, 2, None)
+
+        _set_image(conn, second, OTHER)
+        assert _media(conn, IMAGE)[1:] == (1, None)
+        assert _media(conn, OTHER) == (None, 1, None)  # Legacy names are registered, just not by hash
+
+        conn.execute("DELETE FROM games WHERE room_id = ?", (room_id,))
+        conn.commit()
+        assert _media(conn, IMAGE)[1] == 0 and _media(conn, IMAGE)[2] is not None
+        assert _media(conn, OTHER)[1] == 0
+
+    def test_external_urls_are_not_registered(self, conn):
+        game_id = make_game(conn, make_room(conn))
+        _set_image(conn, game_id, "https://example.com/backglass.png")
+
+        assert _media(conn, "https://example.com/backglass.png") is None
+
+    def test_migration_counts_existing_references_and_orphans(self, conn, tmp_path):
+        db_path = conn.execute("PRAGMA database_list").fetchone()["file"]
+        game_id = make_game(conn, make_room(conn))
+        _set_image(conn, game_id, IMAGE)
+        for name in [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'media_%'")]:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP TABLE media")
+        conn.execute("UPDATE meta SET value = '11' WHERE key = 'db_version'")
+        conn.commit()
+
+        migrate_db(db_path)
+
+        assert _media(conn, IMAGE)[:2] == ("a" * 64, 1)
+        (tmp_path / "gameImage").mkdir()
+        (tmp_path / "gameImage" / "orphan.png").write_bytes(b"")
+        rebuild_media_registry(conn, str(tmp_path))
+        assert _media(conn, "/static/images/gameImage/orphan.png")[1] == 0
+
+
+class TestCleanup:
+    def test_deletes_only_files_unreferenced_past_the_grace_period(self, conn, tmp_path):
+        folder = tmp_path / "static" / "images" / "gameImage"
+        (folder / "variants" / "old.png").mkdir(parents=True)
+        for name in ("old.png", "new.png", "used.png"):
+            (folder / name).write_bytes(b"png")
+        for name in ("old.png", "new.png"):
+            register_media(conn, f"/static/images/gameImage/{name}")
+        conn.execute("UPDATE media SET released_at = released_at - 100 WHERE path LIKE '%/old.png'")
+        _set_image(conn, make_game(conn, make_room(conn)), "/static/images/gameImage/used.png")
+
+        assert cleanup_unreferenced_media(conn, str(tmp_path), grace_seconds=50) == 1
+
+        assert sorted(path.name for path in folder.iterdir()) == ["new.png", "used.png", "variants"]
+        assert not (folder / "variants" / "old.png").exists()
+        assert _media(conn, "/static/images/gameImage/old.png") is None
+        assert _media(conn, "/static/images/gameImage/new.png") is not None
+
+
+class TestContentAddressedStore:
+    @pytest.fixture
+    def jobs(self, monkeypatch):
+        jobs = []
+
+        def run_inline(kind, fn, *args):
+            jobs.append(kind)
+            return fn(*args)
+
+        monkeypatch.setattr(imageProcessor, "run_image_job", run_inline)
+        monkeypatch.setattr(imageProcessor, "_variant_spec", None)
+        return jobs
+
+    def test_same_content_is_processed_and_stored_once(self, jobs, tmp_path):
+        buffer = BytesIO()
+        Image.new("RGB", (40, 20)).save(buffer, format="PNG")
+        data = buffer.getvalue()
+        reused_before = imageProcessor.get_store_stats()["reused"]
+
+        first = imageProcessor.save_image(data, "1_backglass.png", str(tmp_path), "/static/images/gameImage")
+        second = imageProcessor.save_image(data, "2_backglass.png", str(tmp_path), "/static/images/gameImage")
+        rotated = imageProcessor.rotate_image_90(data, "1_playfield.png", str(tmp_path), "/static/images/gameImage")
+
+        assert first == second != rotated  # Same source, different transforms: a different file
+        assert jobs == ["save", "rotate"]
+        assert imageProcessor.get_store_stats()["reused"] - reused_before == 1
+        digest = hashlib.sha256(data).hexdigest()
+        assert first.endswith(f"/{imageProcessor.content_address(digest, imageProcessor.build_transforms())}.png")
@@ -0,0 +1,190 @@
+"""Schema/migration tests (app/modules/models.py).
+
+The index tests run EXPLAIN QUERY PLAN over the exact query shapes the app
+issues on its hot paths, so an index that stops matching its query (a column
+reordered, a WHERE clause rewritten) fails here instead of silently turning
+back into a full table scan in production.
+"""
+import pytest
+
+from app.modules.database import db_version
+from app.modules.models import HOT_INDEXES, SCORE_IDENTITY_INDEX, migrate_db
+from tests.conftest import make_room, make_game, make_player
+
+HOT_QUERIES = {
+    # user_scoreboard / get_high_scores (get_top_scores: each game's top scores_per_card)
+    "room top scores": ("""
+        SELECT * FROM (
+            SELECT h.game_id, p.full_name, p.default_alias, h.score, h.event, h.wins, h.losses, h.timestamp,
+                ROW_NUMBER() OVER (
+                    PARTITION BY h.game_id
+                    ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC, h.id ASC
+                ) AS rank
+            FROM highscores h
+            JOIN players p ON h.player_id = p.id
+            JOIN settings s ON s.id = h.room_id
+            JOIN games g ON g.id = h.game_id
+            WHERE h.room_id = ?
+        )
+        WHERE ? = 0 OR rank <= ?
+        ORDER BY game_id, rank;
+    """, "idx_highscores_room_game_score"),
+    # get_room_leaderboard (rooms listing each player's best score)
+    "room leaderboard": ("""
+        SELECT l.game_id, p.full_name, h.score, h.timestamp, l.rank
+        FROM games g
+        JOIN leaderboard l ON l.game_id = g.id
+        JOIN highscores h ON h.id = l.score_id
+        JOIN players p ON p.id = l.player_id
+        WHERE g.room_id = ? AND l.rank > ? AND l.rank <= ?
+        ORDER BY l.game_id, l.rank;
+    """, "idx_leaderboard_game_rank"),
+    # update_leaderboards placing a player's new best
+    "leaderboard placement": ("""
+        SELECT COUNT(*) FROM leaderboard WHERE game_id = ? AND (score > ? OR score = ?);
+    """, "idx_leaderboard_game_score"),
+    # publicCommands.php getScores2
+    "getScores2": ("""
+        SELECT h.id, p.full_name, p.default_alias, h.game_id, h.event, h.timestamp, h.wins, h.losses, h.score
+        FROM highscores h
+        JOIN players p ON h.player_id = p.id
+        WHERE h.room_id = ?
+        ORDER BY h.timestamp DESC;
+    """, "idx_highscores_room_timestamp"),
+    # Score list pushed by game_score_update after every new score
+    "game score list": ("""
+        SELECT p.full_name, p.default_alias, h.score, h.timestamp, h.wins, h.losses
+        FROM highscores h
+        JOIN players p ON h.player_id = p.id
+        JOIN games g ON g.id = h.game_id
+        WHERE h.game_id = ?
+        ORDER BY CASE WHEN g.sort_ascending = 'TRUE' THEN h.score ELSE -h.score END ASC;
+    """, "idx_highscores_game_score"),
+    # INSERT OR IGNORE dedup (log_scores_to_db) probes the unique identity index
+    "score identity": ("""
+        SELECT id FROM highscores
+        WHERE game_id = ? AND player_id = ? AND score = ? AND timestamp = ? AND room_id = ?;
+    """, "ux_highscores_identity"),
+    # get_player_from_db
+    "player scores": ("""
+        SELECT g.game_name, h.score, h.timestamp, h.wins, h.losses
+        FROM highscores h
+        JOIN games g ON h.game_id = g.id
+        WHERE h.player_id = ?
+        ORDER BY h.timestamp DESC;
+    """, "idx_highscores_player_timestamp"),
+    # webhook_log_score / import_vpin_game_into_room game mapping
+    "vpin game mapping": ("""
+        SELECT vpin_games.arcadescore_game_id
+        FROM vpin_games
+        JOIN games ON vpin_games.arcadescore_game_id = games.id
+        WHERE vpin_games.server_url = ? AND vpin_games.vpin_game_id = ? AND games.room_id = ?;
+    """, "idx_vpin_games_server_game"),
+    # webhook_delete_game
+    "vpin game by id": ("""
+        SELECT arcadescore_game_id FROM vpin_games WHERE vpin_game_id = ?;
+    """, "idx_vpin_games_vpin_game_id"),
+    # webhook_log_score's per-server player map
+    "vpin player map": ("""
+        SELECT arcadescore_player_id, vpin_player_id FROM vpin_players WHERE server_url = ?;
+    """, "idx_vpin_players_server_player"),
+    # webhook_player
+    "vpin player lookup": ("""
+        SELECT arcadescore_player_id FROM vpin_players WHERE vpin_player_id = ? AND server_url = ?
+    """, "idx_vpin_players_server_player"),
+    # webhook_delete_player
+    "vpin player by id": ("""
+        SELECT arcadescore_player_id FROM vpin_players WHERE vpin_player_id = ?;
+    """, "idx_vpin_players_vpin_player_id"),
+    # get_player_from_db
+    "player aliases": ("""
+        SELECT alias FROM aliases WHERE player_id = ?
+    """, "idx_aliases_player_id"),
+    # publicCommands.php addScore name resolution
+    "player by alias": ("""
+        SELECT id FROM players WHERE default_alias = ?
+    """, "idx_players_default_alias"),
+    # Every room's game list
+    "room games": ("""
+        SELECT id, game_name, tags, hidden FROM games WHERE room_id = ? ORDER BY game_sort ASC;
+    """, "idx_games_room_sort"),
+    # _get_room_webhook
+    "room webhook": ("""
+        SELECT server_url, webhook_token FROM vpin_webhooks WHERE room_id = ? LIMIT 1;
+    """, "idx_vpin_webhooks_room_id"),
+}
+
+
+def _index_names(conn):
+    return {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+class TestHotIndexes:
+    def test_fresh_install_has_every_index(self, conn):
+        assert {name for name, _, _ in HOT_INDEXES} <= _index_names(conn)
+
+    @pytest.mark.parametrize("label", sorted(HOT_QUERIES))
+    def test_hot_query_uses_its_index(self, conn, label):
+        sql, expected_index = HOT_QUERIES[label]
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", (1,) * sql.count("?")).fetchall()
+        details = " | ".join(row["detail"] for row in plan)
+        assert expected_index in details, f"{label}: {details}"
+
+    def test_migration_builds_indexes_on_an_existing_database(self, conn, tmp_path):
+        """An install upgraded from version 5 (no secondary indexes at all) gets
+        the same set a fresh install starts with."""
+        db_path = conn.execute("PRAGMA database_list").fetchone()["file"]
+        for name, _, _ in HOT_INDEXES:
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute("UPDATE meta SET value = '5' WHERE key = 'db_version'")
+        conn.commit()
+
+        migrate_db(db_path)
+
+        assert {name for name, _, _ in HOT_INDEXES} <= _index_names(conn)
+        version = conn.execute("SELECT value FROM meta WHERE key = 'db_version'").fetchone()["value"]
+        assert int(version) == db_version
+
+
+class TestScoreIdentityIndex:
+    def test_migration_collapses_duplicates_and_adds_unique_index(self, conn):
+        db_path = conn.execute("PRAGMA database_list").fetchone()["file"]
+        conn.execute(f"DROP INDEX {SCORE_IDENTITY_INDEX[0]}")
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        for _ in range(3):
+            conn.execute(
+                "INSERT INTO highscores (game_id, player_id, score, timestamp, room_id) VALUES (?, ?, 100, '2026-01-01 00:00:00', ?)",
+                (game_id, player_id, room_id),
+            )
+        conn.execute("UPDATE meta SET value = '7' WHERE key = 'db_version'")
+        conn.commit()
+
+        migrate_db(db_path)
+
+        assert conn.execute("SELECT COUNT(*) FROM highscores").fetchone()[0] == 1
+        index = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (SCORE_IDENTITY_INDEX[0],)).fetchone()
+        assert index["sql"].startswith("CREATE UNIQUE INDEX")
+
+
+class TestLeaderboardMigration:
+    def test_migration_builds_leaderboards_from_existing_scores(self, conn):
+        db_path = conn.execute("PRAGMA database_list").fetchone()["file"]
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        for second, score in enumerate([100, 300, 200]):
+            conn.execute(
+                "INSERT INTO highscores (game_id, player_id, score, timestamp, room_id) VALUES (?, ?, ?, ?, ?)",
+                (game_id, player_id, score, f"2026-01-01 00:00:0{second}", room_id),
+            )
+        conn.execute("DROP TABLE leaderboard")
+        conn.execute("UPDATE meta SET value = '10' WHERE key = 'db_version'")
+        conn.commit()
+
+        migrate_db(db_path)
+
+        rows = conn.execute("SELECT player_id, score, rank FROM leaderboard WHERE game_id = ?", (game_id,)).fetchall()
+        assert [tuple(row) for row in rows] == [(player_id, 300, 1)]
+        assert conn.execute("SELECT leaderboard_sort FROM games WHERE id = ?", (game_id,)).fetchone()[0] == "FALSE"
@@ -0,0 +1,117 @@
+"""Tests for the in-process read cache (app/modules/read_cache.py).
+
+The cache only pays off if writers keep it honest, so most of these go
+through the real write paths (linking a player, deleting a game) and check
+the next read sees the change.
+"""
+from unittest.mock import patch, Mock
+
+from app.modules.read_cache import (
+    ReadCache,
+    get_read_cache_stats,
+    get_room_settings,
+    get_vpin_game_mapping,
+    get_vpin_player_map,
+)
+from app.modules.games import delete_game_from_db
+from app.modules.players import link_vpin_player
+from app.modules.webhooks import webhook_log_score
+from tests.conftest import make_room, make_game, make_webhook, make_player, link_vpin_game
+
+SERVER = "http://vpin.local:8089/"
+
+
+def _counts(*namespaces):
+    """(hits, misses) per namespace - the counters live as long as the process,
+    so tests compare before/after."""
+    stats = get_read_cache_stats()["namespaces"]
+    return {name: (stats.get(name, {}).get("hits", 0), stats.get(name, {}).get("misses", 0)) for name in namespaces}
+
+
+def _delta(before, after):
+    return {name: (after[name][0] - before[name][0], after[name][1] - before[name][1]) for name in before}
+
+
+class TestReadCache:
+    def test_evicts_the_least_recently_used_entry(self):
+        cache = ReadCache(max_entries=2)
+        cache.get(("rooms", 1), lambda: "one")
+        cache.get(("rooms", 2), lambda: "two")
+        cache.get(("rooms", 1), lambda: "reloaded")  # 1 is now the most recent
+        cache.get(("rooms", 3), lambda: "three")
+
+        assert cache.get(("rooms", 1), lambda: "reloaded") == "one"
+        assert cache.get(("rooms", 2), lambda: "reloaded") == "reloaded"
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["namespaces"]["rooms"]["evictions"] == 2
+        assert stats["namespaces"]["rooms"]["hits"] == 2
+
+    def test_misses_are_not_cached_and_prefixes_invalidate(self):
+        cache = ReadCache()
+        assert cache.get(("players", SERVER), lambda: None) is None
+        assert cache.get(("players", SERVER), lambda: {7: 1}) == {7: 1}
+        cache.get(("players", "http://other/"), lambda: {8: 2})
+
+        cache.invalidate("players", SERVER)
+
+        assert cache.get(("players", SERVER), lambda: {7: 3}) == {7: 3}
+        assert cache.get(("players", "http://other/"), lambda: {}) == {8: 2}
+
+
+class TestCachedReads:
+    def test_string_and_int_room_ids_share_an_entry(self, conn):
+        room_id = make_room(conn)
+        before = _counts("room_settings")
+
+        get_room_settings(conn, room_id)
+        settings = get_room_settings(conn, str(room_id))
+
+        assert settings["id"] == room_id
+        assert _delta(before, _counts("room_settings")) == {"room_settings": (1, 1)}
+
+    @patch("app.modules.http_client.get")
+    def test_repeat_score_webhooks_are_served_from_the_cache(self, mock_get, conn):
+        room_id = make_room(conn)
+        make_webhook(conn, room_id, webhook_token="tok")
+        game_id = make_game(conn, room_id)
+        link_vpin_game(conn, room_id, game_id, vpin_game_id=42)
+        player_id = make_player(conn)
+        with patch("app.modules.players.emit_player_changes"):
+            link_vpin_player(conn, {"server_url": SERVER, "players": [
+                {"arcadescore_player_id": player_id, "vpin_player_ids": [7]},
+            ]})
+        before = _counts("room_webhook", "vpin_game", "vpin_players")
+
+        for score in (100, 200):
+            mock_get.return_value = Mock(raise_for_status=Mock(), json=Mock(return_value={"scores": [
+                {"player": {"id": 7}, "score": score, "createdAt": f"2026-08-19T12:00:0{score // 100}Z"},
+            ]}))
+            with patch("app.modules.scores.emit_message"):
+                assert webhook_log_score(conn, {"roomID": room_id, "id": 42, "token": "tok"}, max_attempts=1)["success"]
+
+        delta = _delta(before, _counts("room_webhook", "vpin_game", "vpin_players"))
+        assert all(misses == 1 and hits >= 1 for hits, misses in delta.values()), delta
+
+
+class TestWriteInvalidation:
+    def test_linking_a_player_updates_the_server_player_map(self, conn):
+        first, second = make_player(conn, full_name="A", default_alias="AAA"), make_player(conn, full_name="B", default_alias="BBB")
+        with patch("app.modules.players.emit_player_changes"):
+            link_vpin_player(conn, {"server_url": SERVER, "players": [{"arcadescore_player_id": first, "vpin_player_ids": [1]}]})
+            assert get_vpin_player_map(conn, SERVER) == {1: first}
+
+            link_vpin_player(conn, {"server_url": SERVER, "players": [{"arcadescore_player_id": second, "vpin_player_ids": [2]}]})
+
+        assert get_vpin_player_map(conn, SERVER) == {1: first, 2: second}
+
+    def test_deleting_a_game_drops_its_vpin_mapping(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        link_vpin_game(conn, room_id, game_id, vpin_game_id=42)
+        assert get_vpin_game_mapping(conn, SERVER, 42, room_id) == game_id
+
+        with patch("app.modules.games.emit_message"):
+            delete_game_from_db(conn, game_id)
+
+        assert get_vpin_game_mapping(conn, SERVER, 42, room_id) is None
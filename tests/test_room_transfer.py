@@ -0,0 +1,127 @@
+"""Tests for per-room NDJSON export/import (app/modules/room_transfer.py)."""
+import gzip
+import io
+import json
+import sqlite3
+
+import pytest
+
+from app.modules.models import init_db, migrate_db
+from app.modules.room_transfer import export_room, import_room, open_room_export
+from tests.conftest import make_room, make_game, make_player, link_vpin_game, link_vpin_player
+
+
+@pytest.fixture
+def target(tmp_path):
+    """A second instance's database, for the room to move into."""
+    db_path = str(tmp_path / "target.db")
+    init_db(db_path)
+    migrate_db(db_path)
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+
+def _room_with_scores(conn):
+    room_id = make_room(conn, user="moving", room_name="Moving Room")
+    make_room(conn, user="staying", room_name="Staying Room")
+    game_id = make_game(conn, room_id, game_name="Medieval Madness")
+    other_game_id = make_game(conn, room_id, game_name="Attack from Mars")
+    alice = make_player(conn, full_name="Alice", default_alias="ALI")
+    bob = make_player(conn, full_name="Bob", default_alias="BOB")
+    make_player(conn, full_name="Nobody Here", default_alias="NOB")  # No scores in the room - stays behind
+    conn.execute("INSERT INTO aliases (player_id, alias) VALUES (?, 'ACE')", (alice,))
+    link_vpin_game(conn, room_id, game_id, "vp-game-1")
+    link_vpin_player(conn, alice, "vp-alice")
+    conn.executemany("""
+        INSERT INTO highscores (room_id, game_id, player_id, score, timestamp) VALUES (?, ?, ?, ?, ?)
+    """, [(room_id, game_id, alice, 1000, "2024-01-01 10:00:00"),
+          (room_id, game_id, bob, 2000, "2024-01-01 11:00:00"),
+          (room_id, other_game_id, bob, 500, "2024-01-02 10:00:00")])
+    conn.commit()
+    return room_id
+
+
+def _export(conn, room_id, compress=False):
+    return b"".join(export_room(conn, room_id, compress=compress))
+
+
+class TestExportRoom:
+    def test_is_one_line_per_record_with_scores_as_arrays(self, conn):
+        room_id = _room_with_scores(conn)
+
+        lines = [json.loads(line) for line in _export(conn, room_id).decode("utf-8").splitlines()]
+
+        assert lines[0]["type"] == "header"
+        assert lines[-1] == {"type": "end", "scores": 3}
+        types = [line["type"] for line in lines if isinstance(line, dict)]
+        assert types.count("game") == 2 and types.count("player") == 2  # Only the players with scores here
+        scores = [line for line in lines if isinstance(line, list)]
+        assert [score[2] for score in scores] == [1000, 2000, 500]
+        assert conn.execute("SELECT 1").fetchone()  # The read transaction is over
+
+    def test_gzipped_export_reads_back_the_same(self, conn):
+        room_id = _room_with_scores(conn)
+
+        compressed = _export(conn, room_id, compress=True)
+
+        assert compressed[:2] == b"\x1f\x8b"
+        plain = [line for line in gzip.decompress(compressed).splitlines() if b"exported_at" not in line]
+        read_back = [line.rstrip(b"\n") for line in open_room_export(io.BytesIO(compressed)) if b"exported_at" not in line]
+        assert read_back == plain
+
+
+class TestImportRoom:
+    def test_remaps_ids_and_matches_players_by_name(self, conn, target):
+        room_id = _room_with_scores(conn)
+        make_room(target, user="someone-else")
+        existing_bob = make_player(target, full_name="Bob", default_alias="BBB")
+
+        result = import_room(target, open_room_export(io.BytesIO(_export(conn, room_id, compress=True))))
+
+        assert (result["games"], result["players_added"], result["players_matched"], result["scores"]) == (2, 1, 1, 3)
+        room = target.execute("SELECT * FROM settings WHERE id = ?", (result["room_id"],)).fetchone()
+        assert (room["user"], room["room_name"]) == ("moving", "Moving Room")
+        bob_scores = target.execute("""
+            SELECT g.game_name, h.score FROM highscores h JOIN games g ON g.id = h.game_id
+            WHERE h.player_id = ? ORDER BY h.score
+        """, (existing_bob,)).fetchall()
+        assert [tuple(row) for row in bob_scores] == [("Attack from Mars", 500), ("Medieval Madness", 2000)]
+        alice = target.execute("SELECT id FROM players WHERE full_name = 'Alice'").fetchone()["id"]
+        assert target.execute("SELECT alias FROM aliases WHERE player_id = ?", (alice,)).fetchone()["alias"] == "ACE"
+        assert target.execute("SELECT vpin_player_id FROM vpin_players WHERE arcadescore_player_id = ?", (alice,)).fetchone()[0] == "vp-alice"
+        assert target.execute("""
+            SELECT COUNT(*) FROM vpin_games vg JOIN games g ON g.id = vg.arcadescore_game_id WHERE g.room_id = ?
+        """, (result["room_id"],)).fetchone()[0] == 1
+        assert target.execute("""
+            SELECT COUNT(*) FROM leaderboard l JOIN games g ON g.id = l.game_id WHERE g.room_id = ?
+        """, (result["room_id"],)).fetchone()[0] == 3
+
+    def test_a_taken_user_is_refused_unless_overridden(self, conn):
+        room_id = _room_with_scores(conn)
+        exported = _export(conn, room_id)
+
+        with pytest.raises(ValueError, match="already exists"):
+            import_room(conn, io.BytesIO(exported))
+        result = import_room(conn, io.BytesIO(exported), user="copy", room_name="Copy")
+
+        assert result["players_matched"] == 2 and result["players_added"] == 0
+        assert conn.execute("SELECT COUNT(*) FROM highscores WHERE room_id = ?", (result["room_id"],)).fetchone()[0] == 3
+
+    def test_a_truncated_export_leaves_nothing_behind(self, conn, target):
+        room_id = _room_with_scores(conn)
+        truncated = _export(conn, room_id).rsplit(b"\n", 2)[0] + b"\n"  # Missing its "end" line
+        cut_gzip = _export(conn, room_id, compress=True)[:-20]
+        tables = ("settings", "games", "players", "aliases", "highscores")
+        before = [target.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables]
+
+        with pytest.raises(ValueError, match="incomplete"):
+            import_room(target, io.BytesIO(truncated))
+        with pytest.raises(ValueError, match="complete"):
+            import_room(target, open_room_export(io.BytesIO(cut_gzip)))
+
+        assert [target.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables] == before
+        assert target.execute("PRAGMA temp_store").fetchone()[0] == 0  # Restored
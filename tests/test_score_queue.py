@@ -0,0 +1,130 @@
+"""Tests for the score webhook queue (app/modules/score_queue.py).
+
+The workers themselves are just a loop around process_next_event(), so these
+drive the queue synchronously: enqueue, then process one event at a time, with
+a connection pool over the test database for process_next_event to borrow from.
+"""
+import time
+from unittest.mock import patch, Mock
+
+import pytest
+import requests
+
+from app.modules.database import ConnectionPool
+from app.modules.score_queue import (
+    enqueue_score_event,
+    get_event_status,
+    process_next_event,
+    recover_interrupted_events,
+    SCORE_QUEUE_DEFAULTS,
+)
+from tests.conftest import make_room, make_game, make_webhook, make_player, link_vpin_game, link_vpin_player
+
+
+@pytest.fixture
+def pool(conn):
+    pool = ConnectionPool(conn.execute("PRAGMA database_list").fetchone()["file"], size=2)
+    try:
+        yield pool
+    finally:
+        pool.close_all()
+
+
+def _setup_room(conn):
+    room_id = make_room(conn)
+    make_webhook(conn, room_id, webhook_token="tok")
+    game_id = make_game(conn, room_id)
+    link_vpin_game(conn, room_id, game_id, vpin_game_id=42)
+    player_id = make_player(conn)
+    link_vpin_player(conn, player_id, vpin_player_id=7)
+    return room_id, game_id
+
+
+def _score_response(score):
+    resp = Mock()
+    resp.raise_for_status = Mock()
+    resp.json.return_value = {"scores": [{
+        "player": {"id": 7}, "score": score, "createdAt": "2026-08-19T12:00:00Z",
+    }]}
+    return resp
+
+
+class TestScoreQueue:
+    @patch("app.modules.http_client.get")
+    def test_queued_event_is_processed_to_done(self, mock_get, conn, pool):
+        room_id, game_id = _setup_room(conn)
+        mock_get.return_value = _score_response(1000)
+
+        event_id = enqueue_score_event(conn, {"roomID": room_id, "id": 42, "token": "tok"})
+        assert get_event_status(conn, event_id)["status"] == "pending"
+
+        with patch("app.modules.webhooks.emit_message"):
+            assert process_next_event(pool) is True
+
+        event = get_event_status(conn, event_id)
+        assert event["status"] == "done"
+        assert event["attempts"] == 1
+        assert "payload" not in event  # Carries the webhook token
+        assert conn.execute("SELECT COUNT(*) FROM highscores WHERE game_id = ?", (game_id,)).fetchone()[0] == 1
+        assert process_next_event(pool) is False
+
+    @patch("app.modules.http_client.get")
+    def test_unreachable_server_is_retried_with_backoff(self, mock_get, conn, pool):
+        room_id, _ = _setup_room(conn)
+        mock_get.side_effect = requests.ConnectionError("connection refused")
+
+        event_id = enqueue_score_event(conn, {"roomID": room_id, "id": 42, "token": "tok"})
+        before = time.time()
+        process_next_event(pool)
+
+        event = get_event_status(conn, event_id)
+        assert event["status"] == "pending"
+        assert event["next_attempt_at"] >= before + SCORE_QUEUE_DEFAULTS["SCORE_QUEUE_RETRY_BASE_SECONDS"]
+        assert "connection refused" in event["last_error"]
+        assert process_next_event(pool) is False  # Not due yet
+
+    @patch("app.modules.http_client.get")
+    def test_event_fails_after_max_attempts(self, mock_get, conn, pool):
+        room_id, _ = _setup_room(conn)
+        mock_get.return_value = Mock(raise_for_status=Mock(), json=Mock(return_value={"scores": []}))
+        config = {**SCORE_QUEUE_DEFAULTS, "SCORE_QUEUE_MAX_ATTEMPTS": 2, "SCORE_QUEUE_RETRY_BASE_SECONDS": 0}
+
+        event_id = enqueue_score_event(conn, {"roomID": room_id, "id": 42, "token": "tok"})
+        process_next_event(pool, config)
+        assert get_event_status(conn, event_id)["status"] == "pending"
+        process_next_event(pool, config)
+
+        event = get_event_status(conn, event_id)
+        assert event["status"] == "failed"
+        assert event["attempts"] == 2
+        assert "No new scores" in event["last_error"]
+        health = conn.execute("SELECT last_error FROM vpin_webhooks WHERE room_id = ?", (room_id,)).fetchone()
+        assert "No new scores" in health["last_error"]
+
+    @patch("app.modules.http_client.get")
+    def test_no_connection_is_held_during_the_fetch(self, mock_get, conn, pool):
+        room_id, _ = _setup_room(conn)
+        in_use = []
+        def fetch(*args, **kwargs):
+            in_use.append(pool.stats()["in_use"])
+            return _score_response(1000)
+        mock_get.side_effect = fetch
+
+        event_id = enqueue_score_event(conn, {"roomID": room_id, "id": 42, "token": "tok"})
+        with patch("app.modules.webhooks.emit_message"):
+            process_next_event(pool)
+
+        assert in_use == [0]
+        assert get_event_status(conn, event_id)["status"] == "done"
+        assert pool.stats()["in_use"] == 0
+
+    def test_events_interrupted_mid_processing_are_requeued(self, conn):
+        room_id, _ = _setup_room(conn)
+        event_id = enqueue_score_event(conn, {"roomID": room_id, "id": 42, "token": "tok"})
+        conn.execute("UPDATE webhook_events SET status = 'processing', attempts = 1 WHERE id = ?", (event_id,))
+        conn.commit()
+
+        assert recover_interrupted_events(conn) == 1
+        event = get_event_status(conn, event_id)
+        assert event["status"] == "pending"
+        assert event["attempts"] == 1
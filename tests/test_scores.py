@@ -0,0 +1,300 @@
+"""Tests for score logging (app/modules/scores.py)."""
+from unittest.mock import patch
+
+from app.modules.scores import (
+    log_scores_to_db,
+    log_score_to_db,
+    ingest_score_batch,
+    emit_new_scores,
+    build_game_score_payload,
+    get_top_scores,
+    MAX_DELTA_SCORES,
+)
+from app.modules.read_cache import invalidate_room_settings
+from tests.conftest import make_room, make_game, make_player
+
+
+def _score(game_id, player_id, room_id, score, timestamp="2026-08-19 12:00:00"):
+    return {"game_id": game_id, "player_id": player_id, "score": score, "timestamp": timestamp, "room_id": room_id}
+
+
+class TestLogScoresToDb:
+    def test_returns_only_the_rows_that_were_new(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        log_scores_to_db(conn, [_score(game_id, player_id, room_id, 100)])
+
+        success, _, new_scores = log_scores_to_db(conn, [
+            _score(game_id, player_id, room_id, 100),  # Already logged
+            _score(game_id, player_id, room_id, 200),
+            _score(game_id, player_id, room_id, 200),  # Repeated within the batch
+            _score(game_id, player_id, room_id, 300, timestamp="2026-08-19 12:05:00"),
+        ])
+
+        assert success is True
+        assert [row["score"] for row in new_scores] == [200, 300]
+        assert all(row["id"] for row in new_scores)
+        assert conn.execute("SELECT COUNT(*) FROM highscores").fetchone()[0] == 3
+        assert not conn.in_transaction
+
+    def test_invalid_entries_are_skipped(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+
+        success, _, new_scores = log_scores_to_db(conn, [
+            {"game_id": None, "player_id": player_id, "score": 1, "room_id": room_id},
+            _score(game_id, player_id, room_id, 50),
+        ])
+
+        assert success is True
+        assert len(new_scores) == 1
+
+    def test_a_joined_transaction_is_left_to_the_caller(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        conn.execute("BEGIN IMMEDIATE;")
+        player_id = conn.execute("INSERT INTO players (full_name, default_alias) VALUES ('New', 'NEW')").lastrowid
+
+        success, _, new_scores = log_scores_to_db(conn, [_score(game_id, player_id, room_id, 100)])
+
+        assert success is True and len(new_scores) == 1
+        assert conn.in_transaction
+        conn.rollback()
+        assert conn.execute("SELECT COUNT(*) FROM highscores").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM players WHERE default_alias = 'NEW'").fetchone()[0] == 0
+
+    def test_single_score_reports_duplicates(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+
+        assert log_score_to_db(conn, _score(game_id, player_id, room_id, 100)) == (True, "Score logged successfully!")
+        assert log_score_to_db(conn, _score(game_id, player_id, room_id, 100)) == (False, "Score already logged")
+
+
+class TestIngestScoreBatch:
+    def test_batch_resolves_players_and_emits_once_per_game(self, conn):
+        room_id = make_room(conn)
+        game_a = make_game(conn, room_id, game_name="A")
+        game_b = make_game(conn, room_id, game_name="B")
+        existing = make_player(conn, full_name="Existing", default_alias="EXI")
+
+        entries = [
+            {"gameID": game_a, "playerName": "EXI", "score": 100},
+            {"gameID": game_a, "playerID": existing, "score": 200, "timestamp": "2026-08-19 12:00:00"},
+            {"gameID": game_a, "playerName": "NEW", "score": 300},
+            {"gameID": game_b, "playerName": "NEW", "score": 400, "wins": 2},
+        ]
+        with patch("app.modules.scores.emit_message") as mock_emit:
+            result = ingest_score_batch(conn, room_id, entries)
+
+        assert result["success"] is True
+        assert result["inserted"] == 4
+        assert result["players_created"] == 1
+        assert result["rejected"] == []
+        new_player = conn.execute("SELECT id FROM players WHERE default_alias = 'NEW'").fetchone()["id"]
+        assert conn.execute("SELECT COUNT(*) FROM highscores WHERE player_id = ?", (new_player,)).fetchone()[0] == 2
+        assert conn.execute("SELECT wins FROM highscores WHERE score = 400").fetchone()["wins"] == 2
+
+        score_updates = [c.args[1]["gameID"] for c in mock_emit.call_args_list if c.args[0] == "game_score_delta"]
+        assert sorted(score_updates) == sorted([game_a, game_b])
+
+    def test_bad_entries_are_rejected_without_blocking_the_rest(self, conn):
+        room_id = make_room(conn)
+        other_room = make_room(conn, user="other")
+        game_id = make_game(conn, room_id)
+        foreign_game = make_game(conn, other_room)
+
+        result = ingest_score_batch(conn, room_id, [
+            {"gameID": game_id, "playerName": "AAA", "score": 10},
+            {"gameID": foreign_game, "playerName": "AAA", "score": 10},
+            {"gameID": game_id, "playerID": 9999, "score": 10},
+            {"gameID": game_id, "score": 10},
+            {"gameID": game_id, "playerName": "AAA", "score": "lots"},
+        ])
+
+        assert result["inserted"] == 1
+        assert [r["index"] for r in result["rejected"]] == [1, 2, 3, 4]
+
+    def test_bad_wins_are_rejected_and_the_batch_still_commits(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+
+        result = ingest_score_batch(conn, room_id, [
+            {"gameID": game_id, "playerName": "AAA", "score": 10, "wins": "abc"},
+            {"gameID": game_id, "playerName": "BBB", "score": 20, "losses": 1},
+        ])
+
+        assert [r["index"] for r in result["rejected"]] == [0]
+        assert (result["inserted"], result["duplicates"], result["players_created"]) == (1, 0, 1)
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM players WHERE default_alias = 'AAA'").fetchone()[0] == 0
+
+    def test_resending_a_batch_inserts_nothing(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        entries = [{"gameID": game_id, "playerName": "AAA", "score": 10, "timestamp": "2026-08-19 12:00:00"}]
+
+        ingest_score_batch(conn, room_id, entries)
+        with patch("app.modules.scores.emit_message") as mock_emit:
+            result = ingest_score_batch(conn, room_id, entries)
+
+        assert result["inserted"] == 0
+        assert result["duplicates"] == 1
+        mock_emit.assert_not_called()
+
+
+class TestScoreDeltas:
+    def test_delta_ranks_match_the_full_list(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        log_scores_to_db(conn, [_score(game_id, player_id, room_id, s, timestamp=f"2026-01-01 00:00:0{i}")
+                                for i, s in enumerate([500, 300, 100])])
+        base = build_game_score_payload(conn, room_id, game_id)["version"]
+
+        _, _, new_scores = log_scores_to_db(conn, [
+            _score(game_id, player_id, room_id, 400, timestamp="2026-01-02 00:00:00"),
+            _score(game_id, player_id, room_id, 300, timestamp="2026-01-02 00:00:01"),  # Ties sort oldest first
+            _score(game_id, player_id, room_id, 900, timestamp="2026-01-02 00:00:02"),
+        ])
+        with patch("app.modules.scores.emit_message") as mock_emit:
+            emit_new_scores(conn, new_scores)
+
+        event_name, delta = mock_emit.call_args.args
+        assert event_name == "game_score_delta"
+        assert delta["baseVersion"] == base
+        assert delta["version"] == base + 3
+        assert [(s["score"], s["rank"]) for s in delta["scores"]] == [(900, 1), (400, 3), (300, 5)]
+
+        full = build_game_score_payload(conn, room_id, game_id)
+        assert full["version"] == delta["version"]
+        assert [s["score"] for s in full["scores"]] == [900, 500, 400, 300, 300, 100]
+
+    def test_a_later_write_doesnt_shift_the_ranks(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        _, _, new_scores = log_scores_to_db(conn, [_score(game_id, player_id, room_id, 400)])
+        log_scores_to_db(conn, [_score(game_id, player_id, room_id, 900)])  # Lands before the emit
+
+        with patch("app.modules.scores.emit_message") as mock_emit:
+            emit_new_scores(conn, new_scores)
+
+        delta = mock_emit.call_args.args[1]
+        assert (delta["baseVersion"], delta["version"]) == (0, 1)
+        assert [(s["score"], s["rank"]) for s in delta["scores"]] == [(400, 1)]
+
+    def test_deleting_scores_bumps_the_version(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        log_scores_to_db(conn, [_score(game_id, player_id, room_id, 1)])
+        before = build_game_score_payload(conn, room_id, game_id)["version"]
+
+        conn.execute("DELETE FROM highscores WHERE game_id = ?", (game_id,))
+        conn.commit()
+
+        assert build_game_score_payload(conn, room_id, game_id)["version"] == before + 1
+
+    def test_large_writes_send_the_full_list(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        _, _, new_scores = log_scores_to_db(conn, [_score(game_id, player_id, room_id, s)
+                                                   for s in range(MAX_DELTA_SCORES + 1)])
+
+        with patch("app.modules.scores.emit_message") as mock_emit:
+            emit_new_scores(conn, new_scores)
+
+        event_name, payload = mock_emit.call_args.args
+        assert event_name == "game_score_update"
+        assert len(payload["scores"]) == MAX_DELTA_SCORES + 1
+
+
+def _set_scores_per_card(conn, room_id, per_card):
+    conn.execute("UPDATE settings SET scores_per_card = ? WHERE id = ?", (per_card, room_id))
+    conn.commit()
+    invalidate_room_settings(room_id)
+
+
+class TestScoresPerCard:
+    def test_top_scores_are_cut_per_game_in_sql(self, conn):
+        room_id = make_room(conn)
+        high = make_game(conn, room_id, game_name="High")
+        low = make_game(conn, room_id, game_name="Low")
+        conn.execute("UPDATE games SET sort_ascending = 'TRUE' WHERE id = ?", (low,))
+        player_id = make_player(conn)
+        log_scores_to_db(conn, [_score(game_id, player_id, room_id, s, timestamp=f"2026-01-01 00:00:{s:02d}")
+                                for game_id in (high, low) for s in [10, 40, 20, 30, 20]])
+        _set_scores_per_card(conn, room_id, 3)
+
+        rows = get_top_scores(conn, room_id)
+
+        assert [(row["game_id"], row["score"], row["rank"]) for row in rows] == [
+            (high, 40, 1), (high, 30, 2), (high, 20, 3),
+            (low, 10, 1), (low, 20, 2), (low, 30, 3),
+        ]
+        assert len(get_top_scores(conn, room_id, per_game=0)) == 8  # 0 = all (one 20 per game was a duplicate)
+
+    def test_score_list_pages_through_the_full_history(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        log_scores_to_db(conn, [_score(game_id, player_id, room_id, s, timestamp=f"2026-01-01 00:00:{s:02d}")
+                                for s in range(1, 11)])
+        _set_scores_per_card(conn, room_id, 2)
+
+        card = build_game_score_payload(conn, room_id, game_id)
+        page = build_game_score_payload(conn, room_id, game_id, offset=4, limit=3)
+
+        assert [s["score"] for s in card["scores"]] == [10, 9]
+        assert [s["score"] for s in page["scores"]] == [6, 5, 4]
+        assert page["total"] == 10
+
+    def test_delta_leaves_out_scores_below_the_card(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        player_id = make_player(conn)
+        log_scores_to_db(conn, [_score(game_id, player_id, room_id, s, timestamp=f"2026-01-01 00:00:0{s}")
+                                for s in (5, 6, 7)])
+        _set_scores_per_card(conn, room_id, 2)
+
+        _, _, new_scores = log_scores_to_db(conn, [
+            _score(game_id, player_id, room_id, 9, timestamp="2026-01-02 00:00:00"),
+            _score(game_id, player_id, room_id, 1, timestamp="2026-01-02 00:00:01"),
+        ])
+        with patch("app.modules.scores.emit_message") as mock_emit:
+            emit_new_scores(conn, new_scores)
+
+        _, delta = mock_emit.call_args.args
+        assert [(s["score"], s["rank"]) for s in delta["scores"]] == [(9, 1)]
+        assert delta["version"] == delta["baseVersion"] + 2  # The unsent score still moves the version on
+        assert delta["scoresPerCard"] == 2
+
+    def test_hidden_players_dont_take_places_on_the_card(self, conn):
+        room_id = make_room(conn)
+        game_id = make_game(conn, room_id)
+        shown = make_player(conn, full_name="Shown", default_alias="SHO")
+        hidden = make_player(conn, full_name="Hidden", default_alias="HID")
+        conn.execute("UPDATE players SET hidden = 'TRUE' WHERE id = ?", (hidden,))
+        log_scores_to_db(conn, [_score(game_id, hidden, room_id, 100, timestamp="2026-01-01 00:00:00")] +
+                         [_score(game_id, shown, room_id, s, timestamp=f"2026-01-01 00:00:0{s}") for s in (1, 2, 3)])
+        _set_scores_per_card(conn, room_id, 2)
+
+        assert [(row["score"], row["rank"]) for row in get_top_scores(conn, room_id)] == [(3, 1), (2, 2)]
+        card = build_game_score_payload(conn, room_id, game_id)
+        assert [s["score"] for s in card["scores"]] == [3, 2]
+        assert card["total"] == 3
+
+        _, _, new_scores = log_scores_to_db(conn, [
+            _score(game_id, shown, room_id, 4, timestamp="2026-01-02 00:00:00"),
+            _score(game_id, hidden, room_id, 200, timestamp="2026-01-02 00:00:01"),
+        ])
+        with patch("app.modules.scores.emit_message") as mock_emit:
+            emit_new_scores(conn, new_scores)
+
+        _, delta = mock_emit.call_args.args
+        assert [(s["score"], s["rank"]) for s in delta["scores"]] == [(4, 1)]
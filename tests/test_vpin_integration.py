@@ -0,0 +1,94 @@
+"""Tests for the VPin game import pipeline (app/modules/vpin_integration.py).
+
+fetch_vpin_game (the network half) is patched with a fake that sleeps
+cooperatively, so these exercise the pipeline itself: parallel fetches,
+the single writer, per-game failure isolation and progress callbacks.
+"""
+from unittest.mock import patch
+
+import eventlet
+import pytest
+from flask import Flask
+
+from app.modules.vpin_integration import import_vpin_games_into_room
+from tests.conftest import make_room, make_player
+
+SERVER = "http://vpin.local:8089/"
+STYLE = {"css_score_cards": None, "css_initials": None, "css_scores": None, "css_box": None, "css_title": None}
+
+
+@pytest.fixture
+def app_context():
+    app = Flask(__name__)
+    app.config["VPIN_IMPORT_CONCURRENCY"] = 3
+    with app.app_context():
+        yield app
+
+
+def _fake_fetch(in_flight, peak, player_id=None, fail_ids=()):
+    def fetch(vpin_api_url, game, options):
+        in_flight.append(game["id"])
+        peak.append(len(in_flight))
+        eventlet.sleep(0.01 * (game["id"] % 3))
+        in_flight.remove(game["id"])
+        if game["id"] in fail_ids:
+            raise ConnectionError("VPin Studio went away")
+        scores = None
+        if player_id:
+            scores = [{"player_id": player_id, "score": game["id"] * 100, "timestamp": "2026-01-01 00:00:00"}]
+        return {"game": game, "game_image": "", "game_background": "", "scores": scores}
+    return fetch
+
+
+class TestImportPipeline:
+    def test_fetches_in_parallel_and_saves_every_game(self, conn, app_context):
+        room_id = make_room(conn)
+        player_id = make_player(conn)
+        games = [{"id": i, "name": f"Table {i}"} for i in range(1, 9)]
+        in_flight, peak, stages = [], [], []
+
+        with patch("app.modules.vpin_integration.fetch_vpin_game", _fake_fetch(in_flight, peak, player_id, fail_ids={4})), \
+             patch("app.modules.games.emit_message"), patch("app.modules.scores.emit_message"):
+            results = import_vpin_games_into_room(
+                conn, SERVER, room_id, games, STYLE, {"sync_historical_scores": True},
+                on_progress=lambda stage, game, result: stages.append((stage, game["id"])),
+            )
+
+        assert max(peak) == 3
+        assert [r["vpin_game_id"] for r in results] == list(range(1, 9))
+        assert [r["vpin_game_id"] for r in results if not r["success"]] == [4]
+        assert "VPin Studio went away" in results[3]["message"]
+        assert conn.execute("SELECT COUNT(*) FROM vpin_games").fetchone()[0] == 7
+        assert conn.execute("SELECT COUNT(*) FROM highscores").fetchone()[0] == 7
+        assert sorted(game_id for stage, game_id in stages if stage == "saved") == list(range(1, 9))
+
+    def test_running_again_updates_in_place(self, conn, app_context):
+        room_id = make_room(conn)
+        player_id = make_player(conn)
+        games = [{"id": i, "name": f"Table {i}"} for i in range(1, 4)]
+
+        with patch("app.modules.vpin_integration.fetch_vpin_game", _fake_fetch([], [], player_id)), \
+             patch("app.modules.games.emit_message"), patch("app.modules.scores.emit_message"):
+            first = import_vpin_games_into_room(conn, SERVER, room_id, games, STYLE, {"sync_historical_scores": True})
+            second = import_vpin_games_into_room(conn, SERVER, room_id, games, lambda game: STYLE, {"sync_historical_scores": True})
+
+        assert [r["game_id"] for r in first] == [r["game_id"] for r in second]
+        assert all("updated" in r["message"] for r in second)
+        assert conn.execute("SELECT COUNT(*) FROM games WHERE room_id = ?", (room_id,)).fetchone()[0] == 3
+        assert conn.execute("SELECT COUNT(*) FROM highscores").fetchone()[0] == 3
+
+    def test_a_failing_progress_callback_doesnt_stall_the_writer(self, conn, app_context):
+        room_id = make_room(conn)
+        games = [{"id": i, "name": f"Table {i}"} for i in range(1, 4)]
+
+        def on_progress(stage, game, result):
+            if stage == "fetching" and game["id"] == 2:
+                raise ConnectionError("Socket gone")
+
+        with patch("app.modules.vpin_integration.fetch_vpin_game", _fake_fetch([], [])), \
+             patch("app.modules.games.emit_message"), patch("app.modules.scores.emit_message"), \
+             eventlet.Timeout(5):
+            results = import_vpin_games_into_room(conn, SERVER, room_id, games, STYLE, {}, on_progress=on_progress)
+
+        assert [r["success"] for r in results] == [True, False, True]
+        assert "Socket gone" in results[1]["message"]
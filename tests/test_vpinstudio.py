@@ -0,0 +1,80 @@
+"""Tests for VPin Studio media retrieval (app/modules/vpinstudio.py) and the
+media fallback timings the import reports (app/modules/vpin_integration.py)."""
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from app.modules.vpin_integration import _fetch_media_for_game
+from app.modules.vpinstudio import fetch_game_images, sniff_media_kind
+
+SERVER = "http://vpin.local:8089/"
+
+
+class _Response:
+    def __init__(self, body, status_code=200, content_type="application/octet-stream"):
+        self.body, self.status_code = body, status_code
+        self.headers = {"Content-Type": content_type}
+
+    def iter_content(self, chunk_size):
+        for offset in range(0, len(self.body), chunk_size):
+            yield self.body[offset:offset + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _png():
+    buffer = BytesIO()
+    Image.new("RGB", (40, 20)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestFetchGameImages:
+    def test_sniffs_the_body_over_the_content_type(self):
+        assert sniff_media_kind(_png(), "video/mp4") == "image"
+        assert sniff_media_kind(b"\x00\x00\x00\x18ftypmp42", "image/png") == "video"
+        assert sniff_media_kind(b"????", "image/x-tga") == "image"
+        assert sniff_media_kind(b"????", "text/html") is None
+
+    def test_one_request_per_asset(self):
+        mp4 = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 100
+        responses = {
+            f"{SERVER}api/v1/media/7/PlayField": _Response(mp4, content_type="image/png"),
+            f"{SERVER}api/v1/media/7/BackGlass": _Response(_png()),
+        }
+        requested = []
+
+        def get(url, **kwargs):
+            requested.append(url)
+            return responses[url]
+
+        with patch("app.modules.http_client.get", side_effect=get), \
+             patch("app.modules.vpinstudio.extract_first_frame", return_value="/img/frame.png") as extract, \
+             patch("app.modules.vpinstudio.save_image", return_value="/img/backglass.png") as save:
+            media = fetch_game_images(SERVER, 7)
+
+        assert sorted(requested) == sorted(responses)
+        assert media["playfield"] == "/img/frame.png" and media["backglass"] == "/img/backglass.png"
+        assert extract.call_args.kwargs["response"] is responses[f"{SERVER}api/v1/media/7/PlayField"]
+        assert extract.call_args.kwargs["prefix"] == mp4  # Carried on from the bytes already read
+        assert save.call_args.args[0] == _png()
+        assert set(media["timings_ms"]) == {"playfield", "backglass"}
+
+    def test_missing_media_falls_back_to_vps_with_timings(self):
+        with patch("app.modules.http_client.get", return_value=_Response(b"", status_code=404)), \
+             patch("app.modules.vpin_integration.fetch_vpspreadsheet_media",
+                   return_value={"backglass": "/vps/bg.png", "playfield": "/vps/pf.png"}):
+            game_image, game_background, timings = _fetch_media_for_game(
+                SERVER, {"id": 7, "name": "Table", "extTableId": "t", "extTableVersionId": "v"}, "original", "fallback",
+            )
+
+        assert (game_image, game_background) == ("/vps/bg.png", "/vps/pf.png")
+        assert set(timings) == {"vpin_studio", "vp_spreadsheet", "total"}
+        assert set(timings["vpin_studio"]) == {"playfield", "backglass", "total"}
@@ -0,0 +1,136 @@
+"""Tests for the indexed VPS database (app/modules/vpspreadsheet.py), its
+search/lookup endpoints and the refresher that keeps it up to date."""
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from app.modules import vpspreadsheet
+from app.routes.api.v1.settings import settings_bp
+
+VPSDB = [
+    {"id": "afm", "name": "Attack from Mars", "manufacturer": "Bally", "year": 1995, "type": "SS",
+     "tableFiles": [{"id": "afm-1", "imgUrl": "https://vps/afm-pf.png"}], "b2sFiles": [{"imgUrl": "https://vps/afm-bg.png"}]},
+    {"id": "mm", "name": "Medieval Madness", "manufacturer": "Williams", "year": 1997, "type": "SS", "tableFiles": []},
+    {"id": "tz", "name": "Twilight Zone", "manufacturer": "Bally", "year": 1993, "type": "SS", "tableFiles": []},
+    {"id": "ww", "name": "Whirlwind", "manufacturer": "Williams", "year": 1990, "type": "SS", "tableFiles": []},
+]
+
+
+class _Response:
+    def __init__(self, data, status_code=200):
+        self.data, self.status_code = data, status_code
+
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise ConnectionError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.data
+
+    def iter_content(self, chunk_size):
+        body = json.dumps(self.data).encode()
+        for offset in range(0, len(body), chunk_size):
+            yield body[offset:offset + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+@pytest.fixture
+def vps_app(tmp_path, monkeypatch):
+    for name, value in (("last_checked_time", None), ("cached_last_updated", None),
+                        ("vps_games_by_id", {}), ("vps_index_path", None), ("_status", dict(vpspreadsheet._status))):
+        monkeypatch.setattr(vpspreadsheet, name, value)
+    app = Flask(__name__, root_path=str(tmp_path))
+    app.register_blueprint(settings_bp)
+    app.github = {"last_updated": 1739134823243, "vpsdb": VPSDB, "status_code": 200}
+
+    def get(url, **kwargs):
+        if url == vpspreadsheet.VPS_LAST_UPDATED_URL:
+            return _Response(app.github["last_updated"], app.github["status_code"])
+        return _Response(app.github["vpsdb"], app.github["status_code"])
+
+    with patch("app.modules.http_client.get", side_effect=get), app.app_context():
+        yield app
+
+
+class TestVpsIndex:
+    def test_search_matches_name_and_manufacturer_prefixes(self, vps_app):
+        assert [g["id"] for g in vpspreadsheet.search_vps_games("attack mar")["results"]] == ["afm"]
+        assert {g["id"] for g in vpspreadsheet.search_vps_games("bal")["results"]} == {"afm", "tz"}
+        assert [g["id"] for g in vpspreadsheet.search_vps_games('twi* "zone (')["results"]] == ["tz"]  # FTS syntax is just text
+        assert vpspreadsheet.search_vps_games("attack williams")["results"] == []  # Every word has to match
+
+    def test_lookup_and_pagination_endpoints(self, vps_app):
+        client = vps_app.test_client()
+
+        first = client.get("/api/v1/vps/games?per_page=3").get_json()
+        second = client.get("/api/v1/vps/games?per_page=3&page=2").get_json()
+        game = client.get("/api/v1/vps/games/afm").get_json()
+
+        assert first["total"] == 4 and [g["name"] for g in first["results"]] == ["Attack from Mars", "Medieval Madness", "Twilight Zone"]
+        assert [g["name"] for g in second["results"]] == ["Whirlwind"]
+        assert first["results"][0] == {"id": "afm", "name": "Attack from Mars", "manufacturer": "Bally", "year": 1995,
+                                       "type": "SS", "imgUrl": "https://vps/afm-bg.png", "tableCount": 1}
+        assert game["tableFiles"][0]["id"] == "afm-1"
+        assert client.get("/api/v1/vps/games/nope").status_code == 404
+
+    def test_index_is_reused_until_the_data_changes(self, vps_app, monkeypatch):
+        vpspreadsheet.fetch_vps_data()
+        with patch("app.modules.vpspreadsheet.sqlite3.connect", wraps=vpspreadsheet.sqlite3.connect) as connect:
+            vpspreadsheet.fetch_vps_data(force_refresh=True)
+
+        assert connect.call_count == 1  # Only the check of the stamp - no rebuild
+
+
+class TestVpsRefresher:
+    def test_a_failed_refresh_keeps_serving_the_local_copy(self, vps_app):
+        assert vpspreadsheet.refresh_vps_data() == "updated"
+        vps_app.github.update(last_updated=1739134899999, status_code=503)
+
+        assert vpspreadsheet.refresh_vps_data() == "failed"
+        assert vpspreadsheet.get_vps_game("afm").name == "Attack from Mars"
+        status = vpspreadsheet.get_vps_status()
+        assert (status["last_result"], status["failures"], status["games"]) == ("failed", 1, 4)
+        assert status["bytes"] > 0 and "503" in status["last_error"]
+
+        vps_app.github.update(status_code=200, vpsdb=VPSDB[:1])
+        assert vpspreadsheet.refresh_vps_data() == "updated"
+        assert vpspreadsheet.get_vps_game("mm") is None
+
+    def test_refreshes_are_single_flight(self, vps_app):
+        with vpspreadsheet._refresh_lock:
+            assert vpspreadsheet.refresh_vps_data() == "running"
+        assert vpspreadsheet.refresh_vps_data() == "updated"
+        assert vpspreadsheet.refresh_vps_data() == "unchanged"
+
+
+class TestCompactCache:
+    def test_streaming_parser_handles_elements_split_across_chunks(self):
+        data = [{"id": "a]", "n": [1, {"x": "}"}]}, 12345, "s,", None, [], {"year": 1995.5}]
+        for chunk_size in (1, 2, 7, 4096):
+            assert list(vpspreadsheet.iter_json_array(io.StringIO(json.dumps(data, indent=1)), chunk_size)) == data
+        assert list(vpspreadsheet.iter_json_array(io.StringIO(" [ ] "))) == []
+
+    def test_restart_loads_the_snapshot_without_parsing_json(self, vps_app, tmp_path, monkeypatch):
+        vpspreadsheet.refresh_vps_data()
+        client = vps_app.test_client()
+        assert client.get("/api/vpsdata").get_json() == VPSDB  # The original file, every field
+        monkeypatch.setattr(vpspreadsheet, "vps_games_by_id", {})
+        monkeypatch.setattr(vpspreadsheet, "vps_index_path", None)
+        (tmp_path / "vps-data" / "vpsdb.json").write_text("not json")
+
+        vpspreadsheet._load_vps_data(*vpspreadsheet.get_vps_paths())
+
+        game = vpspreadsheet.get_vps_game("afm")
+        assert game.table_image("afm-1") == "https://vps/afm-pf.png" and game.backglass_url == "https://vps/afm-bg.png"
+        assert client.get("/api/v1/vps/games/afm").get_json() == {
+            "id": "afm", "name": "Attack from Mars", "manufacturer": "Bally", "year": 1995, "type": "SS",
+            "b2sFiles": [{"imgUrl": "https://vps/afm-bg.png"}], "tableFiles": [{"id": "afm-1", "imgUrl": "https://vps/afm-pf.png"}],
+        }
@@ -14,6 +14,7 @@ from app.modules.webhooks import (
     webhook_game,
     webhook_delete_game,
     webhook_pause_state,
+    can_view_score_event,
 )
 from tests.conftest import make_room, make_game, make_webhook, make_player, link_vpin_game, link_vpin_player
 
@@ -48,7 +49,7 @@ class TestWebhookLogScore:
         assert result["success"] is False
         assert "Invalid or missing webhook token" in result["error"]
 
-    @patch("app.modules.webhooks.requests.get")
+    @patch("app.modules.http_client.get")
     def test_logs_a_new_score_and_emits_update(self, mock_get, conn):
         room_id = make_room(conn)
         make_webhook(conn, room_id, webhook_token="tok")
@@ -59,7 +60,8 @@ class TestWebhookLogScore:
 
         mock_get.return_value = _score_response(vpin_player_id=7, score=123456)
 
-        with patch("app.modules.webhooks.emit_message") as mock_emit:
+        # The score event is built and sent by the shared scores.emit_new_scores
+        with patch("app.modules.scores.emit_message") as mock_emit:
             result = webhook_log_score(conn, {"roomID": room_id, "id": 42, "token": "tok"})
 
         assert result["success"] is True
@@ -69,12 +71,15 @@ class TestWebhookLogScore:
 
         mock_emit.assert_called_once()
         event_name, payload = mock_emit.call_args.args
-        assert event_name == "game_score_update"
+        assert event_name == "game_score_delta"
         assert payload["gameID"] == game_id
+        assert [entry["score"] for entry in payload["scores"]] == [123456]
+        assert payload["scores"][0]["rank"] == 1
+        assert payload["version"] == payload["baseVersion"] + 1
         assert payload["roomID"] == room_id
         assert mock_emit.call_args.kwargs["room"] == f"room_{room_id}"
 
-    @patch("app.modules.webhooks.requests.get")
+    @patch("app.modules.http_client.get")
     def test_duplicate_score_is_not_logged_twice(self, mock_get, conn):
         """Regression: dedup is checked by exact (game, player, score, timestamp,
         room) match - the same webhook firing twice for an already-seen score
@@ -97,7 +102,7 @@ class TestWebhookLogScore:
         count = conn.execute("SELECT COUNT(*) c FROM highscores WHERE game_id = ?", (game_id,)).fetchone()["c"]
         assert count == 1
 
-    @patch("app.modules.webhooks.requests.get")
+    @patch("app.modules.http_client.get")
     def test_auto_unhides_a_hidden_game_when_room_has_auto_hide_enabled(self, mock_get, conn):
         """A hidden (no-score) game becomes visible again the moment a real
         score lands, when the room's auto-hide setting is on."""
@@ -117,9 +122,19 @@ class TestWebhookLogScore:
         hidden = conn.execute("SELECT hidden FROM games WHERE id = ?", (game_id,)).fetchone()["hidden"]
         assert hidden == "FALSE"
 
+    def test_event_details_need_the_rooms_token(self, conn):
+        room_id = make_room(conn)
+        other_room_id = make_room(conn, user="other")
+        make_webhook(conn, room_id, webhook_token="correct-token")
+
+        assert can_view_score_event(conn, room_id, "correct-token")
+        assert not can_view_score_event(conn, room_id, "wrong-token")
+        assert not can_view_score_event(conn, room_id, None)
+        assert not can_view_score_event(conn, other_room_id, "correct-token")  # No webhook there
+
 
 class TestWebhookPlayer:
-    @patch("app.modules.webhooks.requests.get")
+    @patch("app.modules.http_client.get")
     def test_create_uses_name_and_initials_not_fullname_alias(self, mock_get, conn):
         """Regression for VPIN-14: VPin Studio's real player object uses "name"
         and a single "initials" string - there is no fullName/alias/aliases
@@ -140,7 +155,7 @@ class TestWebhookPlayer:
         assert player["full_name"] == "Michael Morris"
         assert player["default_alias"] == "MDM"
 
-    @patch("app.modules.webhooks.requests.get")
+    @patch("app.modules.http_client.get")
     def test_update_preserves_existing_link_and_changes_name(self, mock_get, conn):
         room_id = make_room(conn)
         make_webhook(conn, room_id, webhook_token="tok")
@@ -177,7 +192,7 @@ class TestWebhookDeletePlayer:
 
 class TestWebhookGame:
     @patch("app.modules.webhooks.fetch_game_images")
-    @patch("app.modules.webhooks.requests.get")
+    @patch("app.modules.http_client.get")
     def test_new_game_applies_rooms_default_preset(self, mock_get, mock_media, conn):
         """Regression: webhook_game used to hardcode css_score_cards/css_initials/
         css_scores/css_box/css_title to None for every new game, ignoring the
@@ -213,7 +228,7 @@ class TestWebhookGame:
         }
 
     @patch("app.modules.webhooks.fetch_game_images")
-    @patch("app.modules.webhooks.requests.get")
+    @patch("app.modules.http_client.get")
     def test_update_preserves_existing_color_and_style(self, mock_get, mock_media, conn):
         """Regression: a plain UPDATE webhook (e.g. a name change in VPin
         Studio) used to blank an already-styled game's CSS and color back to